@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+勘定科目表のキャッシュ
+全勘定科目を1回のクエリで読み込み、ID・科目コード・科目名からの引き当てと
+親科目の階層をプロセス内で共有する仕組み
+
+勘定科目の追加・変更・削除はフラッシュ時に CHART_VERSION の世代番号を進めるので、
+別プロセスでの変更も含めて次に参照したときに作り直される。
+
+階層は親子の深さ優先順（兄弟は科目コード順）に並べ、各科目の子孫が [start, end) の
+連続した位置に入るようにしてある。親科目の小計は、科目ごとの金額をこの順に並べた
+累積和の差で求まるため、末端科目の金額を1回なめるだけで全親科目の小計が出る。
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import event
+
+from cache_versions import CHART_VERSION, bump_version, current_version
+from models import db, AccountingAccount
+
+_cache = {}
+_cache_lock = threading.Lock()
+# 未コミットのトランザクションで勘定科目表の世代番号を進めたか（session.info のキー）
+_CHART_BUMPED = 'account_chart_bumped'
+
+
+class ChartAccount:
+    """勘定科目（キャッシュ用の読み取り専用の写し）"""
+
+    __slots__ = ('id', 'account_code', 'account_name', 'account_type', 'parent_account_id', 'is_active',
+                 'bank_name', 'branch_name', 'level', 'start', 'end')
+
+    def __init__(self, id, account_code, account_name, account_type, parent_account_id, is_active,
+                 bank_name, branch_name):
+        self.id = id
+        self.account_code = account_code
+        self.account_name = account_name
+        self.account_type = account_type
+        self.parent_account_id = parent_account_id
+        self.is_active = bool(is_active)
+        self.bank_name = bank_name
+        self.branch_name = branch_name
+        self.level = 0  # 階層の深さ（親のない科目は 0）
+        self.start = self.end = 0  # 部分木の範囲（AccountChart.order の位置）
+
+
+class AccountChart:
+    """勘定科目表（科目コード順の一覧・引き当て用の辞書・部分木の範囲）"""
+
+    def __init__(self, version: int, accounts: Iterable[ChartAccount]):
+        self.version = version
+        self.accounts = sorted(accounts, key=lambda account: account.account_code)
+        self.active_accounts = [account for account in self.accounts if account.is_active]
+        self.by_id = {account.id: account for account in self.accounts}
+        self.by_code = {account.account_code: account for account in self.accounts}
+        self.by_name = {}
+        for account in sorted(self.accounts, key=lambda account: account.id):
+            self.by_name.setdefault(account.account_name, account)
+
+        self.children = {}
+        for account in self.accounts:
+            if account.parent_account_id in self.by_id:
+                self.children.setdefault(account.parent_account_id, []).append(account)
+        self.order = self._depth_first_order()
+
+    def _depth_first_order(self) -> List[ChartAccount]:
+        """深さ優先順に並べて level / start / end を設定する（親の循環は親なしとして扱う）"""
+        order = []
+        placed = set()
+        roots = [account for account in self.accounts if account.parent_account_id not in self.by_id]
+
+        def place(root):
+            root.level = 0
+            stack = [(root, False)]
+            while stack:
+                account, finished = stack.pop()
+                if finished:
+                    account.end = len(order)
+                    continue
+                account.start = len(order)
+                order.append(account)
+                placed.add(account.id)
+                stack.append((account, True))
+                for child in reversed(self.children.get(account.id, [])):
+                    if child.id not in placed:
+                        child.level = account.level + 1
+                        stack.append((child, False))
+
+        for root in roots:
+            place(root)
+        # 親をたどると循環している科目は、残ったものから親なしとして並べる
+        for account in self.accounts:
+            if account.id not in placed:
+                place(account)
+        return order
+
+    def get(self, account_id: int) -> Optional[ChartAccount]:
+        return self.by_id.get(account_id)
+
+    def account_for_code(self, account_code: str) -> Optional[ChartAccount]:
+        return self.by_code.get(account_code)
+
+    def account_for_name(self, account_name: str) -> Optional[ChartAccount]:
+        """科目名の科目（同名の科目が複数あれば ID の小さい方）"""
+        return self.by_name.get(account_name)
+
+    def subtree(self, account_id: int) -> List[ChartAccount]:
+        """科目と、その子孫の科目（深さ優先順）"""
+        account = self.by_id[account_id]
+        return self.order[account.start:account.end]
+
+    def is_descendant(self, account_id: int, ancestor_id: int) -> bool:
+        """account_id が ancestor_id 自身またはその子孫か"""
+        account, ancestor = self.by_id.get(account_id), self.by_id.get(ancestor_id)
+        return bool(account and ancestor and ancestor.start <= account.start < ancestor.end)
+
+    def roll_up(self, amounts: Dict[int, int]) -> Dict[int, int]:
+        """科目ID → 金額 から、科目ID → 自科目と子孫の合計 を求める"""
+        prefix = [0]
+        for account in self.order:
+            prefix.append(prefix[-1] + amounts.get(account.id, 0))
+        return {account.id: prefix[account.end] - prefix[account.start] for account in self.order}
+
+
+def _has_pending_account_changes(session) -> bool:
+    """セッションに未フラッシュの勘定科目の変更があるか"""
+    return any(isinstance(obj, AccountingAccount) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+def load_account_chart() -> AccountChart:
+    """勘定科目表をデータベースから読み込む
+
+    未フラッシュの変更を読み込まないよう、世代番号と科目は autoflush なしで読む。
+    """
+    with db.session.no_autoflush:
+        version = current_version(CHART_VERSION)
+        rows = db.session.query(
+            AccountingAccount.id, AccountingAccount.account_code, AccountingAccount.account_name,
+            AccountingAccount.account_type, AccountingAccount.parent_account_id, AccountingAccount.is_active,
+            AccountingAccount.bank_name, AccountingAccount.branch_name
+        ).all()
+    return AccountChart(version, [ChartAccount(*row) for row in rows])
+
+
+def account_chart() -> AccountChart:
+    """勘定科目表（世代番号が同じ間はキャッシュを返す。返す科目表は共有されるため変更しないこと）
+
+    勘定科目を変更中（未コミット）のセッションで読み込んだ科目表はロールバックされうるため、キャッシュしない。
+    """
+    key = str(db.engine.url)
+    with db.session.no_autoflush:
+        version = current_version(CHART_VERSION)
+    with _cache_lock:
+        chart = _cache.get(key)
+        if chart is not None and chart.version == version:
+            return chart
+
+    chart = load_account_chart()
+    if not _has_pending_account_changes(db.session) and not db.session.info.get(_CHART_BUMPED):
+        with _cache_lock:
+            _cache[key] = chart
+    return chart
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_chart_version(session, flush_context, instances):
+    """勘定科目の追加・変更・削除で勘定科目表のキャッシュを無効化する"""
+    if _has_pending_account_changes(session):
+        bump_version(session.connection(), CHART_VERSION)
+        session.info[_CHART_BUMPED] = True
+
+
+@event.listens_for(db.session, 'after_commit')
+@event.listens_for(db.session, 'after_rollback')
+def _clear_chart_bumped(session):
+    session.info.pop(_CHART_BUMPED, None)
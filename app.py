@@ -1,8 +1,9 @@
-from flask import Flask, render_template, redirect, url_for, request, flash, make_response, jsonify
+from flask import Flask, render_template, redirect, url_for, request, flash, make_response, jsonify, send_file
 import urllib.parse
 # Flask-Login: User session management for Flask
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.datastructures import MultiDict
 import os
 import uuid
 import io
@@ -12,17 +13,38 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm, inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image as RLImage, PageBreak
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.utils import ImageReader
 from weasyprint import HTML, CSS
 from models import (db, User, Employee, LeaveCredit, LeaveRecord, 
                     CompanyCalendar, CalendarSettings, LeaveRequest, PersonalInfoRequest, PerformanceEvaluation,
                     WorkingTimeRecord, PayrollCalculation, CompanySettings, LaborStandardsSettings, LegalHolidaySettings, Agreement36History, Agreement36,
                     PayrollSlip, EmployeePayrollSettings, AccountingAccount, JournalEntry, JournalEntryDetail, GeneralLedger, TransactionPattern, BusinessPartner,
-                    AccountingPeriod, OpeningBalance)
+                    AccountingPeriod, OpeningBalance, BackgroundJob, BankStatementLine)
+from fiscal_periods import fiscal_date_range, fiscal_months, fiscal_period_dates, fiscal_year_range
+from trial_balance import trial_balance_for
+from account_chart import account_chart  # 読み込み時に勘定科目表のキャッシュを無効化するイベントを登録
+from year_end_carryover import apply_carryover, plan_carryover
+from ledger_balances import ledger_lines, ledger_page, parse_ledger_cursor  # 読み込み時に総勘定元帳の月次残高を更新するイベントを登録
 from payroll_slip_pdf_generator import create_payroll_slip_pdf
 from timecard_pdf_generator import create_timecard_pdf
+from pdf_fonts import japanese_font_pair, warm_up_fonts
+from payroll_batch import PayrollBatchEngine
+from leave_balances import leave_balance, leave_balances, next_auto_grant_date
+from leave_grants import due_grants, grant_due_leave, legal_leave_days as legal_grant_days
+from payroll_slip_bulk import iter_slip_zip_entries, load_slip_jobs, render_slips_to_zip
+from wage_register_manager import WageRegisterManager, register_values
+from wage_ledger_bulk import iter_ledger_zip_entries, load_wage_ledger_jobs, render_ledgers_to_zip, render_wage_ledger
+from zip_stream import streaming_zip_response
+from excel_export import AMOUNT_FORMAT, DASHED, DOUBLE, MEDIUM, MEIRYO, MINCHO, THIN, ExcelWorkbook
+from financial_statement_excel import DEFAULT_PAGE_PROFILE, render_financial_statements
+from weekly_overtime import apply_weekly_limit
+from date_ranges import in_date_range, in_month, in_year, month_date_range
+from attendance_import import AttendanceImporter
+from tabular_import import iter_file_rows
+from bank_statement_import import BankStatementImporter, pending_statement_lines, resolve_statement_lines
+from job_queue import JOB_HANDLERS, job_status, register_job, submit_job
+from attendance_store import (bulk_upsert_working_time, classify_working_minutes, load_company_holidays,
+                              resolve_holiday_flags)
 from datetime import date, datetime, timedelta
 import calendar
 from openpyxl import Workbook
@@ -51,7 +73,10 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 
-# 年次有給休暇の自動付与ロジック
+# PDF用フォントを起動時に1回だけ登録
+warm_up_fonts()
+
+# 年次有給休暇の自動付与ロジック（付与日・付与日数は leave_grants で暦どおりに求める）
 def calculate_annual_leave_days(join_date, current_date=None):
     """
     日本の労働基準法に基づく年次有給休暇の付与日数を計算
@@ -60,94 +85,33 @@ def calculate_annual_leave_days(join_date, current_date=None):
     - 6ヶ月継続勤務：10日付与
     - 1年6ヶ月継続勤務：11日付与
     - 2年6ヶ月継続勤務：12日付与
-    - 以降1年ごとに1日追加（最大20日）
+    - 以降14日、16日、18日、6年6ヶ月以降は20日
     """
-    if current_date is None:
-        current_date = date.today()
-    
-    # 入社日から現在までの勤続期間を計算
-    years_of_service = (current_date - join_date).days / 365.25
-    
-    if years_of_service < 0.5:  # 6ヶ月未満
-        return 0
-    elif years_of_service < 1.5:  # 6ヶ月〜1年6ヶ月未満
-        return 10
-    elif years_of_service < 2.5:  # 1年6ヶ月〜2年6ヶ月未満
-        return 11
-    else:  # 2年6ヶ月以降
-        # 2年6ヶ月以降は1年ごとに1日追加（最大20日）
-        additional_days = min(int(years_of_service - 2.5), 8)  # 最大8日追加
-        return 12 + additional_days
+    return legal_grant_days(join_date, current_date)
 
 def should_auto_grant_leave(employee, current_date=None):
     """
     年次有給休暇の自動付与が必要かどうかを判定
-    入社から6ヶ月経過時点から自動付与可能
+    直近の法定付与日（入社から6ヶ月後、以降1年ごと）以降に付与がなければ付与する
     """
-    if current_date is None:
-        current_date = date.today()
-    
-    # 入社日がNoneの場合は付与しない
-    if not employee.join_date:
-        return False
-    
-    # 入社日から6ヶ月経過しているかチェック
-    days_since_join = (current_date - employee.join_date).days
-    
-    if days_since_join < 182:  # 約6ヶ月 (182日)
-        return False
-    
-    # 前回の自動付与日をチェック
-    last_auto_grant = db.session.query(LeaveCredit)\
-        .filter(LeaveCredit.employee_id == employee.id)\
-        .order_by(LeaveCredit.date_credited.desc())\
-        .first()
-    
-    # 初回付与（6ヶ月経過時点）の場合
-    if not last_auto_grant:
-        return days_since_join >= 182  # 6ヶ月経過していれば付与
-    
-    # 2回目以降の付与（前回から1年経過）の場合
-    days_since_last_grant = (current_date - last_auto_grant.date_credited).days
-    if days_since_last_grant >= 365:  # 1年経過していれば付与
-        return True
-    
-    return False
+    return bool(due_grants(current_date, [employee.id]))
 
 @app.route('/auto_grant_annual_leave', methods=['GET', 'POST'])
 @login_required
 def auto_grant_annual_leave():
-    # ... 関数の処理 ...
+    # 定期実行は python leave_grants.py（cron）。この画面からは同じ処理を手動で実行する
     if current_user.role != 'admin':
         flash('アクセス権がありません。')
         return redirect(url_for('leave_management'))
     
     try:
-        current_date = date.today()
-        granted_count = 0
+        # 付与日を迎えた全従業員分を一括登録
+        grants = grant_due_leave(date.today())
         
-        # 全従業員をチェック
-        employees = Employee.query.filter_by(status='在籍中').all()
-        
-        for employee in employees:
-            if should_auto_grant_leave(employee, current_date):
-                # 法律に基づく付与日数を計算
-                days_to_grant = calculate_annual_leave_days(employee.join_date, current_date)
-                
-                if days_to_grant > 0:
-                    # 自動付与を記録
-                    new_leave_credit = LeaveCredit(
-                        employee_id=employee.id,
-                        days_credited=days_to_grant,
-                        date_credited=current_date
-                    )
-                    
-                    db.session.add(new_leave_credit)
-                    granted_count += 1
-        
-        if granted_count > 0:
-            db.session.commit()
-            flash(f'{granted_count}名の従業員に年次有給休暇を自動付与しました。')
+        # 付与の有無にかかわらずコミットして書き込みロックを解放する
+        db.session.commit()
+        if grants:
+            flash(f'{len({grant.employee_id for grant in grants})}名の従業員に年次有給休暇を自動付与しました。')
         else:
             flash('自動付与対象の従業員はいませんでした。')
             
@@ -228,174 +192,19 @@ def set_calendar_setting(key, value, description=None):
         db.session.add(setting)
     db.session.commit()
 
-def setup_japanese_font():
-    """日本語フォント設定の共通関数 - CIDフォント優先版"""
-    
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    
-    # まずCIDフォントを試行（最も確実）
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),  # 日本語ゴシック
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),        # 日本語明朝
-    ]
-    
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            print(f"✓ setup_japanese_font: CIDフォント {regular_name} 登録成功")
-            return regular_name, bold_name
-        except Exception as e:
-            print(f"✗ setup_japanese_font: CIDフォント {regular_name} 登録失敗: {e}")
-            continue
-    
-    # CIDフォント失敗時のTTFフォント試行
-    font_configs = [
-        # DejaVu Sans（システム標準）
-        {
-            'paths': ['/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'],
-            'regular': 'DejaVuSans-Regular',
-            'bold': 'DejaVuSans-Bold'
-        },
-        
-        # Liberation Sans
-        {
-            'paths': ['/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'],
-            'regular': 'LiberationSans-Regular', 
-            'bold': 'LiberationSans-Bold'
-        }
-    ]
-    
-    # フォントを順番に試行
-    for config in font_configs:
-        for font_path in config['paths']:
-            try:
-                # レギュラーフォント登録
-                pdfmetrics.registerFont(TTFont(config['regular'], font_path))
-                
-                # ボールドフォント登録（ボールド版が存在する場合）
-                bold_path = font_path.replace('Regular', 'Bold').replace('regular', 'bold')
-                try:
-                    if os.path.exists(bold_path):
-                        pdfmetrics.registerFont(TTFont(config['bold'], bold_path))
-                    else:
-                        # ボールド版がない場合はレギュラーを使用
-                        config['bold'] = config['regular']
-                except:
-                    config['bold'] = config['regular']
-                
-                print(f"日本語フォント設定成功: {config['regular']}, {config['bold']}")
-                return config['regular'], config['bold']
-                
-            except Exception as e:
-                continue
-    
-    # フォールバック1: DejaVu Sans（基本的な文字をサポート）
-    try:
-        pdfmetrics.registerFont(TTFont('DejaVuSans', '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'))
-        pdfmetrics.registerFont(TTFont('DejaVuSans-Bold', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf'))
-        print("フォールバック: DejaVuSans使用")
-        return 'DejaVuSans', 'DejaVuSans-Bold'
-    except:
-        pass
-    
-    # フォールバック2: Ubuntu フォント（一部日本語文字サポート）
-    try:
-        # 実在するUbuntuフォントファイル
-        pdfmetrics.registerFont(TTFont('Ubuntu', '/usr/share/fonts/truetype/ubuntu/Ubuntu[wdth,wght].ttf'))
-        # ボールドも同じファイルから取得（Variable Font）
-        pdfmetrics.registerFont(TTFont('Ubuntu-Bold', '/usr/share/fonts/truetype/ubuntu/Ubuntu[wdth,wght].ttf'))
-        print("フォールバック: Ubuntuフォント使用（日本語の一部をサポート）")
-        return 'Ubuntu', 'Ubuntu-Bold'
-    except Exception as e:
-        print(f"Ubuntuフォント読み込み失敗: {e}")
-        pass
-    
-    # フォールバック3: Liberation フォント
-    try:
-        pdfmetrics.registerFont(TTFont('LiberationSans', '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'))
-        pdfmetrics.registerFont(TTFont('LiberationSans-Bold', '/usr/share/fonts/truetype/liberation/LiberationSans-Bold.ttf'))
-        print("フォールバック: Liberationフォント使用")
-        return 'LiberationSans', 'LiberationSans-Bold'
-    except:
-        pass
-    
-    # 最終フォールバック: ReportLab内蔵のTimes-Roman
-    try:
-        print("最終フォールバック: Times-Roman使用（日本語は表示されない可能性があります）")
-        return 'Times-Roman', 'Times-Bold'
-    except:
-        # 究極のフォールバック
-        print("警告: フォント設定に失敗。Helveticaを使用します。")
-        return 'Helvetica', 'Helvetica-Bold'
-
 def create_employee_pdf(employee):
     """従業員情報のPDFを生成 - CIDフォント版（確実な日本語表示）"""
     buffer = BytesIO()
     
-    # CIDフォント設定（日本語専用フォント）
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    
-    japanese_font = None
-    japanese_font_bold = None
-    
-    # CIDフォント候補を順番に試行
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),  # 日本語ゴシック
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),        # 日本語明朝
-    ]
-    
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            japanese_font = regular_name
-            japanese_font_bold = bold_name  # CIDフォントでは同じ名前
-            print(f"✓ CIDフォント {regular_name} 登録成功")
-            break
-        except Exception as e:
-            print(f"✗ CIDフォント {regular_name} 登録失敗: {e}")
-            continue
-    
-    # CIDフォント失敗時のTTFフォールバック
-    if japanese_font is None:
-        font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
-        if os.path.exists(font_path):
-            try:
-                pdfmetrics.registerFont(TTFont('JapaneseFont', font_path))
-                japanese_font = 'JapaneseFont'
-                japanese_font_bold = 'JapaneseFont'
-                print("TTFフォールバック: DejaVu Sans使用")
-            except:
-                japanese_font = 'Helvetica'
-                japanese_font_bold = 'Helvetica-Bold'
-        else:
-            japanese_font = 'Helvetica'
-            japanese_font_bold = 'Helvetica-Bold'
+    # 日本語フォント（登録はプロセスで1回だけ）
+    japanese_font, japanese_font_bold = japanese_font_pair()
     
     # 年休データを計算
-    total_credited = db.session.query(db.func.sum(LeaveCredit.days_credited))\
-                               .filter_by(employee_id=employee.id).scalar() or 0
-    total_taken = db.session.query(db.func.sum(LeaveRecord.days_taken))\
-                            .filter_by(employee_id=employee.id).scalar() or 0
-    remaining_leave = total_credited - total_taken
+    balance = leave_balance(employee.id)
+    total_credited, total_taken, remaining_leave = balance.credited, balance.taken, balance.remaining
     
     # 法定付与日数の計算
-    years_employed = (date.today() - employee.join_date).days / 365.25 if employee.join_date else 0
-    if years_employed < 0.5:
-        legal_leave_days = 0
-    elif years_employed < 1.5:
-        legal_leave_days = 10
-    elif years_employed < 2.5:
-        legal_leave_days = 11
-    elif years_employed < 3.5:
-        legal_leave_days = 12
-    elif years_employed < 4.5:
-        legal_leave_days = 14
-    elif years_employed < 5.5:
-        legal_leave_days = 16
-    elif years_employed < 6.5:
-        legal_leave_days = 18
-    else:
-        legal_leave_days = 20
+    legal_leave_days = calculate_annual_leave_days(employee.join_date) if employee.join_date else 0
     
     # 顔写真情報を保存（後で右上に配置）
     photo_data = None
@@ -759,44 +568,8 @@ def create_calendar_pdf():
     """会社カレンダーのPDFを升目デザインで生成 - CIDフォント版（確実な日本語表示）"""
     buffer = BytesIO()
     
-    # CIDフォント設定（日本語専用フォント）
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    
-    japanese_font = None
-    japanese_font_bold = None
-    
-    # CIDフォント候補を順番に試行
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),  # 日本語ゴシック
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),        # 日本語明朝
-    ]
-    
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            japanese_font = regular_name
-            japanese_font_bold = bold_name  # CIDフォントでは同じ名前
-            print(f"✓ カレンダーPDF用CIDフォント {regular_name} 登録成功")
-            break
-        except Exception as e:
-            print(f"✗ CIDフォント {regular_name} 登録失敗: {e}")
-            continue
-    
-    # CIDフォント失敗時のTTFフォールバック
-    if japanese_font is None:
-        font_path = '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf'
-        if os.path.exists(font_path):
-            try:
-                pdfmetrics.registerFont(TTFont('JapaneseFont', font_path))
-                japanese_font = 'JapaneseFont'
-                japanese_font_bold = 'JapaneseFont'
-                print("TTFフォールバック: DejaVu Sans使用")
-            except:
-                japanese_font = 'Helvetica'
-                japanese_font_bold = 'Helvetica-Bold'
-        else:
-            japanese_font = 'Helvetica'
-            japanese_font_bold = 'Helvetica-Bold'
+    # 日本語フォント（登録はプロセスで1回だけ）
+    japanese_font, japanese_font_bold = japanese_font_pair()
     
     # PDFドキュメントを作成（縦向きA4）
     doc = SimpleDocTemplate(buffer, pagesize=A4, 
@@ -1061,7 +834,7 @@ def create_calendar_pdf():
     # イベント一覧を追加
     events = CompanyCalendar.query.filter(
         db.or_(
-            db.extract('year', CompanyCalendar.event_date) == current_year,
+            in_year(CompanyCalendar.event_date, current_year),
             CompanyCalendar.is_recurring == True
         )
     ).order_by(CompanyCalendar.event_date.asc()).all()
@@ -1728,9 +1501,7 @@ def request_leave():
                 
                 # 年次有給休暇の場合のみ残日数チェック
                 if leave_type == 'annual_leave':
-                    total_credited = sum([credit.days_credited for credit in employee.leave_credits])
-                    total_taken = sum([record.days_taken for record in employee.leave_records])
-                    remaining_leave = total_credited - total_taken
+                    remaining_leave = leave_balance(employee.id).remaining
                     
                     if days_requested > remaining_leave:
                         flash(f'申請日数({days_requested}日)が残り有給日数({remaining_leave}日)を超えています。')
@@ -2062,9 +1833,7 @@ def employee_dashboard():
     employee.car_insurance_level = categorize(employee.car_insurance_expiry)
     
     # 有給休暇の残日数計算
-    total_credited = sum([credit.days_credited for credit in employee.leave_credits])
-    total_taken = sum([record.days_taken for record in employee.leave_records])
-    remaining_leave = total_credited - total_taken
+    remaining_leave = leave_balance(employee.id).remaining
     
     # 申請履歴の取得
     leave_requests = LeaveRequest.query.filter_by(employee_id=employee.id).order_by(LeaveRequest.created_at.desc()).limit(5).all()
@@ -2334,22 +2103,13 @@ def leave_management():
     # 全従業員を取得
     employees = Employee.query.all()
     
-    # 各従業員の年休付与合計、取得合計、残日数を計算
+    # 全従業員の年休付与合計・取得合計・残日数を集計クエリでまとめて取得
+    balances = leave_balances()
     for employee in employees:
-        # 年休付与合計
-        total_credited = db.session.query(db.func.sum(LeaveCredit.days_credited))\
-            .filter(LeaveCredit.employee_id == employee.id)\
-            .scalar() or 0
-        employee.total_leave_credited = total_credited
-        
-        # 年休取得合計
-        total_taken = db.session.query(db.func.sum(LeaveRecord.days_taken))\
-            .filter(LeaveRecord.employee_id == employee.id)\
-            .scalar() or 0
-        employee.total_leave_taken = total_taken
-        
-        # 残日数
-        employee.remaining_leave = total_credited - total_taken
+        balance = balances[employee.id]
+        employee.total_leave_credited = balance.credited
+        employee.total_leave_taken = balance.taken
+        employee.remaining_leave = balance.remaining
         
         # 法律に基づく付与日数（join_dateがNoneの場合は0）
         if employee.join_date:
@@ -2357,24 +2117,8 @@ def leave_management():
         else:
             employee.legal_leave_days = 0
         
-        # 次回自動付与予定日を計算
-        if employee.status == '在籍中' and employee.join_date:
-            # 前回の自動付与日を取得
-            last_auto_grant = db.session.query(LeaveCredit)\
-                .filter(LeaveCredit.employee_id == employee.id)\
-                .order_by(LeaveCredit.date_credited.desc())\
-                .first()
-            
-            if last_auto_grant:
-                # 前回の付与日から1年後
-                from datetime import timedelta
-                employee.next_auto_grant_date = last_auto_grant.date_credited + timedelta(days=365)
-            else:
-                # 入社日から1年後
-                from datetime import timedelta
-                employee.next_auto_grant_date = employee.join_date + timedelta(days=365)
-        else:
-            employee.next_auto_grant_date = None
+        # 次回自動付与予定日
+        employee.next_auto_grant_date = next_auto_grant_date(employee, balance)
     
     return render_template('leave_management.html', employees=employees)
 
@@ -2537,7 +2281,7 @@ def generate_year_calendar(year, start_month=1):
     # その年のイベントを取得
     events = CompanyCalendar.query.filter(
         db.or_(
-            db.extract('year', CompanyCalendar.event_date) == year,
+            in_year(CompanyCalendar.event_date, year),
             CompanyCalendar.is_recurring == True
         )
     ).all()
@@ -2774,15 +2518,8 @@ def employee_detail(employee_id):
     leave_records = LeaveRecord.query.filter_by(employee_id=employee_id).order_by(LeaveRecord.date_taken.desc()).all()
     
     # 年休合計計算
-    total_credited = db.session.query(db.func.sum(LeaveCredit.days_credited))\
-        .filter(LeaveCredit.employee_id == employee_id)\
-        .scalar() or 0
-    
-    total_taken = db.session.query(db.func.sum(LeaveRecord.days_taken))\
-        .filter(LeaveRecord.employee_id == employee_id)\
-        .scalar() or 0
-    
-    remaining_leave = total_credited - total_taken
+    balance = leave_balance(employee_id)
+    total_credited, total_taken, remaining_leave = balance.credited, balance.taken, balance.remaining
     
     # 法律に基づく付与日数
     if employee.join_date:
@@ -2823,78 +2560,32 @@ def employee_pdf(employee_id):
         flash(f'PDFの生成中にエラーが発生しました: {str(e)}')
         return redirect(url_for('employee_detail', employee_id=employee_id))
 
+# 従業員情報Excelの書式（メイリオ）
+EMPLOYEE_EXCEL_STYLES = {
+    'title': {'font_name': MEIRYO, 'font_size': 16, 'bold': True, 'align': 'center'},
+    'issued': {'font_name': MEIRYO, 'font_size': 11, 'align': 'center'},
+    'section': {'font_name': MEIRYO, 'font_size': 14, 'bold': True, 'font_color': '#FFFFFF', 'align': 'center',
+                'pattern': 1},
+    'label': {'font_name': MEIRYO, 'font_size': 11, 'bold': True, 'pattern': 1, 'border': THIN},
+    'value': {'font_name': MEIRYO, 'font_size': 11, 'border': THIN},
+}
+
 def create_employee_excel_data(employee):
     """従業員情報をExcel形式で生成"""
-    import openpyxl
-    from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-    from io import BytesIO
-    
     # 年休データを計算
-    total_credited = db.session.query(db.func.sum(LeaveCredit.days_credited))\
-                               .filter_by(employee_id=employee.id).scalar() or 0
-    total_taken = db.session.query(db.func.sum(LeaveRecord.days_taken))\
-                            .filter_by(employee_id=employee.id).scalar() or 0
-    remaining_leave = total_credited - total_taken
+    balance = leave_balance(employee.id)
+    total_credited, total_taken, remaining_leave = balance.credited, balance.taken, balance.remaining
     
     # 法定付与日数の計算
-    years_employed = (date.today() - employee.join_date).days / 365.25 if employee.join_date else 0
-    if years_employed < 0.5:
-        legal_leave_days = 0
-    elif years_employed < 1.5:
-        legal_leave_days = 10
-    elif years_employed < 2.5:
-        legal_leave_days = 11
-    elif years_employed < 3.5:
-        legal_leave_days = 12
-    elif years_employed < 4.5:
-        legal_leave_days = 14
-    elif years_employed < 5.5:
-        legal_leave_days = 16
-    elif years_employed < 6.5:
-        legal_leave_days = 18
-    else:
-        legal_leave_days = 20
-    
-    # 新しいワークブック作成
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"従業員情報_{employee.name}"
-    
-    # スタイル設定
-    header_font = Font(name='メイリオ', size=14, bold=True, color='FFFFFF')
-    header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-    title_font = Font(name='メイリオ', size=16, bold=True)
-    normal_font = Font(name='メイリオ', size=11)
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'), 
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
-    # タイトル行
-    ws['A1'] = f"従業員情報 - {employee.name}"
-    ws['A1'].font = title_font
-    ws['A1'].alignment = Alignment(horizontal='center')
-    ws.merge_cells('A1:B1')
-    
-    # 発行日
-    ws['A2'] = f"発行日: {date.today().strftime('%Y年%m月%d日')}"
-    ws['A2'].font = normal_font
-    ws['A2'].alignment = Alignment(horizontal='center')
-    ws.merge_cells('A2:B2')
+    legal_leave_days = calculate_annual_leave_days(employee.join_date) if employee.join_date else 0
     
-    # 空行
-    current_row = 4
+    # 新しいワークブック作成（列幅 A: 25, B: 30）
+    book = ExcelWorkbook(EMPLOYEE_EXCEL_STYLES, output=BytesIO())
+    ws = book.add_worksheet(f"従業員情報_{employee.name}", column_widths=[25, 30])
     
-    # 基本情報セクション
-    ws[f'A{current_row}'] = "基本情報"
-    ws[f'A{current_row}'].font = header_font
-    ws[f'A{current_row}'].fill = header_fill
-    ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-    ws[f'B{current_row}'].fill = header_fill
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    current_row += 1
+    # タイトル行・発行日
+    ws.merge_range(0, 0, 0, 1, f"従業員情報 - {employee.name}", book.style('title'))
+    ws.merge_range(1, 0, 1, 1, f"発行日: {date.today().strftime('%Y年%m月%d日')}", book.style('issued'))
     
     # 基本情報データ
     basic_info = [
@@ -2910,33 +2601,6 @@ def create_employee_excel_data(employee):
         ('在籍状況', employee.status or '未設定'),
     ]
     
-    for label, value in basic_info:
-        ws[f'A{current_row}'] = label
-        ws[f'B{current_row}'] = value
-        
-        # スタイル適用
-        ws[f'A{current_row}'].font = Font(name='メイリオ', size=11, bold=True)
-        ws[f'B{current_row}'].font = normal_font
-        ws[f'A{current_row}'].fill = PatternFill(start_color='F2F2F2', end_color='F2F2F2', fill_type='solid')
-        
-        # ボーダー
-        ws[f'A{current_row}'].border = border
-        ws[f'B{current_row}'].border = border
-        
-        current_row += 1
-    
-    # 空行
-    current_row += 1
-    
-    # 年次有給休暇情報
-    ws[f'A{current_row}'] = "年次有給休暇情報"
-    ws[f'A{current_row}'].font = header_font
-    ws[f'A{current_row}'].fill = PatternFill(start_color='28a745', end_color='28a745', fill_type='solid')
-    ws[f'A{current_row}'].alignment = Alignment(horizontal='center')
-    ws[f'B{current_row}'].fill = PatternFill(start_color='28a745', end_color='28a745', fill_type='solid')
-    ws.merge_cells(f'A{current_row}:B{current_row}')
-    current_row += 1
-    
     leave_info = [
         ('付与日数合計', f"{total_credited}日"),
         ('取得日数合計', f"{total_taken}日"),
@@ -2944,31 +2608,23 @@ def create_employee_excel_data(employee):
         ('法定付与日数', f"{legal_leave_days}日"),
     ]
     
-    for label, value in leave_info:
-        ws[f'A{current_row}'] = label
-        ws[f'B{current_row}'] = value
-        
-        # スタイル適用
-        ws[f'A{current_row}'].font = Font(name='メイリオ', size=11, bold=True)
-        ws[f'B{current_row}'].font = normal_font
-        ws[f'A{current_row}'].fill = PatternFill(start_color='E8F5E8', end_color='E8F5E8', fill_type='solid')
+    # 各セクション（見出し行と 項目名・値 の行、セクションの間は空行）
+    current_row = 3
+    for section_title, section_color, label_color, items in [
+        ("基本情報", '#366092', '#F2F2F2', basic_info),
+        ("年次有給休暇情報", '#28A745', '#E8F5E8', leave_info),
+    ]:
+        ws.merge_range(current_row, 0, current_row, 1, section_title, book.style('section', bg_color=section_color))
+        current_row += 1
         
-        # ボーダー
-        ws[f'A{current_row}'].border = border
-        ws[f'B{current_row}'].border = border
+        for label, value in items:
+            ws.write(current_row, 0, label, book.style('label', bg_color=label_color))
+            ws.write(current_row, 1, value, book.style('value'))
+            current_row += 1
         
         current_row += 1
     
-    # 列幅調整
-    ws.column_dimensions['A'].width = 25
-    ws.column_dimensions['B'].width = 30
-    
-    # BytesIOに保存
-    buffer = BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    return buffer
+    return book.close()
 
 @app.route('/employee_excel/<int:employee_id>')
 @login_required
@@ -3559,22 +3215,15 @@ def working_time_input():
             existing_records = {}
             records = WorkingTimeRecord.query.filter(
                 WorkingTimeRecord.employee_id == selected_employee.id,
-                db.extract('year', WorkingTimeRecord.work_date) == selected_year,
-                db.extract('month', WorkingTimeRecord.work_date) == selected_month
+                in_month(WorkingTimeRecord.work_date, selected_year, selected_month)
             ).all()
             
             for record in records:
                 existing_records[record.work_date.day] = record
             
             # 会社カレンダーの祝日を取得
-            holidays = set()
-            company_holidays = CompanyCalendar.query.filter(
-                db.extract('year', CompanyCalendar.event_date) == selected_year,
-                db.extract('month', CompanyCalendar.event_date) == selected_month,
-                CompanyCalendar.event_type == 'holiday'
-            ).all()
-            for holiday in company_holidays:
-                holidays.add(holiday.event_date.day)
+            month_start, next_month_start = month_date_range(selected_year, selected_month)
+            holidays = load_company_holidays(month_start, next_month_start)
             
             # 法定休日設定を取得
             holiday_settings = LegalHolidaySettings.query.first()
@@ -3598,41 +3247,7 @@ def working_time_input():
                     end_minute = record.end_time.minute
                 
                 # 法定休日判定
-                is_legal_holiday = False
-                is_company_holiday = False
-                
-                # 会社カレンダーの祝日チェック
-                if day in holidays:
-                    # 会社カレンダーの祝日は設定に基づいて判定
-                    if holiday_settings and hasattr(holiday_settings, 'specific_date_legal'):
-                        is_legal_holiday = holiday_settings.specific_date_legal
-                    else:
-                        is_legal_holiday = True  # デフォルトでは法定休日
-                else:
-                    # 曜日別法定休日設定をチェック
-                    if holiday_settings:
-                        weekday_legal_flags = [
-                            holiday_settings.monday_legal_holiday,    # 0: 月曜日
-                            holiday_settings.tuesday_legal_holiday,   # 1: 火曜日  
-                            holiday_settings.wednesday_legal_holiday, # 2: 水曜日
-                            holiday_settings.thursday_legal_holiday,  # 3: 木曜日
-                            holiday_settings.friday_legal_holiday,    # 4: 金曜日
-                            holiday_settings.saturday_legal_holiday,  # 5: 土曜日
-                            holiday_settings.sunday_legal_holiday     # 6: 日曜日
-                        ]
-                        
-                        if weekday < len(weekday_legal_flags):
-                            is_legal_holiday = weekday_legal_flags[weekday]
-                        
-                        # 法定休日でない場合は会社休日として扱わない（設定に基づいて判定のみ）
-                        if not is_legal_holiday:
-                            is_company_holiday = False
-                    else:
-                        # 設定がない場合はデフォルト
-                        if weekday == 6:  # 日曜日
-                            is_legal_holiday = True
-                        elif weekday == 5:  # 土曜日
-                            is_company_holiday = True  # 法定外休日
+                is_legal_holiday, is_company_holiday = resolve_holiday_flags(work_date, holiday_settings, holidays)
                 
                 calendar_days.append({
                     'day': day,
@@ -3656,153 +3271,37 @@ def working_time_input():
     if request.method == 'POST' and selected_employee:
         action = request.form.get('action')
         
-        # データ保存処理
-        for day in range(1, len(calendar_days) + 1):
+        # データ保存処理（全日分をメモリ上で分類し、一括で追加・更新）
+        rows = []
+        for calendar_day in calendar_days:
+            day = calendar_day['day']
             work_date = date(selected_year, selected_month, day)
             
-            # 既存レコードを取得または作成
-            record = WorkingTimeRecord.query.filter(
-                WorkingTimeRecord.employee_id == selected_employee.id,
-                WorkingTimeRecord.work_date == work_date
-            ).first()
-            
-            if not record:
-                record = WorkingTimeRecord(
-                    employee_id=selected_employee.id,
-                    work_date=work_date,
-                    input_by=current_user.id
-                )
-                db.session.add(record)
-            
             # フォームデータから更新（時分を個別に取得）
             start_hour = request.form.get(f'start_hour_{day}')
             start_minute = request.form.get(f'start_minute_{day}')
             end_hour = request.form.get(f'end_hour_{day}')
             end_minute = request.form.get(f'end_minute_{day}')
             
-            # 時分が入力された場合に時刻を設定（時のみまたは分のみでも可）
-            if start_hour is not None and start_hour != '':
-                try:
-                    hour = int(start_hour)
-                    minute = int(start_minute) if start_minute and start_minute != '' else 0
-                    if 0 <= hour <= 23 and 0 <= minute <= 59:
-                        record.start_time = datetime.strptime(f'{hour:02d}:{minute:02d}', '%H:%M').time()
-                    else:
-                        record.start_time = None
-                except (ValueError, TypeError):
-                    record.start_time = None
-            else:
-                record.start_time = None
-                
-            if end_hour is not None and end_hour != '':
-                try:
-                    hour = int(end_hour)
-                    minute = int(end_minute) if end_minute and end_minute != '' else 0
-                    if 0 <= hour <= 23 and 0 <= minute <= 59:
-                        record.end_time = datetime.strptime(f'{hour:02d}:{minute:02d}', '%H:%M').time()
-                    else:
-                        record.end_time = None
-                except (ValueError, TypeError):
-                    record.end_time = None
-            else:
-                record.end_time = None
-            record.break_time_minutes = int(request.form.get(f'break_time_{day}') or 0)
-            record.is_paid_leave = bool(request.form.get(f'paid_leave_{day}'))
-            record.is_special_leave = bool(request.form.get(f'special_leave_{day}'))
-            record.is_absence = bool(request.form.get(f'absence_{day}'))
-            record.is_company_closure = bool(request.form.get(f'company_closure_{day}'))
-            record.updated_at = datetime.now()
+            row = {
+                'employee_id': selected_employee.id,
+                'work_date': work_date,
+                'start_time': parse_form_time(start_hour, start_minute),
+                'end_time': parse_form_time(end_hour, end_minute),
+                'break_time_minutes': int(request.form.get(f'break_time_{day}') or 0),
+                'is_paid_leave': bool(request.form.get(f'paid_leave_{day}')),
+                'is_special_leave': bool(request.form.get(f'special_leave_{day}')),
+                'is_absence': bool(request.form.get(f'absence_{day}')),
+                'is_company_closure': bool(request.form.get(f'company_closure_{day}')),
+            }
             
             # 労働時間計算（日本労働基準法準拠）
-            if record.start_time and record.end_time and not (record.is_paid_leave or record.is_special_leave or record.is_absence):
-                start_datetime = datetime.combine(work_date, record.start_time)
-                end_datetime = datetime.combine(work_date, record.end_time)
-                
-                # 日をまたぐ場合の処理
-                if end_datetime <= start_datetime:
-                    end_datetime = end_datetime + timedelta(days=1)
-                
-                total_minutes = int((end_datetime - start_datetime).total_seconds() / 60) - record.break_time_minutes
-                
-                if total_minutes > 0:
-                    # 週の始まりを取得（月曜日を0とする）
-                    weekday = work_date.weekday()
-                    
-                    # 法定休日設定を取得
-                    holiday_settings = LegalHolidaySettings.query.first()
-                    
-                    # 法定休日判定（設定に基づく）
-                    is_legal_holiday = False
-                    is_company_holiday = False
-                    
-                    # 会社カレンダーの祝日チェック
-                    company_holiday = CompanyCalendar.query.filter(
-                        CompanyCalendar.event_date == work_date,
-                        CompanyCalendar.event_type == 'holiday'
-                    ).first()
-                    if company_holiday:
-                        # 会社カレンダーの祝日は設定に基づいて判定
-                        if holiday_settings and hasattr(holiday_settings, 'specific_date_legal'):
-                            is_legal_holiday = holiday_settings.specific_date_legal
-                        else:
-                            is_legal_holiday = True  # デフォルトでは法定休日
-                    
-                    # 曜日別法定休日設定をチェック（会社カレンダーがない場合）
-                    if not company_holiday:
-                        if holiday_settings:
-                            weekday_legal_flags = [
-                                holiday_settings.monday_legal_holiday,    # 0: 月曜日
-                                holiday_settings.tuesday_legal_holiday,   # 1: 火曜日  
-                                holiday_settings.wednesday_legal_holiday, # 2: 水曜日
-                                holiday_settings.thursday_legal_holiday,  # 3: 木曜日
-                                holiday_settings.friday_legal_holiday,    # 4: 金曜日
-                                holiday_settings.saturday_legal_holiday,  # 5: 土曜日
-                                holiday_settings.sunday_legal_holiday     # 6: 日曜日
-                            ]
-                            
-                            if weekday < len(weekday_legal_flags):
-                                is_legal_holiday = weekday_legal_flags[weekday]
-                            
-                            # 法定休日でない場合は会社休日として扱う
-                            if not is_legal_holiday:
-                                is_company_holiday = False  # 設定に基づいて判定のみ
-                        else:
-                            # 設定がない場合はデフォルト
-                            if weekday == 6:  # 日曜日
-                                is_legal_holiday = True
-                            elif weekday == 5:  # 土曜日
-                                is_company_holiday = True  # 法定外休日
-                    
-                    # 労働基準法準拠の労働時間分類
-                    if is_legal_holiday:
-                        # 法定休日労働（35%割増）- 全て法定休日労働時間
-                        record.legal_holiday_minutes = total_minutes
-                        record.regular_working_minutes = 0
-                        record.legal_overtime_minutes = 0
-                        record.overtime_minutes = 0
-                        record.holiday_minutes = 0
-                    else:
-                        # 平日・法定外休日の労働時間計算（週40時間制適用前の仮分類）
-                        # ここでは全て通常労働時間として記録し、後で週40時間制で再分類する
-                        record.regular_working_minutes = total_minutes
-                        record.legal_overtime_minutes = 0
-                        record.overtime_minutes = 0
-                        record.holiday_minutes = 0
-                        record.legal_holiday_minutes = 0
-                    
-                    # 深夜労働時間計算（22:00-5:00）
-                    record.night_working_minutes = calculate_night_work_minutes(start_datetime, end_datetime, work_date)
-            else:
-                # 休暇・欠勤の場合は労働時間を0にリセット
-                record.regular_working_minutes = 0
-                record.legal_overtime_minutes = 0
-                record.overtime_minutes = 0
-                record.legal_holiday_minutes = 0
-                record.holiday_minutes = 0
-                record.night_working_minutes = 0
+            rows.append(classify_working_minutes(row, calendar_day['is_legal_holiday']))
+        
+        bulk_upsert_working_time(rows, input_by=current_user.id)
         
         # 週40時間制限に基づく労働時間再計算
-        calculate_weekly_overtime(selected_employee.id, selected_year, selected_month)
+        apply_weekly_limit([selected_employee.id], selected_year, selected_month)
         
         db.session.commit()
         flash('労働時間データを保存しました。')
@@ -3835,33 +3334,46 @@ def working_time_input():
                          calendar_days=calendar_days,
                          holiday_settings=holiday_settings)
 
-def calculate_night_work_minutes(start_datetime, end_datetime, work_date):
-    """深夜労働時間計算（22:00-5:00）"""
-    night_minutes = 0
-    
-    # 当日の深夜時間帯（22:00-24:00）
-    night_start_today = datetime.combine(work_date, datetime.strptime('22:00', '%H:%M').time())
-    night_end_today = datetime.combine(work_date + timedelta(days=1), datetime.strptime('00:00', '%H:%M').time())
-    
-    # 翌日の深夜時間帯（0:00-5:00）
-    night_start_tomorrow = datetime.combine(work_date + timedelta(days=1), datetime.strptime('00:00', '%H:%M').time())
-    night_end_tomorrow = datetime.combine(work_date + timedelta(days=1), datetime.strptime('05:00', '%H:%M').time())
-    
-    # 当日22:00-24:00の計算
-    if start_datetime < night_end_today and end_datetime > night_start_today:
-        actual_start = max(start_datetime, night_start_today)
-        actual_end = min(end_datetime, night_end_today)
-        if actual_end > actual_start:
-            night_minutes += int((actual_end - actual_start).total_seconds() / 60)
+@app.route('/import_working_time', methods=['POST'])
+@login_required
+def import_working_time():
+    """勤怠データ一括取込（タイムレコーダーの CSV / Excel）"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
     
-    # 翌日0:00-5:00の計算
-    if start_datetime < night_end_tomorrow and end_datetime > night_start_tomorrow:
-        actual_start = max(start_datetime, night_start_tomorrow)
-        actual_end = min(end_datetime, night_end_tomorrow)
-        if actual_end > actual_start:
-            night_minutes += int((actual_end - actual_start).total_seconds() / 60)
+    time_clock_file = request.files.get('time_clock_file')
+    if not time_clock_file or not time_clock_file.filename:
+        flash('取り込むファイルを選択してください。')
+        return redirect(url_for('working_time_input'))
     
-    return night_minutes
+    encoding = request.form.get('encoding') or 'utf-8-sig'
+    try:
+        rows = iter_file_rows(time_clock_file.stream, time_clock_file.filename, encoding)
+        result = AttendanceImporter(input_by=current_user.id).run(rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f'勤怠データの取込に失敗しました: {str(e)}')
+        return redirect(url_for('working_time_input'))
+    
+    flash(f'勤怠データを取り込みました: {result["rows"]:,}行中 {result["saved"]:,}件保存'
+          + (f'（エラー{result["error_count"]}件）' if result['error_count'] else ''))
+    for error in result['errors'][:10]:
+        flash(f'{error["line"]}行目: {error["error"]}')
+    
+    return redirect(url_for('working_time_input'))
+
+def parse_form_time(hour_value, minute_value):
+    """勤怠入力フォームの時・分から時刻を取得（時のみの入力も可）"""
+    if hour_value is None or hour_value == '':
+        return None
+    try:
+        hour = int(hour_value)
+        minute = int(minute_value) if minute_value and minute_value != '' else 0
+        if 0 <= hour <= 23 and 0 <= minute <= 59:
+            return datetime.strptime(f'{hour:02d}:{minute:02d}', '%H:%M').time()
+    except (ValueError, TypeError):
+        pass
+    return None
 
 def calculate_weekly_overtime(employee_id, year, month):
     """週40時間制限に基づく労働時間再計算（月曜日リセット・クロスマンス対応）
@@ -3877,145 +3389,10 @@ def calculate_weekly_overtime(employee_id, year, month):
         year: 年
         month: 月
     """
-    from calendar import monthrange
-    from datetime import date, timedelta
-    
-    print(f"🔄 週40時間制限計算開始（月曜日リセット）: {year}年{month}月 (従業員ID: {employee_id})")
-    
-    # 月の開始日と終了日を取得
-    _, days_in_month = monthrange(year, month)
-    month_start = date(year, month, 1)
-    month_end = date(year, month, days_in_month)
-    
-    # 対象月に含まれる週を特定（月曜日起算）
-    weeks_to_process = set()
-    
-    # 月の各日について、その日が属する週の月曜日を記録
-    current_date = month_start
-    while current_date <= month_end:
-        # その日が属する週の月曜日を計算
-        # weekday(): 月=0, 火=1, 水=2, 木=3, 金=4, 土=5, 日=6
-        days_since_monday = current_date.weekday()  # 月曜日からの日数
-        week_monday = current_date - timedelta(days=days_since_monday)
-        weeks_to_process.add(week_monday)
-        current_date += timedelta(days=1)
-    
-    print(f"📅 処理対象の週: {len(weeks_to_process)}週（月曜日起算）")
-    for week_start in sorted(weeks_to_process):
-        week_end = week_start + timedelta(days=6)
-        print(f"  {week_start}(月) 〜 {week_end}(日)")
-    
-    # 各週について40時間制限を適用
-    for week_monday in weeks_to_process:
-        week_sunday = week_monday + timedelta(days=6)
-        
-        print(f"\n⏰ 週処理中: {week_monday}(月) 〜 {week_sunday}(日)")
-        
-        # その週の全レコードを取得（クロスマンス対応）
-        all_week_records = WorkingTimeRecord.query.filter(
-            WorkingTimeRecord.employee_id == employee_id,
-            WorkingTimeRecord.work_date >= week_monday,
-            WorkingTimeRecord.work_date <= week_sunday
-        ).order_by(WorkingTimeRecord.work_date).all()
-        
-        if not all_week_records:
-            print(f"   📋 この週にはレコードがありません")
-            continue
-        
-        print(f"   📋 この週のレコード数: {len(all_week_records)}")
-        
-        # 法定休日を除いた労働時間を計算
-        workday_records = []
-        total_work_minutes = 0
-        
-        for record in all_week_records:
-            day_name = ['月', '火', '水', '木', '金', '土', '日'][record.work_date.weekday()]
-            
-            # 法定休日労働は週40時間計算から除外
-            if record.holiday_minutes and record.holiday_minutes > 0:
-                print(f"   {record.work_date} ({day_name}): 法定休日労働 {record.holiday_minutes}分 - 除外")
-                continue
-            
-            # 平日・法定外休日の労働時間
-            daily_work_minutes = (record.regular_working_minutes or 0) + (record.overtime_minutes or 0)
-            
-            if daily_work_minutes > 0:
-                total_work_minutes += daily_work_minutes
-                workday_records.append((record, daily_work_minutes))
-                print(f"   {record.work_date} ({day_name}): {daily_work_minutes}分")
-        
-        print(f"   📊 週合計労働時間: {total_work_minutes}分 ({total_work_minutes/60:.1f}時間)")
-        
-        # 週40時間制限を適用
-        WEEKLY_LIMIT_MINUTES = 40 * 60  # 2400分
-        
-        if total_work_minutes > 0:
-            # 法定内労働時間と法定外労働時間を計算
-            legal_regular_minutes = min(total_work_minutes, WEEKLY_LIMIT_MINUTES)
-            legal_overtime_minutes = max(0, total_work_minutes - WEEKLY_LIMIT_MINUTES)
-            
-            print(f"   ⚖️  週40時間制限適用:")
-            print(f"      法定内労働時間: {legal_regular_minutes}分 ({legal_regular_minutes/60:.1f}時間)")
-            print(f"      法定外労働時間: {legal_overtime_minutes}分 ({legal_overtime_minutes/60:.1f}時間)")
-            
-            # 対象月のレコードのみを更新（クロスマンス考慮）
-            target_month_records = [
-                (record, daily_minutes) for record, daily_minutes in workday_records 
-                if record.work_date.year == year and record.work_date.month == month
-            ]
-            
-            if target_month_records:
-                print(f"   🎯 {year}年{month}月のレコード更新: {len(target_month_records)}件")
-                
-                # 対象月の総労働時間を計算
-                target_month_total = sum(daily_minutes for _, daily_minutes in target_month_records)
-                print(f"      対象月労働時間: {target_month_total}分 ({target_month_total/60:.1f}時間)")
-                
-                # 比例配分で法定内・法定外を分配
-                if target_month_total > 0:
-                    # まず全レコードの労働時間をリセット
-                    for record, _ in target_month_records:
-                        record.regular_working_minutes = 0
-                        record.overtime_minutes = 0
-                    
-                    # 対象月の労働時間を週の比例で法定内・法定外に分配
-                    # 対象月の労働時間のうち、週の比例で法定内・法定外を決定
-                    month_regular_ratio = min(1.0, legal_regular_minutes / total_work_minutes) if total_work_minutes > 0 else 0
-                    month_overtime_ratio = max(0.0, legal_overtime_minutes / total_work_minutes) if total_work_minutes > 0 else 0
-                    
-                    print(f"      週比例: 法定内{month_regular_ratio:.3f}, 法定外{month_overtime_ratio:.3f}")
-                    
-                    # 各日に比例配分
-                    remaining_month_regular = int(target_month_total * month_regular_ratio)
-                    remaining_month_overtime = target_month_total - remaining_month_regular
-                    
-                    print(f"      対象月分配: 法定内{remaining_month_regular}分, 法定外{remaining_month_overtime}分")
-                    
-                    for record, daily_minutes in sorted(target_month_records, key=lambda x: x[0].work_date):
-                        if daily_minutes > 0:
-                            # この日に割り当てる法定内労働時間
-                            daily_regular = min(daily_minutes, remaining_month_regular)
-                            remaining_month_regular -= daily_regular
-                            
-                            # 残りは法定外労働時間
-                            daily_overtime = daily_minutes - daily_regular
-                            
-                            record.regular_working_minutes = daily_regular
-                            record.overtime_minutes = daily_overtime
-                            
-                            day_name = ['月', '火', '水', '木', '金', '土', '日'][record.work_date.weekday()]
-                            print(f"      {record.work_date} ({day_name}): "
-                                  f"法定内 {daily_regular}分, 法定外 {daily_overtime}分")
-                
-                # 更新日時を設定
-                for record, _ in target_month_records:
-                    record.updated_at = datetime.now()
-            else:
-                print(f"   ⏭️  この週の{year}年{month}月レコードはありません")
+    apply_weekly_limit([employee_id], year, month)
     
     # データベースに変更をコミット
     db.session.commit()
-    print(f"✅ 週40時間制限計算完了: {year}年{month}月")
 
 def calculate_weekly_overtime_adjustment(employee, year, month, weekly_data, week_start_day):
     """週40時間超過分の時間外労働調整計算（土曜日の労働時間を週40時間基準で再分類）
@@ -4039,44 +3416,34 @@ def calculate_weekly_overtime_adjustment(employee, year, month, weekly_data, wee
     # 週40時間 = 2400分
     WEEKLY_OVERTIME_THRESHOLD = 2400
     
+    if not weekly_data:
+        return adjustment_data
+    
+    # クロスマンスの週に含まれる前月・翌月のレコードを1回で取得
+    month_start = date(year, month, 1)
+    next_month_start = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    window_start = min(weekly_data.keys())
+    window_end = max(weekly_data.keys()) + timedelta(days=6)
+    other_month_records = []
+    if window_start < month_start or window_end >= next_month_start:
+        other_month_records = WorkingTimeRecord.query.filter(
+            WorkingTimeRecord.employee_id == employee.id,
+            WorkingTimeRecord.work_date >= window_start,
+            WorkingTimeRecord.work_date <= window_end,
+            db.or_(
+                WorkingTimeRecord.work_date < month_start,
+                WorkingTimeRecord.work_date >= next_month_start
+            )
+        ).all()
+    
     for week_start, week_info in weekly_data.items():
-        # 該当週の全レコードを取得（クロスマンス対応）
+        # 該当週の全レコード（クロスマンス対応）
         week_end = week_start + timedelta(days=6)
-        week_records = []
-        
-        # 対象月のレコード
-        for record in week_info['records']:
-            week_records.append(record)
-        
-        # クロスマンスの場合は前月・翌月のデータも取得
-        if week_start.month != month or week_end.month != month:
-            # 前月データ
-            if week_start.month != month:
-                prev_month = month - 1 if month > 1 else 12
-                prev_year = year if month > 1 else year - 1
-                
-                prev_records = WorkingTimeRecord.query.filter(
-                    WorkingTimeRecord.employee_id == employee.id,
-                    db.extract('year', WorkingTimeRecord.work_date) == prev_year,
-                    db.extract('month', WorkingTimeRecord.work_date) == prev_month,
-                    WorkingTimeRecord.work_date >= week_start,
-                    WorkingTimeRecord.work_date <= week_end
-                ).all()
-                week_records.extend(prev_records)
-            
-            # 翌月データ
-            if week_end.month != month:
-                next_month = month + 1 if month < 12 else 1
-                next_year = year if month < 12 else year + 1
-                
-                next_records = WorkingTimeRecord.query.filter(
-                    WorkingTimeRecord.employee_id == employee.id,
-                    db.extract('year', WorkingTimeRecord.work_date) == next_year,
-                    db.extract('month', WorkingTimeRecord.work_date) == next_month,
-                    WorkingTimeRecord.work_date >= week_start,
-                    WorkingTimeRecord.work_date <= week_end
-                ).all()
-                week_records.extend(next_records)
+        week_records = list(week_info['records'])
+        week_records.extend(
+            record for record in other_month_records
+            if week_start <= record.work_date <= week_end
+        )
         
         # 週の総労働時間を計算
         week_total_minutes = 0
@@ -4160,408 +3527,56 @@ def calculate_weekly_overtime_adjustment(employee, year, month, weekly_data, wee
     
     return adjustment_data
 
-def calculate_annual_working_hours(year):
-    """年間所定労働時間を計算する"""
-    import calendar
-    
-    # 年間日数
-    days_in_year = 366 if calendar.isleap(year) else 365
-    
-    # 土日の数を計算
-    weekends = 0
-    for month in range(1, 13):
-        for day in range(1, calendar.monthrange(year, month)[1] + 1):
-            weekday = calendar.weekday(year, month, day)
-            if weekday in [5, 6]:  # 土曜日=5, 日曜日=6
-                weekends += 1
-    
-    # 祝日数（日本の祝日概算）
-    holidays = 16  # 基本的な祝日数
-    
-    # 年間労働日数 = 年間日数 - 土日 - 祝日
-    working_days = days_in_year - weekends - holidays
+def calculate_monthly_payroll(employee_id, year, month):
+    """月次給与計算処理（1名分を一括計算エンジンで実行）"""
+    engine = PayrollBatchEngine(
+        year, month,
+        calculated_by=current_user.id if current_user and not current_user.is_anonymous else None
+    )
+    result = engine.run([int(employee_id)])
     
-    # 年間所定労働時間 = 労働日数 × 8時間
-    annual_working_hours = working_days * 8
+    if result['errors']:
+        raise ValueError(result['errors'][0]['error'])
     
-    return annual_working_hours, working_days
+    return result['payrolls'][int(employee_id)]
 
-def apply_weekly_40hour_rule(records, weekly_data, week_start_day, year, month):
-    """週40時間制を正しく適用する関数"""
-    from datetime import datetime, timedelta
+@app.route('/payroll_dashboard', methods=['GET', 'POST'])
+@login_required
+def payroll_dashboard():
+    """給与計算ダッシュボード"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
     
-    WEEKLY_LIMIT_MINUTES = 40 * 60  # 2400分 = 40時間
+    employees = Employee.query.filter_by(status='在籍中').all()
+    current_year = datetime.now().year
+    current_month = datetime.now().month
+    years = list(range(current_year - 2, current_year + 2))
+    months = list(range(1, 13))
     
+    selected_employee = None
+    selected_year = current_year
+    selected_month = current_month
+    payroll_data = None
     
-    for week_start, week_info in weekly_data.items():
-        # その週の法定休日以外の労働記録を取得
-        workday_records = []
-        total_workday_minutes = 0
+    if request.method == 'POST':
+        employee_id = request.form.get('employee_id')
+        selected_year = int(request.form.get('year', current_year))
+        selected_month = int(request.form.get('month', current_month))
         
-        for record in week_info['records']:
-            # 法定休日労働は週40時間計算から除外
-            if record.legal_holiday_minutes and record.legal_holiday_minutes > 0:
-                continue
+        if employee_id:
+            selected_employee = Employee.query.get(employee_id)
             
-            # 平日・法定外休日の労働時間を集計
-            daily_minutes = record.regular_working_minutes or 0
-            if daily_minutes > 0:
-                workday_records.append((record, daily_minutes))
-                total_workday_minutes += daily_minutes
-        
-        # 週40時間を超過している場合の再分類
-        if total_workday_minutes > WEEKLY_LIMIT_MINUTES:
-            overtime_minutes = total_workday_minutes - WEEKLY_LIMIT_MINUTES
-            # 週の労働日を時系列で並び替え（月曜日から日曜日順）
-            workday_records.sort(key=lambda x: x[0].work_date)
+            # 既存の給与計算結果を取得
+            existing_calculation = PayrollCalculation.query.filter(
+                PayrollCalculation.employee_id == employee_id,
+                PayrollCalculation.year == selected_year,
+                PayrollCalculation.month == selected_month
+            ).first()
             
-            # 週40時間超過分を後半の労働日から時間外労働に分類
-            remaining_overtime = overtime_minutes
-            
-            # 逆順（日曜日から）で超過時間を時間外労働に分類
-            for record, daily_minutes in reversed(workday_records):
-                if remaining_overtime <= 0:
-                    break
-                
-                # この日の労働時間を時間外労働に分類
-                overtime_for_this_day = min(remaining_overtime, daily_minutes)
-                regular_for_this_day = daily_minutes - overtime_for_this_day
-                
-                # 労働時間を再分類
-                record.regular_working_minutes = regular_for_this_day
-                record.overtime_minutes = overtime_for_this_day
-                record.updated_at = datetime.now()
-                
-                remaining_overtime -= overtime_for_this_day
-    
-    # データベースに変更をコミット
-    from app import db
-    db.session.commit()
-
-def calculate_monthly_payroll(employee_id, year, month):
-    """月次給与計算処理"""
-    employee = Employee.query.get(employee_id)
-    if not employee:
-        raise ValueError("従業員が見つかりません")
-    
-    # 給与設定を取得（最新の有効な設定を取得）
-    payroll_settings = EmployeePayrollSettings.query.filter(
-        EmployeePayrollSettings.employee_id == employee_id,
-        EmployeePayrollSettings.effective_from <= date(year, month, 1)
-    ).filter(
-        db.or_(
-            EmployeePayrollSettings.effective_until.is_(None),
-            EmployeePayrollSettings.effective_until >= date(year, month, 1)
-        )
-    ).order_by(EmployeePayrollSettings.effective_from.desc()).first()
-    
-    if not payroll_settings:
-        raise ValueError(f"有効な給与設定が見つかりません。先に給与設定を登録してください。")
-    
-    # 年間所定労働時間を計算
-    annual_working_hours, annual_working_days = calculate_annual_working_hours(year)
-    
-    # 既存の計算結果と関連する給与明細書を削除
-    existing = PayrollCalculation.query.filter(
-        PayrollCalculation.employee_id == employee_id,
-        PayrollCalculation.year == year,
-        PayrollCalculation.month == month
-    ).first()
-    
-    if existing:
-        # 関連する給与明細書を先に削除
-        existing_slips = PayrollSlip.query.filter(
-            PayrollSlip.payroll_calculation_id == existing.id
-        ).all()
-        for slip in existing_slips:
-            db.session.delete(slip)
-        
-        # 次に給与計算を削除
-        db.session.delete(existing)
-    
-    # その月の勤怠データを取得
-    records = WorkingTimeRecord.query.filter(
-        WorkingTimeRecord.employee_id == employee_id,
-        db.extract('year', WorkingTimeRecord.work_date) == year,
-        db.extract('month', WorkingTimeRecord.work_date) == month
-    ).all()
-    
-    # 労働時間集計（日本労働基準法準拠）
-    total_working_minutes = 0
-    regular_working_minutes = 0
-    legal_overtime_minutes = 0
-    overtime_minutes = 0
-    legal_holiday_minutes = 0
-    holiday_minutes = 0
-    night_working_minutes = 0
-    
-    paid_leave_days = 0
-    special_leave_days = 0
-    absence_days = 0
-    company_closure_days = 0
-    
-    # 法定休日設定から週起算日を取得
-    holiday_settings = LegalHolidaySettings.query.first()
-    week_start_day = 6  # デフォルトは日曜日（0=月曜日、6=日曜日）
-    if holiday_settings and holiday_settings.week_start_day is not None:
-        week_start_day = holiday_settings.week_start_day
-    
-    # 週40時間制チェック用
-    weekly_data = {}  # {week_start_date: {'total_minutes': int, 'records': [record, ...]}}
-    
-    for record in records:
-        if record.is_paid_leave:
-            paid_leave_days += 1
-        elif record.is_special_leave:
-            special_leave_days += 1
-        elif record.is_absence:
-            absence_days += 1
-        elif record.is_company_closure:
-            company_closure_days += 1
-        else:
-            # 労働時間集計
-            daily_total = (record.regular_working_minutes + record.legal_overtime_minutes + 
-                          record.overtime_minutes + record.legal_holiday_minutes + record.holiday_minutes)
-            total_working_minutes += daily_total
-            regular_working_minutes += record.regular_working_minutes
-            legal_overtime_minutes += record.legal_overtime_minutes
-            overtime_minutes += record.overtime_minutes
-            legal_holiday_minutes += record.legal_holiday_minutes
-            holiday_minutes += record.holiday_minutes
-            night_working_minutes += record.night_working_minutes
-            
-            # 週の開始日を計算
-            work_date = record.work_date
-            days_from_week_start = (work_date.weekday() - week_start_day) % 7
-            week_start = work_date - timedelta(days=days_from_week_start)
-            
-            if week_start not in weekly_data:
-                weekly_data[week_start] = {'total_minutes': 0, 'records': []}
-            weekly_data[week_start]['total_minutes'] += daily_total
-            weekly_data[week_start]['records'].append(record)
-    
-    # 週40時間制の正しい適用
-    apply_weekly_40hour_rule(records, weekly_data, week_start_day, year, month)
-    
-    # 週40時間ルール適用後の労働時間を再集計
-    regular_working_minutes = 0
-    legal_overtime_minutes = 0
-    overtime_minutes = 0
-    legal_holiday_minutes = 0
-    holiday_minutes = 0
-    night_working_minutes = 0
-    
-    for record in records:
-        regular_working_minutes += record.regular_working_minutes or 0
-        legal_overtime_minutes += record.legal_overtime_minutes or 0
-        overtime_minutes += record.overtime_minutes or 0
-        legal_holiday_minutes += record.legal_holiday_minutes or 0
-        holiday_minutes += record.holiday_minutes or 0
-        night_working_minutes += record.night_working_minutes or 0
-    
-    # 給与形態別基本給計算
-    wage_type = payroll_settings.wage_type or 'monthly'
-    
-    if wage_type == 'hourly':
-        # 時給制
-        hourly_rate = payroll_settings.hourly_rate or 0
-        regular_working_pay = int(regular_working_minutes / 60 * hourly_rate)
-        legal_overtime_pay = int(legal_overtime_minutes / 60 * hourly_rate)  # 法定内残業は通常賃金
-        overtime_pay = int(overtime_minutes / 60 * hourly_rate * 1.25)  # 法定外残業は25%増し
-        legal_holiday_pay = int(legal_holiday_minutes / 60 * hourly_rate * 1.35)  # 法定休日は35%増し
-        holiday_pay = int(holiday_minutes / 60 * hourly_rate)  # 法定外休日は通常賃金
-        base_salary = regular_working_pay
-        
-    elif wage_type == 'daily':
-        # 日給制
-        daily_rate = payroll_settings.daily_rate or 0
-        working_days = len([r for r in records if r.regular_working_minutes > 0 or r.legal_overtime_minutes > 0 or r.overtime_minutes > 0])
-        regular_working_pay = working_days * daily_rate
-        
-        # 日給を時給換算（1日8時間で計算）
-        hourly_rate = daily_rate / 8 if daily_rate > 0 else 0
-        legal_overtime_pay = int(legal_overtime_minutes / 60 * hourly_rate)
-        overtime_pay = int(overtime_minutes / 60 * hourly_rate * 1.25)
-        legal_holiday_pay = int(legal_holiday_minutes / 60 * hourly_rate * 1.35)
-        holiday_pay = int(holiday_minutes / 60 * hourly_rate)
-        base_salary = regular_working_pay
-        
-    else:
-        # 月給制（デフォルト）
-        base_salary = payroll_settings.base_salary or 0
-        regular_working_pay = 0  # 月給に含まれる
-        
-        # 年間所定労働時間から時給を算出
-        if base_salary > 0 and annual_working_hours > 0:
-            # 月給 × 12ヶ月 ÷ 年間所定労働時間
-            annual_salary = base_salary * 12
-            hourly_rate = annual_salary / annual_working_hours
-            
-            # 月給制では所定労働時間超過分のみ法定内残業として支払い
-            # legal_overtime_minutesには所定時間超過〜法定時間内の残業が含まれる
-            legal_overtime_pay = int(legal_overtime_minutes / 60 * hourly_rate)
-            overtime_pay = int(overtime_minutes / 60 * hourly_rate * 1.25)
-            legal_holiday_pay = int(legal_holiday_minutes / 60 * hourly_rate * 1.35)
-            holiday_pay = int(holiday_minutes / 60 * hourly_rate)
-        else:
-            legal_overtime_pay = 0
-            overtime_pay = 0
-            legal_holiday_pay = 0
-            holiday_pay = 0
-    
-    # 深夜労働手当（25%増し）- 労働基準法第37条第4項
-    if employee.wage_type == 'hourly':
-        night_working_pay = int(night_working_minutes / 60 * base_salary * 0.25)
-    elif employee.wage_type == 'daily':
-        hourly_rate = base_salary / 8
-        night_working_pay = int(night_working_minutes / 60 * hourly_rate * 0.25)
-    else:
-        monthly_working_hours = employee.standard_working_hours * employee.standard_working_days * 4.33
-        hourly_rate = base_salary / monthly_working_hours if monthly_working_hours > 0 else 0
-        night_working_pay = int(night_working_minutes / 60 * hourly_rate * 0.25)
-    
-    # 週40時間超過分は既にovertime_minutesに分類済み（新ロジック）
-    weekly_overtime_pay = 0
-    
-    # 休業補償（60%）- 労働基準法第26条
-    closure_compensation = 0
-    if company_closure_days > 0:
-        if employee.wage_type == 'hourly':
-            # 時給制の場合：標準労働時間×時給×60%×日数
-            daily_compensation = employee.standard_working_hours * base_salary * 0.6
-            closure_compensation = int(company_closure_days * daily_compensation)
-        elif employee.wage_type == 'daily':
-            # 日給制の場合：日給×60%×日数
-            closure_compensation = int(company_closure_days * base_salary * 0.6)
-        else:
-            # 月給制の場合：月給÷30日×60%×日数
-            daily_rate = base_salary / 30
-            closure_compensation = int(company_closure_days * daily_rate * 0.6)
-    
-    # 欠勤控除（ノーワーク・ノーペイの原則）
-    absence_deduction = 0
-    if absence_days > 0:
-        if wage_type == 'hourly':
-            # 時給制の場合：8時間×時給×日数
-            absence_deduction = int(absence_days * 8 * hourly_rate)
-        elif wage_type == 'daily':
-            # 日給制の場合：日給×日数
-            absence_deduction = int(absence_days * (payroll_settings.daily_rate or 0))
-        else:
-            # 月給制の場合：年間所定労働日数から月平均労働日数を算出
-            monthly_working_days = annual_working_days / 12
-            daily_rate = base_salary / monthly_working_days if monthly_working_days > 0 else 0
-            absence_deduction = int(absence_days * daily_rate)
-    
-    # 総支給額計算
-    gross_salary = (base_salary + regular_working_pay + legal_overtime_pay + overtime_pay + 
-                   legal_holiday_pay + holiday_pay + night_working_pay + weekly_overtime_pay + 
-                   closure_compensation - absence_deduction)
-    
-    # 給与計算結果を保存
-    payroll = PayrollCalculation(
-        employee_id=employee_id,
-        year=year,
-        month=month,
-        wage_type=wage_type,
-        base_salary=base_salary,
-        regular_working_minutes=regular_working_minutes,
-        legal_overtime_minutes=legal_overtime_minutes,
-        overtime_minutes=overtime_minutes,
-        legal_holiday_minutes=legal_holiday_minutes,
-        holiday_minutes=holiday_minutes,
-        night_working_minutes=night_working_minutes,
-        paid_leave_days=paid_leave_days,
-        special_leave_days=special_leave_days,
-        absence_days=absence_days,
-        overtime_allowance=overtime_pay + legal_overtime_pay + weekly_overtime_pay,
-        night_allowance=night_working_pay,
-        holiday_allowance=holiday_pay + legal_holiday_pay,
-        gross_salary=gross_salary,
-        net_salary=gross_salary,  # 控除計算は後で実装
-        calculated_by=current_user.id if current_user and not current_user.is_anonymous else None
-    )
-    
-    db.session.add(payroll)
-    db.session.commit()
-    
-    # 賃金台帳を自動更新
-    try:
-        from wage_register_manager import WageRegisterManager
-        wage_manager = WageRegisterManager()
-        
-        # 給与計算データから賃金台帳用データを構築
-        payroll_data = {
-            'base_salary': base_salary,
-            'overtime_allowance': payroll.overtime_allowance,
-            'holiday_allowance': payroll.holiday_allowance,
-            'night_allowance': payroll.night_allowance,
-            'position_allowance': payroll_settings.position_allowance or 0,
-            'transportation_allowance': payroll_settings.transportation_allowance or 0,
-            'housing_allowance': payroll_settings.housing_allowance or 0,
-            'family_allowance': payroll_settings.family_allowance or 0,
-            'other_allowances': payroll.other_allowances,
-            'health_insurance': payroll.health_insurance,
-            'pension_insurance': payroll.pension_insurance,
-            'employment_insurance': payroll.employment_insurance,
-            'income_tax': payroll.income_tax,
-            'resident_tax': payroll.resident_tax,
-            'other_deductions': payroll.other_deductions,
-            'gross_salary': payroll.gross_salary,
-            'total_deductions': payroll.total_deductions,
-            'net_salary': payroll.net_salary,
-            'working_days': len([r for r in records if r.regular_working_minutes > 0 or r.overtime_minutes > 0]),
-            'overtime_hours': (overtime_minutes + legal_overtime_minutes) / 60.0,
-            'paid_leave_days': paid_leave_days,
-            'absence_days': absence_days
-        }
-        
-        wage_manager.update_wage_register(employee_id, year, month, payroll_data)
-        print(f"✅ 賃金台帳を更新しました: 従業員{employee_id}, {year}年{month}月")
-        
-    except Exception as e:
-        print(f"⚠️ 賃金台帳更新エラー: {e}")
-        # エラーが発生しても給与計算処理は続行
-    
-    return payroll
-
-@app.route('/payroll_dashboard', methods=['GET', 'POST'])
-@login_required
-def payroll_dashboard():
-    """給与計算ダッシュボード"""
-    if current_user.role != 'accounting':
-        flash('アクセス権限がありません。')
-        return redirect(url_for('index'))
-    
-    employees = Employee.query.filter_by(status='在籍中').all()
-    current_year = datetime.now().year
-    current_month = datetime.now().month
-    years = list(range(current_year - 2, current_year + 2))
-    months = list(range(1, 13))
-    
-    selected_employee = None
-    selected_year = current_year
-    selected_month = current_month
-    payroll_data = None
-    
-    if request.method == 'POST':
-        employee_id = request.form.get('employee_id')
-        selected_year = int(request.form.get('year', current_year))
-        selected_month = int(request.form.get('month', current_month))
-        
-        if employee_id:
-            selected_employee = Employee.query.get(employee_id)
-            
-            # 既存の給与計算結果を取得
-            existing_calculation = PayrollCalculation.query.filter(
-                PayrollCalculation.employee_id == employee_id,
-                PayrollCalculation.year == selected_year,
-                PayrollCalculation.month == selected_month
-            ).first()
-            
-            # 従業員の給与設定を取得（最新の有効な設定を取得）
-            target_date = date(selected_year, selected_month, 1)
-            print(f"[DEBUG] 給与設定を検索: 従業員ID={employee_id}, 対象日={target_date}")
+            # 従業員の給与設定を取得（最新の有効な設定を取得）
+            target_date = date(selected_year, selected_month, 1)
+            print(f"[DEBUG] 給与設定を検索: 従業員ID={employee_id}, 対象日={target_date}")
             
             payroll_settings = EmployeePayrollSettings.query.filter(
                 EmployeePayrollSettings.employee_id == employee_id,
@@ -4588,8 +3603,7 @@ def payroll_dashboard():
             # 勤怠データを取得
             working_records = WorkingTimeRecord.query.filter(
                 WorkingTimeRecord.employee_id == employee_id,
-                db.extract('year', WorkingTimeRecord.work_date) == selected_year,
-                db.extract('month', WorkingTimeRecord.work_date) == selected_month
+                in_month(WorkingTimeRecord.work_date, selected_year, selected_month)
             ).all()
             
             # 勤怠データの合計を事前に計算
@@ -4677,6 +3691,43 @@ def api_calculate_payroll():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/calculate_payroll_batch', methods=['POST'])
+@login_required
+def api_calculate_payroll_batch():
+    """給与一括計算API（月締め用）"""
+    if current_user.role != 'accounting':
+        return jsonify({'success': False, 'error': 'アクセス権限がありません'})
+
+    try:
+        data = request.get_json() or {}
+        year = data.get('year')
+        month = data.get('month')
+        employee_ids = data.get('employee_ids')  # 省略時は在籍中の全従業員
+
+        if not all([year, month]):
+            return jsonify({'success': False, 'error': '必要な情報が不足しています'})
+
+        if employee_ids is not None:
+            employee_ids = [int(employee_id) for employee_id in employee_ids]
+
+        # 給与一括計算実行
+        engine = PayrollBatchEngine(int(year), int(month), calculated_by=current_user.id)
+        result = engine.run(employee_ids)
+
+        succeeded = len(result['payrolls'])
+        failed = len(result['errors'])
+
+        return jsonify({
+            'success': True,
+            'message': f'{succeeded}名の給与計算が完了しました' + (f'（エラー{failed}名）' if failed else ''),
+            'succeeded': succeeded,
+            'failed': failed,
+            'errors': result['errors']
+        })
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/employee_payroll_settings/<int:employee_id>', methods=['GET', 'POST'])
 @login_required
 def employee_payroll_settings(employee_id):
@@ -4969,6 +4020,10 @@ def create_payroll_slip(employee_id, year, month):
             slip.created_by = current_user.id if current_user and not current_user.is_anonymous else None
             slip.issued_at = datetime.now()
             
+            # 賃金台帳は発行した明細の値で同じトランザクション内に更新
+            WageRegisterManager().stage_wage_registers(
+                year, month, [(employee_id, register_values(payroll_calculation, slip))])
+            
             db.session.commit()
             
             # PDF生成とダウンロード
@@ -5070,104 +4125,19 @@ def bulk_issue_payroll_slips():
                 return redirect(url_for('payroll_results'))
             employee_ids = [int(emp_id) for emp_id in employee_ids]
         else:
-            # 全従業員の場合、保存済み明細データがある従業員のIDを取得
-            payroll_slips = PayrollSlip.query.filter(
-                PayrollSlip.slip_year == year,
-                PayrollSlip.slip_month == month
-            ).all()
-            employee_ids = [slip.employee_id for slip in payroll_slips]
+            # 全従業員の場合、保存済み明細データがある従業員が対象
+            employee_ids = None
         
-        if not employee_ids:
+        # 明細・従業員・給与計算結果を一括取得
+        jobs = load_slip_jobs(year, month, employee_ids)
+        if not jobs:
             flash(f'{year}年{month}月の保存済み給与明細データが見つかりませんでした。')
             return redirect(url_for('payroll_results'))
         
-        # 複数のPDFを生成してZIPファイルで返す
-        import zipfile
-        from io import BytesIO
-        import os
-        
-        # メモリ上でZIPファイルを作成
-        zip_buffer = BytesIO()
-        
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            generated_count = 0
-            
-            for employee_id in employee_ids:
-                # 保存された給与明細データを取得
-                payroll_slip = PayrollSlip.query.filter(
-                    PayrollSlip.employee_id == employee_id,
-                    PayrollSlip.slip_year == year,
-                    PayrollSlip.slip_month == month
-                ).first()
-                
-                if not payroll_slip:
-                    continue
-                
-                # 従業員情報を取得
-                employee = Employee.query.get(employee_id)
-                if not employee:
-                    continue
-                
-                # 給与計算結果を取得
-                payroll_calculation = PayrollCalculation.query.get(payroll_slip.payroll_calculation_id)
-                if not payroll_calculation:
-                    continue
-                
-                # 給与設定を取得
-                payroll_settings = EmployeePayrollSettings.query.filter(
-                    EmployeePayrollSettings.employee_id == employee_id,
-                    EmployeePayrollSettings.effective_from <= date(year, month, 1)
-                ).filter(
-                    db.or_(
-                        EmployeePayrollSettings.effective_until.is_(None),
-                        EmployeePayrollSettings.effective_until >= date(year, month, 1)
-                    )
-                ).first()
-                
-                # その他手当の詳細を復元
-                if payroll_slip.other_allowances_json:
-                    import json
-                    payroll_slip.other_allowances_detail = json.loads(payroll_slip.other_allowances_json)
-                else:
-                    payroll_slip.other_allowances_detail = []
-                
-                # その他控除の詳細を復元
-                if payroll_slip.other_deductions_json:
-                    import json
-                    payroll_slip.other_deductions_detail = json.loads(payroll_slip.other_deductions_json)
-                else:
-                    payroll_slip.other_deductions_detail = []
-                
-                try:
-                    # PDFを生成
-                    pdf_buffer = create_payroll_slip_pdf(payroll_slip, employee, payroll_calculation, payroll_settings)
-                    pdf_data = pdf_buffer.read()
-                    
-                    # ZIPファイルにPDFを追加
-                    filename = f"{year}年{month}月_{employee.name}_給与明細書.pdf"
-                    zip_file.writestr(filename, pdf_data)
-                    generated_count += 1
-                    
-                except Exception as e:
-                    print(f"PDF生成エラー（従業員ID: {employee_id}）: {e}")
-                    continue
-        
-        if generated_count == 0:
-            flash('給与明細PDFを生成できませんでした。')
-            return redirect(url_for('payroll_results'))
-        
-        zip_buffer.seek(0)
-        
-        # ZIPファイルとしてダウンロード
-        response = make_response(zip_buffer.getvalue())
-        response.headers['Content-Type'] = 'application/zip'
-        # 日本語文字を含むファイル名をUTF-8でエンコード
-        filename = f"{year}年{month}月_給与明細書一括_{generated_count}名.zip"
-        encoded_filename = urllib.parse.quote(filename.encode('utf-8'))
-        response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{encoded_filename}"
-        
-        flash(f'{generated_count}名の給与明細PDFを一括生成しました。')
-        return response
+        # 並列で描画したPDFをできた順にZIPでストリーミング
+        filename = f"{year}年{month}月_給与明細書一括_{len(jobs)}名.zip"
+        flash(f'{len(jobs)}名の給与明細PDFを一括生成しました。')
+        return streaming_zip_response(iter_slip_zip_entries(jobs), filename)
         
     except Exception as e:
         flash(f'一括発行でエラーが発生しました: {str(e)}')
@@ -5209,43 +4179,12 @@ def create_wage_ledger_pdf():
         employee = Employee.query.get_or_404(employee_id)
         year = int(year)
         
-        # 給与明細書データから賃金台帳データを生成
-        wage_data = _generate_wage_ledger_from_payroll_slips(employee_id, year)
-        
-        if not wage_data:
-            flash(f'{employee.name}の{year}年度給与明細データが見つかりません。先に給与明細を作成してください。', 'error')
-            return redirect(url_for('wage_ledger'))
-        
-        # 従業員データ準備
-        employee_data = {
-            'id': employee.id,
-            'name': employee.name,
-            'employee_number': f'EMP{employee.id:03d}'  # IDベースで従業員番号を生成
-        }
-        
-        # PDF生成
-        from wage_ledger_pdf_generator import WageLedgerPDFGenerator
-        generator = WageLedgerPDFGenerator()
-        
-        # 一時ファイルパス作成
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-            temp_path = tmp_file.name
-        
-        # PDF生成
-        success = generator.generate_wage_ledger_pdf(employee_data, wage_data, year, temp_path)
-        
-        if not success:
-            flash('賃金台帳PDFの生成に失敗しました。', 'error')
+        try:
+            pdf_data = build_wage_ledger_pdf(employee, year)
+        except ValueError as e:
+            flash(str(e), 'error')
             return redirect(url_for('wage_ledger'))
         
-        # PDFファイルを読み込んでレスポンス作成
-        with open(temp_path, 'rb') as pdf_file:
-            pdf_data = pdf_file.read()
-        
-        # 一時ファイル削除
-        os.unlink(temp_path)
-        
         # レスポンス作成
         response = make_response(pdf_data)
         response.headers['Content-Type'] = 'application/pdf'
@@ -5259,96 +4198,37 @@ def create_wage_ledger_pdf():
         flash(f'賃金台帳PDF作成中にエラーが発生しました: {str(e)}', 'error')
         return redirect(url_for('wage_ledger'))
 
-def _generate_wage_ledger_from_payroll_slips(employee_id: int, year: int) -> dict:
-    """給与明細書データから賃金台帳データを生成する"""
-    import json
-    
-    # 該当年の全ての給与明細データを取得
-    payroll_slips = PayrollSlip.query.filter(
-        PayrollSlip.employee_id == employee_id,
-        PayrollSlip.slip_year == year
-    ).order_by(PayrollSlip.slip_month).all()
-    
-    if not payroll_slips:
-        return None
-    
-    # 月次データ辞書を初期化
-    monthly_data = {}
-    annual_data = {}
-    
-    # 各項目の月次データを初期化
-    fields = [
-        'base_salary', 'overtime_allowance', 'holiday_allowance', 'night_allowance',
-        'position_allowance', 'family_allowance', 'transportation_allowance', 
-        'housing_allowance', 'meal_allowance', 'skill_allowance',
-        'temporary_closure_compensation', 'salary_payment', 'bonus_payment',
-        'other_allowance', 'gross_salary',
-        'health_insurance', 'pension_insurance', 'employment_insurance', 
-        'long_term_care_insurance', 'income_tax', 'resident_tax',
-        'union_fee', 'parking_fee', 'uniform_fee', 'other_deduction',
-        'total_deduction', 'net_salary',
-        'working_days', 'absence_days', 'paid_leave_days', 'overtime_hours'
-    ]
-    
-    for field in fields:
-        monthly_data[f'monthly_{field}'] = {}
-        annual_data[f'annual_{field}'] = 0
-    
-    # 手当項目の詳細データ用（5項目に対応）
-    for i in range(1, 6):
-        monthly_data[f'monthly_allowance{i}'] = {}
-        annual_data[f'annual_allowance{i}'] = 0
-    
-    # 控除項目の詳細データ用（2項目に対応）
-    for i in range(1, 3):
-        monthly_data[f'monthly_other_deduction{i}'] = {}
-        annual_data[f'annual_other_deduction{i}'] = 0
-    
-    # 各月のデータを集計
-    for slip in payroll_slips:
-        month_str = str(slip.slip_month)
-        
-        # 基本項目のデータを設定
-        for field in fields:
-            value = getattr(slip, field, 0) or 0
-            if field == 'overtime_hours':
-                # 時間データは時間単位で保存
-                monthly_data[f'monthly_{field}'][month_str] = float(value)
-            else:
-                monthly_data[f'monthly_{field}'][month_str] = int(value)
-            annual_data[f'annual_{field}'] += (float(value) if field == 'overtime_hours' else int(value))
-        
-        # その他手当の詳細データを展開（5項目）
-        if slip.other_allowances_json:
-            try:
-                allowances = json.loads(slip.other_allowances_json)
-                for i, allowance in enumerate(allowances[:5], 1):  # 最大5項目
-                    amount = allowance.get('amount', 0)
-                    monthly_data[f'monthly_allowance{i}'][month_str] = int(amount)
-                    annual_data[f'annual_allowance{i}'] += int(amount)
-            except:
-                pass
-        
-        # その他控除の詳細データを展開（2項目）
-        if slip.other_deductions_json:
-            try:
-                deductions = json.loads(slip.other_deductions_json)
-                for i, deduction in enumerate(deductions[:2], 1):  # 最大2項目
-                    amount = deduction.get('amount', 0)
-                    monthly_data[f'monthly_other_deduction{i}'][month_str] = int(amount)
-                    annual_data[f'annual_other_deduction{i}'] += int(amount)
-            except:
-                pass
+@app.route('/bulk_wage_ledger_pdf', methods=['POST'])
+@login_required
+def bulk_wage_ledger_pdf():
+    """賃金台帳PDF一括ダウンロード（給与明細データがある全従業員）"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
     
-    # JSON文字列に変換
-    wage_data = {}
-    for key, value in monthly_data.items():
-        wage_data[key] = json.dumps(value)
+    year = request.form.get('year', type=int)
+    if not year:
+        flash('年度を選択してください。', 'error')
+        return redirect(url_for('wage_ledger'))
     
-    for key, value in annual_data.items():
-        wage_data[key] = value
+    # 対象年の給与明細を1回のクエリで読み込み、従業員ごとの賃金台帳データにまとめる
+    jobs = load_wage_ledger_jobs(year)
+    if not jobs:
+        flash(f'{year}年度の給与明細データが見つかりません。', 'error')
+        return redirect(url_for('wage_ledger'))
     
-    return wage_data
+    # 並列で描画したPDFをできた順にZIPでストリーミング
+    return streaming_zip_response(iter_ledger_zip_entries(jobs, year), f'{year}年度_賃金台帳一括_{len(jobs)}名.zip')
+
+def build_wage_ledger_pdf(employee, year: int) -> bytes:
+    """従業員1名の年間賃金台帳PDFを作成する
+
+    給与明細データがない場合は ValueError
+    """
+    jobs = load_wage_ledger_jobs(year, [employee.id])
+    if not jobs:
+        raise ValueError(f'{employee.name}の{year}年度給与明細データが見つかりません。先に給与明細を作成してください。')
+    return render_wage_ledger(jobs[0], year)
 
 # --- 各種届出管理 ---
 @app.route('/company_submissions')
@@ -5474,12 +4354,7 @@ def create_accounting_period():
         start_day = company_settings.fiscal_year_start_day if company_settings else 1
         
         # 期間設定
-        start_date = date(fiscal_year, start_month, start_day)
-        if start_month == 1:
-            end_date = date(fiscal_year, 12, 31)
-        else:
-            end_date = date(fiscal_year + 1, start_month - 1, 
-                          calendar.monthrange(fiscal_year + 1, start_month - 1)[1])
+        start_date, end_date = fiscal_period_dates(fiscal_year, start_month, start_day)
         
         # 新規期間作成
         new_period = AccountingPeriod(
@@ -5499,6 +4374,37 @@ def create_accounting_period():
     
     return redirect(url_for('accounting_period_management'))
 
+@app.route('/carryover_preview')
+@login_required
+def carryover_preview():
+    """繰越処理のドライラン（繰越後の期首残高と既存残高との差分を返す）"""
+    if current_user.role != 'accounting':
+        return jsonify({'success': False, 'error': 'アクセス権限がありません。'}), 403
+    
+    from_year = request.args.get('from_year', type=int)
+    to_year = request.args.get('to_year', type=int)
+    
+    from_period = AccountingPeriod.query.filter_by(fiscal_year=from_year).first()
+    if not from_period:
+        return jsonify({'success': False, 'error': f'{from_year}年度の会計期間が作成されていません。'})
+    if not AccountingPeriod.query.filter_by(fiscal_year=to_year).first():
+        return jsonify({'success': False, 'error': f'{to_year}年度の会計期間が作成されていません。'})
+    
+    plan = plan_carryover(from_period, to_year)
+    return jsonify({
+        'success': True,
+        'account_count': len(plan),
+        'nonzero_count': sum(1 for row in plan if row.new_balance != 0),
+        'changes': [{
+            'account_code': row.account_code,
+            'account_name': row.account_name,
+            'account_type': row.account_type,
+            'current_balance': row.current_balance,
+            'new_balance': row.new_balance,
+            'difference': row.difference,
+        } for row in plan if row.changed]
+    })
+
 @app.route('/carryover_balances', methods=['POST'])
 @login_required
 def carryover_balances():
@@ -5523,52 +4429,9 @@ def carryover_balances():
             flash(f'{to_year}年度の会計期間が作成されていません。')
             return redirect(url_for('accounting_period_management'))
         
-        # 資産・負債・純資産科目の期末残高を計算して繰越
-        carryover_accounts = AccountingAccount.query.filter(
-            AccountingAccount.account_type.in_(['資産', '負債', '純資産'])
-        ).all()
-        
-        carryover_count = 0
-        
-        for account in carryover_accounts:
-            # 繰越元年度の期末残高を計算
-            balance_query = db.session.query(
-                db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount)
-            ).join(JournalEntry).filter(
-                JournalEntryDetail.account_id == account.id,
-                JournalEntry.entry_date >= from_period.start_date,
-                JournalEntry.entry_date <= from_period.end_date
-            )
-            
-            period_balance = balance_query.scalar() or 0
-            
-            # 既存の期首残高があるかチェック
-            existing_opening = OpeningBalance.query.filter_by(
-                fiscal_year=to_year, 
-                account_id=account.id
-            ).first()
-            
-            if existing_opening:
-                # 既存の期首残高を更新
-                existing_opening.opening_balance = period_balance
-                existing_opening.source_type = 'carryover'
-                existing_opening.updated_at = datetime.now()
-            else:
-                # 新規期首残高を作成
-                opening_balance = OpeningBalance(
-                    fiscal_year=to_year,
-                    account_id=account.id,
-                    opening_balance=period_balance,
-                    source_type='carryover'
-                )
-                db.session.add(opening_balance)
-            
-            if period_balance != 0:  # 残高がある場合のみカウント
-                carryover_count += 1
-        
-        # 繰越元期間を締め済みに設定
-        from_period.is_closed = True
-        from_period.closing_date = datetime.now()
+        # 資産・負債・純資産科目の期末残高を一括で計算して繰越（繰越元年度は締め済みに）
+        plan = plan_carryover(from_period, to_year)
+        carryover_count = apply_carryover(from_period, to_year, plan)
         
         db.session.commit()
         
@@ -5603,61 +4466,8 @@ def create_employment_contract():
         return redirect(url_for('dashboard'))
     
     try:
-        company_settings = CompanySettings.query.first()
-        
-        # 雇用契約書データの収集
-        # 新規雇用の場合は従業員情報を動的に作成
-        if request.form.get('employee_id'):
-            employee = Employee.query.get_or_404(request.form.get('employee_id'))
-            employee_name = employee.name
-        else:
-            # 新規雇用の場合
-            employee = None
-            employee_name = request.form.get('employee_name')
-        
-        contract_data = {
-            'employee': employee,
-            'employee_name': employee_name,
-            'employee_birth_date': request.form.get('birth_date'),
-            'employee_address': request.form.get('address'),
-            'employee_phone': request.form.get('phone_number'),
-            'company': company_settings,
-            'contract_type': request.form.get('contract_type'),
-            'contract_period_type': request.form.get('contract_period_type'),
-            'start_date': request.form.get('start_date'),
-            'end_date': request.form.get('end_date'),
-            'contract_renewal': request.form.get('contract_renewal'),
-            'renewal_criteria': request.form.get('renewal_criteria'),
-            'work_location': request.form.get('work_location'),
-            'work_location_change': request.form.get('work_location_change'),
-            'position': request.form.get('position'),
-            'department': request.form.get('department'),
-            'job_description': request.form.get('job_description'),
-            'work_start_time': request.form.get('work_start_time'),
-            'work_end_time': request.form.get('work_end_time'),
-            'break_time': request.form.get('break_time'),
-            'scheduled_working_hours': request.form.get('scheduled_working_hours'),
-            'shift_work': request.form.get('shift_work'),
-            'work_days': request.form.getlist('work_days'),
-            'holidays': request.form.get('holidays'),
-            'overtime_work': request.form.get('overtime_work'),
-            'salary_type': request.form.get('salary_type'),
-            'base_salary': request.form.get('base_salary'),
-            'wage_calculation_method': request.form.get('wage_calculation_method'),
-            'salary_closing_date': request.form.get('salary_closing_date'),
-            'payment_date': request.form.get('payment_date'),
-            'payment_method': request.form.get('payment_method'),
-            'allowances': request.form.get('allowances'),
-            'bonus_payment': request.form.get('bonus_payment'),
-            'bonus_details': request.form.get('bonus_details'),
-            'trial_period': request.form.get('trial_period'),
-            'social_insurance': request.form.getlist('social_insurance'),
-            'retirement_allowance': request.form.get('retirement_allowance'),
-            'retirement_age': request.form.get('retirement_age'),
-            'termination_conditions': request.form.get('termination_conditions'),
-            'dismissal_reasons': request.form.get('dismissal_reasons'),
-            'special_conditions': request.form.get('special_conditions')
-        }
+        contract_data = collect_employment_contract_data(request.form)
+        employee_name = contract_data['employee_name']
         
         # PDF生成
         pdf_buffer = generate_employment_contract_pdf(contract_data)
@@ -5677,6 +4487,67 @@ def create_employment_contract():
         flash('雇用契約書の作成中にエラーが発生しました。', 'error')
         return redirect(url_for('employment_contract'))
 
+def collect_employment_contract_data(form):
+    """入力フォームから雇用契約書データを組み立てる"""
+    company_settings = CompanySettings.query.first()
+    
+    # 雇用契約書データの収集
+    # 新規雇用の場合は従業員情報を動的に作成
+    if form.get('employee_id'):
+        employee = db.session.get(Employee, form.get('employee_id', type=int))
+        if employee is None:
+            raise ValueError('従業員が見つかりません。')
+        employee_name = employee.name
+    else:
+        # 新規雇用の場合
+        employee = None
+        employee_name = form.get('employee_name')
+    
+    contract_data = {
+        'employee': employee,
+        'employee_name': employee_name,
+        'employee_birth_date': form.get('birth_date'),
+        'employee_address': form.get('address'),
+        'employee_phone': form.get('phone_number'),
+        'company': company_settings,
+        'contract_type': form.get('contract_type'),
+        'contract_period_type': form.get('contract_period_type'),
+        'start_date': form.get('start_date'),
+        'end_date': form.get('end_date'),
+        'contract_renewal': form.get('contract_renewal'),
+        'renewal_criteria': form.get('renewal_criteria'),
+        'work_location': form.get('work_location'),
+        'work_location_change': form.get('work_location_change'),
+        'position': form.get('position'),
+        'department': form.get('department'),
+        'job_description': form.get('job_description'),
+        'work_start_time': form.get('work_start_time'),
+        'work_end_time': form.get('work_end_time'),
+        'break_time': form.get('break_time'),
+        'scheduled_working_hours': form.get('scheduled_working_hours'),
+        'shift_work': form.get('shift_work'),
+        'work_days': form.getlist('work_days'),
+        'holidays': form.get('holidays'),
+        'overtime_work': form.get('overtime_work'),
+        'salary_type': form.get('salary_type'),
+        'base_salary': form.get('base_salary'),
+        'wage_calculation_method': form.get('wage_calculation_method'),
+        'salary_closing_date': form.get('salary_closing_date'),
+        'payment_date': form.get('payment_date'),
+        'payment_method': form.get('payment_method'),
+        'allowances': form.get('allowances'),
+        'bonus_payment': form.get('bonus_payment'),
+        'bonus_details': form.get('bonus_details'),
+        'trial_period': form.get('trial_period'),
+        'social_insurance': form.getlist('social_insurance'),
+        'retirement_allowance': form.get('retirement_allowance'),
+        'retirement_age': form.get('retirement_age'),
+        'termination_conditions': form.get('termination_conditions'),
+        'dismissal_reasons': form.get('dismissal_reasons'),
+        'special_conditions': form.get('special_conditions')
+    }
+    return contract_data
+
 def format_japanese_date(date_str):
     """日付を日本語形式（年月日）に変換"""
     if not date_str:
@@ -5704,7 +4575,7 @@ def generate_employment_contract_pdf(contract_data):
     story = []
     
     # 既存のフォント設定関数を使用
-    japanese_font, japanese_font_bold = setup_japanese_font()
+    japanese_font, japanese_font_bold = japanese_font_pair()
     
     # スタイル設定（コンパクト化）
     japanese_style = ParagraphStyle(
@@ -5903,23 +4774,8 @@ def generate_employment_contract_pdf(contract_data):
     story.append(Paragraph(f"契約日: {today}", japanese_style))
     story.append(Spacer(1, 10))
     
-    # スタッフ詳細PDFと同じフォント設定を使用
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    
-    # CIDフォント候補を順番に試行（スタッフ詳細PDFと同じ順序）
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),  # 日本語ゴシック
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),        # 日本語明朝
-    ]
-    
-    signature_font = japanese_font  # デフォルトは既存のフォント
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            signature_font = regular_name
-            break
-        except Exception:
-            continue
+    # スタッフ詳細PDFと同じフォントを使用
+    signature_font = japanese_font
     
     # 署名欄用のスタイル（CIDフォント、1段階小さくして10pt、左揃え）
     signature_style = ParagraphStyle(
@@ -6318,24 +5174,10 @@ def generate_working_conditions_change_pdf(change_data):
     story = []
     
     # 雇用契約書と同じフォント設定関数を使用
-    japanese_font, japanese_font_bold = setup_japanese_font()
-    
-    # 雇用契約書と同じCIDフォント設定
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),  # 日本語ゴシック
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),        # 日本語明朝
-    ]
+    japanese_font, japanese_font_bold = japanese_font_pair()
     
-    cid_font = japanese_font  # デフォルトは既存のフォント
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            cid_font = regular_name
-            break
-        except Exception:
-            continue
+    # 雇用契約書と同じCIDフォント
+    cid_font = japanese_font
     
     # 雇用契約書と同じスタイル設定
     styles = getSampleStyleSheet()
@@ -6559,22 +5401,9 @@ def generate_social_insurance_acquisition_pdf(acquisition_data):
     story = []
     
     # フォント設定
-    japanese_font, japanese_font_bold = setup_japanese_font()
-    
-    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-    cid_fonts = [
-        ('HeiseiKakuGo-W5', 'HeiseiKakuGo-W5'),
-        ('HeiseiMin-W3', 'HeiseiMin-W3'),
-    ]
+    japanese_font, japanese_font_bold = japanese_font_pair()
     
     cid_font = japanese_font
-    for regular_name, bold_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(regular_name))
-            cid_font = regular_name
-            break
-        except Exception:
-            continue
     
     # スタイル設定
     styles = getSampleStyleSheet()
@@ -6673,7 +5502,7 @@ def journal_entries():
         return redirect(url_for('index'))
     
     # 会計科目一覧を取得
-    accounts = AccountingAccount.query.filter_by(is_active=True).order_by(AccountingAccount.account_code).all()
+    accounts = account_chart().active_accounts
     
     # 最近の仕訳を取得
     recent_entries = JournalEntry.query.order_by(JournalEntry.created_at.desc()).limit(10).all()
@@ -6763,21 +5592,19 @@ def accounting_ledger():
     month = request.args.get('month', type=int)
     
     # 会計科目一覧
-    accounts = AccountingAccount.query.filter_by(is_active=True).order_by(AccountingAccount.account_code).all()
+    accounts = account_chart().active_accounts
+    
+    # ページ位置（前ページ最終明細の 取引日:明細ID）
+    page_cursor = parse_ledger_cursor(request.args.get('after'))
+    
+    # 会計年度（月の指定があれば年度内の月）の期間
+    year_range = fiscal_year_range(year)
+    period_start, period_end = fiscal_date_range(year, month, year_range)
     
     ledger_data = []
+    carried_balance = 0
+    next_cursor = None
     if account_id:
-        # 指定された科目の取引明細を取得
-        query = JournalEntryDetail.query.join(JournalEntry).filter(
-            JournalEntryDetail.account_id == account_id,
-            db.extract('year', JournalEntry.entry_date) == year
-        )
-        
-        if month:
-            query = query.filter(db.extract('month', JournalEntry.entry_date) == month)
-        
-        details = query.order_by(JournalEntry.entry_date).all()
-        
         # 期首残高を取得
         opening_balance_obj = OpeningBalance.query.filter_by(
             fiscal_year=year,
@@ -6785,27 +5612,11 @@ def accounting_ledger():
         ).first()
         opening_balance = opening_balance_obj.opening_balance if opening_balance_obj else 0
         
-        # 各明細に相手科目の情報と累計差引金額を追加
-        running_balance = opening_balance  # 期首残高から開始
-        for detail in details:
-            # 同じ仕訳の他の科目を取得（相手科目）
-            opposite_details = JournalEntryDetail.query.filter(
-                JournalEntryDetail.journal_entry_id == detail.journal_entry_id,
-                JournalEntryDetail.id != detail.id
-            ).all()
-            
-            # 相手科目名を取得（複数ある場合は最初の一つ）
-            if opposite_details:
-                opposite_account = AccountingAccount.query.get(opposite_details[0].account_id)
-                detail.opposite_account_name = opposite_account.account_name if opposite_account else '-'
-            else:
-                detail.opposite_account_name = '-'
-            
-            # 累計差引金額を計算
-            running_balance += detail.debit_amount - detail.credit_amount
-            detail.running_balance = running_balance
-                
-        ledger_data = details
+        # 指定された科目の取引明細（相手科目・累計差引金額つき）を1ページ分取得
+        ledger_data, carried_balance, next_cursor = ledger_page(
+            account_id, period_start, period_end,
+            opening_balance=opening_balance, cursor=page_cursor
+        )
     
     years = list(range(datetime.now().year - 2, datetime.now().year + 2))
     
@@ -6825,8 +5636,29 @@ def accounting_ledger():
                          selected_year=year,
                          selected_month=month,
                          opening_balance=opening_balance,
+                         page_cursor=page_cursor,
+                         carried_balance=carried_balance,
+                         next_cursor=next_cursor,
+                         fiscal_start=year_range[0],
+                         months=fiscal_months(*year_range),
                          years=years)
 
+# 総勘定元帳Excelの書式（明朝体、明細は9pt・自動縮小）
+LEDGER_EXCEL_STYLES = {
+    'title': {'font_name': MINCHO, 'font_size': 14, 'bold': True, 'align': 'center', 'bottom': DOUBLE},
+    'account': {'font_name': MINCHO, 'font_size': 11, 'bold': True, 'align': 'center'},
+    'header': {'font_name': MINCHO, 'font_size': 9, 'bold': True, 'align': 'center'},
+    'opening_center': {'font_name': MINCHO, 'font_size': 9, 'bold': True, 'align': 'center', 'shrink': True},
+    'opening_text': {'font_name': MINCHO, 'font_size': 9, 'bold': True, 'align': 'left', 'shrink': True},
+    'opening_amount': {'font_name': MINCHO, 'font_size': 9, 'bold': True, 'align': 'right', 'shrink': True,
+                       'num_format': AMOUNT_FORMAT},
+    'detail_center': {'font_name': MINCHO, 'font_size': 9, 'align': 'center', 'shrink': True},
+    'detail_text': {'font_name': MINCHO, 'font_size': 9, 'align': 'left', 'shrink': True},
+    'detail_amount': {'font_name': MINCHO, 'font_size': 9, 'align': 'right', 'shrink': True, 'num_format': AMOUNT_FORMAT},
+    'count': {'font_name': MINCHO, 'font_size': 10, 'bold': True, 'align': 'right'},
+    'note': {'font_name': MINCHO, 'font_size': 9, 'align': 'left'},
+}
+
 @app.route('/export_ledger_excel')
 @login_required
 def export_ledger_excel():
@@ -6848,17 +5680,6 @@ def export_ledger_excel():
         # 勘定科目情報取得
         account = AccountingAccount.query.get_or_404(account_id)
         
-        # 元帳データ取得（制限付き - 最大1000件）
-        query = JournalEntryDetail.query.join(JournalEntry).filter(
-            JournalEntryDetail.account_id == account_id,
-            db.extract('year', JournalEntry.entry_date) == year
-        )
-        
-        if month:
-            query = query.filter(db.extract('month', JournalEntry.entry_date) == month)
-        
-        details = query.order_by(JournalEntry.entry_date).limit(1000).all()
-        
         # 期首残高を取得
         opening_balance_obj = OpeningBalance.query.filter_by(
             fiscal_year=year,
@@ -6866,229 +5687,107 @@ def export_ledger_excel():
         ).first()
         opening_balance = opening_balance_obj.opening_balance if opening_balance_obj else 0
         
-        # 各明細に相手科目の情報と累計差引金額を追加
-        running_balance = opening_balance  # 期首残高から開始
-        for detail in details:
-            try:
-                # 相手科目取得
-                opposite_details = JournalEntryDetail.query.filter(
-                    JournalEntryDetail.journal_entry_id == detail.journal_entry_id,
-                    JournalEntryDetail.id != detail.id
-                ).first()  # firstに変更してパフォーマンス向上
-                
-                if opposite_details:
-                    opposite_account = AccountingAccount.query.get(opposite_details.account_id)
-                    detail.opposite_account_name = opposite_account.account_name if opposite_account else '-'
-                else:
-                    detail.opposite_account_name = '-'
-                
-                # 累計差引金額を計算
-                running_balance += detail.debit_amount - detail.credit_amount
-                detail.running_balance = running_balance
-            except Exception as e:
-                print(f"Error processing detail {detail.id}: {e}")
-                detail.opposite_account_name = '-'
-                detail.running_balance = running_balance
+        # 元帳データ取得（相手科目・累計差引金額つき）
+        year_range = fiscal_year_range(year)
+        details = ledger_lines(account_id, *fiscal_date_range(year, month, year_range), opening_balance=opening_balance)
         
-        # Excelワークブック作成
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "総勘定元帳"
-        
-        # ヘッダー情報
-        period_str = f"{year}年"
-        if month:
-            period_str += f"{month}月"
-        
-        ws['A1'] = "総勘定元帳"
-        ws['A3'] = f"{account.account_code}　{account.account_name}"
-        
-        # ヘッダースタイル（明朝体を指定）
-        header_font = Font(name='ＭＳ 明朝', bold=True, size=14)
-        center_alignment = Alignment(horizontal='center')
-        double_underline_border = Border(bottom=Side(style='double'))
-        
-        # 総勘定元帳のセルのみ下線二重線（文字部分のみ）
-        ws['A1'].font = header_font
-        ws['A1'].alignment = center_alignment
-        ws['A1'].border = double_underline_border  # 総勘定元帳に下線二重線（文字部分のみ）
-        
-        # 総勘定元帳を中央表示するためにマージ
-        ws.merge_cells('A1:G1')
-        
-        ws['A3'].font = Font(name='ＭＳ 明朝', bold=True, size=11)
-        ws['A3'].alignment = center_alignment
-        
-        # 科目情報を中央表示
-        ws.merge_cells('A3:G3')
-        
-        # A4サイズ設定
-        ws.page_setup.paperSize = ws.PAPERSIZE_A4
-        ws.page_setup.orientation = ws.ORIENTATION_PORTRAIT  # 縦向き
-        ws.page_setup.fitToWidth = 1
-        ws.page_setup.fitToHeight = 1  # A4縦に収める
-        
-        # 印刷設定
-        ws.print_options.horizontalCentered = True
-        ws.page_margins.left = 0.5
-        ws.page_margins.right = 0.5
-        ws.page_margins.top = 0.5
-        ws.page_margins.bottom = 0.5
-        
-        # 罫線スタイル定義
-        thick_border = Side(style='medium')  # 外枠用中太線（少し細くする）
-        solid_border = Side(style='thin')   # 縦線用実線
-        dashed_border = Side(style='dashed') # 横線用破線
-        
-        # テーブルヘッダー
+        # Excelワークブック作成（行を上から順に書き出す）
+        book = ExcelWorkbook(LEDGER_EXCEL_STYLES)
         headers = ['伝票No.', '日付', '相手科目', '摘要', '借方', '貸方', '差引金額']
-        start_row = 5  # 1行空けたので5行目から開始
-        
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.font = Font(name='ＭＳ 明朝', bold=True, size=9)  # ヘッダーも明朝体9ptに統一
-            cell.alignment = Alignment(horizontal='center')
-            
-            # ヘッダー行の罫線（外枠太線）
-            cell.border = Border(
-                top=thick_border,
-                bottom=thick_border,  # 項目名の下も同じ太線にする
-                left=thick_border if col == 1 else solid_border,
-                right=thick_border if col == len(headers) else solid_border
-            )
-        
-        # A4縦に収まる行数を計算（行数を増やす）
+        last_col = len(headers) - 1
+        # 列幅（伝票No.: 6, 日付: 7, 相手科目: 12, 摘要: 42, 借方: 9, 貸方: 9, 差引: 9）
+        ws = book.add_worksheet("総勘定元帳", column_widths=[6, 7, 12, 42, 9, 9, 9])
+        
+        # A4縦、横1ページに収めて中央に印刷
+        ws.set_paper(9)
+        ws.set_portrait()
+        ws.fit_to_pages(1, 1)
+        ws.center_horizontally()
+        ws.set_margins(left=0.5, right=0.5, top=0.5, bottom=0.5)
+        
+        # タイトル（総勘定元帳に下線二重線）と科目情報を中央表示
+        ws.merge_range(0, 0, 0, last_col, "総勘定元帳", book.style('title'))
+        ws.merge_range(2, 0, 2, last_col, f"{account.account_code}　{account.account_name}", book.style('account'))
+        
+        # 列ごとの罫線（左端・右端は中太線、縦線は実線、横線は破線）
+        def side_borders(col):
+            return {'left': MEDIUM if col == 0 else THIN, 'right': MEDIUM if col == last_col else THIN}
+        
+        def row_styles(name, bottom=DASHED, number_format=True):
+            styles = []
+            for col in range(len(headers)):
+                style_name = name + ('_amount' if col >= 4 else '_center' if col < 2 else '_text')
+                overrides = side_borders(col)
+                if col >= 4 and not number_format:
+                    overrides['num_format'] = 'General'
+                styles.append(book.style(style_name, top=DASHED, bottom=bottom, **overrides))
+            return styles
+        
+        # テーブルヘッダー（5行目、外枠中太線）
+        start_row = 4
+        for col, header in enumerate(headers):
+            ws.write(start_row, col, header, book.style('header', top=MEDIUM, bottom=MEDIUM, **side_borders(col)))
+        
+        # A4縦に収まる行数
         max_rows = 45
         data_rows = len(details)
         current_row = start_row + 1
         
-        # 期首残高行を追加（期首残高がある場合）
+        # 期首残高行を追加（期首残高がある場合、金額は正の値のみ桁区切り）
         if opening_balance != 0:
-            debit_value = opening_balance if opening_balance > 0 else 0
-            credit_value = -opening_balance if opening_balance < 0 else 0
-            
-            cells = [
-                ws.cell(row=current_row, column=1, value='期首残高'),
-                ws.cell(row=current_row, column=2, value=f'{year % 100}.4.1'),
-                ws.cell(row=current_row, column=3, value='-'),
-                ws.cell(row=current_row, column=4, value='期首残高'),
-                ws.cell(row=current_row, column=5, value=debit_value),
-                ws.cell(row=current_row, column=6, value=credit_value),
-                ws.cell(row=current_row, column=7, value=opening_balance)
-            ]
-            
-            # 期首残高行のスタイル設定
-            for col, cell in enumerate(cells, 1):
-                cell.font = Font(name='ＭＳ 明朝', bold=True, size=9)  # 太字にする
-                
-                if col >= 5:  # 借方、貸方、差引金額
-                    cell.alignment = Alignment(horizontal='right', shrinkToFit=True)
-                    if cell.value > 0:
-                        cell.number_format = '#,##0'
-                else:
-                    cell.alignment = Alignment(horizontal='left' if col > 2 else 'center', shrinkToFit=True)
-                
-                # 罫線設定
-                cell.border = Border(
-                    top=dashed_border,
-                    bottom=dashed_border,
-                    left=thick_border if col == 1 else solid_border,
-                    right=thick_border if col == len(headers) else solid_border
-                )
+            values = ['期首残高', year_range[0].strftime('%y.%-m.%-d'), '-', '期首残高',
+                      opening_balance if opening_balance > 0 else 0,
+                      -opening_balance if opening_balance < 0 else 0,
+                      opening_balance]
+            styles = row_styles('opening')
+            plain_styles = row_styles('opening', number_format=False)
+            for col, value in enumerate(values):
+                ws.write(current_row, col, value, styles[col] if col < 4 or value > 0 else plain_styles[col])
             
             current_row += 1
             max_rows -= 1  # 期首残高行の分を差し引く
         
-        # データ行またはダミー行を作成
-        for row_idx in range(current_row, current_row + max_rows):
-            try:
-                detail_idx = row_idx - current_row
-                is_last_row = (row_idx == current_row + max_rows - 1)
-                
-                if detail_idx < data_rows:
-                    # 実際のデータ行
-                    detail = details[detail_idx]
-                    # 日付フォーマット変更: 25.9.12形式
-                    date_str = detail.journal_entry.entry_date.strftime('%y.%-m.%-d')
-                    
-                    cells = [
-                        ws.cell(row=row_idx, column=1, value=detail.journal_entry.reference_number or '-'),
-                        ws.cell(row=row_idx, column=2, value=date_str),
-                        ws.cell(row=row_idx, column=3, value=detail.opposite_account_name),
-                        ws.cell(row=row_idx, column=4, value=detail.journal_entry.description),
-                        ws.cell(row=row_idx, column=5, value=detail.debit_amount if detail.debit_amount > 0 else 0),
-                        ws.cell(row=row_idx, column=6, value=detail.credit_amount if detail.credit_amount > 0 else 0),
-                        ws.cell(row=row_idx, column=7, value=detail.running_balance)
-                    ]
-                else:
-                    # 空白行
-                    cells = [
-                        ws.cell(row=row_idx, column=1, value=''),
-                        ws.cell(row=row_idx, column=2, value=''),
-                        ws.cell(row=row_idx, column=3, value=''),
-                        ws.cell(row=row_idx, column=4, value=''),
-                        ws.cell(row=row_idx, column=5, value=''),
-                        ws.cell(row=row_idx, column=6, value=''),
-                        ws.cell(row=row_idx, column=7, value='')
-                    ]
-                
-                # 各セルに罫線とフォントサイズを設定
-                for col, cell in enumerate(cells, 1):
-                    # 明細部分のフォントサイズを小さく（明朝体）
-                    cell.font = Font(name='ＭＳ 明朝', size=9)  # 明朝体9pt
-                    
-                    # 数値セルは右揃え、テキストセルは自動縮小設定
-                    if col >= 5:  # 借方、貸方、差引金額
-                        cell.alignment = Alignment(horizontal='right', shrinkToFit=True)
-                        if detail_idx < data_rows:  # データがある場合のみ数値フォーマット
-                            cell.number_format = '#,##0'
-                    else:
-                        # テキストセルは自動縮小を有効化
-                        cell.alignment = Alignment(horizontal='left' if col > 2 else 'center', shrinkToFit=True)
-                    
-                    # 罫線設定（格子状）
-                    cell.border = Border(
-                        top=dashed_border,  # 横線は破線
-                        bottom=thick_border if is_last_row else dashed_border,  # 最終行は太線
-                        left=thick_border if col == 1 else solid_border,  # 左端は太線、縦線は実線
-                        right=thick_border if col == len(headers) else solid_border  # 右端は太線、縦線は実線
-                    )
-                
-            except Exception as e:
-                print(f"Error writing row {row_idx}: {e}")
-                continue
+        # A4縦1枚に収まらない件数は、見出し行を繰り返して複数ページに印刷
+        if data_rows > max_rows:
+            max_rows = data_rows
+            ws.fit_to_pages(1, 0)
+            ws.repeat_rows(start_row)
+        
+        # データ行（足りない分は空白行、最終行の下は中太線）
+        detail_styles = row_styles('detail')
+        blank_styles = row_styles('detail', number_format=False)
+        last_detail_styles = row_styles('detail', bottom=MEDIUM)
+        last_blank_styles = row_styles('detail', bottom=MEDIUM, number_format=False)
+        last_row = current_row + max_rows - 1
+        for detail_idx in range(max_rows):
+            row_idx = current_row + detail_idx
+            is_last_row = row_idx == last_row
+            
+            if detail_idx < data_rows:
+                detail = details[detail_idx]
+                styles = last_detail_styles if is_last_row else detail_styles
+                # 日付フォーマット変更: 25.9.12形式
+                ws.write(row_idx, 0, detail.journal_entry.reference_number or '-', styles[0])
+                ws.write(row_idx, 1, detail.journal_entry.entry_date.strftime('%y.%-m.%-d'), styles[1])
+                ws.write(row_idx, 2, detail.opposite_account_name, styles[2])
+                ws.write(row_idx, 3, detail.journal_entry.description, styles[3])
+                ws.write_number(row_idx, 4, detail.debit_amount if detail.debit_amount > 0 else 0, styles[4])
+                ws.write_number(row_idx, 5, detail.credit_amount if detail.credit_amount > 0 else 0, styles[5])
+                ws.write_number(row_idx, 6, detail.running_balance, styles[6])
+            else:
+                styles = last_blank_styles if is_last_row else blank_styles
+                for col in range(len(headers)):
+                    ws.write_blank(row_idx, col, None, styles[col])
         
         # 件数を右下に表示（明細の直後の行）
         count_row = current_row + max_rows + 1
-        count_cell = ws.cell(row=count_row, column=7, value=f"件数: {len(details)}件")
-        count_cell.font = Font(name='ＭＳ 明朝', bold=True, size=10)
-        count_cell.alignment = Alignment(horizontal='right')
+        ws.write(count_row, last_col, f"件数: {len(details)}件", book.style('count'))
         
         # 注記を件数の下の行に左寄せで追加
-        note_row = count_row + 1
-        note_cell = ws.cell(row=note_row, column=1, value="注)軽印は軽減税率対象　☆印は80%控除対象")
-        note_cell.font = Font(name='ＭＳ 明朝', size=9)
-        note_cell.alignment = Alignment(horizontal='left')
-        
-        # 列幅調整（摘要を42に調整）
-        column_widths = [6, 7, 12, 42, 9, 9, 9]  # 伝票No.: 6, 日付: 7, 相手科目: 12, 摘要: 42, 借方: 9, 貸方: 9, 差引: 9
-        for col, width in enumerate(column_widths, 1):
-            ws.column_dimensions[get_column_letter(col)].width = width
-            # 各列の幅に合わせてテキストを自動縮小
-            ws.column_dimensions[get_column_letter(col)].bestFit = True
-        
-        # レスポンス作成
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
+        ws.write(count_row + 1, 0, "注)軽印は軽減税率対象　☆印は80%控除対象", book.style('note'))
         
         filename = f"ledger_{account.account_code}_{year}.xlsx"
-        
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        return book.response(filename)
         
     except Exception as e:
         print(f"Excel export error: {e}")
@@ -7119,55 +5818,25 @@ def test_excel():
     except Exception as e:
         return f"Error: {e}"
 
-def create_cash_flow_statement(year):
+def create_cash_flow_statement(year, trial_balance=None):
     """キャッシュフロー計算書データ作成"""
     try:
         from types import SimpleNamespace
         
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         # 現金科目（現金、預金等）の期首・期末残高を取得
         cash_accounts = ['現金', '当座預金', '普通預金']
+        cash_lines = [line for line in map(trial_balance.line_named, cash_accounts) if line]
         
         # 期首現金残高
-        beginning_cash = 0
-        for account_name in cash_accounts:
-            account = AccountingAccount.query.filter_by(account_name=account_name).first()
-            if account:
-                opening_balance = OpeningBalance.query.filter_by(
-                    fiscal_year=year,
-                    account_id=account.id
-                ).first()
-                if opening_balance:
-                    beginning_cash += opening_balance.opening_balance
+        beginning_cash = sum(line.opening for line in cash_lines)
         
         # 期末現金残高（期首＋当期取引）
-        ending_cash = beginning_cash
-        for account_name in cash_accounts:
-            account = AccountingAccount.query.filter_by(account_name=account_name).first()
-            if account:
-                transactions = db.session.query(
-                    db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount)
-                ).join(JournalEntry).filter(
-                    JournalEntryDetail.account_id == account.id,
-                    db.extract('year', JournalEntry.entry_date) == year
-                ).scalar() or 0
-                ending_cash += transactions
+        ending_cash = beginning_cash + sum(line.movement for line in cash_lines)
         
         # 当期純利益計算
-        revenues = db.session.query(
-            db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount)
-        ).join(JournalEntry).join(AccountingAccount).filter(
-            AccountingAccount.account_type == '収益',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).scalar() or 0
-        
-        expenses = db.session.query(
-            db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount)
-        ).join(JournalEntry).join(AccountingAccount).filter(
-            AccountingAccount.account_type == '費用',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).scalar() or 0
-        
-        net_income = revenues - expenses
+        net_income = trial_balance.net_income
         
         # 簡易的なキャッシュフロー計算（実際はより複雑な調整が必要）
         depreciation = 0  # 減価償却費（簡易版では0）
@@ -7206,11 +5875,13 @@ def create_cash_flow_statement(year):
     except Exception:
         return None
 
-def create_equity_change_statement(year):
+def create_equity_change_statement(year, trial_balance=None):
     """株主資本等変動計算書データ作成"""
     try:
         from types import SimpleNamespace
         
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         # 資本金、剰余金等の期首・期末残高（簡易版）
         capital = 1000000  # 資本金（固定値）
         capital_surplus = 0  # 資本剰余金
@@ -7219,21 +5890,7 @@ def create_equity_change_statement(year):
         prev_retained_earnings = 0
         
         # 当期純利益計算
-        revenues = db.session.query(
-            db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount)
-        ).join(JournalEntry).join(AccountingAccount).filter(
-            AccountingAccount.account_type == '収益',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).scalar() or 0
-        
-        expenses = db.session.query(
-            db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount)
-        ).join(JournalEntry).join(AccountingAccount).filter(
-            AccountingAccount.account_type == '費用',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).scalar() or 0
-        
-        net_income = revenues - expenses
+        net_income = trial_balance.net_income
         dividend = 0  # 配当金（簡易版では0）
         
         # 当期末利益剰余金
@@ -7267,30 +5924,23 @@ def create_equity_change_statement(year):
     except Exception:
         return None
 
-def create_fixed_assets_schedule(year):
+def create_fixed_assets_schedule(year, trial_balance=None):
     """有形固定資産等明細書データ作成"""
     try:
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         # 簡易版：固定資産科目の残高変動を取得
         fixed_asset_types = ['建物', '機械装置', '車両運搬具', '工具器具備品']
         assets = []
         
         for asset_type in fixed_asset_types:
-            account = AccountingAccount.query.filter_by(account_name=asset_type).first()
+            account = trial_balance.line_named(asset_type)
             if account:
                 # 期首残高
-                opening_balance = OpeningBalance.query.filter_by(
-                    fiscal_year=year,
-                    account_id=account.id
-                ).first()
-                beginning_value = opening_balance.opening_balance if opening_balance else 0
+                beginning_value = account.opening
                 
                 # 当期増減
-                transactions = db.session.query(
-                    db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount)
-                ).join(JournalEntry).filter(
-                    JournalEntryDetail.account_id == account.id,
-                    db.extract('year', JournalEntry.entry_date) == year
-                ).scalar() or 0
+                transactions = account.movement
                 
                 increase = max(transactions, 0)
                 decrease = max(-transactions, 0)
@@ -7311,25 +5961,18 @@ def create_fixed_assets_schedule(year):
     except Exception:
         return []
 
-def create_bonds_schedule(year):
+def create_bonds_schedule(year, trial_balance=None):
     """社債明細書データ作成"""
     try:
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         # 簡易版：社債科目の残高変動を取得
         bonds = []
-        account = AccountingAccount.query.filter_by(account_name='社債').first()
+        account = trial_balance.line_named('社債')
         if account:
-            opening_balance = OpeningBalance.query.filter_by(
-                fiscal_year=year,
-                account_id=account.id
-            ).first()
-            beginning_value = opening_balance.opening_balance if opening_balance else 0
+            beginning_value = account.opening
             
-            transactions = db.session.query(
-                db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount)
-            ).join(JournalEntry).filter(
-                JournalEntryDetail.account_id == account.id,
-                db.extract('year', JournalEntry.entry_date) == year
-            ).scalar() or 0
+            transactions = -account.movement
             
             ending_value = beginning_value + transactions
             
@@ -7346,27 +5989,20 @@ def create_bonds_schedule(year):
     except Exception:
         return []
 
-def create_loans_schedule(year):
+def create_loans_schedule(year, trial_balance=None):
     """借入金明細書データ作成"""
     try:
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         loans = []
         loan_accounts = ['短期借入金', '長期借入金']
         
         for account_name in loan_accounts:
-            account = AccountingAccount.query.filter_by(account_name=account_name).first()
+            account = trial_balance.line_named(account_name)
             if account:
-                opening_balance = OpeningBalance.query.filter_by(
-                    fiscal_year=year,
-                    account_id=account.id
-                ).first()
-                beginning_value = opening_balance.opening_balance if opening_balance else 0
+                beginning_value = account.opening
                 
-                transactions = db.session.query(
-                    db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount)
-                ).join(JournalEntry).filter(
-                    JournalEntryDetail.account_id == account.id,
-                    db.extract('year', JournalEntry.entry_date) == year
-                ).scalar() or 0
+                transactions = -account.movement
                 
                 ending_value = beginning_value + transactions
                 
@@ -7383,27 +6019,20 @@ def create_loans_schedule(year):
     except Exception:
         return []
 
-def create_reserves_schedule(year):
+def create_reserves_schedule(year, trial_balance=None):
     """引当金明細書データ作成"""
     try:
+        trial_balance = trial_balance or trial_balance_for(year)
+        
         reserves = []
         reserve_accounts = ['貸倒引当金', '賞与引当金', '退職給付引当金']
         
         for account_name in reserve_accounts:
-            account = AccountingAccount.query.filter_by(account_name=account_name).first()
+            account = trial_balance.line_named(account_name)
             if account:
-                opening_balance = OpeningBalance.query.filter_by(
-                    fiscal_year=year,
-                    account_id=account.id
-                ).first()
-                beginning_value = opening_balance.opening_balance if opening_balance else 0
+                beginning_value = account.opening
                 
-                transactions = db.session.query(
-                    db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount)
-                ).join(JournalEntry).filter(
-                    JournalEntryDetail.account_id == account.id,
-                    db.extract('year', JournalEntry.entry_date) == year
-                ).scalar() or 0
+                transactions = -account.movement
                 
                 ending_value = beginning_value + transactions
                 
@@ -7422,844 +6051,6 @@ def create_reserves_schedule(year):
     except Exception:
         return []
 
-def generate_financial_statements_excel(assets, liabilities, revenues, expenses, cash_flow, equity_change,
-                                       fixed_assets, bonds, loans, reserves, year, report_type):
-    """財務諸表のExcel生成（データベース連動版）"""
-    # データベース連動財務諸表生成機能を使用
-    try:
-        from database_integrated_financial_generator import generate_mixed_orientation_financial_statements_from_db
-
-        # 会社名をサンプルに設定（実際のシステムでは動的に取得）
-        company_name = "株式会社サンプル"
-
-        # 実際のデータベースデータを辞書形式に変換
-        assets_data = []
-        liabilities_data = []
-        revenues_data = []
-        expenses_data = []
-
-        # 資産データ変換
-        for asset in assets:
-            assets_data.append({
-                'account_name': asset.account_name,
-                'total_balance': float(asset.balance) if asset.balance else 0
-            })
-
-        # 負債データ変換
-        for liability in liabilities:
-            liabilities_data.append({
-                'account_name': liability.account_name,
-                'total_balance': float(liability.balance) if liability.balance else 0
-            })
-
-        # 収益データ変換
-        for revenue in revenues:
-            revenues_data.append({
-                'account_name': revenue.account_name,
-                'total_amount': float(revenue.balance) if revenue.balance else 0
-            })
-
-        # 費用データ変換
-        for expense in expenses:
-            expenses_data.append({
-                'account_name': expense.account_name,
-                'total_amount': float(expense.balance) if expense.balance else 0
-            })
-
-        # データベース連動Excel生成
-        return generate_mixed_orientation_financial_statements_from_db(
-            company_name, year, assets_data, liabilities_data, revenues_data, expenses_data
-        )
-
-    except ImportError:
-        # フォールバック：混合レイアウト版を使用
-        try:
-            from mixed_orientation_financial_generator import generate_mixed_orientation_financial_statements
-            company_name = "株式会社サンプル"
-            return generate_mixed_orientation_financial_statements(company_name, year)
-        except ImportError:
-            # フォールバック：改良版を使用
-            try:
-                from improved_financial_excel_generator import create_improved_financial_statements_excel
-                return create_improved_financial_statements_excel(
-                    assets, liabilities, revenues, expenses, cash_flow, equity_change,
-                    fixed_assets, bonds, loans, reserves, year, report_type
-                )
-            except ImportError:
-                # 最後のフォールバック：従来版を使用
-                from io import BytesIO
-                import openpyxl
-                from openpyxl.styles import Font, Alignment, Border, Side, PatternFill
-                from openpyxl.utils import get_column_letter
-
-                # ワークブック作成
-                wb = openpyxl.Workbook()
-    
-    # スタイル定義
-    title_font = Font(name='ＭＳ 明朝', size=16, bold=True)
-    header_font = Font(name='ＭＳ 明朝', size=11, bold=True)
-    normal_font = Font(name='ＭＳ 明朝', size=10)
-    center_alignment = Alignment(horizontal='center', vertical='center')
-    left_alignment = Alignment(horizontal='left', vertical='center')
-    right_alignment = Alignment(horizontal='right', vertical='center')
-    
-    thin_border = Border(
-        left=Side(style='thin'), right=Side(style='thin'),
-        top=Side(style='thin'), bottom=Side(style='thin')
-    )
-    thick_border = Border(
-        left=Side(style='thick'), right=Side(style='thick'),
-        top=Side(style='thick'), bottom=Side(style='thick')
-    )
-    
-    # 全ての帳票または貸借対照表
-    if report_type in ['all', 'balance_sheet']:
-        ws_bs = wb.active if report_type == 'balance_sheet' else wb.create_sheet("貸借対照表")
-        ws_bs.title = "貸借対照表"
-        create_balance_sheet_excel(ws_bs, assets, liabilities, year, title_font, header_font, normal_font, 
-                                 center_alignment, left_alignment, right_alignment, thin_border)
-    
-    # 損益計算書
-    if report_type in ['all', 'income_statement']:
-        ws_pl = wb.create_sheet("損益計算書")
-        create_income_statement_excel(ws_pl, revenues, expenses, year, title_font, header_font, normal_font,
-                                    center_alignment, left_alignment, right_alignment, thin_border)
-    
-    # キャッシュフロー計算書
-    if report_type in ['all', 'cash_flow']:
-        ws_cf = wb.create_sheet("キャッシュフロー計算書")
-        create_cash_flow_excel(ws_cf, cash_flow, year, title_font, header_font, normal_font,
-                             center_alignment, left_alignment, right_alignment, thin_border)
-    
-    # 株主資本等変動計算書
-    if report_type in ['all', 'equity_change']:
-        ws_eq = wb.create_sheet("株主資本等変動計算書")
-        create_equity_change_excel(ws_eq, equity_change, year, title_font, header_font, normal_font,
-                                 center_alignment, left_alignment, right_alignment, thin_border)
-    
-    # 附属明細書
-    if report_type in ['all', 'notes']:
-        ws_notes = wb.create_sheet("附属明細書")
-        create_notes_excel(ws_notes, fixed_assets, bonds, loans, reserves, year, title_font, header_font, normal_font,
-                          center_alignment, left_alignment, right_alignment, thin_border)
-    
-    # デフォルトシートを削除（allの場合）
-    if report_type == 'all' and 'Sheet' in wb.sheetnames:
-        wb.remove(wb['Sheet'])
-    
-    # バイナリストリームに保存
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)
-    
-    return output
-
-def create_balance_sheet_excel(ws, assets, liabilities, year, title_font, header_font, normal_font,
-                              center_alignment, left_alignment, right_alignment, thin_border):
-    """貸借対照表シート作成（標準アカウント式フォーマット）"""
-    
-    # タイトル設定
-    ws['A1'] = '貸借対照表'
-    ws['A1'].font = title_font
-    ws['A1'].alignment = center_alignment
-    ws.merge_cells('A1:H1')
-    
-    # 期間表示
-    ws['A3'] = f'{year+1}年 3月31日現在'
-    ws['A3'].font = header_font
-    ws['A3'].alignment = center_alignment
-    ws.merge_cells('A3:H3')
-    
-    # 単位表示
-    ws['H2'] = '(単位：円)'
-    ws['H2'].font = normal_font
-    ws['H2'].alignment = right_alignment
-    
-    # 列幅設定（アカウント式レイアウト）
-    ws.column_dimensions['A'].width = 5   # 番号列
-    ws.column_dimensions['B'].width = 25  # 資産科目
-    ws.column_dimensions['C'].width = 15  # 資産金額
-    ws.column_dimensions['D'].width = 5   # 空白
-    ws.column_dimensions['E'].width = 5   # 番号列
-    ws.column_dimensions['F'].width = 25  # 負債・純資産科目
-    ws.column_dimensions['G'].width = 15  # 負債・純資産金額
-    ws.column_dimensions['H'].width = 5   # 空白
-    
-    # ヘッダー行設定
-    row = 5
-    # 左側（資産の部）
-    ws[f'B{row}'] = '資産の部'
-    ws[f'C{row}'] = '金額'
-    # 右側（負債・純資産の部）
-    ws[f'F{row}'] = '負債・純資産の部'
-    ws[f'G{row}'] = '金額'
-    
-    # ヘッダー行のスタイル設定
-    for col in ['B', 'C', 'F', 'G']:
-        ws[f'{col}{row}'].font = header_font
-        ws[f'{col}{row}'].alignment = center_alignment
-        ws[f'{col}{row}'].border = thin_border
-    
-    row += 1
-    
-    # 左側：資産の部
-    asset_row = row
-    
-    # 流動資産
-    ws[f'B{asset_row}'] = '流動資産'
-    ws[f'B{asset_row}'].font = header_font
-    ws[f'B{asset_row}'].alignment = left_alignment
-    asset_row += 1
-    
-    current_assets = 0
-    for asset in assets:
-        # 流動資産の判定（簡略化）
-        if any(keyword in asset.account_name for keyword in ['現金', '預金', '売掛金', '未収金', '在庫', '商品']):
-            ws[f'B{asset_row}'] = f'　{asset.account_name}'
-            ws[f'C{asset_row}'] = f"{asset.balance:,}" if asset.balance != 0 else "-"
-            ws[f'B{asset_row}'].font = normal_font
-            ws[f'C{asset_row}'].font = normal_font
-            ws[f'C{asset_row}'].alignment = right_alignment
-            current_assets += asset.balance
-            asset_row += 1
-    
-    # 流動資産計
-    ws[f'B{asset_row}'] = '流動資産計'
-    ws[f'C{asset_row}'] = f"{current_assets:,}"
-    ws[f'B{asset_row}'].font = header_font
-    ws[f'C{asset_row}'].font = header_font
-    ws[f'C{asset_row}'].alignment = right_alignment
-    for col in ['B', 'C']:
-        ws[f'{col}{asset_row}'].border = thin_border
-    asset_row += 1
-    
-    # 固定資産
-    ws[f'B{asset_row}'] = '固定資産'
-    ws[f'B{asset_row}'].font = header_font
-    ws[f'B{asset_row}'].alignment = left_alignment
-    asset_row += 1
-    
-    fixed_assets = 0
-    for asset in assets:
-        # 固定資産の判定
-        if not any(keyword in asset.account_name for keyword in ['現金', '預金', '売掛金', '未収金', '在庫', '商品']):
-            ws[f'B{asset_row}'] = f'　{asset.account_name}'
-            ws[f'C{asset_row}'] = f"{asset.balance:,}" if asset.balance != 0 else "-"
-            ws[f'B{asset_row}'].font = normal_font
-            ws[f'C{asset_row}'].font = normal_font
-            ws[f'C{asset_row}'].alignment = right_alignment
-            fixed_assets += asset.balance
-            asset_row += 1
-    
-    # 固定資産計
-    ws[f'B{asset_row}'] = '固定資産計'
-    ws[f'C{asset_row}'] = f"{fixed_assets:,}"
-    ws[f'B{asset_row}'].font = header_font
-    ws[f'C{asset_row}'].font = header_font
-    ws[f'C{asset_row}'].alignment = right_alignment
-    for col in ['B', 'C']:
-        ws[f'{col}{asset_row}'].border = thin_border
-    asset_row += 1
-    
-    # 資産合計
-    total_assets = current_assets + fixed_assets
-    ws[f'B{asset_row}'] = '資産合計'
-    ws[f'C{asset_row}'] = f"{total_assets:,}"
-    ws[f'B{asset_row}'].font = title_font
-    ws[f'C{asset_row}'].font = title_font
-    ws[f'C{asset_row}'].alignment = right_alignment
-    for col in ['B', 'C']:
-        ws[f'{col}{asset_row}'].border = thin_border
-    
-    # 右側：負債・純資産の部
-    liability_row = row
-    
-    # 流動負債
-    ws[f'F{liability_row}'] = '流動負債'
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'F{liability_row}'].alignment = left_alignment
-    liability_row += 1
-    
-    current_liabilities = 0
-    for liability in liabilities:
-        # 流動負債の判定
-        if any(keyword in liability.account_name for keyword in ['買掛金', '未払金', '短期借入金', '預り金']):
-            ws[f'F{liability_row}'] = f'　{liability.account_name}'
-            ws[f'G{liability_row}'] = f"{liability.balance:,}" if liability.balance != 0 else "-"
-            ws[f'F{liability_row}'].font = normal_font
-            ws[f'G{liability_row}'].font = normal_font
-            ws[f'G{liability_row}'].alignment = right_alignment
-            current_liabilities += liability.balance
-            liability_row += 1
-    
-    # 流動負債計
-    ws[f'F{liability_row}'] = '流動負債計'
-    ws[f'G{liability_row}'] = f"{current_liabilities:,}"
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    for col in ['F', 'G']:
-        ws[f'{col}{liability_row}'].border = thin_border
-    liability_row += 1
-    
-    # 固定負債
-    ws[f'F{liability_row}'] = '固定負債'
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'F{liability_row}'].alignment = left_alignment
-    liability_row += 1
-    
-    fixed_liabilities = 0
-    for liability in liabilities:
-        # 固定負債の判定
-        if not any(keyword in liability.account_name for keyword in ['買掛金', '未払金', '短期借入金', '預り金']):
-            ws[f'F{liability_row}'] = f'　{liability.account_name}'
-            ws[f'G{liability_row}'] = f"{liability.balance:,}" if liability.balance != 0 else "-"
-            ws[f'F{liability_row}'].font = normal_font
-            ws[f'G{liability_row}'].font = normal_font
-            ws[f'G{liability_row}'].alignment = right_alignment
-            fixed_liabilities += liability.balance
-            liability_row += 1
-    
-    # 固定負債計
-    ws[f'F{liability_row}'] = '固定負債計'
-    ws[f'G{liability_row}'] = f"{fixed_liabilities:,}"
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    for col in ['F', 'G']:
-        ws[f'{col}{liability_row}'].border = thin_border
-    liability_row += 1
-    
-    # 負債合計
-    total_liabilities = current_liabilities + fixed_liabilities
-    ws[f'F{liability_row}'] = '負債合計'
-    ws[f'G{liability_row}'] = f"{total_liabilities:,}"
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    for col in ['F', 'G']:
-        ws[f'{col}{liability_row}'].border = thin_border
-    liability_row += 1
-    
-    # 純資産の部
-    liability_row += 1
-    ws[f'F{liability_row}'] = '純資産の部'
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'F{liability_row}'].alignment = left_alignment
-    liability_row += 1
-    
-    # 資本金
-    capital = 1000000  # 仮の資本金
-    ws[f'F{liability_row}'] = '　資本金'
-    ws[f'G{liability_row}'] = f"{capital:,}"
-    ws[f'F{liability_row}'].font = normal_font
-    ws[f'G{liability_row}'].font = normal_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    liability_row += 1
-    
-    # 利益剰余金
-    retained_earnings = total_assets - total_liabilities - capital
-    ws[f'F{liability_row}'] = '　利益剰余金'
-    ws[f'G{liability_row}'] = f"{retained_earnings:,}"
-    ws[f'F{liability_row}'].font = normal_font
-    ws[f'G{liability_row}'].font = normal_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    liability_row += 1
-    
-    # 純資産合計
-    total_equity = capital + retained_earnings
-    ws[f'F{liability_row}'] = '純資産合計'
-    ws[f'G{liability_row}'] = f"{total_equity:,}"
-    ws[f'F{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].font = header_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    for col in ['F', 'G']:
-        ws[f'{col}{liability_row}'].border = thin_border
-    liability_row += 1
-    
-    # 負債・純資産合計
-    total_liabilities_equity = total_liabilities + total_equity
-    ws[f'F{liability_row}'] = '負債・純資産合計'
-    ws[f'G{liability_row}'] = f"{total_liabilities_equity:,}"
-    ws[f'F{liability_row}'].font = title_font
-    ws[f'G{liability_row}'].font = title_font
-    ws[f'G{liability_row}'].alignment = right_alignment
-    for col in ['F', 'G']:
-        ws[f'{col}{liability_row}'].border = thin_border
-
-def create_income_statement_excel(ws, revenues, expenses, year, title_font, header_font, normal_font,
-                                center_alignment, left_alignment, right_alignment, thin_border):
-    """損益計算書シート作成（標準日本会計基準フォーマット）"""
-    
-    # タイトル設定
-    ws['A1'] = '損益計算書'
-    ws['A1'].font = title_font
-    ws['A1'].alignment = center_alignment
-    ws.merge_cells('A1:E1')
-    
-    # 期間表示
-    ws['A3'] = f'自　{year}年 4月 1日　至　{year+1}年 3月31日'
-    ws['A3'].font = header_font
-    ws['A3'].alignment = center_alignment
-    ws.merge_cells('A3:E3')
-    
-    # 単位表示
-    ws['E2'] = '(単位：円)'
-    ws['E2'].font = normal_font
-    ws['E2'].alignment = right_alignment
-    
-    # 列幅設定
-    ws.column_dimensions['A'].width = 5
-    ws.column_dimensions['B'].width = 40
-    ws.column_dimensions['C'].width = 10
-    ws.column_dimensions['D'].width = 15
-    ws.column_dimensions['E'].width = 15
-    
-    # ヘッダー行設定
-    row = 5
-    ws[f'B{row}'] = '科目'
-    ws[f'D{row}'] = '注記'
-    ws[f'E{row}'] = '金額'
-    
-    # ヘッダー行のスタイル設定
-    for col in ['B', 'D', 'E']:
-        ws[f'{col}{row}'].font = header_font
-        ws[f'{col}{row}'].alignment = center_alignment
-        ws[f'{col}{row}'].border = thin_border
-    
-    row += 1
-    
-    # 売上高
-    sales_total = 0
-    for revenue in revenues:
-        if '売上' in revenue.account_name:
-            ws[f'B{row}'] = revenue.account_name
-            ws[f'E{row}'] = f"{revenue.balance:,}" if revenue.balance != 0 else "-"
-            ws[f'B{row}'].font = normal_font
-            ws[f'E{row}'].font = normal_font
-            ws[f'E{row}'].alignment = right_alignment
-            sales_total += revenue.balance
-            row += 1
-    
-    # 売上高計
-    if sales_total > 0:
-        ws[f'B{row}'] = '売上高'
-        ws[f'E{row}'] = f"{sales_total:,}"
-        ws[f'B{row}'].font = header_font
-        ws[f'E{row}'].font = header_font
-        ws[f'E{row}'].alignment = right_alignment
-        # 罫線追加
-        for col in ['B', 'C', 'D', 'E']:
-            ws[f'{col}{row}'].border = thin_border
-        row += 1
-    
-    # 売上原価
-    cost_of_sales = 0
-    for expense in expenses:
-        if any(keyword in expense.account_name for keyword in ['材料費', '商品仕入', '製造', '原価']):
-            ws[f'B{row}'] = f'　{expense.account_name}'
-            ws[f'E{row}'] = f"{expense.balance:,}" if expense.balance != 0 else "-"
-            ws[f'B{row}'].font = normal_font
-            ws[f'E{row}'].font = normal_font
-            ws[f'E{row}'].alignment = right_alignment
-            cost_of_sales += expense.balance
-            row += 1
-    
-    # 売上原価計
-    ws[f'B{row}'] = '売上原価'
-    ws[f'E{row}'] = f"{cost_of_sales:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 売上総利益
-    gross_profit = sales_total - cost_of_sales
-    ws[f'B{row}'] = '売上総利益'
-    ws[f'E{row}'] = f"{gross_profit:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 販売費及び一般管理費
-    sg_a_expenses = 0
-    for expense in expenses:
-        if not any(keyword in expense.account_name for keyword in ['材料費', '商品仕入', '製造', '原価', '営業外', '特別']):
-            ws[f'B{row}'] = f'　{expense.account_name}'
-            ws[f'E{row}'] = f"{expense.balance:,}" if expense.balance != 0 else "-"
-            ws[f'B{row}'].font = normal_font
-            ws[f'E{row}'].font = normal_font
-            ws[f'E{row}'].alignment = right_alignment
-            sg_a_expenses += expense.balance
-            row += 1
-    
-    # 販売費及び一般管理費計
-    ws[f'B{row}'] = '販売費及び一般管理費'
-    ws[f'E{row}'] = f"{sg_a_expenses:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 営業利益
-    operating_income = gross_profit - sg_a_expenses
-    ws[f'B{row}'] = '営業利益'
-    ws[f'E{row}'] = f"{operating_income:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 営業外収益
-    non_operating_income = 0
-    for revenue in revenues:
-        if '売上' not in revenue.account_name:
-            ws[f'B{row}'] = f'　{revenue.account_name}'
-            ws[f'E{row}'] = f"{revenue.balance:,}" if revenue.balance != 0 else "-"
-            ws[f'B{row}'].font = normal_font
-            ws[f'E{row}'].font = normal_font
-            ws[f'E{row}'].alignment = right_alignment
-            non_operating_income += revenue.balance
-            row += 1
-    
-    # 営業外費用
-    non_operating_expense = 0
-    for expense in expenses:
-        if '営業外' in expense.account_name:
-            ws[f'B{row}'] = f'　{expense.account_name}'
-            ws[f'E{row}'] = f"{expense.balance:,}" if expense.balance != 0 else "-"
-            ws[f'B{row}'].font = normal_font
-            ws[f'E{row}'].font = normal_font
-            ws[f'E{row}'].alignment = right_alignment
-            non_operating_expense += expense.balance
-            row += 1
-    
-    # 経常利益
-    ordinary_income = operating_income + non_operating_income - non_operating_expense
-    ws[f'B{row}'] = '経常利益'
-    ws[f'E{row}'] = f"{ordinary_income:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 特別利益・特別損失（必要に応じて追加）
-    
-    # 税引前当期純利益
-    ws[f'B{row}'] = '税引前当期純利益'
-    ws[f'E{row}'] = f"{ordinary_income:,}"
-    ws[f'B{row}'].font = header_font
-    ws[f'E{row}'].font = header_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    row += 1
-    
-    # 法人税等（簡略化）
-    tax_rate = 0.3  # 仮定
-    tax_expense = ordinary_income * tax_rate
-    ws[f'B{row}'] = '法人税等'
-    ws[f'E{row}'] = f"{tax_expense:,.0f}"
-    ws[f'B{row}'].font = normal_font
-    ws[f'E{row}'].font = normal_font
-    ws[f'E{row}'].alignment = right_alignment
-    row += 1
-    
-    # 当期純利益
-    net_income = ordinary_income - tax_expense
-    ws[f'B{row}'] = '当期純利益'
-    ws[f'E{row}'] = f"{net_income:,.0f}"
-    ws[f'B{row}'].font = title_font
-    ws[f'E{row}'].font = title_font
-    ws[f'E{row}'].alignment = right_alignment
-    for col in ['B', 'C', 'D', 'E']:
-        ws[f'{col}{row}'].border = thin_border
-    
-    # 罫線適用
-    for row_num in range(1, row + 1):
-        for col_num in range(1, 4):
-            cell = ws.cell(row=row_num, column=col_num)
-            cell.border = thin_border
-
-def create_cash_flow_excel(ws, cash_flow, year, title_font, header_font, normal_font,
-                          center_alignment, left_alignment, right_alignment, thin_border):
-    """キャッシュフロー計算書シート作成"""
-    
-    # タイトル
-    ws['A1'] = 'キャッシュフロー計算書'
-    ws['A1'].font = title_font
-    ws['A1'].alignment = center_alignment
-    ws.merge_cells('A1:C1')
-    
-    # 期間表示
-    ws['A2'] = f'{year}年4月1日から{year+1}年3月31日まで'
-    ws['A2'].font = header_font
-    ws['A2'].alignment = center_alignment
-    ws.merge_cells('A2:C2')
-    
-    # 列幅設定
-    ws.column_dimensions['A'].width = 35
-    ws.column_dimensions['B'].width = 15
-    
-    row = 4
-    
-    if cash_flow:
-        # 営業活動によるキャッシュフロー
-        ws[f'A{row}'] = '営業活動によるキャッシュフロー'
-        ws[f'A{row}'].font = header_font
-        row += 1
-        
-        ws[f'A{row}'] = '  税引前当期純利益'
-        ws[f'B{row}'] = f"{cash_flow.operating.pre_tax_income:,}"
-        ws[f'A{row}'].font = normal_font
-        ws[f'B{row}'].font = normal_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 1
-        
-        ws[f'A{row}'] = '  減価償却費'
-        ws[f'B{row}'] = f"{cash_flow.operating.depreciation:,}"
-        ws[f'A{row}'].font = normal_font
-        ws[f'B{row}'].font = normal_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 1
-        
-        ws[f'A{row}'] = '営業活動によるキャッシュフロー'
-        ws[f'B{row}'] = f"{cash_flow.operating.total:,}"
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 2
-        
-        # 投資活動によるキャッシュフロー
-        ws[f'A{row}'] = '投資活動によるキャッシュフロー'
-        ws[f'A{row}'].font = header_font
-        row += 1
-        
-        ws[f'A{row}'] = '投資活動によるキャッシュフロー'
-        ws[f'B{row}'] = f"{cash_flow.investing.total:,}"
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 2
-        
-        # 財務活動によるキャッシュフロー
-        ws[f'A{row}'] = '財務活動によるキャッシュフロー'
-        ws[f'A{row}'].font = header_font
-        row += 1
-        
-        ws[f'A{row}'] = '財務活動によるキャッシュフロー'
-        ws[f'B{row}'] = f"{cash_flow.financing.total:,}"
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 2
-        
-        # 現金および現金同等物の増減額
-        cash_change = cash_flow.operating.total + cash_flow.investing.total + cash_flow.financing.total
-        ws[f'A{row}'] = '現金および現金同等物の増減額'
-        ws[f'B{row}'] = f"{cash_change:,}"
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 1
-        
-        # 期首現金および現金同等物
-        ws[f'A{row}'] = '期首現金および現金同等物'
-        ws[f'B{row}'] = f"{cash_flow.beginning_cash:,}"
-        ws[f'A{row}'].font = normal_font
-        ws[f'B{row}'].font = normal_font
-        ws[f'B{row}'].alignment = right_alignment
-        row += 1
-        
-        # 期末現金および現金同等物
-        ws[f'A{row}'] = '期末現金および現金同等物'
-        ws[f'B{row}'] = f"{cash_flow.ending_cash:,}"
-        ws[f'A{row}'].font = header_font
-        ws[f'B{row}'].font = header_font
-        ws[f'B{row}'].alignment = right_alignment
-    else:
-        ws[f'A{row}'] = 'データがありません'
-        ws[f'A{row}'].font = normal_font
-    
-    # 罫線適用
-    for row_num in range(1, row + 1):
-        for col_num in range(1, 3):
-            cell = ws.cell(row=row_num, column=col_num)
-            cell.border = thin_border
-
-def create_equity_change_excel(ws, equity_change, year, title_font, header_font, normal_font,
-                              center_alignment, left_alignment, right_alignment, thin_border):
-    """株主資本等変動計算書シート作成"""
-    
-    # タイトル
-    ws['A1'] = '株主資本等変動計算書'
-    ws['A1'].font = title_font
-    ws['A1'].alignment = center_alignment
-    ws.merge_cells('A1:F1')
-    
-    # 期間表示
-    ws['A2'] = f'{year}年4月1日から{year+1}年3月31日まで'
-    ws['A2'].font = header_font
-    ws['A2'].alignment = center_alignment
-    ws.merge_cells('A2:F2')
-    
-    # 列幅設定
-    ws.column_dimensions['A'].width = 20
-    for col in ['B', 'C', 'D', 'E', 'F']:
-        ws.column_dimensions[col].width = 12
-    
-    row = 4
-    
-    # ヘッダー
-    headers = ['', '資本金', '資本剰余金', '利益剰余金', '自己株式', '株主資本合計']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col, value=header)
-        cell.font = header_font
-        cell.alignment = center_alignment
-        cell.border = thin_border
-    row += 1
-    
-    if equity_change:
-        # 当期首残高
-        ws[f'A{row}'] = '当期首残高'
-        ws[f'B{row}'] = f"{equity_change.beginning.capital:,}"
-        ws[f'C{row}'] = f"{equity_change.beginning.capital_surplus:,}"
-        ws[f'D{row}'] = f"{equity_change.beginning.retained_earnings:,}"
-        ws[f'E{row}'] = f"{equity_change.beginning.treasury_stock:,}"
-        ws[f'F{row}'] = f"{equity_change.beginning.total:,}"
-        for col in range(1, 7):
-            cell = ws.cell(row=row, column=col)
-            cell.font = normal_font
-            cell.alignment = right_alignment if col > 1 else left_alignment
-            cell.border = thin_border
-        row += 1
-        
-        # 当期純利益
-        ws[f'A{row}'] = '当期純利益'
-        ws[f'D{row}'] = f"{equity_change.changes.net_income:,}"
-        ws[f'F{row}'] = f"{equity_change.changes.net_income:,}"
-        for col in range(1, 7):
-            cell = ws.cell(row=row, column=col)
-            cell.font = normal_font
-            cell.alignment = right_alignment if col > 1 else left_alignment
-            cell.border = thin_border
-        row += 1
-        
-        # 当期末残高
-        ws[f'A{row}'] = '当期末残高'
-        ws[f'B{row}'] = f"{equity_change.ending.capital:,}"
-        ws[f'C{row}'] = f"{equity_change.ending.capital_surplus:,}"
-        ws[f'D{row}'] = f"{equity_change.ending.retained_earnings:,}"
-        ws[f'E{row}'] = f"{equity_change.ending.treasury_stock:,}"
-        ws[f'F{row}'] = f"{equity_change.ending.total:,}"
-        for col in range(1, 7):
-            cell = ws.cell(row=row, column=col)
-            cell.font = header_font
-            cell.alignment = right_alignment if col > 1 else left_alignment
-            cell.border = thin_border
-    else:
-        ws[f'A{row}'] = 'データがありません'
-        ws[f'A{row}'].font = normal_font
-
-def create_notes_excel(ws, fixed_assets, bonds, loans, reserves, year, title_font, header_font, normal_font,
-                      center_alignment, left_alignment, right_alignment, thin_border):
-    """附属明細書シート作成"""
-    
-    # タイトル
-    ws['A1'] = '附属明細書'
-    ws['A1'].font = title_font
-    ws['A1'].alignment = center_alignment
-    ws.merge_cells('A1:G1')
-    
-    # 期間表示
-    ws['A2'] = f'{year}年4月1日から{year+1}年3月31日まで'
-    ws['A2'].font = header_font
-    ws['A2'].alignment = center_alignment
-    ws.merge_cells('A2:G2')
-    
-    row = 4
-    
-    # 有形固定資産等明細書
-    ws[f'A{row}'] = '有形固定資産等明細書'
-    ws[f'A{row}'].font = header_font
-    row += 1
-    
-    # ヘッダー
-    headers = ['資産の種類', '期首帳簿価額', '当期増加額', '当期減少額', '期末帳簿価額', '減価償却累計額', '期末取得価額']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col, value=header)
-        cell.font = header_font
-        cell.alignment = center_alignment
-        cell.border = thin_border
-    row += 1
-    
-    if fixed_assets:
-        for asset in fixed_assets:
-            ws[f'A{row}'] = asset.asset_type
-            ws[f'B{row}'] = f"{asset.beginning_book_value:,}"
-            ws[f'C{row}'] = f"{asset.increase:,}"
-            ws[f'D{row}'] = f"{asset.decrease:,}"
-            ws[f'E{row}'] = f"{asset.ending_book_value:,}"
-            ws[f'F{row}'] = f"{asset.accumulated_depreciation:,}"
-            ws[f'G{row}'] = f"{asset.acquisition_cost:,}"
-            for col in range(1, 8):
-                cell = ws.cell(row=row, column=col)
-                cell.font = normal_font
-                cell.alignment = right_alignment if col > 1 else left_alignment
-                cell.border = thin_border
-            row += 1
-    else:
-        ws[f'A{row}'] = 'データがありません'
-        ws[f'A{row}'].font = normal_font
-        row += 1
-    
-    row += 2
-    
-    # 借入金明細書
-    ws[f'A{row}'] = '借入金明細書'
-    ws[f'A{row}'].font = header_font
-    row += 1
-    
-    # ヘッダー
-    headers = ['借入先', '期首残高', '当期増減', '期末残高']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col, value=header)
-        cell.font = header_font
-        cell.alignment = center_alignment
-        cell.border = thin_border
-    row += 1
-    
-    if loans:
-        for loan in loans:
-            ws[f'A{row}'] = loan.lender
-            ws[f'B{row}'] = f"{loan.beginning_balance:,}"
-            ws[f'C{row}'] = f"{loan.change:,}"
-            ws[f'D{row}'] = f"{loan.ending_balance:,}"
-            for col in range(1, 5):
-                cell = ws.cell(row=row, column=col)
-                cell.font = normal_font
-                cell.alignment = right_alignment if col > 1 else left_alignment
-                cell.border = thin_border
-            row += 1
-    else:
-        ws[f'A{row}'] = 'データがありません'
-        ws[f'A{row}'].font = normal_font
-    
-    # 列幅設定
-    for col_letter in ['A', 'B', 'C', 'D', 'E', 'F', 'G']:
-        ws.column_dimensions[col_letter].width = 15
-
 @app.route('/financial_statements')
 @login_required
 def financial_statements():
@@ -8270,58 +6061,26 @@ def financial_statements():
     
     year = request.args.get('year', type=int, default=datetime.now().year)
     
-    # 簡易的な財務諸表データを作成
-    # 実際の実装では、より複雑な集計処理が必要
-    
-    # 資産科目の残高
-    assets = db.session.query(
-        AccountingAccount.account_name,
-        db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount).label('balance')
-    ).join(JournalEntryDetail).join(JournalEntry).filter(
-        AccountingAccount.account_type == '資産',
-        db.extract('year', JournalEntry.entry_date) == year
-    ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-    
-    # 負債科目の残高
-    liabilities = db.session.query(
-        AccountingAccount.account_name,
-        db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount).label('balance')
-    ).join(JournalEntryDetail).join(JournalEntry).filter(
-        AccountingAccount.account_type == '負債',
-        db.extract('year', JournalEntry.entry_date) == year
-    ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-    
-    # 収益科目の残高
-    revenues = db.session.query(
-        AccountingAccount.account_name,
-        db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount).label('balance')
-    ).join(JournalEntryDetail).join(JournalEntry).filter(
-        AccountingAccount.account_type == '収益',
-        db.extract('year', JournalEntry.entry_date) == year
-    ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-    
-    # 費用科目の残高
-    expenses = db.session.query(
-        AccountingAccount.account_name,
-        db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount).label('balance')
-    ).join(JournalEntryDetail).join(JournalEntry).filter(
-        AccountingAccount.account_type == '費用',
-        db.extract('year', JournalEntry.entry_date) == year
-    ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
+    # 試算表（全科目の期首残高・借方・貸方を1回で集計）から各財務諸表を作成
+    trial_balance = trial_balance_for(year)
+    assets = trial_balance.statement_lines('資産')
+    liabilities = trial_balance.statement_lines('負債')
+    revenues = trial_balance.statement_lines('収益')
+    expenses = trial_balance.statement_lines('費用')
     
     years = list(range(datetime.now().year - 2, datetime.now().year + 2))
     
     # キャッシュフロー計算書データ作成
-    cash_flow = create_cash_flow_statement(year)
+    cash_flow = create_cash_flow_statement(year, trial_balance)
     
     # 株主資本等変動計算書データ作成
-    equity_change = create_equity_change_statement(year)
+    equity_change = create_equity_change_statement(year, trial_balance)
     
     # 附属明細書データ作成
-    fixed_assets = create_fixed_assets_schedule(year)
-    bonds = create_bonds_schedule(year)
-    loans = create_loans_schedule(year)
-    reserves = create_reserves_schedule(year)
+    fixed_assets = create_fixed_assets_schedule(year, trial_balance)
+    bonds = create_bonds_schedule(year, trial_balance)
+    loans = create_loans_schedule(year, trial_balance)
+    reserves = create_reserves_schedule(year, trial_balance)
     
     return render_template('financial_statements.html',
                          assets=assets,
@@ -8337,6 +6096,25 @@ def financial_statements():
                          selected_year=year,
                          years=years)
 
+def build_financial_statements_excel(year, report_type='all', page_profile=DEFAULT_PAGE_PROFILE):
+    """財務諸表のExcelを作成する（BytesIO を返す）"""
+    from types import SimpleNamespace
+    
+    # 画面と同じ試算表から、全帳票を1回で作成
+    trial_balance = trial_balance_for(year)
+    schedules = SimpleNamespace(
+        cash_flow=create_cash_flow_statement(year, trial_balance),
+        equity_change=create_equity_change_statement(year, trial_balance),
+        fixed_assets=create_fixed_assets_schedule(year, trial_balance),
+        bonds=create_bonds_schedule(year, trial_balance),
+        loans=create_loans_schedule(year, trial_balance),
+        reserves=create_reserves_schedule(year, trial_balance)
+    )
+    company_settings = CompanySettings.query.first()
+    company_name = company_settings.company_name if company_settings else '株式会社サンプル'
+    
+    return render_financial_statements(company_name, trial_balance, schedules, report_type, page_profile)
+
 @app.route('/export_financial_statements_excel')
 @login_required
 def export_financial_statements_excel():
@@ -8348,57 +6126,9 @@ def export_financial_statements_excel():
     try:
         year = request.args.get('year', type=int, default=datetime.now().year)
         report_type = request.args.get('type', default='all')  # all, balance_sheet, income_statement, cash_flow, equity_change, notes
+        page_profile = request.args.get('layout', default=DEFAULT_PAGE_PROFILE)  # mixed, a4_portrait, a4_landscape
         
-        # 財務諸表データを再取得
-        # 資産科目の残高
-        assets = db.session.query(
-            AccountingAccount.account_name,
-            db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount).label('balance')
-        ).join(JournalEntryDetail).join(JournalEntry).filter(
-            AccountingAccount.account_type == '資産',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-        
-        # 負債科目の残高
-        liabilities = db.session.query(
-            AccountingAccount.account_name,
-            db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount).label('balance')
-        ).join(JournalEntryDetail).join(JournalEntry).filter(
-            AccountingAccount.account_type == '負債',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-        
-        # 収益科目の残高
-        revenues = db.session.query(
-            AccountingAccount.account_name,
-            db.func.sum(JournalEntryDetail.credit_amount - JournalEntryDetail.debit_amount).label('balance')
-        ).join(JournalEntryDetail).join(JournalEntry).filter(
-            AccountingAccount.account_type == '収益',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-        
-        # 費用科目の残高
-        expenses = db.session.query(
-            AccountingAccount.account_name,
-            db.func.sum(JournalEntryDetail.debit_amount - JournalEntryDetail.credit_amount).label('balance')
-        ).join(JournalEntry).filter(
-            AccountingAccount.account_type == '費用',
-            db.extract('year', JournalEntry.entry_date) == year
-        ).group_by(AccountingAccount.id, AccountingAccount.account_name).all()
-        
-        # 新しい財務諸表データを作成
-        cash_flow = create_cash_flow_statement(year)
-        equity_change = create_equity_change_statement(year)
-        fixed_assets = create_fixed_assets_schedule(year)
-        bonds = create_bonds_schedule(year)
-        loans = create_loans_schedule(year)
-        reserves = create_reserves_schedule(year)
-        
-        # Excel生成
-        output = generate_financial_statements_excel(
-            assets, liabilities, revenues, expenses, cash_flow, equity_change,
-            fixed_assets, bonds, loans, reserves, year, report_type
-        )
+        output = build_financial_statements_excel(year, report_type, page_profile)
         
         # レスポンス作成
         response = make_response(output.getvalue())
@@ -8424,8 +6154,22 @@ def account_management():
         flash('アクセス権限がありません。')
         return redirect(url_for('index'))
     
-    accounts = AccountingAccount.query.order_by(AccountingAccount.account_code).all()
-    return render_template('account_management.html', accounts=accounts)
+    chart = account_chart()
+    return render_template('account_management.html', accounts=chart.accounts, chart=chart)
+
+def form_parent_account_id(chart, account_type, account_id=None):
+    """フォームの親科目ID（同じ区分で、自分自身・下位の科目でないもの）"""
+    parent_id = request.form.get('parent_account_id', type=int)
+    if not parent_id:
+        return None
+    parent = chart.get(parent_id)
+    if parent is None:
+        raise ValueError('親科目が見つかりません。')
+    if parent.account_type != account_type:
+        raise ValueError('親科目は同じ区分の勘定科目を選択してください。')
+    if account_id is not None and chart.is_descendant(parent_id, account_id):
+        raise ValueError('自分自身または下位の勘定科目は親科目にできません。')
+    return parent_id
 
 @app.route('/create_account', methods=['POST'])
 @login_required
@@ -8443,8 +6187,8 @@ def create_account():
         branch_name = request.form.get('branch_name')
         
         # 勘定科目コードの重複チェック
-        existing_account = AccountingAccount.query.filter_by(account_code=account_code).first()
-        if existing_account:
+        chart = account_chart()
+        if chart.account_for_code(account_code):
             flash('この勘定科目コードは既に使用されています。')
             return redirect(url_for('account_management'))
         
@@ -8453,6 +6197,7 @@ def create_account():
             account_code=account_code,
             account_name=account_name,
             account_type=account_type,
+            parent_account_id=form_parent_account_id(chart, account_type),
             bank_name=bank_name if bank_name else None,
             branch_name=branch_name if branch_name else None,
             is_active=True
@@ -8479,12 +6224,20 @@ def edit_account(account_id):
     
     try:
         account = AccountingAccount.query.get_or_404(account_id)
+        account_type = request.form.get('account_type')
+        
+        # 親科目の検証は変更前の科目表で行う（失敗時は何も変更しない）
+        if 'parent_account_id' in request.form:
+            parent_account_id = form_parent_account_id(account_chart(), account_type, account.id)
+        else:
+            parent_account_id = account.parent_account_id
         
         account.account_name = request.form.get('account_name')
-        account.account_type = request.form.get('account_type')
+        account.account_type = account_type
         account.bank_name = request.form.get('bank_name') if request.form.get('bank_name') else None
         account.branch_name = request.form.get('branch_name') if request.form.get('branch_name') else None
         account.is_active = request.form.get('is_active') == 'on'
+        account.parent_account_id = parent_account_id
         
         db.session.commit()
         
@@ -8513,6 +6266,10 @@ def delete_account(account_id):
             flash('この勘定科目は仕訳で使用されているため削除できません。')
             return redirect(url_for('account_management'))
         
+        # 子科目は削除する科目の親科目の下に付け替える
+        AccountingAccount.query.filter_by(parent_account_id=account.id).update(
+            {'parent_account_id': account.parent_account_id}, synchronize_session=False)
+        
         db.session.delete(account)
         db.session.commit()
         
@@ -8561,11 +6318,9 @@ def simple_journal_entry():
             ordered_patterns_by_category[category] = patterns_by_category[category]
     
     # 現金・預金口座を取得
-    cash_accounts = AccountingAccount.query.filter(
-        AccountingAccount.account_type == '資産',
-        AccountingAccount.account_code.in_(['101', '102', '103', '104', '105', '106', '107', '108', '109', '110', '113']),
-        AccountingAccount.is_active == True
-    ).order_by(AccountingAccount.account_code).all()
+    cash_account_codes = ['101', '102', '103', '104', '105', '106', '107', '108', '109', '110', '113']
+    cash_accounts = [account for account in account_chart().active_accounts
+                     if account.account_type == '資産' and account.account_code in cash_account_codes]
     
     # 最近の仕訳を取得
     recent_entries = JournalEntry.query.order_by(JournalEntry.created_at.desc()).limit(5).all()
@@ -8647,7 +6402,7 @@ def create_simple_journal_entry():
             
             # 相手科目を取得
             if pattern.credit_account_code:
-                credit_account = AccountingAccount.query.filter_by(account_code=pattern.credit_account_code).first()
+                credit_account = account_chart().account_for_code(pattern.credit_account_code)
                 if credit_account:
                     opposite_detail = JournalEntryDetail(
                         journal_entry_id=journal_entry.id,
@@ -8669,7 +6424,7 @@ def create_simple_journal_entry():
             
             # 相手科目を取得
             if pattern.debit_account_code:
-                debit_account = AccountingAccount.query.filter_by(account_code=pattern.debit_account_code).first()
+                debit_account = account_chart().account_for_code(pattern.debit_account_code)
                 if debit_account:
                     opposite_detail = JournalEntryDetail(
                         journal_entry_id=journal_entry.id,
@@ -8692,6 +6447,101 @@ def create_simple_journal_entry():
         flash(f'仕訳の登録に失敗しました: {str(e)}')
         return redirect(url_for('simple_journal_entry'))
 
+# === 銀行・クレジットカード明細の一括取込 ===
+
+@app.route('/bank_statement_import')
+@login_required
+def bank_statement_import():
+    """銀行・クレジットカード明細の取込画面（確認待ちの明細一覧）"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
+    
+    # 明細の口座（預金口座・カードの未払金など）
+    statement_accounts = [account for account in account_chart().active_accounts
+                          if account.account_type in ('資産', '負債')]
+    
+    patterns = TransactionPattern.query.filter(
+        TransactionPattern.is_active == True,
+        TransactionPattern.transaction_type.in_(['入金', '出金'])
+    ).order_by(TransactionPattern.id).all()
+    partners = BusinessPartner.query.filter_by(is_active=True).order_by(BusinessPartner.partner_name).all()
+    
+    pending_count = BankStatementLine.query.filter_by(status='pending').count()
+    
+    return render_template('bank_statement_import.html',
+                         statement_accounts=statement_accounts,
+                         patterns=patterns,
+                         partners=partners,
+                         pending_lines=pending_statement_lines(),
+                         pending_count=pending_count)
+
+@app.route('/import_bank_statement', methods=['POST'])
+@login_required
+def import_bank_statement():
+    """銀行・クレジットカード明細の一括仕訳取込（CSV / Excel）"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
+    
+    statement_file = request.files.get('statement_file')
+    if not statement_file or not statement_file.filename:
+        flash('取り込むファイルを選択してください。')
+        return redirect(url_for('bank_statement_import'))
+    
+    cash_account_id = request.form.get('cash_account_id', type=int)
+    encoding = request.form.get('encoding') or 'utf-8-sig'
+    try:
+        rows = iter_file_rows(statement_file.stream, statement_file.filename, encoding)
+        result = BankStatementImporter(cash_account_id, current_user.id,
+                                       source_filename=statement_file.filename).run(rows)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f'明細の取込に失敗しました: {str(e)}')
+        return redirect(url_for('bank_statement_import'))
+    
+    flash(f'明細を取り込みました: {result["rows"]:,}行中 仕訳登録{result["imported"]:,}件・確認待ち{result["pending"]:,}件'
+          + (f'（取込済み{result["duplicates"]:,}件は読み飛ばし）' if result['duplicates'] else '')
+          + (f'（エラー{result["error_count"]}件）' if result['error_count'] else ''))
+    for error in result['errors'][:10]:
+        flash(f'{error["line"]}行目: {error["error"]}')
+    
+    return redirect(url_for('bank_statement_import'))
+
+@app.route('/resolve_bank_statement_lines', methods=['POST'])
+@login_required
+def resolve_bank_statement_lines():
+    """確認待ちの明細を仕訳登録・除外する"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
+    
+    action = request.form.get('action')
+    decisions = [{
+        'line_id': line_id,
+        'action': action,
+        'pattern_id': request.form.get(f'pattern_{line_id}', type=int),
+        'partner_id': request.form.get(f'partner_{line_id}', type=int),
+    } for line_id in request.form.getlist('line_ids', type=int)]
+    
+    if not decisions or action not in ('import', 'skip'):
+        flash('明細を選択してください。')
+        return redirect(url_for('bank_statement_import'))
+    
+    try:
+        result = resolve_statement_lines(decisions, current_user.id)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        flash(f'明細の登録に失敗しました: {str(e)}')
+        return redirect(url_for('bank_statement_import'))
+    
+    if action == 'skip':
+        flash(f'{result["skipped"]}件の明細を除外しました。')
+    else:
+        flash(f'{result["imported"]}件の明細を仕訳登録しました。'
+              + (f'（取引内容が未選択・入出金と合わない{result["unresolved"]}件は確認待ちのまま）' if result['unresolved'] else ''))
+    return redirect(url_for('bank_statement_import'))
+
 # === 取引先管理機能 ===
 
 @app.route('/partner_management')
@@ -8803,7 +6653,7 @@ def timecard_issuance():
         return redirect(url_for('index'))
 
     # 従業員一覧取得
-    employees = Employee.query.filter_by(is_active=True).order_by(Employee.employee_id).all()
+    employees = Employee.query.filter_by(status='在籍中').order_by(Employee.id).all()
 
     # 年月選択用のデータ
     current_date = datetime.now()
@@ -8836,14 +6686,13 @@ def generate_timecard_pdf():
         # 指定月の労働時間データ取得
         working_time_records = WorkingTimeRecord.query.filter(
             WorkingTimeRecord.employee_id == employee_id,
-            WorkingTimeRecord.year == year,
-            WorkingTimeRecord.month == month
-        ).order_by(WorkingTimeRecord.day).all()
+            in_month(WorkingTimeRecord.work_date, year, month)
+        ).order_by(WorkingTimeRecord.work_date).all()
 
         # PDFレスポンス生成
         response = make_response(create_timecard_pdf(employee, working_time_records, year, month))
         response.headers['Content-Type'] = 'application/pdf'
-        response.headers['Content-Disposition'] = f'inline; filename="timecard_{employee.employee_id}_{year}{month:02d}.pdf"'
+        response.headers['Content-Disposition'] = f'inline; filename="timecard_{employee.id}_{year}{month:02d}.pdf"'
 
         return response
 
@@ -8851,6 +6700,186 @@ def generate_timecard_pdf():
         flash(f'タイムカードの生成に失敗しました: {str(e)}')
         return redirect(url_for('timecard_issuance'))
 
+@app.route('/bulk_timecard_pdf', methods=['POST'])
+@login_required
+def bulk_timecard_pdf():
+    """タイムカードPDF一括ダウンロード（在籍中の全従業員）"""
+    if current_user.role != 'accounting':
+        flash('アクセス権限がありません。')
+        return redirect(url_for('index'))
+
+    year = request.form.get('year', type=int)
+    month = request.form.get('month', type=int)
+    if not year or not month:
+        flash('年月を選択してください。')
+        return redirect(url_for('timecard_issuance'))
+
+    employees = Employee.query.filter_by(status='在籍中').order_by(Employee.id).all()
+
+    # 対象月の労働時間データを1回で取得して従業員ごとに分ける
+    records_by_employee = {}
+    for record in WorkingTimeRecord.query.filter(
+        in_month(WorkingTimeRecord.work_date, year, month)
+    ).order_by(WorkingTimeRecord.employee_id, WorkingTimeRecord.work_date):
+        records_by_employee.setdefault(record.employee_id, []).append(record)
+
+    def entries():
+        for employee in employees:
+            pdf_data = create_timecard_pdf(employee, records_by_employee.get(employee.id, []), year, month)
+            yield f'{year}年{month}月_タイムカード_{employee.name}.pdf', pdf_data
+
+    return streaming_zip_response(entries(), f'{year}年{month}月_タイムカード一括_{len(employees)}名.zip')
+
+# --- バックグラウンドジョブ ---
+@register_job('payroll_slips_zip', roles=['accounting'], label='給与明細書一括発行')
+def payroll_slips_zip_job(params, context):
+    """給与明細書PDFを一括作成してZIPにまとめる"""
+    import zipfile
+
+    year = params.get('year', type=int)
+    month = params.get('month', type=int)
+    if not year or not month:
+        raise ValueError('年月を指定してください。')
+
+    employee_ids = None
+    if params.get('employee_scope') == 'selected':
+        employee_ids = [int(emp_id) for emp_id in params.getlist('employee_ids')]
+        if not employee_ids:
+            raise ValueError('従業員を選択してください。')
+
+    jobs = load_slip_jobs(year, month, employee_ids)
+    if not jobs:
+        raise ValueError(f'{year}年{month}月の保存済み給与明細データが見つかりませんでした。')
+
+    # 進捗の更新は10%刻み（1件ごとにはコミットしない）
+    def report(done, total):
+        percent = done * 100 // total
+        if percent // 10 != context.job.progress // 10 or done == total:
+            context.progress(percent, f'{done}/{total}名 作成済み')
+
+    context.progress(0, f'0/{len(jobs)}名 作成済み')
+    with zipfile.ZipFile(context.artifact_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        result = render_slips_to_zip(jobs, zip_file, progress=report)
+
+    if result['generated'] == 0:
+        raise ValueError('給与明細PDFを生成できませんでした。')
+    return f"{year}年{month}月_給与明細書一括_{result['generated']}名.zip", 'application/zip'
+
+@register_job('wage_ledger_pdf', roles=['accounting'], label='賃金台帳PDF')
+def wage_ledger_pdf_job(params, context):
+    """賃金台帳PDFを作成する"""
+    employee = db.session.get(Employee, params.get('employee_id', type=int) or 0)
+    year = params.get('year', type=int)
+    if employee is None or not year:
+        raise ValueError('従業員と年度を選択してください。')
+
+    pdf_data = build_wage_ledger_pdf(employee, year)
+    with open(context.artifact_path, 'wb') as artifact:
+        artifact.write(pdf_data)
+    return f'{year}年度_賃金台帳_{employee.name}.pdf', 'application/pdf'
+
+@register_job('wage_ledgers_zip', roles=['accounting'], label='賃金台帳一括作成')
+def wage_ledgers_zip_job(params, context):
+    """全従業員の賃金台帳PDFを作成してZIPにまとめる"""
+    import zipfile
+
+    year = params.get('year', type=int)
+    if not year:
+        raise ValueError('年度を選択してください。')
+
+    jobs = load_wage_ledger_jobs(year)
+    if not jobs:
+        raise ValueError(f'{year}年度の給与明細データが見つかりません。')
+
+    # 進捗の更新は10%刻み（1件ごとにはコミットしない）
+    def report(done, total):
+        percent = done * 100 // total
+        if percent // 10 != context.job.progress // 10 or done == total:
+            context.progress(percent, f'{done}/{total}名 作成済み')
+
+    context.progress(0, f'0/{len(jobs)}名 作成済み')
+    with zipfile.ZipFile(context.artifact_path, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        result = render_ledgers_to_zip(jobs, year, zip_file, progress=report)
+
+    if result['generated'] == 0:
+        raise ValueError('賃金台帳PDFを生成できませんでした。')
+    return f"{year}年度_賃金台帳一括_{result['generated']}名.zip", 'application/zip'
+
+@register_job('financial_statements_excel', roles=['accounting'], label='財務諸表Excel')
+def financial_statements_excel_job(params, context):
+    """財務諸表のExcelを作成する"""
+    year = params.get('year', type=int, default=datetime.now().year)
+    report_type = params.get('type', default='all')
+    page_profile = params.get('layout', default=DEFAULT_PAGE_PROFILE)
+
+    output = build_financial_statements_excel(year, report_type, page_profile)
+    with open(context.artifact_path, 'wb') as artifact:
+        artifact.write(output.getvalue())
+    return f'financial_statements_{year}.xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+@register_job('employment_contract_pdf', roles=['admin', 'general_affairs', 'hr_affairs'], label='雇用契約書PDF')
+def employment_contract_pdf_job(params, context):
+    """雇用契約書PDFを作成する"""
+    contract_data = collect_employment_contract_data(params)
+
+    pdf_buffer = generate_employment_contract_pdf(contract_data)
+    with open(context.artifact_path, 'wb') as artifact:
+        artifact.write(pdf_buffer.getvalue())
+    return f"雇用契約書_{contract_data['employee_name']}.pdf", 'application/pdf'
+
+def _job_accessible(job):
+    """ジョブの状態・成果物を参照できるか（登録者、またはジョブ種別の権限を持つユーザー）"""
+    entry = JOB_HANDLERS.get(job.job_type)
+    return job.created_by == current_user.id or (entry is not None and current_user.role in entry['roles'])
+
+@app.route('/jobs/submit/<job_type>', methods=['POST'])
+@login_required
+def submit_background_job(job_type):
+    """バックグラウンドジョブ登録API"""
+    entry = JOB_HANDLERS.get(job_type)
+    if entry is None:
+        return jsonify({'success': False, 'error': '不明なジョブ種別です'}), 404
+    if current_user.role not in entry['roles']:
+        return jsonify({'success': False, 'error': 'アクセス権限がありません'}), 403
+
+    try:
+        params = MultiDict(request.args)
+        params.update(request.form)
+        job = submit_job(job_type, params, created_by=current_user.id)
+        return jsonify({
+            'success': True,
+            'job_id': job.id,
+            'status_url': url_for('background_job_status', job_id=job.id)
+        })
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@app.route('/jobs/<int:job_id>')
+@login_required
+def background_job_status(job_id):
+    """バックグラウンドジョブ状態取得API"""
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None or not _job_accessible(job):
+        return jsonify({'success': False, 'error': 'ジョブが見つかりません'}), 404
+
+    status = job_status(job)
+    if status['ready']:
+        status['download_url'] = url_for('download_background_job', job_id=job.id)
+    return jsonify({'success': True, 'job': status})
+
+@app.route('/jobs/<int:job_id>/download')
+@login_required
+def download_background_job(job_id):
+    """バックグラウンドジョブ成果物ダウンロード"""
+    job = db.session.get(BackgroundJob, job_id)
+    if job is None or not _job_accessible(job) or not job_status(job)['ready']:
+        flash('ダウンロードできるファイルがありません。')
+        return redirect(url_for('index'))
+
+    return send_file(os.path.abspath(job.artifact_path), mimetype=job.artifact_mimetype,
+                     as_attachment=True, download_name=job.artifact_name)
+
 # --- 起動と初期設定のためのコマンド ---
 
 if __name__ == '__main__':
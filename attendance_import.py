@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+勤怠データ一括取込
+タイムレコーダー等から出力した全従業員分の CSV / Excel を取り込む機能
+
+ファイルは1行ずつ読み込み、検証・労働時間分類を行った行を一定件数ごとに
+一括保存（UPSERT）する。ファイル全体をメモリに読み込まないため、
+10万行を超えるファイルも取り込める。
+取込後、取り込んだ月ごとに週40時間制限を適用する。
+
+ファイル形式（1行目は見出し行）:
+    従業員ID,勤務日,出勤,退勤,休憩,有給,特別休暇,欠勤,休業
+    1,2025-07-01,9:00,18:00,60,,,,
+    2,2025/07/01,22:00,7:00,60,,,,
+
+使い方:
+    python attendance_import.py <ファイル> [--encoding cp932] [--chunk-size 1000]
+"""
+
+import sys
+from datetime import date, datetime, time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from attendance_store import bulk_upsert_working_time, classify_working_minutes, load_company_holidays, resolve_holiday_flags
+from date_ranges import month_date_range
+from models import db, Employee, LegalHolidaySettings
+from tabular_import import iter_file_rows
+from weekly_overtime import apply_weekly_limit
+
+# 見出し名 → 列名
+HEADER_ALIASES = {
+    'employee_id': ['employee_id', '従業員ID', '社員ID'],
+    'work_date': ['work_date', '勤務日', '日付'],
+    'start_time': ['start_time', '出勤', '出勤時刻', '開始時刻'],
+    'end_time': ['end_time', '退勤', '退勤時刻', '終了時刻'],
+    'break_time_minutes': ['break_time_minutes', 'break_minutes', '休憩', '休憩時間', '休憩（分）'],
+    'is_paid_leave': ['is_paid_leave', 'paid_leave', '有給', '有給休暇'],
+    'is_special_leave': ['is_special_leave', 'special_leave', '特別休暇'],
+    'is_absence': ['is_absence', 'absence', '欠勤'],
+    'is_company_closure': ['is_company_closure', 'company_closure', '休業', '会社都合休業'],
+}
+
+REQUIRED_COLUMNS = ['employee_id', 'work_date']
+FLAG_COLUMNS = ['is_paid_leave', 'is_special_leave', 'is_absence', 'is_company_closure']
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on', '○', '〇', '有', 'はい'}
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100  # 結果に含めるエラー行の上限
+
+
+def _text(value) -> str:
+    return '' if value is None else str(value).strip()
+
+
+def parse_date(value) -> date:
+    """勤務日を解析する（YYYY-MM-DD / YYYY/MM/DD / Excel の日付）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _text(value)
+    try:
+        if len(text) == 8 and text.isdigit():
+            return date(int(text[:4]), int(text[4:6]), int(text[6:]))
+        year, month, day = text.replace('/', '-').split('-')
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise ValueError(f'勤務日が不正です: {text or "(空欄)"}')
+
+
+def parse_time(value, label: str) -> Optional[time]:
+    """時刻を解析する（H:MM / H:MM:SS / Excel の時刻）。空欄は None"""
+    if isinstance(value, datetime):
+        return value.time().replace(second=0, microsecond=0)
+    if isinstance(value, time):
+        return value.replace(second=0, microsecond=0)
+    text = _text(value)
+    if not text:
+        return None
+    try:
+        parts = [int(part) for part in text.split(':')]
+        if len(parts) not in (2, 3):
+            raise ValueError
+        return time(parts[0], parts[1])
+    except ValueError:
+        raise ValueError(f'{label}が不正です: {text}')
+
+
+def parse_flag(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return _text(value).lower() in TRUE_VALUES
+
+
+def resolve_columns(header: List) -> Dict[str, int]:
+    """見出し行から列名 → 列番号の対応を作る"""
+    positions = {_text(name): index for index, name in enumerate(header)}
+    columns = {}
+    for column, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if alias in positions:
+                columns[column] = positions[alias]
+                break
+
+    missing = [HEADER_ALIASES[column][1] for column in REQUIRED_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f'必須列がありません: {", ".join(missing)}')
+    return columns
+
+
+class AttendanceImporter:
+    """勤怠データ一括取込"""
+
+    def __init__(self, input_by=None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 progress: Optional[Callable[[Dict], None]] = None):
+        self.input_by = input_by
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def run(self, rows: Iterable[List]) -> Dict:
+        """行を取り込む
+
+        Args:
+            rows: 見出し行から始まる行のイテラブル
+
+        Returns:
+            dict: 'rows'（読込行数）、'saved'（保存件数）、'error_count'、
+                  'errors'（行番号とエラー内容、先頭 MAX_REPORTED_ERRORS 件）、'months'（取り込んだ年月）
+        """
+        rows = iter(rows)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError('ファイルが空です')
+        columns = resolve_columns(header)
+
+        self.result = {'rows': 0, 'saved': 0, 'error_count': 0, 'errors': [], 'months': []}
+        self._company_holidays = {}
+        self._holiday_settings = LegalHolidaySettings.query.first()
+        employee_ids = {employee_id for (employee_id,) in db.session.query(Employee.id)}
+
+        chunk = {}
+        touched_months = {}
+        for line_number, values in enumerate(rows, start=2):
+            if not any(_text(value) for value in values):
+                continue  # 空行
+            self.result['rows'] += 1
+
+            try:
+                row = self._parse_row(values, columns)
+                if row['employee_id'] not in employee_ids:
+                    raise ValueError(f'従業員が見つかりません: {row["employee_id"]}')
+            except ValueError as e:
+                self._add_error(line_number, str(e))
+                continue
+
+            work_date = row['work_date']
+            is_legal_holiday, _ = resolve_holiday_flags(
+                work_date, self._holiday_settings, self._month_company_holidays(work_date))
+
+            # 同じ従業員・勤務日の行はファイル内で後の行を優先
+            chunk[(row['employee_id'], work_date)] = classify_working_minutes(row, is_legal_holiday)
+            touched_months.setdefault((work_date.year, work_date.month), set()).add(row['employee_id'])
+
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+        self._flush(chunk)
+
+        # 取り込んだ月ごとに週40時間制限を適用
+        for (year, month), month_employee_ids in sorted(touched_months.items()):
+            try:
+                apply_weekly_limit(month_employee_ids, year, month)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            self.result['months'].append(f'{year}-{month:02d}')
+
+        return self.result
+
+    def _parse_row(self, values: List, columns: Dict[str, int]) -> Dict:
+        """1行を検証して勤怠行に変換する"""
+        def value_of(column):
+            index = columns.get(column)
+            return values[index] if index is not None and index < len(values) else None
+
+        employee_id = _text(value_of('employee_id'))
+        if not employee_id.isdigit():
+            raise ValueError(f'従業員IDが不正です: {employee_id or "(空欄)"}')
+
+        break_text = _text(value_of('break_time_minutes'))
+        try:
+            break_time_minutes = int(float(break_text)) if break_text else 0
+        except ValueError:
+            raise ValueError(f'休憩時間が不正です: {break_text}')
+        if break_time_minutes < 0:
+            raise ValueError(f'休憩時間が不正です: {break_text}')
+
+        row = {
+            'employee_id': int(employee_id),
+            'work_date': parse_date(value_of('work_date')),
+            'start_time': parse_time(value_of('start_time'), '出勤時刻'),
+            'end_time': parse_time(value_of('end_time'), '退勤時刻'),
+            'break_time_minutes': break_time_minutes,
+        }
+        for column in FLAG_COLUMNS:
+            row[column] = parse_flag(value_of(column))
+
+        if (row['start_time'] is None) != (row['end_time'] is None):
+            raise ValueError('出勤時刻と退勤時刻は両方入力してください')
+        return row
+
+    def _month_company_holidays(self, work_date):
+        """会社カレンダーの祝日を月単位で取得（キャッシュ）"""
+        key = (work_date.year, work_date.month)
+        if key not in self._company_holidays:
+            self._company_holidays[key] = load_company_holidays(*month_date_range(*key))
+        return self._company_holidays[key]
+
+    def _add_error(self, line_number: int, message: str):
+        self.result['error_count'] += 1
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append({'line': line_number, 'error': message})
+
+    def _flush(self, chunk: Dict):
+        """溜まった行を一括保存してコミットする"""
+        if not chunk:
+            return
+        try:
+            self.result['saved'] += bulk_upsert_working_time(list(chunk.values()), input_by=self.input_by)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        chunk.clear()
+
+        if self.progress:
+            self.progress(self.result)
+
+
+def main():
+    args = sys.argv[1:]
+    if not args:
+        print("Usage: python attendance_import.py <file> [--encoding cp932] [--chunk-size 1000]")
+        sys.exit(1)
+
+    path = args[0]
+    encoding = 'utf-8-sig'
+    chunk_size = DEFAULT_CHUNK_SIZE
+    if '--encoding' in args:
+        encoding = args[args.index('--encoding') + 1]
+    if '--chunk-size' in args:
+        chunk_size = int(args[args.index('--chunk-size') + 1])
+
+    def report(progress):
+        print(f"   ... {progress['rows']:,}行読込 / {progress['saved']:,}件保存 / エラー{progress['error_count']}件")
+
+    from app import app
+    with app.app_context():
+        with open(path, 'rb') as source:
+            result = AttendanceImporter(chunk_size=chunk_size, progress=report).run(
+                iter_file_rows(source, path, encoding))
+
+    print(f"✅ 勤怠データ取込完了: {result['rows']:,}行中 {result['saved']:,}件保存 / エラー{result['error_count']}件")
+    print(f"   対象月: {', '.join(result['months']) or '-'}")
+    for error in result['errors']:
+        print(f"   ❌ {error['line']}行目: {error['error']}")
+
+    if result['error_count']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+勤怠データ一括保存
+月次勤怠入力・打刻データ取込で共通の労働時間分類と一括保存（UPSERT）
+
+休日判定に必要な法定休日設定・会社カレンダーは呼び出し側で1回だけ取得し、
+各日の分類はメモリ上で行う。保存は SQLite の INSERT ... ON CONFLICT で
+(employee_id, work_date) 単位にまとめて追加・更新する。
+"""
+
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Set
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from date_ranges import in_date_range
+from models import db, WorkingTimeRecord, CompanyCalendar
+
+# 深夜労働の時間帯（22:00-5:00）
+NIGHT_START = time(22, 0)
+NIGHT_END = time(5, 0)
+MIDNIGHT = time(0, 0)
+
+# UPSERT 時に更新する列（作成日時・入力者は初回登録時の値を残す）
+UPSERT_UPDATE_COLUMNS = [
+    'start_time', 'end_time', 'break_time_minutes',
+    'regular_working_minutes', 'legal_overtime_minutes', 'overtime_minutes',
+    'legal_holiday_minutes', 'holiday_minutes', 'night_working_minutes',
+    'is_paid_leave', 'is_special_leave', 'is_absence', 'is_company_closure',
+    'updated_at',
+]
+
+
+def load_company_holidays(start, end) -> Set:
+    """期間 [start, end) の会社カレンダーの祝日を取得する"""
+    company_holidays = CompanyCalendar.query.filter(
+        in_date_range(CompanyCalendar.event_date, start, end),
+        CompanyCalendar.event_type == 'holiday'
+    ).all()
+    return {holiday.event_date for holiday in company_holidays}
+
+
+def resolve_holiday_flags(work_date, holiday_settings, company_holidays: Set):
+    """法定休日・法定外休日の判定
+
+    Args:
+        work_date: 勤務日
+        holiday_settings: LegalHolidaySettings（未設定の場合は None）
+        company_holidays: 会社カレンダーの祝日の集合
+
+    Returns:
+        tuple: (法定休日か, 法定外休日か)
+    """
+    weekday = work_date.weekday()
+    is_legal_holiday = False
+    is_company_holiday = False
+
+    # 会社カレンダーの祝日チェック
+    if work_date in company_holidays:
+        # 会社カレンダーの祝日は設定に基づいて判定
+        if holiday_settings and hasattr(holiday_settings, 'specific_date_legal'):
+            is_legal_holiday = holiday_settings.specific_date_legal
+        else:
+            is_legal_holiday = True  # デフォルトでは法定休日
+    elif holiday_settings:
+        # 曜日別法定休日設定をチェック
+        weekday_legal_flags = [
+            holiday_settings.monday_legal_holiday,    # 0: 月曜日
+            holiday_settings.tuesday_legal_holiday,   # 1: 火曜日
+            holiday_settings.wednesday_legal_holiday, # 2: 水曜日
+            holiday_settings.thursday_legal_holiday,  # 3: 木曜日
+            holiday_settings.friday_legal_holiday,    # 4: 金曜日
+            holiday_settings.saturday_legal_holiday,  # 5: 土曜日
+            holiday_settings.sunday_legal_holiday     # 6: 日曜日
+        ]
+        is_legal_holiday = weekday_legal_flags[weekday]
+    else:
+        # 設定がない場合はデフォルト
+        if weekday == 6:  # 日曜日
+            is_legal_holiday = True
+        elif weekday == 5:  # 土曜日
+            is_company_holiday = True  # 法定外休日
+
+    return is_legal_holiday, is_company_holiday
+
+
+def calculate_night_work_minutes(start_datetime, end_datetime, work_date):
+    """深夜労働時間計算（22:00-5:00）"""
+    night_minutes = 0
+
+    # 当日の深夜時間帯（22:00-24:00）
+    night_start_today = datetime.combine(work_date, NIGHT_START)
+    night_end_today = datetime.combine(work_date + timedelta(days=1), MIDNIGHT)
+
+    # 翌日の深夜時間帯（0:00-5:00）
+    night_start_tomorrow = night_end_today
+    night_end_tomorrow = datetime.combine(work_date + timedelta(days=1), NIGHT_END)
+
+    # 当日22:00-24:00の計算
+    if start_datetime < night_end_today and end_datetime > night_start_today:
+        actual_start = max(start_datetime, night_start_today)
+        actual_end = min(end_datetime, night_end_today)
+        if actual_end > actual_start:
+            night_minutes += int((actual_end - actual_start).total_seconds() / 60)
+
+    # 翌日0:00-5:00の計算
+    if start_datetime < night_end_tomorrow and end_datetime > night_start_tomorrow:
+        actual_start = max(start_datetime, night_start_tomorrow)
+        actual_end = min(end_datetime, night_end_tomorrow)
+        if actual_end > actual_start:
+            night_minutes += int((actual_end - actual_start).total_seconds() / 60)
+
+    return night_minutes
+
+
+def classify_working_minutes(row: Dict, is_legal_holiday: bool) -> Dict:
+    """1日分の勤怠行に労働時間分類（分）を設定する（日本労働基準法準拠）
+
+    平日・法定外休日の労働時間は全て法定内労働時間として仮分類し、
+    後で週40時間制で再分類する。
+
+    Args:
+        row: work_date, start_time, end_time, break_time_minutes と休暇フラグを含む勤怠行
+        is_legal_holiday: 法定休日か
+
+    Returns:
+        dict: 労働時間分類を設定した勤怠行
+    """
+    row.update({
+        'regular_working_minutes': 0,
+        'legal_overtime_minutes': 0,
+        'overtime_minutes': 0,
+        'legal_holiday_minutes': 0,
+        'holiday_minutes': 0,
+        'night_working_minutes': 0,
+    })
+
+    work_date = row['work_date']
+    if not (row['start_time'] and row['end_time']) or \
+            row['is_paid_leave'] or row['is_special_leave'] or row['is_absence']:
+        # 休暇・欠勤の場合は労働時間を0にする
+        return row
+
+    start_datetime = datetime.combine(work_date, row['start_time'])
+    end_datetime = datetime.combine(work_date, row['end_time'])
+
+    # 日をまたぐ場合の処理
+    if end_datetime <= start_datetime:
+        end_datetime = end_datetime + timedelta(days=1)
+
+    total_minutes = int((end_datetime - start_datetime).total_seconds() / 60) - row['break_time_minutes']
+    if total_minutes <= 0:
+        return row
+
+    if is_legal_holiday:
+        # 法定休日労働（35%割増）- 全て法定休日労働時間
+        row['legal_holiday_minutes'] = total_minutes
+    else:
+        row['regular_working_minutes'] = total_minutes
+
+    # 深夜労働時間計算（22:00-5:00）
+    row['night_working_minutes'] = calculate_night_work_minutes(start_datetime, end_datetime, work_date)
+    return row
+
+
+def bulk_upsert_working_time(rows: List[Dict], input_by=None) -> int:
+    """勤怠行を (employee_id, work_date) 単位で一括追加・更新する（コミットはしない）
+
+    Args:
+        rows: employee_id, work_date, UPSERT_UPDATE_COLUMNS を含む勤怠行
+        input_by: 新規登録時の入力者ユーザーID
+
+    Returns:
+        int: 保存した行数
+    """
+    if not rows:
+        return 0
+
+    now = datetime.now()
+    values = []
+    for row in rows:
+        value = {column: row.get(column) for column in UPSERT_UPDATE_COLUMNS}
+        value.update({
+            'employee_id': row['employee_id'],
+            'work_date': row['work_date'],
+            'input_by': input_by,
+            'created_at': now,
+            'updated_at': now,
+        })
+        values.append(value)
+
+    # 同じ文を executemany で実行する（SQL のコンパイルは1回）
+    stmt = sqlite_insert(WorkingTimeRecord.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['employee_id', 'work_date'],
+        set_={column: stmt.excluded[column] for column in UPSERT_UPDATE_COLUMNS}
+    )
+    db.session.execute(stmt, values)
+
+    # セッション内の既存レコードに一括更新の結果を反映させる
+    db.session.expire_all()
+    return len(values)
@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+銀行・クレジットカード明細の一括仕訳取込
+ネットバンキング・カード会社の CSV / Excel 明細から仕訳をまとめて作成する機能
+
+明細は1行ずつ読み込み、取引パターン（TransactionPattern）と取引先（BusinessPartner）を
+メモリ上の索引で照合する。照合の優先順は
+    1. 過去に同じ摘要で登録した明細のパターン・取引先
+    2. 同じ取引先・同じ金額で過去に登録した明細のパターン
+    3. 摘要に含まれるキーワード（パターン名・パターンの説明から作成）
+    4. 同じ取引先で過去に登録した明細のパターン
+で、取引先は摘要に含まれる取引先名で照合する。
+照合できた行は一定件数ごとに仕訳（JournalEntry / JournalEntryDetail）をまとめて登録し、
+照合できなかった行は確認待ち（BankStatementLine.status = 'pending'）として残す。
+同じ明細を再度取り込んでも、取込済みの行は読み飛ばす。
+
+使い方:
+    python bank_statement_import.py <ファイル> <口座の勘定科目コード> [--encoding cp932] [--user 2] [--chunk-size 500]
+"""
+
+import hashlib
+import re
+import sys
+import unicodedata
+from collections import Counter
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from account_chart import account_chart
+from tabular_import import iter_file_rows
+from models import db, AccountingAccount, BankStatementLine, BusinessPartner, JournalEntry, JournalEntryDetail, \
+    TransactionPattern, User
+
+# 見出し名 → 列名（銀行・カード会社ごとの表記ゆれ）
+HEADER_ALIASES = {
+    'transaction_date': ['日付', '取引日', '年月日', 'お取引日', '取扱日', '利用日', 'ご利用日', '利用年月日', 'ご利用年月日'],
+    'description': ['摘要', '取引内容', 'お取引内容', '内容', '利用店名', 'ご利用店名', '利用先', 'ご利用先', '利用店名・商品名', '備考'],
+    'deposit': ['入金', '入金額', '入金金額', '預入金額', 'お預入金額', 'お預り金額', '入金(円)'],
+    'withdrawal': ['出金', '出金額', '出金金額', '引出金額', 'お引出金額', '支払金額', 'お支払金額', '利用金額', 'ご利用金額', '出金(円)'],
+    'amount': ['金額', '取引金額', '入出金額'],  # 入金がプラス・出金がマイナス
+}
+
+HEADER_SEARCH_ROWS = 20  # 見出し行を探す先頭行数（明細の前に口座情報の行がある形式に対応）
+DEFAULT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100  # 結果に含めるエラー行の上限
+
+# 入出金の向き → 取引パターンの現金・預金側
+CASH_SIDES = {'入金': 'cash_debit', '出金': 'cash_credit'}
+
+KEYWORD_SEPARATORS = re.compile(r'[、,，・/／\s]+')
+KEYWORD_TRAILERS = ('など', '等')
+KEYWORD_SUFFIXES = ('代', '費', '料')  # 「タクシー代」は「タクシー」でも照合する
+PARTNER_NAME_AFFIXES = ('株式会社', '有限会社', '合同会社', '(株)', '(有)')
+MIN_KEYWORD_LENGTH = 2
+
+
+def normalize_text(value) -> str:
+    """照合用に正規化する（全角・半角の統一、英字は大文字、空白は除去）"""
+    text = unicodedata.normalize('NFKC', '' if value is None else str(value))
+    return ''.join(text.upper().split())
+
+
+def _text(value) -> str:
+    return '' if value is None else str(value).strip()
+
+
+def parse_date(value) -> date:
+    """取引日を解析する（YYYY-MM-DD / YYYY/MM/DD / YYYYMMDD / YYYY年M月D日 / Excel の日付）"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = normalize_text(value)
+    try:
+        if len(text) == 8 and text.isdigit():
+            return date(int(text[:4]), int(text[4:6]), int(text[6:]))
+        year, month, day = re.split(r'[-/.年月]', text.rstrip('日'))
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise ValueError(f'取引日が不正です: {_text(value) or "(空欄)"}')
+
+
+def parse_amount(value, label: str) -> int:
+    """金額を解析する（カンマ・円記号・△▲のマイナス表記に対応）。空欄は0"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    text = normalize_text(value).replace(',', '').replace('¥', '').replace('\\', '').replace('円', '')
+    text = text.replace('△', '-').replace('▲', '-')
+    if not text:
+        return 0
+    try:
+        return int(float(text)) if '.' in text else int(text)
+    except ValueError:
+        raise ValueError(f'{label}が不正です: {_text(value)}')
+
+
+def resolve_columns(header: List) -> Dict[str, int]:
+    """見出し行から列名 → 列番号の対応を作る"""
+    positions = {}
+    for index, name in enumerate(header):
+        positions.setdefault(normalize_text(name), index)
+
+    columns = {}
+    for column, aliases in HEADER_ALIASES.items():
+        for alias in aliases:
+            if normalize_text(alias) in positions:
+                columns[column] = positions[normalize_text(alias)]
+                break
+
+    missing = [HEADER_ALIASES[column][0] for column in ('transaction_date', 'description') if column not in columns]
+    if not any(column in columns for column in ('deposit', 'withdrawal', 'amount')):
+        missing.append('金額（入金・出金）')
+    if missing:
+        raise ValueError(f'必須列がありません: {", ".join(missing)}')
+    return columns
+
+
+def find_header(rows) -> Tuple[Dict[str, int], int]:
+    """先頭 HEADER_SEARCH_ROWS 行から見出し行を探す（列の対応と行番号を返す）"""
+    error = ValueError('ファイルが空です')
+    for line_number, values in enumerate(rows, start=1):
+        try:
+            return resolve_columns(values), line_number
+        except ValueError as e:
+            error = e
+        if line_number >= HEADER_SEARCH_ROWS:
+            break
+    raise error
+
+
+def parse_row(values: List, columns: Dict[str, int]) -> Dict:
+    """1行を検証して明細行（取引日・摘要・金額・入出金）に変換する"""
+    def value_of(column):
+        index = columns.get(column)
+        return values[index] if index is not None and index < len(values) else None
+
+    description = _text(value_of('description'))
+    if not description:
+        raise ValueError('摘要が空欄です')
+
+    deposit = parse_amount(value_of('deposit'), '入金額')
+    withdrawal = parse_amount(value_of('withdrawal'), '出金額')
+    signed = parse_amount(value_of('amount'), '金額')
+    if signed > 0:
+        deposit += signed
+    elif signed < 0:
+        withdrawal -= signed
+    if withdrawal < 0:  # 返金などのマイナスの出金は入金として扱う
+        deposit, withdrawal = deposit - withdrawal, 0
+    if deposit < 0:
+        deposit, withdrawal = 0, withdrawal - deposit
+    if (deposit == 0) == (withdrawal == 0):
+        raise ValueError('入金額・出金額のどちらか一方を入力してください')
+
+    return {
+        'transaction_date': parse_date(value_of('transaction_date')),
+        'description': description[:255],
+        'amount': deposit or withdrawal,
+        'direction': '入金' if deposit else '出金',
+    }
+
+
+def statement_fingerprint(cash_account_id: int, row: Dict, occurrence: int) -> str:
+    """明細行の重複判定キー（同じ口座・日付・入出金・金額・摘要の何件目か）"""
+    key = '|'.join([str(cash_account_id), row['transaction_date'].isoformat(), row['direction'],
+                    str(row['amount']), normalize_text(row['description']), str(occurrence)])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def pattern_keywords(pattern) -> List[str]:
+    """取引パターン名・説明から照合用のキーワードを作る"""
+    keywords = set()
+    for text in (pattern.pattern_name, pattern.description):
+        for word in KEYWORD_SEPARATORS.split(normalize_text(text) if text else ''):
+            for trailer in KEYWORD_TRAILERS:
+                if word.endswith(trailer):
+                    word = word[:-len(trailer)]
+            if len(word) < MIN_KEYWORD_LENGTH:
+                continue
+            keywords.add(word)
+            if word.endswith(KEYWORD_SUFFIXES) and len(word) - 1 >= MIN_KEYWORD_LENGTH:
+                keywords.add(word[:-1])
+    return sorted(keywords)
+
+
+def partner_keys(partner_name: str) -> List[str]:
+    """取引先名の照合キー（法人格を除いた名前も含む）"""
+    name = normalize_text(partner_name)
+    keys = {name}
+    for affix in PARTNER_NAME_AFFIXES:
+        name = name.replace(normalize_text(affix), '')
+    keys.add(name)
+    return [key for key in keys if len(key) >= MIN_KEYWORD_LENGTH]
+
+
+class StatementMatcher:
+    """取引パターン・取引先・過去の登録明細のメモリ上の索引（作成時に各テーブルを1回ずつ読む）"""
+
+    def __init__(self):
+        account_ids = {code: account.id for code, account in account_chart().by_code.items()}
+
+        # 現金・預金の相手科目が決まる取引パターン（入金・出金別）
+        self.patterns = {}
+        self.keywords = {direction: [] for direction in CASH_SIDES}
+        for pattern in TransactionPattern.query.filter_by(is_active=True).order_by(TransactionPattern.id):
+            direction = pattern.transaction_type
+            if CASH_SIDES.get(direction) != pattern.main_account_side:
+                continue
+            counter_code = pattern.credit_account_code if direction == '入金' else pattern.debit_account_code
+            if counter_code not in account_ids:
+                continue
+            self.patterns[pattern.id] = (pattern, account_ids[counter_code])
+            self.keywords[direction].extend((keyword, pattern.id) for keyword in pattern_keywords(pattern))
+
+        # 取引先名（長い名前を優先）
+        self.partner_names = {}
+        self.partner_keys = []
+        for partner_id, partner_name in db.session.query(BusinessPartner.id, BusinessPartner.partner_name).filter(
+                BusinessPartner.is_active == True):
+            self.partner_names[partner_id] = partner_name
+            self.partner_keys.extend((key, partner_id) for key in partner_keys(partner_name))
+        self.partner_keys.sort(key=lambda item: -len(item[0]))
+
+        # 過去に登録した明細（後から登録したものを優先）
+        self.by_description = {}
+        self.by_partner_amount = {}
+        self.by_partner = {}
+        for line in db.session.query(
+            BankStatementLine.description, BankStatementLine.direction, BankStatementLine.amount,
+            BankStatementLine.pattern_id, BankStatementLine.partner_id
+        ).filter(
+            BankStatementLine.status == 'imported', BankStatementLine.pattern_id.isnot(None)
+        ).order_by(BankStatementLine.id):
+            self.learn(line)
+
+    def learn(self, line):
+        """登録した明細を索引に加える"""
+        if line.pattern_id not in self.patterns:
+            return
+        self.by_description[(line.direction, normalize_text(line.description))] = (line.pattern_id, line.partner_id)
+        if line.partner_id:
+            self.by_partner_amount[(line.partner_id, line.direction, line.amount)] = line.pattern_id
+            self.by_partner[(line.partner_id, line.direction)] = line.pattern_id
+
+    def accepts(self, pattern_id, direction: str) -> bool:
+        """取引パターンが入出金の向きに合うか"""
+        return pattern_id in self.patterns and self.patterns[pattern_id][0].transaction_type == direction
+
+    def match_partner(self, text: str) -> Optional[int]:
+        for key, partner_id in self.partner_keys:
+            if key in text:
+                return partner_id
+        return None
+
+    def match_keywords(self, text: str, direction: str) -> Optional[int]:
+        """キーワードの一致が最も長い取引パターン（同点の場合は照合しない）"""
+        scores = Counter()
+        for keyword, pattern_id in self.keywords[direction]:
+            if keyword in text:
+                scores[pattern_id] += len(keyword)
+        best = scores.most_common(2)
+        if not best or (len(best) == 2 and best[0][1] == best[1][1]):
+            return None
+        return best[0][0]
+
+    def match(self, row: Dict) -> Tuple[Optional[int], Optional[int]]:
+        """明細行の (取引パターンID, 取引先ID)。照合できなければパターンは None"""
+        direction = row['direction']
+        text = normalize_text(row['description'])
+
+        known = self.by_description.get((direction, text))
+        if known:
+            pattern_id, partner_id = known
+            return pattern_id, partner_id if partner_id in self.partner_names else self.match_partner(text)
+
+        partner_id = self.match_partner(text)
+        pattern_id = None
+        if partner_id:
+            pattern_id = self.by_partner_amount.get((partner_id, direction, row['amount']))
+        if pattern_id is None:
+            pattern_id = self.match_keywords(text, direction)
+        if pattern_id is None and partner_id:
+            pattern_id = self.by_partner.get((partner_id, direction))
+        return pattern_id, partner_id
+
+    def journal_entry(self, line, created_by) -> JournalEntry:
+        """明細行と取引パターンから貸借の一致した仕訳を作る（簡単仕訳入力と同じ摘要）"""
+        pattern, counter_account_id = self.patterns[line.pattern_id]
+        description = f"{pattern.pattern_name}（{line.description}）"
+        partner_name = self.partner_names.get(line.partner_id)
+        if partner_name:
+            description += f" - {partner_name}"
+
+        if line.direction == '入金':
+            debit_account_id, credit_account_id = line.cash_account_id, counter_account_id
+        else:
+            debit_account_id, credit_account_id = counter_account_id, line.cash_account_id
+
+        return JournalEntry(
+            entry_date=line.transaction_date,
+            description=description[:255],
+            total_amount=line.amount,
+            partner_id=line.partner_id,
+            created_by=created_by,
+            details=[
+                JournalEntryDetail(account_id=debit_account_id, debit_amount=line.amount, credit_amount=0),
+                JournalEntryDetail(account_id=credit_account_id, debit_amount=0, credit_amount=line.amount),
+            ]
+        )
+
+
+class BankStatementImporter:
+    """銀行・クレジットカード明細の一括仕訳取込"""
+
+    def __init__(self, cash_account_id: int, created_by, source_filename: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, progress: Optional[Callable[[Dict], None]] = None):
+        self.cash_account_id = cash_account_id
+        self.created_by = created_by
+        self.source_filename = source_filename
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def run(self, rows: Iterable[List]) -> Dict:
+        """行を取り込む
+
+        Args:
+            rows: 見出し行を含む行のイテラブル（見出し行の前に口座情報などの行があってもよい）
+
+        Returns:
+            dict: 'rows'（明細行数）、'imported'（仕訳を作成した行数）、'pending'（確認待ちの行数）、
+                  'duplicates'（取込済みで読み飛ばした行数）、'error_count'、
+                  'errors'（行番号とエラー内容、先頭 MAX_REPORTED_ERRORS 件）
+        """
+        if db.session.get(AccountingAccount, self.cash_account_id) is None:
+            raise ValueError('明細の口座（勘定科目）が見つかりません')
+
+        rows = iter(rows)
+        columns, header_line = find_header(rows)
+
+        self.result = {'rows': 0, 'imported': 0, 'pending': 0, 'duplicates': 0, 'error_count': 0, 'errors': []}
+        self.matcher = StatementMatcher()
+
+        occurrences = Counter()
+        chunk = []
+        for line_number, values in enumerate(rows, start=header_line + 1):
+            if not any(_text(value) for value in values):
+                continue  # 空行
+            self.result['rows'] += 1
+
+            try:
+                row = parse_row(values, columns)
+            except ValueError as e:
+                self._add_error(line_number, str(e))
+                continue
+
+            # ファイル内の同じ内容の行は何件目かで区別する
+            key = (row['transaction_date'], row['direction'], row['amount'], normalize_text(row['description']))
+            occurrences[key] += 1
+            chunk.append((statement_fingerprint(self.cash_account_id, row, occurrences[key]), row))
+
+            if len(chunk) >= self.chunk_size:
+                self._flush(chunk)
+        self._flush(chunk)
+
+        return self.result
+
+    def _add_error(self, line_number: int, message: str):
+        self.result['error_count'] += 1
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append({'line': line_number, 'error': message})
+
+    def _flush(self, chunk: List):
+        """溜まった行を照合し、明細行と仕訳をまとめて登録してコミットする"""
+        if not chunk:
+            return
+        existing = {fingerprint for (fingerprint,) in db.session.query(BankStatementLine.fingerprint).filter(
+            BankStatementLine.fingerprint.in_([fingerprint for fingerprint, _ in chunk]))}
+
+        try:
+            lines = []
+            for fingerprint, row in chunk:
+                if fingerprint in existing:
+                    self.result['duplicates'] += 1
+                    continue
+                pattern_id, partner_id = self.matcher.match(row)
+                line = BankStatementLine(fingerprint=fingerprint, cash_account_id=self.cash_account_id,
+                                         pattern_id=pattern_id, partner_id=partner_id, status='pending',
+                                         source_filename=self.source_filename, created_by=self.created_by, **row)
+                if pattern_id is not None:
+                    line.journal_entry = self.matcher.journal_entry(line, self.created_by)
+                    line.status = 'imported'
+                    self.result['imported'] += 1
+                else:
+                    self.result['pending'] += 1
+                lines.append(line)
+
+            db.session.add_all(lines)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        chunk.clear()
+
+        if self.progress:
+            self.progress(self.result)
+
+
+def pending_statement_lines(limit: int = 200) -> List[BankStatementLine]:
+    """確認待ちの明細行（取引日順）"""
+    return BankStatementLine.query.filter_by(status='pending').order_by(
+        BankStatementLine.transaction_date, BankStatementLine.id
+    ).limit(limit).all()
+
+
+def resolve_statement_lines(decisions: List[Dict], created_by) -> Dict:
+    """確認待ちの明細行を登録・除外する（コミットは呼び出し側）
+
+    Args:
+        decisions: {'line_id', 'action'（'import' / 'skip'）, 'pattern_id', 'partner_id'} のリスト
+
+    Returns:
+        dict: 'imported'（仕訳を作成した行数）、'skipped'（除外した行数）、'unresolved'（パターン未選択などで残した行数）
+    """
+    result = {'imported': 0, 'skipped': 0, 'unresolved': 0}
+    decisions = {decision['line_id']: decision for decision in decisions}
+    if not decisions:
+        return result
+
+    matcher = StatementMatcher()
+    lines = BankStatementLine.query.filter(
+        BankStatementLine.id.in_(list(decisions)), BankStatementLine.status == 'pending'
+    ).order_by(BankStatementLine.id).all()
+
+    for line in lines:
+        decision = decisions[line.id]
+        if decision['action'] == 'skip':
+            line.status = 'skipped'
+            result['skipped'] += 1
+            continue
+
+        if not matcher.accepts(decision.get('pattern_id'), line.direction):
+            result['unresolved'] += 1
+            continue
+        line.pattern_id = decision['pattern_id']
+        line.partner_id = decision.get('partner_id') or None
+        line.journal_entry = matcher.journal_entry(line, created_by)
+        line.status = 'imported'
+        matcher.learn(line)
+        result['imported'] += 1
+
+    db.session.flush()
+    return result
+
+
+def main():
+    args = sys.argv[1:]
+    if len(args) < 2:
+        print("Usage: python bank_statement_import.py <file> <account_code> [--encoding cp932] [--user 2] [--chunk-size 500]")
+        sys.exit(1)
+
+    path, account_code = args[0], args[1]
+    encoding = 'utf-8-sig'
+    chunk_size = DEFAULT_CHUNK_SIZE
+    user_id = None
+    if '--encoding' in args:
+        encoding = args[args.index('--encoding') + 1]
+    if '--chunk-size' in args:
+        chunk_size = int(args[args.index('--chunk-size') + 1])
+    if '--user' in args:
+        user_id = int(args[args.index('--user') + 1])
+
+    def report(progress):
+        print(f"   ... {progress['rows']:,}行読込 / 仕訳{progress['imported']:,}件 / 確認待ち{progress['pending']:,}件")
+
+    from app import app
+    with app.app_context():
+        account = AccountingAccount.query.filter_by(account_code=account_code).first()
+        if account is None:
+            print(f"❌ 勘定科目が見つかりません: {account_code}")
+            sys.exit(1)
+        if user_id is None:
+            accounting_user = User.query.filter_by(role='accounting').order_by(User.id).first()
+            user_id = accounting_user.id if accounting_user else None
+        if user_id is None:
+            print("❌ 登録者のユーザーIDを --user で指定してください")
+            sys.exit(1)
+
+        with open(path, 'rb') as source:
+            result = BankStatementImporter(account.id, user_id, source_filename=path, chunk_size=chunk_size,
+                                           progress=report).run(iter_file_rows(source, path, encoding))
+
+    print(f"✅ 明細取込完了: {result['rows']:,}行中 仕訳{result['imported']:,}件 / 確認待ち{result['pending']:,}件"
+          f" / 取込済み{result['duplicates']:,}件 / エラー{result['error_count']}件")
+    for error in result['errors']:
+        print(f"   ❌ {error['line']}行目: {error['error']}")
+
+    if result['error_count']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
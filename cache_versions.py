@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+キャッシュの世代番号
+プロセス内にキャッシュした集計結果を、別プロセス（Web・ジョブワーカー）での
+書き込み後にも確実に作り直すための仕組み
+
+書き込み側は同じトランザクション内で bump_version() を呼んで世代番号を増やし、
+読み出し側は current_version() をキャッシュのキーに含める。
+"""
+
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, CacheVersion
+
+LEDGER_VERSION = 'ledger'  # 仕訳・期首残高・勘定科目
+CHART_VERSION = 'account_chart'  # 勘定科目表
+
+version_table = CacheVersion.__table__
+
+
+def bump_version(connection, name: str):
+    """世代番号を1つ進める（呼び出し側のトランザクション内で実行）"""
+    now = datetime.now()
+    stmt = sqlite_insert(version_table).values(name=name, version=1, updated_at=now)
+    connection.execute(stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={'version': version_table.c.version + 1, 'updated_at': now}
+    ))
+
+
+def current_version(name: str) -> int:
+    """現在の世代番号（まだ書き込みがなければ 0）"""
+    return db.session.execute(
+        select(version_table.c.version).where(version_table.c.name == name)
+    ).scalar() or 0
@@ -35,14 +35,18 @@ def check_wage_register_data():
         
         # 3. 賃金台帳データ確認
         print("\n3. 賃金台帳データ (wage_register):")
-        wage_registers = WageRegister.query.all()
-        
+        wage_registers = db.session.query(
+            WageRegister.employee_id, WageRegister.year,
+            db.func.count(WageRegister.id), db.func.sum(WageRegister.gross_salary)
+        ).group_by(WageRegister.employee_id, WageRegister.year).order_by(WageRegister.year).all()
+
         if not wage_registers:
             print("  ⚠️ 賃金台帳データが存在しません")
         else:
-            for wage_reg in wage_registers:
-                employee = Employee.query.get(wage_reg.employee_id)
-                print(f"  - {wage_reg.year}年: {employee.name if employee else 'Unknown'} (ID: {wage_reg.employee_id})")
+            for employee_id, year, months, gross_salary in wage_registers:
+                employee = Employee.query.get(employee_id)
+                print(f"  - {year}年: {employee.name if employee else 'Unknown'} (ID: {employee_id}) "
+                      f"{months}ヶ月 総支給額 ¥{gross_salary:,}")
         
         # 4. 田中太郎の2023年データ確認
         print("\n4. 田中太郎の2023年データ確認:")
@@ -164,15 +168,13 @@ def create_sample_wage_register():
                 'holiday_hours': 0
             }
             
-            success = wage_manager.update_wage_register(
-                tanaka.id, 
-                2023, 
-                payroll.month, 
-                payroll_data
-            )
+            try:
+                wage_manager.update_wage_registers(2023, payroll.month, [(tanaka.id, payroll_data)])
+            except Exception as e:
+                print(f"❌ 2023年{payroll.month}月の賃金台帳データの作成/更新に失敗しました: {e}")
+                continue
             
-            if success:
-                print(f"✅ 2023年{payroll.month}月の賃金台帳データを作成/更新")
+            print(f"✅ 2023年{payroll.month}月の賃金台帳データを作成/更新")
         
         print("\n賃金台帳データの作成が完了しました")
 
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+期間検索ヘルパー
+年・月の指定を半開区間 [開始日, 終了日) の日付範囲に変換する
+
+db.extract('year'/'month', 列) による絞り込みはインデックスを使えず全件走査になるため、
+日付列の範囲条件（列 >= 開始日 AND 列 < 終了日）で検索する。
+"""
+
+from datetime import date
+
+
+def month_date_range(year: int, month: int):
+    """対象月の初日と翌月初日を返す（半開区間）"""
+    month_start = date(year, month, 1)
+    next_month_start = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return month_start, next_month_start
+
+
+def year_date_range(year: int):
+    """対象年の1月1日と翌年1月1日を返す（半開区間）"""
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def period_date_range(year: int, month=None):
+    """月の指定があれば月、なければ年の日付範囲を返す（半開区間）"""
+    if month:
+        return month_date_range(year, month)
+    return year_date_range(year)
+
+
+def in_date_range(column, start, end):
+    """日付列が [start, end) に含まれる条件式を返す"""
+    return (column >= start) & (column < end)
+
+
+def in_month(column, year: int, month: int):
+    """日付列が対象月に含まれる条件式を返す"""
+    return in_date_range(column, *month_date_range(year, month))
+
+
+def in_year(column, year: int):
+    """日付列が対象年に含まれる条件式を返す"""
+    return in_date_range(column, *year_date_range(year))
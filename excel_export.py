@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Excel出力の共通部品
+xlsxwriter の省メモリモード（constant_memory）でワークブックを作り、行を上から順に書き出す仕組み
+
+省メモリモードでは1行書き終えるごとに一時ファイルへ書き出すため、5万行の総勘定元帳でも
+セルのオブジェクトをメモリに溜めない（行は上から順に書くこと）。
+書式は名前を付けて定義しておき、ワークブックごとに (名前, 上書きする属性) ごとに1回だけ
+作成して使い回す。セルごとに Font / Border / Alignment を作らない。
+出来上がったファイルは一定サイズまではメモリ、それを超えると一時ファイルに置き、
+レスポンスへ少しずつ送る。
+"""
+
+import tempfile
+from typing import Dict, Optional
+
+import xlsxwriter
+from flask import send_file
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # これを超えるファイルは一時ファイルに置く
+
+# 罫線の種類（xlsxwriter の番号）
+THIN = 1
+MEDIUM = 2
+DASHED = 3
+THICK = 5
+DOUBLE = 6
+
+MINCHO = 'ＭＳ 明朝'
+GOTHIC = 'ＭＳ ゴシック'
+MEIRYO = 'メイリオ'
+AMOUNT_FORMAT = '#,##0'
+
+
+class ExcelWorkbook:
+    """省メモリモードのワークブック（名前付き書式をワークブックごとに1回だけ作成）
+
+    Args:
+        styles: 書式名 → xlsxwriter の書式属性（font_name, bold, align, border, num_format など）
+        output: 書き込み先（省略時はメモリ・一時ファイル）
+    """
+
+    def __init__(self, styles: Dict[str, dict], output=None):
+        self.styles = styles
+        self.output = output if output is not None else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        self.workbook = xlsxwriter.Workbook(self.output, {'constant_memory': True})
+        self._formats = {}
+
+    def style(self, name: Optional[str] = None, **overrides):
+        """名前付き書式（属性を上書きした書式も組み合わせごとに1回だけ作成）"""
+        key = (name, tuple(sorted(overrides.items())))
+        fmt = self._formats.get(key)
+        if fmt is None:
+            properties = dict(self.styles[name]) if name else {}
+            properties.update(overrides)
+            fmt = self._formats[key] = self.workbook.add_format(properties)
+        return fmt
+
+    def add_worksheet(self, title: str, column_widths=()):
+        """シートを追加する（列幅は文字数単位、A列から順に）"""
+        worksheet = self.workbook.add_worksheet(title[:31])
+        worksheet.set_margins(left=0.75, right=0.75, top=1.0, bottom=1.0)  # openpyxl と同じ既定の余白
+        for column, width in enumerate(column_widths):
+            worksheet.set_column(column, column, width)
+        return worksheet
+
+    def close(self):
+        """ワークブックを書き終えて、先頭に戻した書き込み先を返す"""
+        self.workbook.close()
+        self.output.seek(0)
+        return self.output
+
+    def response(self, filename: str):
+        """ダウンロード用のレスポンス（ファイルを少しずつ送る）"""
+        return send_file(self.close(), mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=filename)
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+財務諸表Excel出力
+1つの試算表から 貸借対照表・損益計算書・キャッシュフロー計算書・株主資本等変動計算書・附属明細書 を
+1回の処理で書き出す仕組み
+
+シートのレイアウトは1通りで、用紙の向きはページプロファイル（A4縦・A4横・混合）で切り替える。
+書式は excel_export.ExcelWorkbook の名前付き書式を (書式名, 文字サイズ) ごとに1回だけ作成して
+全シートで使い回すため、プロファイルや帳票の数が増えても書式の数は増えない。
+"""
+
+from datetime import date, timedelta
+from io import BytesIO
+from itertools import zip_longest
+from types import SimpleNamespace
+
+from excel_export import AMOUNT_FORMAT, DOUBLE, GOTHIC, THIN, ExcelWorkbook
+from trial_balance import TrialBalance, TrialBalanceLine
+
+# 帳票（report_type → シート名）
+STATEMENTS = (
+    ('balance_sheet', '貸借対照表'),
+    ('income_statement', '損益計算書'),
+    ('cash_flow', 'キャッシュフロー計算書'),
+    ('equity_change', '株主資本等変動計算書'),
+    ('notes', '附属明細書'),
+)
+STATEMENT_KEYS = tuple(key for key, _ in STATEMENTS)
+
+# 用紙の向きごとの印刷設定と文字サイズ（列幅は縦向きの幅に column_scale を掛ける）
+PAGE_SETUPS = {
+    'portrait': {
+        'landscape': False, 'scale': 85, 'column_scale': 1.0,
+        'font_sizes': {'title': 12, 'header': 10, 'normal': 9, 'small': 8},
+    },
+    'landscape': {
+        'landscape': True, 'scale': 90, 'column_scale': 1.4,
+        'font_sizes': {'title': 14, 'header': 11, 'normal': 10, 'small': 9},
+    },
+}
+
+# ページプロファイル（帳票 → 用紙の向き）
+PAGE_PROFILES = {
+    'a4_portrait': dict.fromkeys(STATEMENT_KEYS, 'portrait'),
+    'a4_landscape': dict.fromkeys(STATEMENT_KEYS, 'landscape'),
+    'mixed': {
+        'balance_sheet': 'portrait',
+        'income_statement': 'portrait',
+        'cash_flow': 'portrait',
+        'equity_change': 'landscape',
+        'notes': 'landscape',
+    },
+}
+DEFAULT_PAGE_PROFILE = 'mixed'
+
+FINANCIAL_STATEMENT_STYLES = {
+    'title': {'font_name': GOTHIC, 'bold': True, 'align': 'center', 'valign': 'vcenter'},
+    'period': {'font_name': GOTHIC, 'align': 'center', 'valign': 'vcenter'},
+    'unit': {'font_name': GOTHIC, 'align': 'center', 'valign': 'vcenter'},
+    'section': {'font_name': GOTHIC, 'bold': True, 'align': 'center', 'valign': 'vcenter',
+                'bg_color': '#F5F5F5', 'border': THIN},
+    'heading': {'font_name': GOTHIC, 'bold': True},
+    'item': {'font_name': GOTHIC},
+    'item_amount': {'font_name': GOTHIC, 'num_format': AMOUNT_FORMAT},
+    'subtotal': {'font_name': GOTHIC, 'bold': True, 'bg_color': '#FAFAFA', 'top': THIN},
+    'subtotal_amount': {'font_name': GOTHIC, 'bold': True, 'bg_color': '#FAFAFA', 'top': THIN,
+                        'num_format': AMOUNT_FORMAT},
+    'total': {'font_name': GOTHIC, 'bold': True, 'top': THIN, 'bottom': DOUBLE},
+    'total_amount': {'font_name': GOTHIC, 'bold': True, 'top': THIN, 'bottom': DOUBLE,
+                     'num_format': AMOUNT_FORMAT},
+    'column_header': {'font_name': GOTHIC, 'bold': True, 'align': 'center', 'valign': 'vcenter',
+                      'text_wrap': True, 'bg_color': '#F5F5F5', 'border': THIN},
+    'cell': {'font_name': GOTHIC, 'border': THIN},
+    'cell_amount': {'font_name': GOTHIC, 'border': THIN, 'num_format': AMOUNT_FORMAT},
+    'cell_total': {'font_name': GOTHIC, 'bold': True, 'border': THIN},
+    'cell_total_amount': {'font_name': GOTHIC, 'bold': True, 'border': THIN, 'num_format': AMOUNT_FORMAT},
+    'note': {'font_name': GOTHIC},
+}
+
+# 書式名 → 文字サイズの種類（記載のないものは normal）
+STYLE_FONT_SIZES = {'title': 'title', 'section': 'header', 'heading': 'header', 'column_header': 'header',
+                    'unit': 'small', 'note': 'small'}
+
+# 科目名による表示区分の判定
+CURRENT_ASSET_KEYWORDS = ('現金', '預金', '売掛金', '受取手形', '未収', '商品', '製品', '原材料', '在庫')
+FIXED_LIABILITY_KEYWORDS = ('長期借入金', '社債', '退職給付引当金')
+SALES_KEYWORDS = ('売上',)
+COST_OF_SALES_KEYWORDS = ('原価', '仕入', '材料費', '製造')
+NON_OPERATING_EXPENSE_KEYWORDS = ('営業外', '支払利息')
+INCOME_TAX_KEYWORDS = ('法人税',)
+
+NO_DATA = 'データがありません'
+
+
+def _matches(account_name: str, keywords) -> bool:
+    return any(keyword in account_name for keyword in keywords)
+
+
+def _value(source, name: str) -> int:
+    """明細データの金額（項目がなければ 0）"""
+    return getattr(source, name, 0) or 0
+
+
+def classify_statement_lines(trial_balance: TrialBalance) -> SimpleNamespace:
+    """試算表の表示行を貸借対照表・損益計算書の表示区分に振り分ける"""
+    classified = SimpleNamespace(current_assets=[], fixed_assets=[], current_liabilities=[],
+                                 fixed_liabilities=[], equity=trial_balance.statement_lines('純資産'),
+                                 sales=[], other_income=[], cost_of_sales=[], sga=[],
+                                 other_expenses=[], income_taxes=[])
+
+    for line in trial_balance.statement_lines('資産'):
+        if _matches(line.account_name, CURRENT_ASSET_KEYWORDS):
+            classified.current_assets.append(line)
+        else:
+            classified.fixed_assets.append(line)
+
+    for line in trial_balance.statement_lines('負債'):
+        if _matches(line.account_name, FIXED_LIABILITY_KEYWORDS):
+            classified.fixed_liabilities.append(line)
+        else:
+            classified.current_liabilities.append(line)
+
+    for line in trial_balance.statement_lines('収益'):
+        if _matches(line.account_name, SALES_KEYWORDS):
+            classified.sales.append(line)
+        else:
+            classified.other_income.append(line)
+
+    for line in trial_balance.statement_lines('費用'):
+        if _matches(line.account_name, INCOME_TAX_KEYWORDS):
+            classified.income_taxes.append(line)
+        elif _matches(line.account_name, COST_OF_SALES_KEYWORDS):
+            classified.cost_of_sales.append(line)
+        elif _matches(line.account_name, NON_OPERATING_EXPENSE_KEYWORDS):
+            classified.other_expenses.append(line)
+        else:
+            classified.sga.append(line)
+
+    return classified
+
+
+def _total(lines) -> int:
+    return sum(line.balance for line in lines)
+
+
+def _items(lines) -> list:
+    return [(f'　{line.account_name}', line.balance, 'item') for line in lines]
+
+
+class FinancialStatementWriter:
+    """1冊のワークブックに財務諸表を書き出す（書式はワークブック内で共有）"""
+
+    def __init__(self, company_name: str, trial_balance: TrialBalance, schedules=None,
+                 page_profile: str = DEFAULT_PAGE_PROFILE, output=None):
+        if page_profile not in PAGE_PROFILES:
+            raise ValueError(f'不明なページ設定です: {page_profile}')
+        self.company_name = company_name
+        self.trial_balance = trial_balance
+        self.schedules = schedules or SimpleNamespace()
+        self.profile = PAGE_PROFILES[page_profile]
+        self.book = ExcelWorkbook(FINANCIAL_STATEMENT_STYLES, output if output is not None else BytesIO())
+        self.classified = classify_statement_lines(trial_balance)
+        self.setup = None
+
+        last_day = trial_balance.end_date - timedelta(days=1)
+        self.as_of = f'{last_day.year}年{last_day.month}月{last_day.day}日現在'
+        self.period = (f'自　{trial_balance.start_date.year}年{trial_balance.start_date.month}月'
+                       f'{trial_balance.start_date.day}日　至　{last_day.year}年{last_day.month}月{last_day.day}日')
+
+    def style(self, name: str):
+        """用紙の向きの文字サイズを当てた名前付き書式"""
+        size = self.setup['font_sizes'][STYLE_FONT_SIZES.get(name, 'normal')]
+        return self.book.style(name, size=size)
+
+    def write(self, report_type: str = 'all'):
+        """帳票を書き出して、先頭に戻した書き込み先を返す"""
+        if report_type != 'all' and report_type not in STATEMENT_KEYS:
+            raise ValueError(f'不明な帳票の種類です: {report_type}')
+
+        for key, title in STATEMENTS:
+            if report_type in ('all', key):
+                getattr(self, f'_write_{key}')(self._add_sheet(key, title))
+        return self.book.close()
+
+    # --- シート共通 ---
+
+    def _add_sheet(self, key: str, title: str):
+        self.setup = PAGE_SETUPS[self.profile[key]]
+        worksheet = self.book.add_worksheet(title)
+        worksheet.set_paper(9)  # A4
+        if self.setup['landscape']:
+            worksheet.set_landscape()
+        else:
+            worksheet.set_portrait()
+        worksheet.set_print_scale(self.setup['scale'])
+        worksheet.set_margins(left=0.5, right=0.5, top=0.5, bottom=0.5)
+        worksheet.center_horizontally()
+        return worksheet
+
+    def _set_columns(self, worksheet, widths):
+        for column, width in enumerate(widths):
+            worksheet.set_column(column, column, round(width * self.setup['column_scale'], 1))
+
+    def _write_heading(self, worksheet, last_column: int, period: str):
+        """会社名・帳票名、期間、単位の3行"""
+        worksheet.merge_range(0, 0, 0, last_column, f'{self.company_name}　{worksheet.name}', self.style('title'))
+        worksheet.merge_range(1, 0, 1, last_column, period, self.style('period'))
+        worksheet.merge_range(2, 0, 2, last_column, '（単位：円）', self.style('unit'))
+        return 4
+
+    def _write_entry(self, worksheet, row: int, column: int, entry, amount_column=None):
+        """(表示名, 金額, 種類) の1行（種類: heading / item / subtotal / total）"""
+        label, amount, kind = entry
+        worksheet.write_string(row, column, label, self.style(kind))
+        if amount_column is None:
+            amount_column = column + 1
+        if amount is not None:
+            worksheet.write_number(row, amount_column, amount, self.style(f'{kind}_amount'))
+        elif kind != 'heading':
+            worksheet.write_blank(row, amount_column, None, self.style(f'{kind}_amount'))
+
+    def _write_table(self, worksheet, row: int, title: str, headers, rows, total=None):
+        """見出し付きの明細表（1列目は文字、2列目以降は金額）"""
+        worksheet.write_string(row, 0, title, self.style('heading'))
+        row += 1
+        for column, header in enumerate(headers):
+            worksheet.write_string(row, column, header, self.style('column_header'))
+        row += 1
+
+        if not rows:
+            worksheet.write_string(row, 0, NO_DATA, self.style('note'))
+            return row + 1
+
+        for values in rows + ([total] if total else []):
+            is_total = values is total
+            worksheet.write_string(row, 0, values[0], self.style('cell_total' if is_total else 'cell'))
+            for column, amount in enumerate(values[1:], 1):
+                amount_style = self.style('cell_total_amount' if is_total else 'cell_amount')
+                if amount is None:
+                    worksheet.write_blank(row, column, None, amount_style)
+                else:
+                    worksheet.write_number(row, column, amount, amount_style)
+            row += 1
+        return row
+
+    # --- 貸借対照表 ---
+
+    def _write_balance_sheet(self, worksheet):
+        """勘定式（左に資産、右に負債・純資産）"""
+        self._set_columns(worksheet, (24, 14, 2, 24, 14))
+        row = self._write_heading(worksheet, 4, self.as_of)
+        c = self.classified
+
+        current_assets, fixed_assets = _total(c.current_assets), _total(c.fixed_assets)
+        current_liabilities, fixed_liabilities = _total(c.current_liabilities), _total(c.fixed_liabilities)
+        net_income = self.trial_balance.net_income
+        equity = _total(c.equity) + net_income
+
+        left = ([('流動資産', None, 'heading')] + _items(c.current_assets)
+                + [('流動資産合計', current_assets, 'subtotal'), ('', None, 'heading'),
+                   ('固定資産', None, 'heading')] + _items(c.fixed_assets)
+                + [('固定資産合計', fixed_assets, 'subtotal')])
+        right = ([('流動負債', None, 'heading')] + _items(c.current_liabilities)
+                 + [('流動負債合計', current_liabilities, 'subtotal'), ('', None, 'heading'),
+                    ('固定負債', None, 'heading')] + _items(c.fixed_liabilities)
+                 + [('固定負債合計', fixed_liabilities, 'subtotal'),
+                    ('負債合計', current_liabilities + fixed_liabilities, 'subtotal'), ('', None, 'heading'),
+                    ('純資産', None, 'heading')] + _items(c.equity)
+                 + [('　当期純利益', net_income, 'item'), ('純資産合計', equity, 'subtotal')])
+
+        worksheet.merge_range(row, 0, row, 1, '資産の部', self.style('section'))
+        worksheet.merge_range(row, 3, row, 4, '負債及び純資産の部', self.style('section'))
+        row += 1
+
+        for left_entry, right_entry in zip_longest(left, right):
+            if left_entry:
+                self._write_entry(worksheet, row, 0, left_entry)
+            if right_entry:
+                self._write_entry(worksheet, row, 3, right_entry)
+            row += 1
+
+        row += 1
+        self._write_entry(worksheet, row, 0, ('資産合計', current_assets + fixed_assets, 'total'))
+        self._write_entry(worksheet, row, 3, ('負債及び純資産合計',
+                                              current_liabilities + fixed_liabilities + equity, 'total'))
+
+    # --- 損益計算書 ---
+
+    def _write_income_statement(self, worksheet):
+        """報告式（科目の金額は中列、区分の合計と段階利益は右列）"""
+        self._set_columns(worksheet, (30, 14, 14))
+        row = self._write_heading(worksheet, 2, self.period)
+        c = self.classified
+
+        sales, cost_of_sales = _total(c.sales), _total(c.cost_of_sales)
+        sga, other_income, other_expenses = _total(c.sga), _total(c.other_income), _total(c.other_expenses)
+        gross_profit = sales - cost_of_sales
+        operating_income = gross_profit - sga
+        ordinary_income = operating_income + other_income - other_expenses
+        income_taxes = _total(c.income_taxes)
+
+        entries = []
+        for title, lines, total, profit in (
+            ('Ⅰ　売上高', c.sales, sales, None),
+            ('Ⅱ　売上原価', c.cost_of_sales, cost_of_sales, ('売上総利益', gross_profit)),
+            ('Ⅲ　販売費及び一般管理費', c.sga, sga, ('営業利益', operating_income)),
+            ('Ⅳ　営業外収益', c.other_income, other_income, None),
+            ('Ⅴ　営業外費用', c.other_expenses, other_expenses, ('経常利益', ordinary_income)),
+        ):
+            entries += [(title, None, 'heading')] + _items(lines) + [(f'　{title[2:]}合計', total, 'subtotal')]
+            if profit:
+                entries.append((profit[0], profit[1], 'subtotal'))
+        entries += [('税引前当期純利益', ordinary_income, 'subtotal'),
+                    ('法人税等', income_taxes, 'subtotal'),
+                    ('当期純利益', self.trial_balance.net_income, 'total')]
+
+        for entry in entries:
+            self._write_entry(worksheet, row, 0, entry, amount_column=1 if entry[2] == 'item' else 2)
+            row += 1
+
+    # --- キャッシュフロー計算書 ---
+
+    def _write_cash_flow(self, worksheet):
+        """間接法（区分ごとの小計と現金及び現金同等物の増減）"""
+        self._set_columns(worksheet, (36, 14))
+        row = self._write_heading(worksheet, 1, self.period)
+        cash_flow = getattr(self.schedules, 'cash_flow', None)
+        if cash_flow is None:
+            worksheet.write_string(row, 0, NO_DATA, self.style('note'))
+            return
+
+        sections = (
+            ('Ⅰ　営業活動によるキャッシュ・フロー', cash_flow.operating, (
+                ('税引前当期純利益', 'pre_tax_income'), ('減価償却費', 'depreciation'),
+                ('売上債権の増減額', 'receivables_change'), ('仕入債務の増減額', 'payables_change'))),
+            ('Ⅱ　投資活動によるキャッシュ・フロー', cash_flow.investing, (
+                ('有形固定資産の取得による支出', 'asset_purchase'), ('有形固定資産の売却による収入', 'asset_sale'),
+                ('有価証券の取得による支出', 'securities_purchase'))),
+            ('Ⅲ　財務活動によるキャッシュ・フロー', cash_flow.financing, (
+                ('借入れによる収入', 'loan_increase'), ('借入金の返済による支出', 'loan_repayment'),
+                ('配当金の支払額', 'dividend_payment'))),
+        )
+
+        entries = []
+        change = 0
+        for title, section, items in sections:
+            amounts = [_value(section, name) for _, name in items]
+            total = getattr(section, 'total', None)
+            total = sum(amounts) if total is None else total
+            change += total
+            entries += ([(title, None, 'heading')]
+                        + [(f'　{label}', amount, 'item') for (label, _), amount in zip(items, amounts)]
+                        + [(f'　{title[2:]}', total, 'subtotal'), ('', None, 'heading')])
+        entries += [('Ⅳ　現金及び現金同等物の増減額', change, 'subtotal'),
+                    ('Ⅴ　現金及び現金同等物の期首残高', _value(cash_flow, 'beginning_cash'), 'subtotal'),
+                    ('Ⅵ　現金及び現金同等物の期末残高', _value(cash_flow, 'ending_cash'), 'total')]
+
+        for entry in entries:
+            self._write_entry(worksheet, row, 0, entry)
+            row += 1
+
+    # --- 株主資本等変動計算書 ---
+
+    def _write_equity_change(self, worksheet):
+        """株主資本の項目を列、期首残高・当期変動額・期末残高を行とする表"""
+        self._set_columns(worksheet, (20, 14, 14, 14, 14, 14))
+        row = self._write_heading(worksheet, 5, self.period)
+        equity_change = getattr(self.schedules, 'equity_change', None)
+        if equity_change is None:
+            worksheet.write_string(row, 0, NO_DATA, self.style('note'))
+            return
+
+        columns = ('capital', 'capital_surplus', 'retained_earnings', 'treasury_stock', 'total')
+        changes = equity_change.changes
+
+        def balances(source):
+            return [_value(source, name) for name in columns]
+
+        rows = [
+            ['当期首残高'] + balances(equity_change.beginning),
+            ['当期変動額', None, None, None, None, None],
+            ['　剰余金の配当', None, None, _value(changes, 'dividend'), None, _value(changes, 'dividend')],
+            ['　当期純利益', None, None, _value(changes, 'net_income'), None, _value(changes, 'net_income')],
+            ['当期変動額合計', _value(changes, 'capital_change'), _value(changes, 'surplus_change'),
+             _value(changes, 'earnings_change'), _value(changes, 'treasury_change'), _value(changes, 'total')],
+        ]
+        self._write_table(worksheet, row, '株主資本', ('', '資本金', '資本剰余金', '利益剰余金', '自己株式', '株主資本合計'),
+                          rows, total=['当期末残高'] + balances(equity_change.ending))
+
+    # --- 附属明細書 ---
+
+    def _write_notes(self, worksheet):
+        """有形固定資産等・社債・借入金・引当金の明細"""
+        self._set_columns(worksheet, (20, 15, 15, 15, 15, 15, 15))
+        row = self._write_heading(worksheet, 6, self.period)
+        schedules = self.schedules
+
+        fixed_assets = [[asset.asset_type, asset.beginning_book_value, asset.increase, asset.decrease,
+                         asset.ending_book_value, asset.accumulated_depreciation, asset.acquisition_cost]
+                        for asset in getattr(schedules, 'fixed_assets', None) or []]
+        row = self._write_table(worksheet, row, '有形固定資産等明細書',
+                                ('資産の種類', '期首帳簿価額', '当期増加額', '当期減少額',
+                                 '期末帳簿価額', '減価償却累計額', '期末取得価額'), fixed_assets) + 1
+
+        bonds = [[bond.name, bond.beginning_balance, bond.change, bond.ending_balance]
+                 for bond in getattr(schedules, 'bonds', None) or []]
+        row = self._write_table(worksheet, row, '社債明細書', ('銘柄', '期首残高', '当期増減', '期末残高'), bonds) + 1
+
+        loans = [[loan.lender, loan.beginning_balance, loan.change, loan.ending_balance]
+                 for loan in getattr(schedules, 'loans', None) or []]
+        row = self._write_table(worksheet, row, '借入金明細書', ('借入先', '期首残高', '当期増減', '期末残高'), loans) + 1
+
+        reserves = [[reserve.account_name, reserve.beginning_balance, reserve.increase,
+                     reserve.purpose_decrease, reserve.other_decrease, reserve.ending_balance]
+                    for reserve in getattr(schedules, 'reserves', None) or []]
+        self._write_table(worksheet, row, '引当金明細書',
+                          ('科目', '期首残高', '当期増加額', '当期減少額（目的使用）',
+                           '当期減少額（その他）', '期末残高'), reserves)
+
+
+def render_financial_statements(company_name: str, trial_balance: TrialBalance, schedules=None,
+                                report_type: str = 'all', page_profile: str = DEFAULT_PAGE_PROFILE,
+                                output=None):
+    """試算表と明細データから財務諸表のExcelを作る（先頭に戻した BytesIO を返す）
+
+    Args:
+        company_name: 表題に入れる会社名
+        trial_balance: 会計年度の試算表（全帳票で共有する）
+        schedules: cash_flow, equity_change, fixed_assets, bonds, loans, reserves を持つオブジェクト
+            （ないものは「データがありません」と表示する）
+        report_type: 'all' または STATEMENT_KEYS の1つ
+        page_profile: PAGE_PROFILES のキー（a4_portrait / a4_landscape / mixed）
+    """
+    writer = FinancialStatementWriter(company_name, trial_balance, schedules, page_profile, output)
+    return writer.write(report_type)
+
+
+def statement_trial_balance(fiscal_year: int, assets=(), liabilities=(), revenues=(), expenses=(), equity=(),
+                            start_date=None, end_date=None) -> TrialBalance:
+    """科目名と金額（account_name, balance）の一覧から試算表を組み立てる（データベースを使わない呼び出し用）
+
+    期間を省略した場合は4月1日から翌年3月31日まで。
+    """
+    start_date = start_date or date(fiscal_year, 4, 1)
+    end_date = end_date or date(fiscal_year + 1, 4, 1)
+
+    lines = []
+    for account_type, entries in (('資産', assets), ('負債', liabilities), ('純資産', equity),
+                                  ('収益', revenues), ('費用', expenses)):
+        for entry in entries:
+            amount = int(entry.balance or 0)
+            debit, credit = (amount, 0) if account_type in ('資産', '費用') else (0, amount)
+            lines.append(TrialBalanceLine(len(lines) + 1, '', entry.account_name, account_type,
+                                          0, debit, credit, True))
+    return TrialBalance(fiscal_year, start_date, end_date, lines)
+
+
+# 動作確認・見本用の科目残高（貸借が一致する）
+SAMPLE_ACCOUNTS = {
+    'assets': (('現金及び預金', 5000000), ('売掛金', 8000000), ('商品', 3000000),
+               ('建物', 20000000), ('機械装置', 7000000), ('土地', 30000000)),
+    'liabilities': (('買掛金', 6000000), ('未払金', 2000000), ('短期借入金', 5000000),
+                    ('長期借入金', 20000000)),
+    'equity': (('資本金', 10000000), ('繰越利益剰余金', 24000000)),
+    'revenues': (('売上高', 100000000), ('受取利息', 500000)),
+    'expenses': (('売上原価', 60000000), ('給料手当', 20000000), ('地代家賃', 6000000),
+                 ('広告宣伝費', 3000000), ('減価償却費', 2000000), ('支払利息', 500000),
+                 ('法人税等', 3000000)),
+}
+
+
+def sample_trial_balance(fiscal_year: int) -> TrialBalance:
+    """見本の試算表"""
+    return statement_trial_balance(fiscal_year, **{
+        group: [SimpleNamespace(account_name=name, balance=amount) for name, amount in entries]
+        for group, entries in SAMPLE_ACCOUNTS.items()
+    })
+
+
+def render_sample_financial_statements(company_name: str = '株式会社サンプル', fiscal_year: int = 2025,
+                                       page_profile: str = DEFAULT_PAGE_PROFILE):
+    """見本の試算表で財務諸表を作る"""
+    return render_financial_statements(company_name, sample_trial_balance(fiscal_year),
+                                       page_profile=page_profile)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+会計期間
+会計年度を AccountingPeriod の期首日〜期末日の日付範囲に読み替える仕組み
+
+元帳・財務諸表・Excel出力などの集計は、年度ごとにここで一度だけ日付範囲を求め、
+entry_date のインデックスで範囲検索する（4月始まりなど暦年でない会計年度に対応）。
+会計期間が未作成の年度は、会社設定の期首月日から create_accounting_period と同じ規則で求める。
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from models import AccountingPeriod, CompanySettings
+
+DEFAULT_START_MONTH = 4
+DEFAULT_START_DAY = 1
+
+
+def fiscal_period_dates(fiscal_year: int, start_month: int = DEFAULT_START_MONTH,
+                        start_day: int = DEFAULT_START_DAY) -> Tuple[date, date]:
+    """期首月日から会計年度の (期首日, 期末日) を求める"""
+    start_date = date(fiscal_year, start_month, start_day)
+    if start_month == 1:
+        end_date = date(fiscal_year, 12, 31)
+    else:
+        end_date = date(fiscal_year + 1, start_month - 1,
+                        calendar.monthrange(fiscal_year + 1, start_month - 1)[1])
+    return start_date, end_date
+
+
+def fiscal_year_range(fiscal_year: int) -> Tuple[date, date]:
+    """会計年度の期首日と期末日の翌日を返す（半開区間）"""
+    period = AccountingPeriod.query.filter_by(fiscal_year=fiscal_year).first()
+    if period:
+        start_date, end_date = period.start_date, period.end_date
+    else:
+        settings = CompanySettings.query.first()
+        start_date, end_date = fiscal_period_dates(
+            fiscal_year,
+            (settings.fiscal_year_start_month if settings else None) or DEFAULT_START_MONTH,
+            (settings.fiscal_year_start_day if settings else None) or DEFAULT_START_DAY
+        )
+    return start_date, end_date + timedelta(days=1)
+
+
+def fiscal_months(start_date: date, end_date: date) -> List[int]:
+    """会計期間 [start_date, end_date) に含まれる月を期首から順に返す"""
+    months = []
+    current = start_date.replace(day=1)
+    while current < end_date:
+        months.append(current.month)
+        current = (current + timedelta(days=32)).replace(day=1)
+    return months
+
+
+def fiscal_date_range(fiscal_year: int, month: Optional[int] = None,
+                      year_range: Optional[Tuple[date, date]] = None) -> Tuple[date, date]:
+    """会計年度（月の指定があればその年度内の月）の日付範囲を返す（半開区間）
+
+    4月始まりの2025年度で month=2 なら 2026年2月。year_range に
+    fiscal_year_range() の結果を渡すと会計期間を読み直さない。
+    """
+    start_date, end_date = year_range or fiscal_year_range(fiscal_year)
+    if not month:
+        return start_date, end_date
+
+    month_start = date(start_date.year, month, 1)
+    if month_start < start_date.replace(day=1):
+        month_start = date(start_date.year + 1, month, 1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return max(month_start, start_date), min(next_month, end_date)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+バックグラウンドジョブキュー
+時間のかかる帳票・PDF作成を Web リクエストの外で実行する仕組み
+
+ジョブは SQLite の background_job テーブルに登録し、別プロセスのワーカーが
+取り出して実行する（外部のメッセージブローカーは使わない）。
+成果物は instance/job_artifacts に保存し、/jobs/<id>/download から取得する。
+
+- ワーカー数は --concurrency で上限を指定する
+- 失敗したジョブは待機時間を空けて max_attempts 回まで再試行する
+- 終了から JOB_RETENTION_HOURS 時間を過ぎたジョブと成果物は自動で削除する
+
+使い方（事前に python migrate_background_jobs.py で background_job テーブルを作成）:
+    python job_queue.py worker [--concurrency 2]
+    python job_queue.py cleanup
+"""
+
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from werkzeug.datastructures import MultiDict
+
+from models import db, BackgroundJob
+
+JOB_ARTIFACT_DIR = os.path.join('instance', 'job_artifacts')
+JOB_RETENTION_HOURS = 24            # 終了したジョブ・成果物の保存期間
+JOB_TIMEOUT_MINUTES = 60            # これを超えて実行中のジョブはワーカー停止とみなして再登録
+JOB_RETRY_DELAY_SECONDS = 30        # 再試行までの待機時間（実行回数に比例）
+POLL_INTERVAL_SECONDS = 2           # 待機中ジョブの確認間隔
+CLEANUP_INTERVAL_SECONDS = 600      # 古いジョブの削除間隔
+
+# ジョブ種別 → {'handler': 関数, 'roles': 実行できるロール, 'label': 表示名}
+JOB_HANDLERS: Dict[str, Dict] = {}
+
+
+def register_job(job_type: str, roles: List[str], label: str):
+    """ジョブ処理関数を登録するデコレーター
+
+    処理関数は (params: MultiDict, context: JobContext) を受け取り、
+    context.artifact_path に成果物を書き込んで (ダウンロード名, MIME タイプ) を返す。
+    ユーザーに見せるエラーは ValueError で送出する（再試行しない）。
+    """
+    def decorator(func: Callable):
+        JOB_HANDLERS[job_type] = {'handler': func, 'roles': roles, 'label': label}
+        return func
+    return decorator
+
+
+class JobContext:
+    """実行中のジョブから進捗を更新するためのコンテキスト"""
+
+    def __init__(self, job: BackgroundJob):
+        self.job = job
+        self.job_id = job.id
+        self.created_by = job.created_by
+        self.artifact_path = os.path.join(JOB_ARTIFACT_DIR, f'job_{job.id}')
+
+    def progress(self, percent: int, message: Optional[str] = None):
+        """進捗を更新してコミットする"""
+        self.job.progress = max(0, min(100, int(percent)))
+        if message is not None:
+            self.job.message = message[:255]
+        db.session.commit()
+
+
+def submit_job(job_type: str, params: MultiDict, created_by=None, max_attempts: int = 3) -> BackgroundJob:
+    """ジョブを登録する"""
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f'不明なジョブ種別です: {job_type}')
+
+    job = BackgroundJob(
+        job_type=job_type,
+        params_json=json.dumps(params.to_dict(flat=False), ensure_ascii=False),
+        status='queued',
+        message='待機中',
+        max_attempts=max_attempts,
+        created_by=created_by,
+        available_at=datetime.now()
+    )
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def job_status(job: BackgroundJob) -> Dict:
+    """ジョブの状態を JSON 用の辞書にする"""
+    return {
+        'id': job.id,
+        'job_type': job.job_type,
+        'label': JOB_HANDLERS.get(job.job_type, {}).get('label', job.job_type),
+        'status': job.status,
+        'progress': job.progress or 0,
+        'message': job.message,
+        'error': job.error if job.status == 'failed' else None,
+        'attempts': job.attempts or 0,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'ready': job.status == 'succeeded' and bool(job.artifact_path) and os.path.exists(job.artifact_path),
+    }
+
+
+def claim_next_job() -> Optional[BackgroundJob]:
+    """実行可能なジョブを1件取り出して実行中にする（複数ワーカーで取り合わない）"""
+    while True:
+        candidate = BackgroundJob.query.filter(
+            BackgroundJob.status == 'queued',
+            BackgroundJob.available_at <= datetime.now()
+        ).order_by(BackgroundJob.id).first()
+        if candidate is None:
+            db.session.rollback()
+            return None
+
+        claimed = BackgroundJob.query.filter(
+            BackgroundJob.id == candidate.id,
+            BackgroundJob.status == 'queued'
+        ).update({
+            'status': 'running',
+            'started_at': datetime.now(),
+            'attempts': BackgroundJob.attempts + 1,
+            'message': '実行中',
+        }, synchronize_session=False)
+        db.session.commit()
+        if claimed:
+            db.session.refresh(candidate)
+            return candidate
+        # 他のワーカーが先に取り出した場合は次の候補へ
+
+
+def run_job(job: BackgroundJob):
+    """ジョブを実行し、結果（成功・再試行・失敗）を記録する"""
+    entry = JOB_HANDLERS.get(job.job_type)
+    context = JobContext(job)
+    try:
+        if entry is None:
+            raise ValueError(f'不明なジョブ種別です: {job.job_type}')
+
+        os.makedirs(JOB_ARTIFACT_DIR, exist_ok=True)
+        params = MultiDict(json.loads(job.params_json or '{}'))
+        download_name, mimetype = entry['handler'](params, context)
+
+        job.status = 'succeeded'
+        job.progress = 100
+        job.message = '完了'
+        job.error = None
+        job.artifact_path = context.artifact_path
+        job.artifact_name = download_name
+        job.artifact_mimetype = mimetype
+        job.finished_at = datetime.now()
+        db.session.commit()
+
+    except Exception as e:
+        db.session.rollback()
+        if os.path.exists(context.artifact_path):
+            os.remove(context.artifact_path)
+
+        job = db.session.get(BackgroundJob, context.job_id)
+        job.error = str(e) if isinstance(e, ValueError) else traceback.format_exc(limit=5)
+        # 入力エラー（ValueError）は再試行しない
+        if not isinstance(e, ValueError) and (job.attempts or 0) < (job.max_attempts or 1):
+            job.status = 'queued'
+            job.message = f'再試行待ち（{job.attempts}回失敗）'
+            job.available_at = datetime.now() + timedelta(seconds=JOB_RETRY_DELAY_SECONDS * job.attempts)
+        else:
+            job.status = 'failed'
+            job.message = str(e)[:255]
+            job.finished_at = datetime.now()
+        db.session.commit()
+        print(f"❌ ジョブ{job.id}（{job.job_type}）エラー: {e}")
+
+
+def requeue_stale_jobs() -> int:
+    """タイムアウトした実行中ジョブを再登録する"""
+    threshold = datetime.now() - timedelta(minutes=JOB_TIMEOUT_MINUTES)
+    stale_jobs = BackgroundJob.query.filter(
+        BackgroundJob.status == 'running',
+        BackgroundJob.started_at < threshold
+    ).all()
+    for job in stale_jobs:
+        if (job.attempts or 0) < (job.max_attempts or 1):
+            job.status = 'queued'
+            job.message = '再試行待ち（タイムアウト）'
+            job.available_at = datetime.now()
+        else:
+            job.status = 'failed'
+            job.message = 'タイムアウトしました'
+            job.finished_at = datetime.now()
+    db.session.commit()
+    return len(stale_jobs)
+
+
+def cleanup_jobs(retention_hours: int = JOB_RETENTION_HOURS) -> int:
+    """保存期間を過ぎた終了済みジョブと成果物を削除する"""
+    threshold = datetime.now() - timedelta(hours=retention_hours)
+    old_jobs = BackgroundJob.query.filter(
+        BackgroundJob.status.in_(['succeeded', 'failed']),
+        BackgroundJob.finished_at < threshold
+    ).all()
+    for job in old_jobs:
+        if job.artifact_path and os.path.exists(job.artifact_path):
+            os.remove(job.artifact_path)
+        db.session.delete(job)
+    db.session.commit()
+    return len(old_jobs)
+
+
+def worker_loop(worker_number: int = 0, run_once: bool = False):
+    """ジョブを取り出して実行し続ける（ワーカープロセス本体）"""
+    from app import app  # ジョブ処理関数は app で登録される
+
+    with app.app_context():
+        print(f"🚀 ジョブワーカー{worker_number} 起動 (PID: {os.getpid()})")
+        last_cleanup = 0.0
+        while True:
+            if worker_number == 0 and time.time() - last_cleanup >= CLEANUP_INTERVAL_SECONDS:
+                requeue_stale_jobs()
+                cleanup_jobs()
+                last_cleanup = time.time()
+
+            job = claim_next_job()
+            if job is None:
+                if run_once:
+                    return
+                time.sleep(POLL_INTERVAL_SECONDS)
+                continue
+
+            print(f"▶️  ジョブ{job.id}（{job.job_type}）開始 {job.attempts}回目")
+            run_job(job)
+            db.session.remove()
+
+
+def main():
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command == 'worker':
+        concurrency = int(args[args.index('--concurrency') + 1]) if '--concurrency' in args else 1
+        if concurrency <= 1:
+            worker_loop()
+            return
+        # ワーカーはジョブ内でプロセスプールを使うため、非デーモンのプロセスで起動する
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=worker_loop, args=(number,)) for number in range(concurrency)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    elif command == 'cleanup':
+        from app import app
+        with app.app_context():
+            stale = requeue_stale_jobs()
+            removed = cleanup_jobs()
+        print(f"✅ 古いジョブを{removed}件削除しました（タイムアウト再登録: {stale}件）")
+
+    else:
+        print("Usage: python job_queue.py worker [--concurrency 2] | cleanup")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+年次有給休暇の残日数
+従業員ごとの付与合計・取得合計・残日数・直近の付与日を、付与と取得それぞれ
+1回の集計クエリ（従業員IDでグループ化）で求める機能
+
+年休管理画面は従業員数に関わらず、従業員一覧と合わせて3回のクエリで表示できる。
+"""
+
+from collections import defaultdict
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import func
+
+from models import db, LeaveCredit, LeaveRecord
+from leave_grants import next_grant_date
+
+
+def _empty_balance() -> SimpleNamespace:
+    return SimpleNamespace(credited=0, taken=0, remaining=0, last_credited=None)
+
+
+def leave_balances(employee_ids: Optional[Iterable[int]] = None) -> Dict[int, SimpleNamespace]:
+    """従業員ごとの年休残高 {従業員ID: (credited, taken, remaining, last_credited)}
+
+    付与・取得のない従業員も参照でき、その場合はすべて 0（last_credited は None）。
+
+    Args:
+        employee_ids: 対象従業員ID（省略時は全従業員）
+    """
+    credited_query = db.session.query(
+        LeaveCredit.employee_id, func.sum(LeaveCredit.days_credited), func.max(LeaveCredit.date_credited)
+    )
+    taken_query = db.session.query(LeaveRecord.employee_id, func.sum(LeaveRecord.days_taken))
+    if employee_ids is not None:
+        employee_ids = list(employee_ids)
+        credited_query = credited_query.filter(LeaveCredit.employee_id.in_(employee_ids))
+        taken_query = taken_query.filter(LeaveRecord.employee_id.in_(employee_ids))
+
+    balances = defaultdict(_empty_balance)
+    for employee_id, credited, last_credited in credited_query.group_by(LeaveCredit.employee_id):
+        balance = balances[employee_id]
+        balance.credited = credited or 0
+        balance.last_credited = last_credited
+    for employee_id, taken in taken_query.group_by(LeaveRecord.employee_id):
+        balances[employee_id].taken = taken or 0
+
+    for balance in balances.values():
+        balance.remaining = balance.credited - balance.taken
+    return balances
+
+
+def leave_balance(employee_id: int) -> SimpleNamespace:
+    """従業員1名の年休残高"""
+    return leave_balances([employee_id])[employee_id]
+
+
+def next_auto_grant_date(employee, balance: SimpleNamespace, as_of: Optional[date] = None) -> Optional[date]:
+    """次回自動付与予定日（在籍中で入社日がある従業員のみ）
+
+    入社日から6か月後、以降1年ごとの法定付与日のうち、まだ付与していない直近の日。
+    """
+    if employee.status != '在籍中' or not employee.join_date:
+        return None
+    return next_grant_date(employee.join_date, balance.last_credited, as_of)
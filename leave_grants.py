@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+年次有給休暇の自動付与
+労働基準法第39条の付与日（入社日から6か月後、以降1年ごと）と付与日数を暦どおりに求め、
+付与日を迎えた全従業員分の付与（LeaveCredit）を一括で登録する機能
+
+対象の判定は、在籍中の従業員と前回の付与日を1回の集計クエリで読み込んで行う。
+付与は法定の付与日の日付で登録し、判定の前に書き込みロックを取るため、
+Web 画面と cron が同時に実行しても二重に付与されない。
+年休は付与日から2年間有効（第115条）なので、実行が遅れた場合や初回の実行では、
+まだ有効な付与日の分（直近の2回まで）をすべて付与する。
+
+Web リクエストなしで毎日実行できる:
+    python leave_grants.py [--dry-run] [YYYY-MM-DD]
+    例（cron で毎朝6時）: 0 6 * * * cd /path/to/staffcloud && python leave_grants.py
+"""
+
+import calendar
+import sys
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, insert
+
+from models import db, Employee, LeaveCredit
+
+# 付与回数ごとの付与日数（6か月、1年6か月、2年6か月 … 6年6か月以降は20日）
+LEGAL_GRANT_DAYS = (10, 11, 12, 14, 16, 18, 20)
+# 付与した年休の有効期間（か月）
+GRANT_VALID_MONTHS = 24
+
+def _add_months(base: date, months: int) -> date:
+    """base の months か月後（応当日がなければ月末）"""
+    month_index = base.month - 1 + months
+    year, month = base.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(base.day, calendar.monthrange(year, month)[1]))
+
+def _grant_days(grant_number: int) -> int:
+    return LEGAL_GRANT_DAYS[min(grant_number, len(LEGAL_GRANT_DAYS) - 1)]
+
+def legal_grant_date(join_date: date, grant_number: int) -> date:
+    """grant_number 回目（0始まり）の法定付与日"""
+    return _add_months(join_date, 6 + 12 * grant_number)
+
+def grant_number_on(join_date: date, as_of: date) -> Optional[int]:
+    """as_of 時点で迎えている直近の付与の回数（0始まり）。6か月未満なら None"""
+    months = (as_of.year - join_date.year) * 12 + as_of.month - join_date.month
+    if _add_months(join_date, months) > as_of:
+        months -= 1
+    if months < 6:
+        return None
+    return (months - 6) // 12
+
+def legal_leave_days(join_date: date, as_of: Optional[date] = None) -> int:
+    """as_of 時点の法定付与日数（6か月未満は0）"""
+    grant_number = grant_number_on(join_date, as_of or date.today())
+    if grant_number is None:
+        return 0
+    return _grant_days(grant_number)
+
+def _ungranted_dates(join_date: date, last_credited: Optional[date], as_of: date) -> List[Tuple[int, date]]:
+    """as_of 時点で迎えていて、前回の付与より後で、まだ有効な法定付与日 [(回数, 付与日)]（古い順）"""
+    grant_number = grant_number_on(join_date, as_of)
+    if grant_number is None:
+        return []
+    dates = []
+    for number in range(grant_number, -1, -1):
+        grant_date = legal_grant_date(join_date, number)
+        if _add_months(grant_date, GRANT_VALID_MONTHS) <= as_of:
+            break
+        if last_credited is not None and last_credited >= grant_date:
+            break
+        dates.append((number, grant_date))
+    return dates[::-1]
+
+def next_grant_date(join_date: date, last_credited: Optional[date], as_of: Optional[date] = None) -> date:
+    """次に付与する日
+
+    法定付与日を迎えていて、まだ有効なのに付与していない日があればその最も古い日、
+    そうでなければ次の法定付与日。
+    """
+    as_of = as_of or date.today()
+    ungranted = _ungranted_dates(join_date, last_credited, as_of)
+    if ungranted:
+        return ungranted[0][1]
+    grant_number = grant_number_on(join_date, as_of)
+    return legal_grant_date(join_date, 0 if grant_number is None else grant_number + 1)
+
+def due_grants(as_of: Optional[date] = None, employee_ids: Optional[Iterable[int]] = None) -> List[SimpleNamespace]:
+    """as_of 時点で付与日を迎えていて未付与の付与 [(employee_id, date_credited, days_credited)]
+
+    在籍中で入社日のある従業員と前回の付与日を1回の集計クエリで読み込む。
+    前回の付与（手動付与を含む）より後の法定付与日のうち、まだ有効なもの（従業員ごとに最大2件）が対象。
+    """
+    as_of = as_of or date.today()
+    query = db.session.query(
+        Employee.id, Employee.join_date, func.max(LeaveCredit.date_credited)
+    ).outerjoin(
+        LeaveCredit, LeaveCredit.employee_id == Employee.id
+    ).filter(
+        Employee.status == '在籍中', Employee.join_date.isnot(None)
+    )
+    if employee_ids is not None:
+        query = query.filter(Employee.id.in_(list(employee_ids)))
+
+    grants = []
+    for employee_id, join_date, last_credited in query.group_by(Employee.id, Employee.join_date).order_by(Employee.id):
+        for grant_number, grant_date in _ungranted_dates(join_date, last_credited, as_of):
+            grants.append(SimpleNamespace(
+                employee_id=employee_id,
+                date_credited=grant_date,
+                days_credited=_grant_days(grant_number),
+            ))
+    return grants
+
+def _begin_write_transaction():
+    """書き込みロックを取ってからトランザクションを始める（同時に実行された付与処理を直列化する）
+
+    SQLite は最初の書き込みまでロックを取らないため、そのままでは2つの実行が
+    どちらも付与前の状態を読んでしまう。BEGIN IMMEDIATE で先にロックを取り、
+    後から実行した側は先の付与がコミットされるまで待ってから判定する。
+    """
+    connection = db.session.connection()
+    if not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+
+def grant_due_leave(as_of: Optional[date] = None, employee_ids: Optional[Iterable[int]] = None) -> List[SimpleNamespace]:
+    """付与日を迎えた従業員の付与を1回の一括 INSERT でセッションに登録する（コミットは呼び出し側）"""
+    _begin_write_transaction()
+    grants = due_grants(as_of, employee_ids)
+    if grants:
+        db.session.execute(insert(LeaveCredit.__table__), [{
+            'employee_id': grant.employee_id,
+            'days_credited': grant.days_credited,
+            'date_credited': grant.date_credited,
+        } for grant in grants])
+    return grants
+
+def main():
+    args = sys.argv[1:]
+    dry_run = '--dry-run' in args
+    args = [arg for arg in args if arg != '--dry-run']
+
+    try:
+        if len(args) > 1:
+            raise ValueError
+        as_of = datetime.strptime(args[0], '%Y-%m-%d').date() if args else date.today()
+    except ValueError:
+        print("Usage: python leave_grants.py [--dry-run] [YYYY-MM-DD]")
+        sys.exit(1)
+
+    from app import app
+    with app.app_context():
+        try:
+            grants = due_grants(as_of) if dry_run else grant_due_leave(as_of)
+            if not dry_run:
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ 年次有給休暇の自動付与に失敗しました: {e}")
+            sys.exit(1)
+
+        for grant in grants:
+            print(f"   従業員ID {grant.employee_id}: {grant.date_credited} 付与 {grant.days_credited}日")
+        employee_count = len({grant.employee_id for grant in grants})
+        if dry_run:
+            print(f"💡 {as_of} 時点の付与対象は{employee_count}名・{len(grants)}件です（登録していません）")
+        else:
+            print(f"✅ {as_of} 時点で{employee_count}名の従業員に年次有給休暇を{len(grants)}件付与しました")
+
+
+if __name__ == "__main__":
+    main()
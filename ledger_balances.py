@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+総勘定元帳の月次残高
+勘定科目×年月の借方合計・貸方合計・月初残高・月末残高を general_ledger に保持する仕組み
+
+仕訳（JournalEntry / JournalEntryDetail）の登録・修正・削除をセッションの
+フラッシュ前に検出し、差分だけを general_ledger に反映する。
+どの画面・処理から仕訳を書き込んでも同じトランザクション内で更新されるため、
+残高の集計は仕訳明細全件ではなく 勘定科目数×月数 の行を読むだけで済む。
+
+残高は OpeningBalance と同じく借方プラス・貸方マイナスで、仕訳の累計
+（期首残高の入力分は含まない）。
+
+使い方:
+    python ledger_balances.py rebuild   # 仕訳から全件再作成
+    python ledger_balances.py verify    # 仕訳と突き合わせ
+"""
+
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Tuple
+
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased, attributes, contains_eager
+
+from cache_versions import LEDGER_VERSION, bump_version
+from date_ranges import in_date_range
+from models import db, AccountingAccount, GeneralLedger, JournalEntry, JournalEntryDetail, OpeningBalance
+
+ledger_table = GeneralLedger.__table__
+
+# 変更前の値を履歴に残す（期限切れの属性に代入しても差分を計算できるように）
+TRACKED_ATTRIBUTES = [
+    (JournalEntryDetail, ('account_id', 'debit_amount', 'credit_amount', 'journal_entry_id')),
+    (JournalEntry, ('entry_date',)),
+]
+for _model, _keys in TRACKED_ATTRIBUTES:
+    for _key in _keys:
+        event.listen(getattr(_model, _key), 'set', lambda *args: None, active_history=True)
+
+
+def _previous(obj, key):
+    """フラッシュ前（変更前）の属性値"""
+    history = attributes.get_history(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, key)
+
+
+def _entry_date(session, detail, previous: bool):
+    """明細が属する仕訳の日付（previous=True で変更前の仕訳・日付）"""
+    entry_id = _previous(detail, 'journal_entry_id') if previous else detail.journal_entry_id
+    entry = session.get(JournalEntry, entry_id) if entry_id else detail.journal_entry
+    if entry is None:
+        return None
+    return _previous(entry, 'entry_date') if previous else entry.entry_date
+
+
+def collect_ledger_deltas(session) -> Dict[Tuple[int, int, int], list]:
+    """フラッシュ対象の仕訳から (勘定科目ID, 年, 月) → [借方差分, 貸方差分] を集計する"""
+    deltas = defaultdict(lambda: [0, 0])
+
+    def add(account_id, entry_date, debit, credit, sign):
+        if account_id is None or entry_date is None:
+            return
+        delta = deltas[(account_id, entry_date.year, entry_date.month)]
+        delta[0] += sign * (debit or 0)
+        delta[1] += sign * (credit or 0)
+
+    def add_previous(detail):
+        add(_previous(detail, 'account_id'), _entry_date(session, detail, previous=True),
+            _previous(detail, 'debit_amount'), _previous(detail, 'credit_amount'), -1)
+
+    def add_current(detail):
+        add(detail.account_id, _entry_date(session, detail, previous=False),
+            detail.debit_amount, detail.credit_amount, 1)
+
+    handled_detail_ids = set()
+    for obj in session.new:
+        if isinstance(obj, JournalEntryDetail):
+            add_current(obj)
+    for obj in session.deleted:
+        if isinstance(obj, JournalEntryDetail):
+            add_previous(obj)
+            handled_detail_ids.add(obj.id)
+    for obj in session.dirty:
+        if isinstance(obj, JournalEntryDetail) and session.is_modified(obj):
+            add_previous(obj)
+            add_current(obj)
+            handled_detail_ids.add(obj.id)
+
+    # 仕訳日付の変更は、変更されていない明細も月を移す
+    for obj in session.dirty:
+        if not isinstance(obj, JournalEntry) or obj in session.deleted:
+            continue
+        previous_date = _previous(obj, 'entry_date')
+        if previous_date == obj.entry_date:
+            continue
+        for detail in session.query(JournalEntryDetail).filter(JournalEntryDetail.journal_entry_id == obj.id):
+            if detail.id in handled_detail_ids:
+                continue
+            add(detail.account_id, previous_date, detail.debit_amount, detail.credit_amount, -1)
+            add(detail.account_id, obj.entry_date, detail.debit_amount, detail.credit_amount, 1)
+
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def _after_month(year: int, month: int):
+    return or_(ledger_table.c.year > year, and_(ledger_table.c.year == year, ledger_table.c.month > month))
+
+
+def _before_month(year: int, month: int):
+    return or_(ledger_table.c.year < year, and_(ledger_table.c.year == year, ledger_table.c.month < month))
+
+
+def apply_ledger_deltas(connection, deltas: Dict[Tuple[int, int, int], list]):
+    """差分を general_ledger に反映する（当月の合計と、当月以降の残高を更新）"""
+    now = datetime.now()
+    for (account_id, year, month), (debit, credit) in sorted(deltas.items()):
+        net = debit - credit
+
+        # 行がない月は、直前の月末残高を月初残高にして作成
+        previous_closing = connection.execute(
+            select(ledger_table.c.closing_balance).where(
+                ledger_table.c.account_id == account_id,
+                _before_month(year, month)
+            ).order_by(ledger_table.c.year.desc(), ledger_table.c.month.desc()).limit(1)
+        ).scalar() or 0
+
+        stmt = sqlite_insert(ledger_table).values(
+            account_id=account_id, year=year, month=month,
+            opening_balance=previous_closing, debit_total=debit, credit_total=credit,
+            closing_balance=previous_closing + net, updated_at=now
+        )
+        connection.execute(stmt.on_conflict_do_update(
+            index_elements=['account_id', 'year', 'month'],
+            set_={
+                'debit_total': ledger_table.c.debit_total + debit,
+                'credit_total': ledger_table.c.credit_total + credit,
+                'closing_balance': ledger_table.c.closing_balance + net,
+                'updated_at': now,
+            }
+        ))
+
+        # 翌月以降の残高を繰り下げ
+        connection.execute(ledger_table.update().where(
+            ledger_table.c.account_id == account_id,
+            _after_month(year, month)
+        ).values(
+            opening_balance=ledger_table.c.opening_balance + net,
+            closing_balance=ledger_table.c.closing_balance + net,
+            updated_at=now
+        ))
+
+
+def _touches(session, models) -> bool:
+    """フラッシュ対象に指定モデルの追加・変更・削除が含まれるか"""
+    return any(isinstance(obj, models) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+@event.listens_for(db.session, 'before_flush')
+def _update_general_ledger(session, flush_context, instances):
+    """仕訳の変更を総勘定元帳の月次残高に反映する"""
+    with session.no_autoflush:
+        deltas = collect_ledger_deltas(session)
+        if deltas:
+            apply_ledger_deltas(session.connection(), deltas)
+        # 試算表などのキャッシュを無効化
+        if deltas or _touches(session, (OpeningBalance, AccountingAccount)):
+            bump_version(session.connection(), LEDGER_VERSION)
+        if not deltas:
+            return
+
+    # 読み込み済みの月次残高は再読込させる
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, GeneralLedger):
+            session.expire(obj)
+
+
+def aggregate_journal_months():
+    """仕訳明細から (勘定科目ID, 年, 月) → (借方合計, 貸方合計) を集計する"""
+    year = db.extract('year', JournalEntry.entry_date)
+    month = db.extract('month', JournalEntry.entry_date)
+    rows = db.session.query(
+        JournalEntryDetail.account_id, year, month,
+        func.coalesce(func.sum(JournalEntryDetail.debit_amount), 0),
+        func.coalesce(func.sum(JournalEntryDetail.credit_amount), 0)
+    ).join(JournalEntry, JournalEntryDetail.journal_entry_id == JournalEntry.id).group_by(
+        JournalEntryDetail.account_id, year, month
+    )
+    return {(account_id, int(y), int(m)): (debit, credit) for account_id, y, m, debit, credit in rows}
+
+
+def build_ledger_rows(monthly_totals) -> list:
+    """月次合計から月初・月末残高を含む general_ledger の行を作る"""
+    rows = []
+    closing_by_account = {}
+    now = datetime.now()
+    for (account_id, year, month), (debit, credit) in sorted(monthly_totals.items()):
+        opening = closing_by_account.get(account_id, 0)
+        closing = opening + debit - credit
+        closing_by_account[account_id] = closing
+        rows.append({
+            'account_id': account_id, 'year': year, 'month': month,
+            'opening_balance': opening, 'debit_total': debit, 'credit_total': credit,
+            'closing_balance': closing, 'updated_at': now,
+        })
+    return rows
+
+
+def rebuild_general_ledger() -> int:
+    """general_ledger を仕訳から全件作り直す（コミットは呼び出し側）"""
+    rows = build_ledger_rows(aggregate_journal_months())
+    db.session.execute(ledger_table.delete())
+    if rows:
+        db.session.execute(ledger_table.insert(), rows)
+    bump_version(db.session.connection(), LEDGER_VERSION)
+    db.session.expire_all()
+    return len(rows)
+
+
+def verify_general_ledger() -> list:
+    """保存済みの月次残高と仕訳からの再集計を比べ、食い違う行を返す"""
+    expected = {(row['account_id'], row['year'], row['month']): row
+                for row in build_ledger_rows(aggregate_journal_months())}
+    columns = ['opening_balance', 'debit_total', 'credit_total', 'closing_balance']
+
+    mismatches = []
+    stored_keys = set()
+    for ledger in GeneralLedger.query.order_by(GeneralLedger.account_id, GeneralLedger.year, GeneralLedger.month):
+        key = (ledger.account_id, ledger.year, ledger.month)
+        stored_keys.add(key)
+        row = expected.get(key)
+        actual = {column: getattr(ledger, column) or 0 for column in columns}
+        if row is None:
+            # 仕訳がすべて削除された月は合計ゼロで残る
+            if actual['debit_total'] or actual['credit_total']:
+                mismatches.append({'key': key, 'stored': actual, 'expected': None})
+            continue
+        if any(actual[column] != row[column] for column in columns):
+            mismatches.append({'key': key, 'stored': actual, 'expected': {column: row[column] for column in columns}})
+
+    for key in expected.keys() - stored_keys:
+        mismatches.append({'key': key, 'stored': None, 'expected': expected[key]})
+    return mismatches
+
+
+def ledger_totals(start: Tuple[int, int], end: Tuple[int, int], account_id: int = None) -> Dict[int, Tuple[int, int]]:
+    """期間（(年, 月) から (年, 月) まで）の勘定科目別 (借方合計, 貸方合計)"""
+    (start_year, start_month), (end_year, end_month) = start, end
+    rows = db.session.query(
+        GeneralLedger.account_id,
+        func.sum(GeneralLedger.debit_total),
+        func.sum(GeneralLedger.credit_total)
+    ).filter(
+        ~_before_month(start_year, start_month),
+        ~_after_month(end_year, end_month)
+    )
+    if account_id is not None:
+        rows = rows.filter(GeneralLedger.account_id == account_id)
+    rows = rows.group_by(GeneralLedger.account_id)
+    return {account_id: (debit or 0, credit or 0) for account_id, debit, credit in rows}
+
+
+def closing_balances(year: int, month: int) -> Dict[int, int]:
+    """指定月末時点の勘定科目別残高（借方プラス・貸方マイナス）"""
+    period = GeneralLedger.year * 100 + GeneralLedger.month
+    latest = db.session.query(
+        GeneralLedger.account_id, func.max(period).label('period')
+    ).filter(period <= year * 100 + month).group_by(GeneralLedger.account_id).subquery()
+
+    rows = db.session.query(GeneralLedger.account_id, GeneralLedger.closing_balance).join(
+        latest, and_(GeneralLedger.account_id == latest.c.account_id, period == latest.c.period)
+    )
+    return {account_id: closing or 0 for account_id, closing in rows}
+
+
+LEDGER_PAGE_SIZE = 100  # 元帳画面の1ページの明細数
+
+
+def _net_amount():
+    return func.coalesce(JournalEntryDetail.debit_amount, 0) - func.coalesce(JournalEntryDetail.credit_amount, 0)
+
+
+def _ledger_query(account_id: int, start_date, end_date, *columns):
+    """勘定科目の [start_date, end_date) の明細と相手科目名を (取引日, 明細ID) 順に返すクエリ
+
+    相手科目は同じ仕訳の他の明細のうち最初の科目（相関サブクエリで取得）。
+    """
+    opposite = aliased(JournalEntryDetail)
+    opposite_account_name = select(AccountingAccount.account_name).join(
+        opposite, opposite.account_id == AccountingAccount.id
+    ).where(
+        opposite.journal_entry_id == JournalEntryDetail.journal_entry_id,
+        opposite.id != JournalEntryDetail.id
+    ).order_by(opposite.id).limit(1).scalar_subquery()
+
+    return db.session.query(JournalEntryDetail, opposite_account_name, *columns).join(
+        JournalEntry, JournalEntryDetail.journal_entry_id == JournalEntry.id
+    ).options(contains_eager(JournalEntryDetail.journal_entry)).filter(
+        JournalEntryDetail.account_id == account_id,
+        in_date_range(JournalEntry.entry_date, start_date, end_date)
+    ).order_by(JournalEntry.entry_date, JournalEntryDetail.id)
+
+
+def ledger_lines(account_id: int, start_date, end_date, opening_balance: int = 0) -> list:
+    """勘定科目の [start_date, end_date) の元帳明細（相手科目名・差引残高つき）を1回のクエリで取得する
+
+    差引残高は opening_balance に借方−貸方を (取引日, 明細ID) 順に累計した値
+    （ウィンドウ関数で計算）。返す明細には opposite_account_name・running_balance を設定する。
+    """
+    cumulative = func.sum(_net_amount()).over(order_by=(JournalEntry.entry_date, JournalEntryDetail.id))
+
+    lines = []
+    for detail, opposite_name, running in _ledger_query(account_id, start_date, end_date, cumulative):
+        detail.opposite_account_name = opposite_name or '-'
+        detail.running_balance = opening_balance + (running or 0)
+        lines.append(detail)
+    return lines
+
+
+def parse_ledger_cursor(value):
+    """'YYYY-MM-DD:明細ID' 形式のカーソルを (取引日, 明細ID) にする（不正な値は None）"""
+    try:
+        date_text, detail_id = value.split(':')
+        return datetime.strptime(date_text, '%Y-%m-%d').date(), int(detail_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_ledger_cursor(detail) -> str:
+    """明細の位置を表すカーソル文字列"""
+    return f"{detail.journal_entry.entry_date.strftime('%Y-%m-%d')}:{detail.id}"
+
+
+def _after_cursor(cursor):
+    """(取引日, 明細ID) がカーソルより後の明細の条件式"""
+    entry_date, detail_id = cursor
+    return or_(JournalEntry.entry_date > entry_date,
+               and_(JournalEntry.entry_date == entry_date, JournalEntryDetail.id > detail_id))
+
+
+def balance_through(account_id: int, start_date, cursor, opening_balance: int = 0) -> int:
+    """期間開始からカーソルの明細までの差引残高
+
+    カーソルの前月までは general_ledger の月次合計を使い、明細を読むのは
+    カーソルの月の分だけにする（何ページ目でも読む行数は1か月分以内）。
+    """
+    cursor_date, _ = cursor
+    month_start = cursor_date.replace(day=1)
+    balance = opening_balance
+    partial_start = start_date
+
+    if start_date.day == 1 and month_start > start_date:
+        last_month = month_start - timedelta(days=1)
+        debit, credit = ledger_totals((start_date.year, start_date.month), (last_month.year, last_month.month),
+                                      account_id=account_id).get(account_id, (0, 0))
+        balance += debit - credit
+        partial_start = month_start
+
+    balance += db.session.query(func.coalesce(func.sum(_net_amount()), 0)).join(
+        JournalEntry, JournalEntryDetail.journal_entry_id == JournalEntry.id
+    ).filter(
+        JournalEntryDetail.account_id == account_id,
+        JournalEntry.entry_date >= partial_start,
+        ~_after_cursor(cursor)
+    ).scalar()
+    return balance
+
+
+def ledger_page(account_id: int, start_date, end_date, opening_balance: int = 0, cursor=None,
+                page_size: int = LEDGER_PAGE_SIZE):
+    """元帳明細の1ページ分を (取引日, 明細ID) のキーセットで取得する
+
+    戻り値は (明細リスト, ページ先頭の繰越残高, 次ページのカーソル or None)。
+    """
+    carried_balance = opening_balance
+    query = _ledger_query(account_id, start_date, end_date)
+    if cursor is not None:
+        carried_balance = balance_through(account_id, start_date, cursor, opening_balance)
+        query = query.filter(_after_cursor(cursor))
+
+    rows = query.limit(page_size + 1).all()
+
+    lines = []
+    running_balance = carried_balance
+    for detail, opposite_name in rows[:page_size]:
+        detail.opposite_account_name = opposite_name or '-'
+        running_balance += (detail.debit_amount or 0) - (detail.credit_amount or 0)
+        detail.running_balance = running_balance
+        lines.append(detail)
+
+    next_cursor = format_ledger_cursor(lines[-1]) if len(rows) > page_size else None
+    return lines, carried_balance, next_cursor
+
+
+def main():
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command not in ('rebuild', 'verify'):
+        print("Usage: python ledger_balances.py rebuild | verify")
+        sys.exit(1)
+
+    from app import app
+    with app.app_context():
+        if command == 'rebuild':
+            count = rebuild_general_ledger()
+            db.session.commit()
+            print(f"✅ 総勘定元帳の月次残高を{count}件作成しました")
+            return
+
+        mismatches = verify_general_ledger()
+        if not mismatches:
+            print("✅ 総勘定元帳の月次残高は仕訳と一致しています")
+            return
+        for mismatch in mismatches[:50]:
+            account_id, year, month = mismatch['key']
+            print(f"❌ 科目ID {account_id} {year}年{month}月: 保存値={mismatch['stored']} 再集計={mismatch['expected']}")
+        print(f"💡 {len(mismatches)}件の食い違いがあります。python ledger_balances.py rebuild で作り直してください。")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+バックグラウンドジョブのテーブルを追加するマイグレーション
+- background_job: 帳票・PDF作成ジョブの待ち行列と進捗・成果物
+"""
+
+import sqlite3
+import os
+
+def migrate_background_jobs():
+    """background_job テーブルを追加"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'background_job'")
+        if cursor.fetchone():
+            print("ℹ️  background_job は既に存在します")
+            conn.close()
+            return True
+
+        cursor.execute("""
+            CREATE TABLE background_job (
+                id INTEGER NOT NULL,
+                job_type VARCHAR(50) NOT NULL,
+                params_json TEXT,
+                status VARCHAR(20) NOT NULL,
+                progress INTEGER,
+                message VARCHAR(255),
+                attempts INTEGER,
+                max_attempts INTEGER,
+                error TEXT,
+                artifact_path VARCHAR(255),
+                artifact_name VARCHAR(255),
+                artifact_mimetype VARCHAR(100),
+                available_at DATETIME,
+                created_by INTEGER,
+                created_at DATETIME,
+                started_at DATETIME,
+                finished_at DATETIME,
+                PRIMARY KEY (id),
+                FOREIGN KEY(created_by) REFERENCES user (id)
+            )
+        """)
+        cursor.execute("CREATE INDEX ix_background_job_status ON background_job (status)")
+        print("✅ 追加: background_job")
+
+        conn.commit()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 バックグラウンドジョブのマイグレーションを開始...")
+    success = migrate_background_jobs()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
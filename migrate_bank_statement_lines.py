@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+銀行・クレジットカード明細の取込テーブルを追加するマイグレーション
+- bank_statement_line: 取込んだ明細行（重複取込の防止・未照合行の確認待ち）
+"""
+
+import sqlite3
+import os
+
+def migrate_bank_statement_lines():
+    """bank_statement_line テーブルを追加"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'bank_statement_line'")
+        if cursor.fetchone():
+            print("ℹ️  bank_statement_line は既に存在します")
+            conn.close()
+            return True
+
+        cursor.execute("""
+            CREATE TABLE bank_statement_line (
+                id INTEGER NOT NULL,
+                fingerprint VARCHAR(64) NOT NULL,
+                cash_account_id INTEGER NOT NULL,
+                transaction_date DATE NOT NULL,
+                description VARCHAR(255) NOT NULL,
+                amount INTEGER NOT NULL,
+                direction VARCHAR(20) NOT NULL,
+                pattern_id INTEGER,
+                partner_id INTEGER,
+                status VARCHAR(20) NOT NULL,
+                journal_entry_id INTEGER,
+                source_filename VARCHAR(255),
+                created_by INTEGER,
+                created_at DATETIME,
+                PRIMARY KEY (id),
+                UNIQUE (fingerprint),
+                FOREIGN KEY(cash_account_id) REFERENCES accounting_account (id),
+                FOREIGN KEY(pattern_id) REFERENCES transaction_pattern (id),
+                FOREIGN KEY(partner_id) REFERENCES business_partner (id),
+                FOREIGN KEY(journal_entry_id) REFERENCES journal_entry (id),
+                FOREIGN KEY(created_by) REFERENCES user (id)
+            )
+        """)
+        cursor.execute("CREATE INDEX ix_bank_statement_line_status ON bank_statement_line (status)")
+        print("✅ 追加: bank_statement_line")
+
+        conn.commit()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 明細取込テーブルのマイグレーションを開始...")
+    success = migrate_bank_statement_lines()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+キャッシュの世代番号テーブルを追加するマイグレーション
+- cache_version: 名前ごとの世代番号（試算表キャッシュの無効化に使用）
+"""
+
+import sqlite3
+import os
+
+def migrate_cache_versions():
+    """cache_version テーブルを追加"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'cache_version'")
+        if cursor.fetchone():
+            print("ℹ️  cache_version は既に存在します")
+            conn.close()
+            return True
+
+        cursor.execute("""
+            CREATE TABLE cache_version (
+                name VARCHAR(50) NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at DATETIME,
+                PRIMARY KEY (name)
+            )
+        """)
+        print("✅ 追加: cache_version")
+
+        conn.commit()
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 キャッシュ世代番号のマイグレーションを開始...")
+    success = migrate_cache_versions()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+期間検索用インデックスを追加するマイグレーション
+- working_time_record: (employee_id, work_date) の一意インデックス
+- journal_entry: entry_date のインデックス
+- company_calendar: event_date のインデックス
+"""
+
+import sqlite3
+import os
+
+INDEXES = [
+    ('uq_working_time_record_employee_date',
+     'CREATE UNIQUE INDEX IF NOT EXISTS uq_working_time_record_employee_date '
+     'ON working_time_record (employee_id, work_date)'),
+    ('ix_journal_entry_entry_date',
+     'CREATE INDEX IF NOT EXISTS ix_journal_entry_entry_date ON journal_entry (entry_date)'),
+    ('ix_company_calendar_event_date',
+     'CREATE INDEX IF NOT EXISTS ix_company_calendar_event_date ON company_calendar (event_date)'),
+]
+
+def migrate_date_indexes():
+    """期間検索用インデックスを追加"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        # 一意インデックスの作成前に重複した勤怠データを確認
+        cursor.execute("""
+            SELECT employee_id, work_date, COUNT(*)
+            FROM working_time_record
+            GROUP BY employee_id, work_date
+            HAVING COUNT(*) > 1
+        """)
+        duplicates = cursor.fetchall()
+        if duplicates:
+            print(f"❌ 同一従業員・同一日の勤怠データが {len(duplicates)} 件重複しています")
+            for employee_id, work_date, count in duplicates[:20]:
+                print(f"   従業員ID {employee_id} / {work_date}: {count}件")
+            print("💡 重複を解消してから再実行してください。")
+            conn.close()
+            return False
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+
+        for index_name, sql in INDEXES:
+            if index_name in existing_indexes:
+                print(f"ℹ️  {index_name} は既に存在します")
+                continue
+            cursor.execute(sql)
+            print(f"✅ 追加: {index_name}")
+
+        conn.commit()
+        conn.close()
+
+        print("✅ インデックスのマイグレーションが完了しました")
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 期間検索用インデックスのマイグレーションを開始...")
+    success = migrate_date_indexes()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
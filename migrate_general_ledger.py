@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+総勘定元帳の月次残高を増分更新するためのマイグレーション
+- general_ledger: (account_id, year, month) の一意インデックス
+- journal_entry_detail: journal_entry_id・account_id のインデックス（元帳の相手科目検索用）
+作成後、python ledger_balances.py rebuild で既存の仕訳から月次残高を作成する
+"""
+
+import sqlite3
+import os
+
+INDEX_NAME = 'uq_general_ledger_account_month'
+INDEX_SQL = ('CREATE UNIQUE INDEX IF NOT EXISTS uq_general_ledger_account_month '
+             'ON general_ledger (account_id, year, month)')
+
+DETAIL_INDEXES = [
+    ('ix_journal_entry_detail_journal_entry_id',
+     'CREATE INDEX IF NOT EXISTS ix_journal_entry_detail_journal_entry_id ON journal_entry_detail (journal_entry_id)'),
+    ('ix_journal_entry_detail_account_id',
+     'CREATE INDEX IF NOT EXISTS ix_journal_entry_detail_account_id ON journal_entry_detail (account_id)'),
+]
+
+def migrate_general_ledger():
+    """総勘定元帳・仕訳明細のインデックスを追加"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        conn = sqlite3.connect(db_path)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        existing_indexes = {row[0] for row in cursor.fetchall()}
+
+        for index_name, sql in DETAIL_INDEXES:
+            if index_name in existing_indexes:
+                print(f"ℹ️  {index_name} は既に存在します")
+                continue
+            cursor.execute(sql)
+            print(f"✅ 追加: {index_name}")
+
+        if INDEX_NAME in existing_indexes:
+            print(f"ℹ️  {INDEX_NAME} は既に存在します")
+            conn.commit()
+            conn.close()
+            return True
+
+        # 月次残高は仕訳から作り直すため、既存の行（重複を含む）は削除する
+        cursor.execute("SELECT COUNT(*) FROM general_ledger")
+        existing_rows = cursor.fetchone()[0]
+        if existing_rows:
+            cursor.execute("DELETE FROM general_ledger")
+            print(f"🗑️  既存の月次残高 {existing_rows} 件を削除しました")
+
+        cursor.execute(INDEX_SQL)
+        print(f"✅ 追加: {INDEX_NAME}")
+
+        conn.commit()
+        conn.close()
+
+        print("💡 python ledger_balances.py rebuild で仕訳から月次残高を作成してください。")
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 総勘定元帳のマイグレーションを開始...")
+    success = migrate_general_ledger()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
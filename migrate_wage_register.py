@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+賃金台帳を月ごとの行に作り替えるマイグレーション
+- wage_register: 従業員・年ごとに項目別の JSON（{"月": 金額}）を持つ形から、
+  従業員・年・月ごとに1行で各項目を数値の列として持つ形へ変換する
+"""
+
+import sqlite3
+import os
+import json
+from datetime import datetime
+
+# 旧テーブルの JSON 列 → 新テーブルの列
+ITEM_COLUMNS = [
+    'base_salary', 'overtime_allowance', 'holiday_allowance', 'night_allowance',
+    'position_allowance', 'transportation_allowance', 'housing_allowance', 'family_allowance',
+    'other_allowances',
+    'health_insurance', 'pension_insurance', 'employment_insurance', 'income_tax',
+    'resident_tax', 'other_deductions',
+    'gross_salary', 'total_deductions', 'net_salary',
+    'working_days', 'overtime_hours', 'paid_leave_days', 'absence_days'
+]
+FLOAT_COLUMNS = {'overtime_hours', 'paid_leave_days', 'absence_days'}
+
+def parse_monthly(value):
+    """旧形式の JSON 列を {月: 値} にする（壊れた値は空として扱う）"""
+    try:
+        data = json.loads(value or '{}')
+    except (json.JSONDecodeError, TypeError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return {int(month): amount for month, amount in data.items() if str(month).isdigit()}
+
+def migrate_wage_register():
+    """wage_register を月ごとの行に変換"""
+    db_path = 'instance/employees.db'
+
+    if not os.path.exists(db_path):
+        print(f"❌ データベースファイルが見つかりません: {db_path}")
+        return False
+
+    try:
+        # テーブルの作り直し（DDL）も含めて1つのトランザクションで行う
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        cursor = conn.cursor()
+
+        cursor.execute("PRAGMA table_info(wage_register)")
+        columns = [row[1] for row in cursor.fetchall()]
+        if 'month' in columns:
+            print("ℹ️  wage_register は既に月ごとの行です")
+            conn.close()
+            return True
+
+        cursor.execute("BEGIN")
+        old_rows = []
+        if columns:
+            cursor.execute(f"""
+                SELECT employee_id, year, created_at, updated_at, created_by,
+                       {', '.join('monthly_' + column for column in ITEM_COLUMNS)}
+                FROM wage_register
+            """)
+            old_rows = cursor.fetchall()
+            cursor.execute("DROP TABLE wage_register")
+
+        item_definitions = ',\n'.join(
+            f"                {column} {'FLOAT' if column in FLOAT_COLUMNS else 'INTEGER'} NOT NULL DEFAULT 0"
+            for column in ITEM_COLUMNS
+        )
+        cursor.execute(f"""
+            CREATE TABLE wage_register (
+                id INTEGER NOT NULL,
+                employee_id INTEGER NOT NULL,
+                year INTEGER NOT NULL,
+                month INTEGER NOT NULL,
+{item_definitions},
+                created_at DATETIME NOT NULL,
+                updated_at DATETIME NOT NULL,
+                created_by INTEGER,
+                PRIMARY KEY (id),
+                CONSTRAINT uq_wage_register_employee_month UNIQUE (employee_id, year, month),
+                FOREIGN KEY(employee_id) REFERENCES employee (id),
+                FOREIGN KEY(created_by) REFERENCES user (id)
+            )
+        """)
+        cursor.execute("CREATE INDEX ix_wage_register_year_month ON wage_register (year, month)")
+
+        # 旧形式の1行（従業員・年）を、値のある月ごとの行に展開する
+        now = datetime.now()
+        new_rows = []
+        for employee_id, year, created_at, updated_at, created_by, *monthly_values in old_rows:
+            monthly = [parse_monthly(value) for value in monthly_values]
+            for month in sorted(set().union(*monthly)):
+                if not 1 <= month <= 12:
+                    continue
+                values = [data.get(month) or 0 for data in monthly]
+                new_rows.append((employee_id, year, month, *values,
+                                 created_at or now, updated_at or now, created_by))
+
+        cursor.executemany(f"""
+            INSERT INTO wage_register (employee_id, year, month, {', '.join(ITEM_COLUMNS)},
+                                       created_at, updated_at, created_by)
+            VALUES ({', '.join('?' * (len(ITEM_COLUMNS) + 6))})
+        """, new_rows)
+        print(f"✅ 変換: wage_register（{len(old_rows)}件 → 月ごと{len(new_rows)}行）")
+
+        cursor.execute("COMMIT")
+        conn.close()
+        return True
+
+    except Exception as e:
+        print(f"❌ マイグレーション中にエラーが発生しました: {e}")
+        if 'conn' in locals():
+            if conn.in_transaction:
+                conn.rollback()
+            conn.close()
+        return False
+
+if __name__ == '__main__':
+    print("🚀 賃金台帳のマイグレーションを開始...")
+    success = migrate_wage_register()
+
+    if success:
+        print("🎉 マイグレーションが正常に完了しました！")
+    else:
+        print("💔 マイグレーションに失敗しました。")
+        exit(1)
@@ -262,7 +262,7 @@ class Agreement36History(db.Model):
 class CompanyCalendar(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)  # イベント・休日名
-    event_date = db.Column(db.Date, nullable=False)  # 日付
+    event_date = db.Column(db.Date, nullable=False, index=True)  # 日付
     event_type = db.Column(db.String(20), nullable=False)  # 'holiday' or 'event'
     description = db.Column(db.Text, nullable=True)  # 詳細説明
     is_recurring = db.Column(db.Boolean, default=False)  # 毎年繰り返しか
@@ -383,6 +383,9 @@ class WorkingTimeRecord(db.Model):
     
     # リレーション
     employee = db.relationship('Employee', backref='working_time_records')
+    
+    # 従業員・勤務日で一意（期間検索にも使用）
+    __table_args__ = (db.UniqueConstraint('employee_id', 'work_date', name='uq_working_time_record_employee_date'),)
 
 # 給与計算データモデル
 class PayrollCalculation(db.Model):
@@ -445,58 +448,58 @@ class PayrollCalculation(db.Model):
 
 # 賃金台帳モデル（年間給与データ集約）
 class WageRegister(db.Model):
+    """賃金台帳（従業員・年・月ごとに1行）"""
     __tablename__ = 'wage_register'
+    __table_args__ = (
+        db.UniqueConstraint('employee_id', 'year', 'month', name='uq_wage_register_employee_month'),
+        db.Index('ix_wage_register_year_month', 'year', 'month'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     employee_id = db.Column(db.Integer, db.ForeignKey('employee.id'), nullable=False)
     year = db.Column(db.Integer, nullable=False)
+    month = db.Column(db.Integer, nullable=False)
     
-    # 12ヶ月分の基本給与データ（JSON形式で効率保存）
-    monthly_base_salary = db.Column(db.Text)  # {"1": 250000, "2": 250000, ...}
-    monthly_overtime_allowance = db.Column(db.Text)
-    monthly_holiday_allowance = db.Column(db.Text)
-    monthly_night_allowance = db.Column(db.Text)
-    monthly_position_allowance = db.Column(db.Text)
-    monthly_transportation_allowance = db.Column(db.Text)
-    monthly_housing_allowance = db.Column(db.Text)
-    monthly_family_allowance = db.Column(db.Text)
-    monthly_other_allowances = db.Column(db.Text)
+    # 支給項目
+    base_salary = db.Column(db.Integer, nullable=False, default=0)
+    overtime_allowance = db.Column(db.Integer, nullable=False, default=0)
+    holiday_allowance = db.Column(db.Integer, nullable=False, default=0)
+    night_allowance = db.Column(db.Integer, nullable=False, default=0)
+    position_allowance = db.Column(db.Integer, nullable=False, default=0)
+    transportation_allowance = db.Column(db.Integer, nullable=False, default=0)
+    housing_allowance = db.Column(db.Integer, nullable=False, default=0)
+    family_allowance = db.Column(db.Integer, nullable=False, default=0)
+    other_allowances = db.Column(db.Integer, nullable=False, default=0)
     
     # 控除項目
-    monthly_health_insurance = db.Column(db.Text)
-    monthly_pension_insurance = db.Column(db.Text)
-    monthly_employment_insurance = db.Column(db.Text)
-    monthly_income_tax = db.Column(db.Text)
-    monthly_resident_tax = db.Column(db.Text)
-    monthly_other_deductions = db.Column(db.Text)
+    health_insurance = db.Column(db.Integer, nullable=False, default=0)
+    pension_insurance = db.Column(db.Integer, nullable=False, default=0)
+    employment_insurance = db.Column(db.Integer, nullable=False, default=0)
+    income_tax = db.Column(db.Integer, nullable=False, default=0)
+    resident_tax = db.Column(db.Integer, nullable=False, default=0)
+    other_deductions = db.Column(db.Integer, nullable=False, default=0)
     
     # 支給・控除合計
-    monthly_gross_salary = db.Column(db.Text)
-    monthly_total_deductions = db.Column(db.Text)
-    monthly_net_salary = db.Column(db.Text)
+    gross_salary = db.Column(db.Integer, nullable=False, default=0)
+    total_deductions = db.Column(db.Integer, nullable=False, default=0)
+    net_salary = db.Column(db.Integer, nullable=False, default=0)
     
     # 労働時間データ
-    monthly_working_days = db.Column(db.Text)
-    monthly_overtime_hours = db.Column(db.Text)
-    monthly_paid_leave_days = db.Column(db.Text)
-    monthly_absence_days = db.Column(db.Text)
-    
-    # 年間合計（計算済み）
-    annual_gross_salary = db.Column(db.Integer, default=0)
-    annual_total_deductions = db.Column(db.Integer, default=0)
-    annual_net_salary = db.Column(db.Integer, default=0)
-    annual_overtime_hours = db.Column(db.Float, default=0.0)
+    working_days = db.Column(db.Integer, nullable=False, default=0)
+    overtime_hours = db.Column(db.Float, nullable=False, default=0.0)
+    paid_leave_days = db.Column(db.Float, nullable=False, default=0.0)
+    absence_days = db.Column(db.Float, nullable=False, default=0.0)
     
     # メタデータ
-    created_at = db.Column(db.DateTime, nullable=False)
-    updated_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     
     # リレーション
     employee = db.relationship('Employee', backref='wage_registers')
     
     def __repr__(self):
-        return f'<WageRegister {self.employee_id}-{self.year}>'
+        return f'<WageRegister {self.employee_id}-{self.year}-{self.month}>'
 
 # 給与明細書モデル（詳細版）
 class PayrollSlip(db.Model):
@@ -633,7 +636,7 @@ class AccountingAccount(db.Model):
 # 仕訳帳
 class JournalEntry(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    entry_date = db.Column(db.Date, nullable=False)  # 取引日
+    entry_date = db.Column(db.Date, nullable=False, index=True)  # 取引日
     description = db.Column(db.String(255), nullable=False)  # 摘要
     reference_number = db.Column(db.String(50), nullable=True)  # 伝票番号
     total_amount = db.Column(db.Integer, nullable=False)  # 合計金額
@@ -648,8 +651,8 @@ class JournalEntry(db.Model):
 # 仕訳明細
 class JournalEntryDetail(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    journal_entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False)
-    account_id = db.Column(db.Integer, db.ForeignKey('accounting_account.id'), nullable=False)
+    journal_entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False, index=True)
+    account_id = db.Column(db.Integer, db.ForeignKey('accounting_account.id'), nullable=False, index=True)
     debit_amount = db.Column(db.Integer, default=0)  # 借方金額
     credit_amount = db.Column(db.Integer, default=0)  # 貸方金額
     description = db.Column(db.String(255), nullable=True)  # 摘要
@@ -670,9 +673,18 @@ class GeneralLedger(db.Model):
     closing_balance = db.Column(db.Integer, default=0)  # 期末残高
     updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
     
+    # 仕訳の登録・修正・削除時に ledger_balances が勘定科目×年月ごとに1行を更新する
+    __table_args__ = (db.UniqueConstraint('account_id', 'year', 'month', name='uq_general_ledger_account_month'),)
+    
     # リレーション
     account = db.relationship('AccountingAccount', backref='ledger_entries')
 
+# キャッシュの世代番号（書き込みのたびに増やし、各プロセスのキャッシュを無効化する）
+class CacheVersion(db.Model):
+    name = db.Column(db.String(50), primary_key=True)  # 例: ledger（仕訳・期首残高・勘定科目）
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+
 # 簡単仕訳入力用の取引パターンマスター
 class TransactionPattern(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -710,6 +722,29 @@ class BusinessPartner(db.Model):
     def __repr__(self):
         return f'<BusinessPartner {self.partner_name}>'
 
+# 銀行・クレジットカード明細の取込行（未照合の行は確認待ちとして残す）
+class BankStatementLine(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), unique=True, nullable=False)  # 重複取込防止用のハッシュ
+    cash_account_id = db.Column(db.Integer, db.ForeignKey('accounting_account.id'), nullable=False)  # 明細の口座（預金・未払金など）
+    transaction_date = db.Column(db.Date, nullable=False)  # 取引日
+    description = db.Column(db.String(255), nullable=False)  # 明細の摘要
+    amount = db.Column(db.Integer, nullable=False)  # 金額（正の数）
+    direction = db.Column(db.String(20), nullable=False)  # 入金、出金
+    pattern_id = db.Column(db.Integer, db.ForeignKey('transaction_pattern.id'), nullable=True)  # 照合した取引パターン
+    partner_id = db.Column(db.Integer, db.ForeignKey('business_partner.id'), nullable=True)  # 照合した取引先
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending（確認待ち）, imported, skipped
+    journal_entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=True)  # 作成した仕訳
+    source_filename = db.Column(db.String(255), nullable=True)  # 取込ファイル名
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    
+    # リレーション
+    cash_account = db.relationship('AccountingAccount')
+    pattern = db.relationship('TransactionPattern')
+    partner = db.relationship('BusinessPartner')
+    journal_entry = db.relationship('JournalEntry')
+
 # 会計年度設定・繰越管理
 class AccountingPeriod(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -741,4 +776,24 @@ class OpeningBalance(db.Model):
     __table_args__ = (db.UniqueConstraint('fiscal_year', 'account_id', name='unique_fiscal_year_account'),)
     
     def __repr__(self):
-        return f'<OpeningBalance {self.fiscal_year}年度 {self.account.account_name if self.account else "Unknown"}>'
\ No newline at end of file
+        return f'<OpeningBalance {self.fiscal_year}年度 {self.account.account_name if self.account else "Unknown"}>'
+
+# バックグラウンドジョブ（帳票・PDFの非同期作成）
+class BackgroundJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(50), nullable=False)  # ジョブ種別
+    params_json = db.Column(db.Text, nullable=True)  # 実行パラメータ（JSON）
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, default=0)  # 進捗（0〜100）
+    message = db.Column(db.String(255), nullable=True)  # 進捗メッセージ
+    attempts = db.Column(db.Integer, default=0)  # 実行回数
+    max_attempts = db.Column(db.Integer, default=3)  # 最大実行回数
+    error = db.Column(db.Text, nullable=True)  # 最後のエラー内容
+    artifact_path = db.Column(db.String(255), nullable=True)  # 成果物ファイルパス
+    artifact_name = db.Column(db.String(255), nullable=True)  # ダウンロード時のファイル名
+    artifact_mimetype = db.Column(db.String(100), nullable=True)  # 成果物の MIME タイプ
+    available_at = db.Column(db.DateTime, default=datetime.now)  # 実行可能日時（再試行の待機に使用）
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.now)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
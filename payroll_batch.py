@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+月次給与一括計算エンジン
+月締め時に対象従業員全員の給与を一括で計算する機能
+
+給与設定・勤怠データ・法定休日設定を少数の集合クエリで先読みし、
+計算はメモリ上で行い、結果は賃金台帳の更新とあわせて単一トランザクションで保存する。
+
+使い方:
+    python payroll_batch.py <年> <月> [従業員ID ...]
+"""
+
+import sys
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from date_ranges import month_date_range
+from models import (db, Employee, EmployeePayrollSettings, WorkingTimeRecord,
+                    PayrollCalculation, PayrollSlip, LegalHolidaySettings)
+from payroll_kernel import compute_payroll_roll, rows_to_columns, columns_to_rows
+from wage_register_manager import WageRegisterManager, register_values
+from weekly_overtime import reclassify_weekly_overtime
+
+
+def summarize_month_records(records: List, week_start_day: int) -> Dict:
+    """1ヶ月分の勤怠レコードを集計する（週40時間制の再分類を含む）
+
+    Args:
+        records: 対象月の WorkingTimeRecord 一覧
+        week_start_day: 週起算日（0=月曜日、6=日曜日）
+
+    Returns:
+        dict: 区分別労働時間（分）と休暇日数
+    """
+    paid_leave_days = 0
+    special_leave_days = 0
+    absence_days = 0
+    company_closure_days = 0
+
+    # 週40時間制チェック用
+    weekly_data = {}  # {week_start_date: {'total_minutes': int, 'records': [record, ...]}}
+
+    for record in records:
+        if record.is_paid_leave:
+            paid_leave_days += 1
+        elif record.is_special_leave:
+            special_leave_days += 1
+        elif record.is_absence:
+            absence_days += 1
+        elif record.is_company_closure:
+            company_closure_days += 1
+        else:
+            daily_total = ((record.regular_working_minutes or 0) + (record.legal_overtime_minutes or 0) +
+                           (record.overtime_minutes or 0) + (record.legal_holiday_minutes or 0) +
+                           (record.holiday_minutes or 0))
+
+            # 週の開始日を計算
+            work_date = record.work_date
+            days_from_week_start = (work_date.weekday() - week_start_day) % 7
+            week_start = work_date - timedelta(days=days_from_week_start)
+
+            if week_start not in weekly_data:
+                weekly_data[week_start] = {'total_minutes': 0, 'records': []}
+            weekly_data[week_start]['total_minutes'] += daily_total
+            weekly_data[week_start]['records'].append(record)
+
+    # 週40時間制の適用
+    changed_records = reclassify_weekly_overtime(weekly_data)
+
+    # 週40時間ルール適用後の労働時間を集計
+    totals = {
+        'regular_working_minutes': 0,
+        'legal_overtime_minutes': 0,
+        'overtime_minutes': 0,
+        'legal_holiday_minutes': 0,
+        'holiday_minutes': 0,
+        'night_working_minutes': 0,
+    }
+    for record in records:
+        for key in totals:
+            totals[key] += getattr(record, key) or 0
+
+    totals.update({
+        'paid_leave_days': paid_leave_days,
+        'special_leave_days': special_leave_days,
+        'absence_days': absence_days,
+        'company_closure_days': company_closure_days,
+        # 日給制の出勤日数
+        'daily_wage_working_days': len([r for r in records if (r.regular_working_minutes or 0) > 0 or
+                                        (r.legal_overtime_minutes or 0) > 0 or (r.overtime_minutes or 0) > 0]),
+        # 賃金台帳用の出勤日数
+        'working_days': len([r for r in records if (r.regular_working_minutes or 0) > 0 or
+                             (r.overtime_minutes or 0) > 0]),
+        'changed_records': changed_records,
+    })
+    return totals
+
+
+def build_payroll_input_row(employee, payroll_settings, totals: Dict) -> Dict:
+    """従業員・給与設定・勤怠集計から給与計算カーネルの入力行を作る"""
+    # 月給制の深夜手当・時給制の休業補償は標準労働時間から算出する
+    if employee.wage_type not in ('hourly', 'daily') and (
+            employee.standard_working_hours is None or employee.standard_working_days is None):
+        raise ValueError("1日標準労働時間・週標準労働日数が設定されていません")
+    if (employee.wage_type == 'hourly' and totals['company_closure_days'] > 0
+            and employee.standard_working_hours is None):
+        raise ValueError("1日標準労働時間が設定されていません")
+
+    return {
+        'wage_type': payroll_settings.wage_type,
+        'employee_wage_type': employee.wage_type,
+        'base_salary': payroll_settings.base_salary,
+        'hourly_rate': payroll_settings.hourly_rate,
+        'daily_rate': payroll_settings.daily_rate,
+        'standard_working_hours': employee.standard_working_hours,
+        'standard_working_days': employee.standard_working_days,
+        'regular_working_minutes': totals['regular_working_minutes'],
+        'legal_overtime_minutes': totals['legal_overtime_minutes'],
+        'overtime_minutes': totals['overtime_minutes'],
+        'legal_holiday_minutes': totals['legal_holiday_minutes'],
+        'holiday_minutes': totals['holiday_minutes'],
+        'night_working_minutes': totals['night_working_minutes'],
+        'daily_wage_working_days': totals['daily_wage_working_days'],
+        'absence_days': totals['absence_days'],
+        'company_closure_days': totals['company_closure_days'],
+    }
+
+
+class PayrollBatchEngine:
+    """月次給与一括計算エンジン"""
+
+    def __init__(self, year: int, month: int, calculated_by: Optional[int] = None):
+        self.year = year
+        self.month = month
+        self.calculated_by = calculated_by
+
+    def run(self, employee_ids: Optional[List[int]] = None) -> Dict:
+        """対象従業員の給与を一括計算して保存する
+
+        Args:
+            employee_ids: 対象従業員ID（省略時は在籍中の全従業員）
+
+        Returns:
+            dict: 'payrolls'（従業員ID→PayrollCalculation）、'errors'（従業員別エラー）
+        """
+        year, month = self.year, self.month
+        month_start, next_month_start = month_date_range(year, month)
+
+        # 従業員を一括取得
+        employee_query = Employee.query
+        if employee_ids is None:
+            employee_query = employee_query.filter(Employee.status == '在籍中')
+        else:
+            employee_query = employee_query.filter(Employee.id.in_(employee_ids))
+        employees = employee_query.order_by(Employee.id).all()
+
+        errors = []
+        if employee_ids is not None:
+            found_ids = {employee.id for employee in employees}
+            for employee_id in employee_ids:
+                if employee_id not in found_ids:
+                    errors.append({'employee_id': employee_id, 'employee_name': None,
+                                   'error': '従業員が見つかりません'})
+
+        target_ids = [employee.id for employee in employees]
+        if not target_ids:
+            return {'payrolls': {}, 'errors': errors}
+
+        # 給与設定を一括取得（従業員ごとに最新の有効な設定を採用）
+        settings_by_employee = {}
+        settings_rows = EmployeePayrollSettings.query.filter(
+            EmployeePayrollSettings.employee_id.in_(target_ids),
+            EmployeePayrollSettings.effective_from <= month_start
+        ).filter(
+            db.or_(
+                EmployeePayrollSettings.effective_until.is_(None),
+                EmployeePayrollSettings.effective_until >= month_start
+            )
+        ).order_by(EmployeePayrollSettings.effective_from.desc()).all()
+        for settings in settings_rows:
+            settings_by_employee.setdefault(settings.employee_id, settings)
+
+        # 勤怠データを一括取得
+        records_by_employee = {}
+        records = WorkingTimeRecord.query.filter(
+            WorkingTimeRecord.employee_id.in_(target_ids),
+            WorkingTimeRecord.work_date >= month_start,
+            WorkingTimeRecord.work_date < next_month_start
+        ).all()
+        for record in records:
+            records_by_employee.setdefault(record.employee_id, []).append(record)
+
+        # 法定休日設定から週起算日を取得
+        holiday_settings = LegalHolidaySettings.query.first()
+        week_start_day = 6  # デフォルトは日曜日（0=月曜日、6=日曜日）
+        if holiday_settings and holiday_settings.week_start_day is not None:
+            week_start_day = holiday_settings.week_start_day
+
+        # メモリ上で全従業員分の勤怠を集計
+        computed = []
+        with db.session.no_autoflush:
+            for employee in employees:
+                employee_records = records_by_employee.get(employee.id, [])
+                try:
+                    payroll_settings = settings_by_employee.get(employee.id)
+                    if not payroll_settings:
+                        raise ValueError("有効な給与設定が見つかりません。先に給与設定を登録してください。")
+
+                    totals = summarize_month_records(employee_records, week_start_day)
+                    input_row = build_payroll_input_row(employee, payroll_settings, totals)
+                    computed.append((employee, payroll_settings, totals, input_row))
+                except Exception as e:
+                    # 再分類途中の変更を破棄
+                    for record in employee_records:
+                        db.session.expire(record)
+                    errors.append({'employee_id': employee.id, 'employee_name': employee.name,
+                                   'error': str(e)})
+
+        # 給与額は全従業員分を列単位でまとめて計算
+        roll = compute_payroll_roll(rows_to_columns([row for _, _, _, row in computed]), year)
+        computed = [(employee, payroll_settings, totals, amounts) for (employee, payroll_settings, totals, _), amounts
+                    in zip(computed, columns_to_rows(roll))]
+
+        computed_ids = [employee.id for employee, _, _, _ in computed]
+        payrolls = {}
+
+        try:
+            if computed_ids:
+                # 既存の計算結果と関連する給与明細書を一括削除
+                existing_ids = [row.id for row in db.session.query(PayrollCalculation.id).filter(
+                    PayrollCalculation.employee_id.in_(computed_ids),
+                    PayrollCalculation.year == year,
+                    PayrollCalculation.month == month
+                )]
+                if existing_ids:
+                    PayrollSlip.query.filter(
+                        PayrollSlip.payroll_calculation_id.in_(existing_ids)
+                    ).delete(synchronize_session=False)
+                    PayrollCalculation.query.filter(
+                        PayrollCalculation.id.in_(existing_ids)
+                    ).delete(synchronize_session=False)
+
+            for employee, payroll_settings, totals, amounts in computed:
+                payroll = PayrollCalculation(
+                    employee_id=employee.id,
+                    year=year,
+                    month=month,
+                    wage_type=amounts['wage_type'],
+                    base_salary=amounts['base_salary'],
+                    regular_working_minutes=totals['regular_working_minutes'],
+                    legal_overtime_minutes=totals['legal_overtime_minutes'],
+                    overtime_minutes=totals['overtime_minutes'],
+                    legal_holiday_minutes=totals['legal_holiday_minutes'],
+                    holiday_minutes=totals['holiday_minutes'],
+                    night_working_minutes=totals['night_working_minutes'],
+                    paid_leave_days=totals['paid_leave_days'],
+                    special_leave_days=totals['special_leave_days'],
+                    absence_days=totals['absence_days'],
+                    overtime_allowance=amounts['overtime_allowance'],
+                    night_allowance=amounts['night_allowance'],
+                    holiday_allowance=amounts['holiday_allowance'],
+                    gross_salary=amounts['gross_salary'],
+                    net_salary=amounts['gross_salary'],  # 控除計算は後で実装
+                    calculated_by=self.calculated_by
+                )
+                db.session.add(payroll)
+                payrolls[employee.id] = payroll
+
+            # 賃金台帳も同じトランザクションで一括更新
+            if computed:
+                WageRegisterManager().stage_wage_registers(year, month, [
+                    (employee.id, register_values(payrolls[employee.id], working_days=totals['working_days']))
+                    for employee, _, totals, _ in computed
+                ])
+
+            # 全従業員分を単一トランザクションで保存
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return {'payrolls': payrolls, 'errors': errors}
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python payroll_batch.py <year> <month> [employee_id ...]")
+        sys.exit(1)
+
+    year = int(sys.argv[1])
+    month = int(sys.argv[2])
+    employee_ids = [int(arg) for arg in sys.argv[3:]] or None
+
+    from app import app
+    with app.app_context():
+        result = PayrollBatchEngine(year, month).run(employee_ids)
+
+        print(f"✅ 給与一括計算完了: {year}年{month}月 成功{len(result['payrolls'])}名 / エラー{len(result['errors'])}名")
+        for error in result['errors']:
+            print(f"   ❌ 従業員ID {error['employee_id']} ({error['employee_name'] or '-'}): {error['error']}")
+
+    if result['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+給与計算カーネル
+データベースに依存しない給与額計算（列指向）
+
+従業員ごとの労働時間（分）・日数・給与設定を列（リスト）で受け取り、
+給与形態別の支給額を列単位でまとめて計算する。
+副作用がないため、一括計算・試算・ベンチマークに利用できる。
+"""
+
+import calendar
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+# 入力列
+INPUT_COLUMNS = [
+    'wage_type',                    # 給与設定の給与形態（monthly/daily/hourly）
+    'employee_wage_type',           # 従業員マスタの給与形態（深夜手当・休業補償の計算に使用）
+    'base_salary',                  # 月給
+    'hourly_rate',                  # 時給
+    'daily_rate',                   # 日給
+    'standard_working_hours',       # 1日標準労働時間
+    'standard_working_days',        # 週標準労働日数
+    'regular_working_minutes',      # 法定内労働時間
+    'legal_overtime_minutes',       # 法定内残業時間
+    'overtime_minutes',             # 法定外残業時間
+    'legal_holiday_minutes',        # 法定休日労働時間
+    'holiday_minutes',              # 法定外休日労働時間
+    'night_working_minutes',        # 深夜労働時間
+    'daily_wage_working_days',      # 日給制の出勤日数
+    'absence_days',                 # 欠勤日数
+    'company_closure_days',         # 会社都合の休業日数
+]
+
+# 出力列
+OUTPUT_COLUMNS = [
+    'wage_type', 'base_salary', 'overtime_allowance', 'night_allowance', 'holiday_allowance',
+    'closure_compensation', 'absence_deduction', 'gross_salary',
+]
+
+
+@lru_cache(maxsize=None)
+def calculate_annual_working_hours(year):
+    """年間所定労働時間を計算する"""
+    # 年間日数
+    days_in_year = 366 if calendar.isleap(year) else 365
+
+    # 土日の数を計算
+    weekends = 0
+    for month in range(1, 13):
+        for day in range(1, calendar.monthrange(year, month)[1] + 1):
+            weekday = calendar.weekday(year, month, day)
+            if weekday in [5, 6]:  # 土曜日=5, 日曜日=6
+                weekends += 1
+
+    # 祝日数（日本の祝日概算）
+    holidays = 16  # 基本的な祝日数
+
+    # 年間労働日数 = 年間日数 - 土日 - 祝日
+    working_days = days_in_year - weekends - holidays
+
+    # 年間所定労働時間 = 労働日数 × 8時間
+    annual_working_hours = working_days * 8
+
+    return annual_working_hours, working_days
+
+
+# --- 列演算ヘルパー ---
+
+def _where(mask, a, b):
+    """mask が真の要素は a、偽の要素は b を選ぶ"""
+    return [x if m else y for m, x, y in zip(mask, a, b)]
+
+
+def _int(column):
+    """各要素を整数に切り捨てる"""
+    return [int(x) for x in column]
+
+
+def _premium_pay(minutes, hourly_rate, multiplier=None):
+    """労働時間（分）× 時給（× 割増率）"""
+    if multiplier is None:
+        return _int([m / 60 * r for m, r in zip(minutes, hourly_rate)])
+    return _int([m / 60 * r * multiplier for m, r in zip(minutes, hourly_rate)])
+
+
+def compute_payroll_roll(inputs: Dict[str, Sequence], year: int) -> Dict[str, List]:
+    """給与額を列単位で一括計算する
+
+    Args:
+        inputs: INPUT_COLUMNS をキーとする同じ長さの列
+        year: 対象年（年間所定労働時間の算出に使用）
+
+    Returns:
+        dict: OUTPUT_COLUMNS をキーとする列
+    """
+    annual_working_hours, annual_working_days = calculate_annual_working_hours(year)
+
+    wage_type = [w or 'monthly' for w in inputs['wage_type']]
+    employee_wage_type = list(inputs['employee_wage_type'])
+    is_hourly = [w == 'hourly' for w in wage_type]
+    is_daily = [w == 'daily' for w in wage_type]
+    emp_hourly = [w == 'hourly' for w in employee_wage_type]
+    emp_daily = [w == 'daily' for w in employee_wage_type]
+
+    settings_base = [b or 0 for b in inputs['base_salary']]
+    settings_hourly_rate = [r or 0 for r in inputs['hourly_rate']]
+    settings_daily_rate = [r or 0 for r in inputs['daily_rate']]
+
+    regular = inputs['regular_working_minutes']
+    legal_overtime = inputs['legal_overtime_minutes']
+    overtime = inputs['overtime_minutes']
+    legal_holiday = inputs['legal_holiday_minutes']
+    holiday = inputs['holiday_minutes']
+    night = inputs['night_working_minutes']
+    absence_days = inputs['absence_days']
+    closure_days = inputs['company_closure_days']
+
+    # 給与形態別の基本給
+    hourly_regular_pay = _premium_pay(regular, settings_hourly_rate)
+    daily_regular_pay = [d * r for d, r in zip(inputs['daily_wage_working_days'], settings_daily_rate)]
+    regular_working_pay = _where(is_hourly, hourly_regular_pay,
+                                 _where(is_daily, daily_regular_pay, [0] * len(wage_type)))
+    base_salary = _where(is_hourly, hourly_regular_pay, _where(is_daily, daily_regular_pay, settings_base))
+
+    # 割増賃金の基礎となる時給
+    # 時給制: 時給 / 日給制: 日給÷8時間 / 月給制: 月給×12ヶ月÷年間所定労働時間
+    monthly_rate = [b * 12 / annual_working_hours if b > 0 and annual_working_hours > 0 else 0
+                    for b in settings_base]
+    daily_hourly_rate = [r / 8 if r > 0 else 0 for r in settings_daily_rate]
+    hourly_rate = _where(is_hourly, settings_hourly_rate, _where(is_daily, daily_hourly_rate, monthly_rate))
+
+    legal_overtime_pay = _premium_pay(legal_overtime, hourly_rate)     # 法定内残業は通常賃金
+    overtime_pay = _premium_pay(overtime, hourly_rate, 1.25)           # 法定外残業は25%増し
+    legal_holiday_pay = _premium_pay(legal_holiday, hourly_rate, 1.35)  # 法定休日は35%増し
+    holiday_pay = _premium_pay(holiday, hourly_rate)                   # 法定外休日は通常賃金
+
+    # 深夜労働手当（25%増し）- 労働基準法第37条第4項
+    # 時給制は基本給をそのまま時給として扱う
+    night_hourly_rate = []
+    for base, hours, days, hourly, daily in zip(base_salary, inputs['standard_working_hours'],
+                                                inputs['standard_working_days'], emp_hourly, emp_daily):
+        if hourly:
+            night_hourly_rate.append(base)
+        elif daily:
+            night_hourly_rate.append(base / 8)
+        else:
+            monthly_working_hours = hours * days * 4.33
+            night_hourly_rate.append(base / monthly_working_hours if monthly_working_hours > 0 else 0)
+    night_allowance = _premium_pay(night, night_hourly_rate, 0.25)
+
+    # 欠勤控除で使う時給（従業員マスタが時給制以外なら深夜手当の時給を使う）
+    deduction_hourly_rate = _where(emp_hourly, hourly_rate, night_hourly_rate)
+
+    # 休業補償（60%）- 労働基準法第26条
+    closure_compensation = []
+    for days, base, hours, hourly, daily in zip(closure_days, base_salary,
+                                                inputs['standard_working_hours'], emp_hourly, emp_daily):
+        if days <= 0:
+            closure_compensation.append(0)
+        elif hourly:
+            # 時給制の場合：標準労働時間×時給×60%×日数
+            closure_compensation.append(int(days * (hours * base * 0.6)))
+        elif daily:
+            # 日給制の場合：日給×60%×日数
+            closure_compensation.append(int(days * base * 0.6))
+        else:
+            # 月給制の場合：月給÷30日×60%×日数
+            closure_compensation.append(int(days * (base / 30) * 0.6))
+
+    # 欠勤控除（ノーワーク・ノーペイの原則）
+    monthly_working_days = annual_working_days / 12
+    absence_deduction = []
+    for days, base, rate, daily_rate, hourly, daily in zip(absence_days, base_salary, deduction_hourly_rate,
+                                                           settings_daily_rate, is_hourly, is_daily):
+        if days <= 0:
+            absence_deduction.append(0)
+        elif hourly:
+            # 時給制の場合：8時間×時給×日数
+            absence_deduction.append(int(days * 8 * rate))
+        elif daily:
+            # 日給制の場合：日給×日数
+            absence_deduction.append(int(days * daily_rate))
+        else:
+            # 月給制の場合：年間所定労働日数から月平均労働日数を算出
+            rate_per_day = base / monthly_working_days if monthly_working_days > 0 else 0
+            absence_deduction.append(int(days * rate_per_day))
+
+    # 総支給額
+    gross_salary = [sum(values) - deduction for *values, deduction in zip(
+        base_salary, regular_working_pay, legal_overtime_pay, overtime_pay, legal_holiday_pay,
+        holiday_pay, night_allowance, closure_compensation, absence_deduction)]
+
+    return {
+        'wage_type': wage_type,
+        'base_salary': base_salary,
+        'overtime_allowance': [a + b for a, b in zip(overtime_pay, legal_overtime_pay)],
+        'night_allowance': night_allowance,
+        'holiday_allowance': [a + b for a, b in zip(holiday_pay, legal_holiday_pay)],
+        'closure_compensation': closure_compensation,
+        'absence_deduction': absence_deduction,
+        'gross_salary': gross_salary,
+    }
+
+
+def rows_to_columns(rows: Sequence[Dict]) -> Dict[str, List]:
+    """行（辞書）のリストを列形式に変換する"""
+    return {column: [row[column] for row in rows] for column in INPUT_COLUMNS}
+
+
+def columns_to_rows(columns: Dict[str, List]) -> List[Dict]:
+    """列形式を行（辞書）のリストに変換する"""
+    keys = list(columns.keys())
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+if __name__ == "__main__":
+    # 1,000名分の試算ベンチマーク
+    import random
+    import time
+
+    random.seed(0)
+    size = 1000
+    sample_rows = []
+    for i in range(size):
+        wage_type = ['monthly', 'daily', 'hourly'][i % 3]
+        sample_rows.append({
+            'wage_type': wage_type,
+            'employee_wage_type': wage_type,
+            'base_salary': 250000,
+            'hourly_rate': 1200,
+            'daily_rate': 10000,
+            'standard_working_hours': 8.0,
+            'standard_working_days': 5,
+            'regular_working_minutes': random.randint(8000, 10000),
+            'legal_overtime_minutes': 0,
+            'overtime_minutes': random.randint(0, 2400),
+            'legal_holiday_minutes': random.randint(0, 480),
+            'holiday_minutes': random.randint(0, 480),
+            'night_working_minutes': random.randint(0, 300),
+            'daily_wage_working_days': 21,
+            'absence_days': random.randint(0, 1),
+            'company_closure_days': 0,
+        })
+
+    columns = rows_to_columns(sample_rows)
+    started = time.perf_counter()
+    roll = compute_payroll_roll(columns, 2025)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{size}名分の給与計算: {elapsed:.1f}ms")
+    print(f"総支給額合計: ¥{sum(roll['gross_salary']):,}")
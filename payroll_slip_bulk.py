@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+給与明細書PDF一括生成
+月次の給与明細書をまとめて PDF にし、ZIP に格納する機能
+
+明細・従業員・給与計算結果は1回の結合クエリで先読みし、
+データベースに依存しない値のスナップショットにしてから描画する。
+描画は render_pool のプロセスプールで並列化し（ワーカーごとにフォントを1回だけ登録）、
+できあがった PDF から順に ZIP へ書き込む（またはストリーミングで返す）。
+描画の投入はワーカー数×2件までに絞るため、数百名分でも親プロセスが抱える PDF はその件数分に収まる。
+"""
+
+import json
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from models import db, Employee, PayrollCalculation, PayrollSlip
+from payroll_slip_pdf_generator import create_payroll_slip_pdf, get_company_name
+from pdf_fonts import japanese_font, warm_up_fonts
+from render_pool import iter_rendered
+from zip_stream import iter_rendered_zip_entries, write_rendered_to_zip
+
+# この件数未満はプロセスを起動せずに描画する
+MIN_PARALLEL_SLIPS = 8
+
+# ワーカーで登録済みのフォント名
+_worker_font_name = None
+
+
+def _snapshot(model) -> SimpleNamespace:
+    """モデルの列値をプロセス間で受け渡せる形に写す"""
+    return SimpleNamespace(**{column.name: getattr(model, column.name) for column in model.__table__.columns})
+
+
+def load_slip_jobs(year: int, month: int, employee_ids: Optional[List[int]] = None) -> List[Dict]:
+    """保存済みの給与明細データを一括取得する
+
+    Args:
+        year: 年
+        month: 月
+        employee_ids: 対象従業員ID（省略時は保存済み明細がある全従業員）
+
+    Returns:
+        list: 'employee_id', 'filename', 'payroll_slip', 'employee', 'payroll_calculation' の辞書
+    """
+    query = db.session.query(PayrollSlip, Employee, PayrollCalculation).join(
+        Employee, PayrollSlip.employee_id == Employee.id
+    ).join(
+        PayrollCalculation, PayrollSlip.payroll_calculation_id == PayrollCalculation.id
+    ).filter(
+        PayrollSlip.slip_year == year,
+        PayrollSlip.slip_month == month
+    )
+    if employee_ids is not None:
+        query = query.filter(PayrollSlip.employee_id.in_(employee_ids))
+
+    jobs = []
+    seen_employee_ids = set()
+    for slip, employee, calculation in query.order_by(PayrollSlip.employee_id, PayrollSlip.id):
+        # 従業員ごとに最初の明細のみ
+        if slip.employee_id in seen_employee_ids:
+            continue
+        seen_employee_ids.add(slip.employee_id)
+
+        payroll_slip = _snapshot(slip)
+        # その他手当・その他控除の詳細を復元
+        payroll_slip.other_allowances_detail = json.loads(slip.other_allowances_json) if slip.other_allowances_json else []
+        payroll_slip.other_deductions_detail = json.loads(slip.other_deductions_json) if slip.other_deductions_json else []
+
+        jobs.append({
+            'employee_id': employee.id,
+            'filename': f"{year}年{month}月_{employee.name}_給与明細書.pdf",
+            'payroll_slip': payroll_slip,
+            'employee': SimpleNamespace(id=employee.id, name=employee.name),
+            'payroll_calculation': _snapshot(calculation),
+        })
+    return jobs
+
+
+def _init_worker():
+    """ワーカー起動時にフォントを1回だけ登録する"""
+    global _worker_font_name
+    warm_up_fonts()
+    _worker_font_name = japanese_font()
+
+
+def _render_slip(job: Dict, company_name: str) -> bytes:
+    """給与明細書1件を描画する"""
+    buffer = create_payroll_slip_pdf(job['payroll_slip'], job['employee'], job['payroll_calculation'],
+                                     font_name=_worker_font_name, company_name=company_name)
+    return buffer.getvalue()
+
+
+def iter_rendered_slips(jobs: List[Dict], max_workers: Optional[int] = None) -> Iterator[Tuple[Dict, Optional[bytes], Optional[Exception]]]:
+    """給与明細書を描画し、できた順に (ジョブ, PDF, エラー) を返す
+
+    描画に失敗したジョブは PDF が None、エラーに例外が入る。
+
+    Args:
+        jobs: load_slip_jobs の戻り値
+        max_workers: 最大ワーカー数（省略時は CPU 数）
+    """
+    if not jobs:
+        return iter(())
+    # 会社名は描画前に1回だけ取得（ワーカーはデータベースに接続しない）
+    return iter_rendered(jobs, _render_slip, (get_company_name(),), initializer=_init_worker,
+                         min_parallel=MIN_PARALLEL_SLIPS, max_workers=max_workers)
+
+
+def _describe_error(job: Dict, error: Exception) -> str:
+    print(f"PDF生成エラー（従業員ID: {job['employee_id']}）: {error}")
+    return f"従業員ID {job['employee_id']}: {error}"
+
+
+def render_slips_to_zip(jobs: List[Dict], zip_file, max_workers: Optional[int] = None,
+                        progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """給与明細書を描画して ZIP に書き込む（失敗した従業員はエラー一覧に記載）
+
+    Args:
+        jobs: load_slip_jobs の戻り値
+        zip_file: 書き込み先の zipfile.ZipFile
+        max_workers: 最大ワーカー数（省略時は CPU 数）
+        progress: 1件終わるごとに (処理済み件数, 全件数) で呼ばれる関数
+
+    Returns:
+        dict: 'generated'（生成件数）、'errors'（従業員IDとエラー内容）
+    """
+    return write_rendered_to_zip(iter_rendered_slips(jobs, max_workers), len(jobs), zip_file,
+                                 _describe_error, progress)
+
+
+def iter_slip_zip_entries(jobs: List[Dict], max_workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """ZIP ストリーミング用に (ファイル名, PDF) を返す（失敗した従業員があれば最後にエラー一覧）"""
+    return iter_rendered_zip_entries(iter_rendered_slips(jobs, max_workers), _describe_error)
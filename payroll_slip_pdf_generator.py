@@ -7,12 +7,10 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
 from datetime import datetime
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.pdfbase.ttfonts import TTFont
 import io
-import os
+
+from pdf_fonts import draw_centered_text, draw_justified_text, japanese_font, string_width
 
 def get_company_name():
     """企業情報から会社名を取得"""
@@ -26,102 +24,26 @@ def get_company_name():
     except Exception:
         return "株式会社 サンプル企業"  # データベースエラー時のフォールバック
 
-def draw_justified_text(canvas, font_name, font_size, text, x, y, width):
-    """項目名を均等割り付けで描画"""
-    canvas.setFont(font_name, font_size)
-    
-    # 2文字の場合は中央揃えで文字間に全角スペース3つを挿入
-    if len(text) == 2:
-        spaced_text = text[0] + "　　　" + text[1]  # 全角スペース3つ
-        text_width = canvas.stringWidth(spaced_text, font_name, font_size)
-        center_x = x + (width - text_width) / 2
-        canvas.drawString(center_x, y, spaced_text)
-        return
-    
-    # 1文字の場合は中央揃え
-    if len(text) == 1:
-        text_width = canvas.stringWidth(text, font_name, font_size)
-        center_x = x + (width - text_width) / 2
-        canvas.drawString(center_x, y, text)
-        return
-    
-    # 文字間のスペースを計算
-    text_width = canvas.stringWidth(text, font_name, font_size)
-    if text_width >= width:
-        # 文字列が幅を超える場合は通常表示
-        canvas.drawString(x, y, text)
-        return
-    
-    # 均等割り付けのため文字間の追加スペースを計算
-    extra_space = width - text_width
-    char_count = len(text) - 1  # 文字間の数
-    
-    if char_count > 0:
-        space_per_char = extra_space / char_count
-        current_x = x
-        
-        for i, char in enumerate(text):
-            canvas.drawString(current_x, y, char)
-            char_width = canvas.stringWidth(char, font_name, font_size)
-            current_x += char_width
-            if i < char_count:  # 最後の文字以外
-                current_x += space_per_char
-    else:
-        canvas.drawString(x, y, text)
-
-def draw_centered_text(canvas, font_name, font_size, text, x, y, width):
-    """項目名を中央揃えで描画"""
-    canvas.setFont(font_name, font_size)
-    text_width = canvas.stringWidth(text, font_name, font_size)
-    center_x = x + (width - text_width) / 2
-    canvas.drawString(center_x, y, text)
-
-def setup_japanese_font():
-    """日本語フォント設定"""
-    # CIDフォントを試行（最も確実）
-    cid_fonts = [
-        'HeiseiKakuGo-W5',  # 日本語ゴシック
-        'HeiseiMin-W3',     # 日本語明朝
-    ]
+def create_payroll_slip_pdf(payroll_slip, employee, payroll_calculation, payroll_settings=None,
+                            font_name=None, company_name=None):
+    """給与明細書PDFを生成
     
-    for font_name in cid_fonts:
-        try:
-            pdfmetrics.registerFont(UnicodeCIDFont(font_name))
-            return font_name
-        except Exception:
-            continue
-    
-    # TTFフォントフォールバック
-    font_paths = [
-        '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-        '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'
-    ]
-    
-    for font_path in font_paths:
-        if os.path.exists(font_path):
-            try:
-                pdfmetrics.registerFont(TTFont('JapaneseFont', font_path))
-                return 'JapaneseFont'
-            except Exception:
-                continue
-    
-    # 最終フォールバック
-    return 'Helvetica'
-
-def create_payroll_slip_pdf(payroll_slip, employee, payroll_calculation, payroll_settings=None):
-    """給与明細書PDFを生成"""
+    一括発行では会社名を渡して、明細ごとのデータベース参照を省略する。
+    """
     
     buffer = io.BytesIO()
     p = canvas.Canvas(buffer, pagesize=A4)
     
     # フォント設定
-    font_name = setup_japanese_font()
+    if font_name is None:
+        font_name = japanese_font()
     
     # A4サイズの寸法
     page_width, page_height = A4
     
     # 2列表形式フォーマットでPDF生成
-    draw_umebishi_payroll_format(p, font_name, payroll_slip, employee, payroll_calculation, payroll_settings)
+    draw_umebishi_payroll_format(p, font_name, payroll_slip, employee, payroll_calculation, payroll_settings,
+                                 company_name)
     
     # ページを保存
     p.save()
@@ -153,14 +75,15 @@ def format_working_hours(payroll_calculation):
     minutes = total_minutes % 60
     return f"{hours}:{minutes:02d}"
 
-def draw_umebishi_payroll_format(canvas, font_name, payroll_slip, employee, payroll_calculation, payroll_settings):
+def draw_umebishi_payroll_format(canvas, font_name, payroll_slip, employee, payroll_calculation, payroll_settings,
+                                 company_name=None):
     """2列表形式フォーマット"""
     page_width, page_height = A4
     
     # 2列表形式フォーマットで描画
-    draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_calculation)
+    draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_calculation, company_name)
 
-def draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_calculation):
+def draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_calculation, company_name=None):
     """2列表形式フォーマット"""
     page_width, page_height = A4
     table_width = 320  # 固定幅に変更（約20%縮小）
@@ -174,7 +97,7 @@ def draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_ca
     # ヘッダー
     canvas.setFont(font_name, 18)
     title = "給与明細"
-    title_width = canvas.stringWidth(title, font_name, 18)
+    title_width = string_width(title, font_name, 18)
     canvas.drawString((page_width - title_width) / 2, y, title)
     
     y -= 40
@@ -197,8 +120,9 @@ def draw_two_column_format(canvas, font_name, payroll_slip, employee, payroll_ca
     
     # フッター
     canvas.setFont(font_name, 12)
-    company_name = get_company_name()  # 企業情報から会社名を取得
-    company_width = canvas.stringWidth(company_name, font_name, 12)
+    if company_name is None:
+        company_name = get_company_name()  # 企業情報から会社名を取得
+    company_width = string_width(company_name, font_name, 12)
     canvas.drawString((page_width - company_width) / 2, 40, company_name)
 
 def draw_two_column_table(canvas, font_name, payroll_slip, employee, payroll_calculation, x, y, table_width):
@@ -317,7 +241,7 @@ def draw_two_column_table(canvas, font_name, payroll_slip, employee, payroll_cal
         else:
             draw_justified_text(canvas, font_name, 10, item_name, x + 5, current_y - 12, item_name_width)
         if value:  # 値がある場合のみ表示
-            value_width = canvas.stringWidth(str(value), font_name, canvas._fontsize)
+            value_width = string_width(str(value), font_name, canvas._fontsize)
             canvas.drawString(x + table_width - value_width - 5, current_y - 12, str(value))  # 15→12に調整
         
         current_y -= row_height
@@ -385,7 +309,7 @@ def draw_allowance_section(canvas, font_name, allowance_items, x, current_y, tab
         # 金額列（3列目）- 新しい幅に調整
         if amount > 0:  # 金額が0より大きい場合のみ表示
             amount_text = f"¥{amount:,}"
-            amount_width = canvas.stringWidth(amount_text, font_name, 10)  # フォントサイズを10ptに統一
+            amount_width = string_width(amount_text, font_name, 10)  # フォントサイズを10ptに統一
             # 3列目の右端に合わせて配置
             canvas.drawString(x + col1_width + col2_width + col3_width - amount_width - 5, item_y, amount_text)
     
@@ -453,7 +377,7 @@ def draw_deduction_section(canvas, font_name, deduction_items, x, current_y, tab
         # 金額列（3列目）- 新しい幅に調整
         if amount > 0:  # 金額が0より大きい場合のみ表示
             amount_text = f"¥{amount:,}"
-            amount_width = canvas.stringWidth(amount_text, font_name, 10)  # フォントサイズを10ptに統一
+            amount_width = string_width(amount_text, font_name, 10)  # フォントサイズを10ptに統一
             # 3列目の右端に合わせて配置
             canvas.drawString(x + col1_width + col2_width + col3_width - amount_width - 5, item_y, amount_text)
     
@@ -525,7 +449,7 @@ def draw_excel_integrated_table(canvas, font_name, payroll_slip, employee, payro
         for i, cell_data in enumerate(row_data):
             canvas.line(x + col_width * i, current_y, x + col_width * i, current_y - row_height)
             cell_x = x + col_width * i + col_width//2
-            cell_width = canvas.stringWidth(str(cell_data), font_name, 11)
+            cell_width = string_width(str(cell_data), font_name, 11)
             canvas.drawString(cell_x - cell_width//2, current_y - 13, str(cell_data))
         
         current_y -= row_height
@@ -550,7 +474,7 @@ def draw_excel_integrated_table(canvas, font_name, payroll_slip, employee, payro
     canvas.setFont(font_name, 16)
     canvas.drawString(x + 10, current_y - 25, "差引支給額")
     net_salary_text = f"¥{payroll_slip.net_salary:,}"
-    net_salary_width = canvas.stringWidth(net_salary_text, font_name, 16)
+    net_salary_width = string_width(net_salary_text, font_name, 16)
     canvas.drawString(x + table_width - net_salary_width - 10, current_y - 25, net_salary_text)
 
 def draw_payment_section(canvas, font_name, payroll_slip, x, y, width):
@@ -587,7 +511,7 @@ def draw_payment_section(canvas, font_name, payroll_slip, x, y, width):
         
         canvas.drawString(x + 5, current_y - 13, item)
         amount_text = f"¥{amount:,}"
-        amount_width = canvas.stringWidth(amount_text, font_name, 11)
+        amount_width = string_width(amount_text, font_name, 11)
         canvas.drawString(x + width - amount_width - 5, current_y - 13, amount_text)
         
         current_y -= row_height
@@ -628,7 +552,7 @@ def draw_old_deduction_section(canvas, font_name, payroll_slip, x, y, width):
         
         canvas.drawString(x + 5, current_y - 13, item)
         amount_text = f"¥{amount:,}"
-        amount_width = canvas.stringWidth(amount_text, font_name, 11)
+        amount_width = string_width(amount_text, font_name, 11)
         canvas.drawString(x + width - amount_width - 5, current_y - 13, amount_text)
         
         current_y -= row_height
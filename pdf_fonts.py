@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+PDFフォント登録
+各PDF生成で使う日本語フォントを、プロセスごとに1回だけ登録する仕組み
+
+フォントの登録・文字幅の計測結果はプロセス内で使い回すため、
+一括発行で何百枚描画してもフォントの読み込みは最初の1回だけになる。
+Web・ジョブワーカー・描画用ワーカープロセスの起動時に warm_up_fonts() を呼ぶ。
+"""
+
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+from reportlab.pdfbase.ttfonts import TTFont
+
+# CIDフォント（ReportLab 内蔵、最も確実）
+CID_FONTS = [
+    'HeiseiKakuGo-W5',  # 日本語ゴシック
+    'HeiseiMin-W3',     # 日本語明朝
+]
+
+# CIDフォントが使えない場合の TTF フォント
+TTF_FALLBACK_PATHS = [
+    '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
+    '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf',
+]
+
+# タイムカード用の IPAex ゴシック
+IPAEX_FONT_NAME = 'IPAexGothic'
+IPAEX_FONT_PATHS = [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts', 'ipaexg.ttf'),
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fonts', 'ipaexg00401', 'ipaexg.ttf'),
+]
+
+# 事前に幅を計測しておく文字（金額・日付の描画で多用）
+WARM_UP_TEXT = '0123456789,¥円年月日時間分-'
+WARM_UP_SIZES = (7, 8, 9, 10, 11, 12)
+
+
+def _register(font) -> bool:
+    try:
+        pdfmetrics.registerFont(font)
+        return True
+    except Exception as e:
+        print(f"✗ フォント {font.fontName} 登録失敗: {e}")
+        return False
+
+
+@lru_cache(maxsize=None)
+def japanese_font() -> str:
+    """日本語フォントを登録してフォント名を返す（2回目以降は登録済みの名前を返すだけ）"""
+    for font_name in CID_FONTS:
+        if _register(UnicodeCIDFont(font_name)):
+            return font_name
+
+    for font_path in TTF_FALLBACK_PATHS:
+        if os.path.exists(font_path) and _register(TTFont('JapaneseFont', font_path)):
+            return 'JapaneseFont'
+
+    print("警告: 日本語フォントを登録できません。Helveticaを使用します。")
+    return 'Helvetica'
+
+
+def japanese_font_pair() -> Tuple[str, str]:
+    """(通常, 太字) の日本語フォント名（CID/TTF フォントは太字も同じフォント）"""
+    font_name = japanese_font()
+    if font_name == 'Helvetica':
+        return 'Helvetica', 'Helvetica-Bold'
+    return font_name, font_name
+
+
+@lru_cache(maxsize=None)
+def ipaex_font() -> str:
+    """IPAex ゴシックを登録してフォント名を返す（ファイルがなければ日本語CIDフォント）"""
+    for font_path in IPAEX_FONT_PATHS:
+        if os.path.exists(font_path) and _register(TTFont(IPAEX_FONT_NAME, font_path)):
+            return IPAEX_FONT_NAME
+    return japanese_font()
+
+
+@lru_cache(maxsize=8192)
+def string_width(text: str, font_name: str, font_size: float) -> float:
+    """文字列の幅（同じ文字列・フォント・サイズは計測結果を使い回す）"""
+    return pdfmetrics.stringWidth(text, font_name, font_size)
+
+
+def warm_up_fonts():
+    """フォントを登録し、よく使う文字の幅を計測しておく"""
+    for font_name in {japanese_font(), ipaex_font()}:
+        for font_size in WARM_UP_SIZES:
+            for char in WARM_UP_TEXT:
+                string_width(char, font_name, font_size)
+
+
+def draw_justified_text(canvas, font_name, font_size, text, x, y, width):
+    """項目名を均等割り付けで描画"""
+    canvas.setFont(font_name, font_size)
+
+    # 2文字の場合は中央揃えで文字間に全角スペース3つを挿入
+    if len(text) == 2:
+        spaced_text = text[0] + "　　　" + text[1]  # 全角スペース3つ
+        text_width = string_width(spaced_text, font_name, font_size)
+        center_x = x + (width - text_width) / 2
+        canvas.drawString(center_x, y, spaced_text)
+        return
+
+    # 1文字の場合は中央揃え
+    if len(text) == 1:
+        text_width = string_width(text, font_name, font_size)
+        center_x = x + (width - text_width) / 2
+        canvas.drawString(center_x, y, text)
+        return
+
+    # 文字間のスペースを計算
+    text_width = string_width(text, font_name, font_size)
+    if text_width >= width:
+        # 文字列が幅を超える場合は通常表示
+        canvas.drawString(x, y, text)
+        return
+
+    # 均等割り付けのため文字間の追加スペースを計算
+    extra_space = width - text_width
+    char_count = len(text) - 1  # 文字間の数
+
+    if char_count > 0:
+        space_per_char = extra_space / char_count
+        current_x = x
+
+        for i, char in enumerate(text):
+            canvas.drawString(current_x, y, char)
+            char_width = string_width(char, font_name, font_size)
+            current_x += char_width
+            if i < char_count:  # 最後の文字以外
+                current_x += space_per_char
+    else:
+        canvas.drawString(x, y, text)
+
+
+def draw_centered_text(canvas, font_name, font_size, text, x, y, width):
+    """項目名を中央揃えで描画"""
+    canvas.setFont(font_name, font_size)
+    text_width = string_width(text, font_name, font_size)
+    center_x = x + (width - text_width) / 2
+    canvas.drawString(center_x, y, text)
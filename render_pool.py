@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+帳票の並列描画
+給与明細書・賃金台帳などの一括作成で、データベースに依存しないスナップショット
+（ジョブ）をプロセスプールで描画し、できた順に返す機能
+
+ワーカーは spawn で起動し、initializer でフォントなどを1回だけ準備する。
+件数が少ないときはプロセスを起動せずにこのプロセスで描画する。
+
+一度に投入する描画はワーカー数×IN_FLIGHT_PER_WORKER 件までとし、結果を1件返すごとに
+次のジョブを投入する。受け取り側（ZIP のストリーミングなど）が遅くても、
+親プロセスが抱える描画結果はこの件数分に収まる。
+"""
+
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ワーカー1つあたりの投入済み（描画中・受け取り待ち）ジョブ数の上限
+IN_FLIGHT_PER_WORKER = 2
+
+
+def iter_rendered(jobs: List[Dict], render: Callable, args: Sequence = (),
+                  initializer: Optional[Callable[[], None]] = None, min_parallel: int = 1,
+                  max_workers: Optional[int] = None) -> Iterator[Tuple[Dict, Optional[Any], Optional[Exception]]]:
+    """ジョブを描画し、できた順に (ジョブ, 描画結果, エラー) を返す
+
+    描画に失敗したジョブは描画結果が None、エラーに例外が入る。
+
+    Args:
+        jobs: 描画するジョブ（プロセス間で受け渡せる値のみ）
+        render: render(job, *args) で描画するモジュールレベルの関数
+        args: render に渡す追加の引数
+        initializer: ワーカー（逐次描画ではこのプロセス）で描画前に1回呼ぶ関数
+        min_parallel: この件数未満はプロセスを起動せずに描画する
+        max_workers: 最大ワーカー数（省略時は CPU 数）
+    """
+    if not jobs:
+        return
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+
+    if len(jobs) < min_parallel or max_workers <= 1:
+        if initializer:
+            initializer()
+        for job in jobs:
+            try:
+                result = render(job, *args)
+            except Exception as e:
+                yield job, None, e
+            else:
+                yield job, result, None
+        return
+
+    max_in_flight = max_workers * IN_FLIGHT_PER_WORKER
+    queued = deque(jobs)
+    pending = {}
+
+    # 親プロセスのスレッド・DB接続を引き継がないよう spawn で起動する
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=initializer) as executor:
+        try:
+            while queued or pending:
+                # 結果を返した分だけ次のジョブを投入する
+                while queued and len(pending) < max_in_flight:
+                    job = queued.popleft()
+                    pending[executor.submit(render, job, *args)] = job
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        yield job, None, e
+                    else:
+                        yield job, result, None
+        finally:
+            # ダウンロードが中断された場合は未着手の描画を取り消す
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+表形式ファイルの読み込み
+取込機能（勤怠データ・銀行/カード明細など）で使う CSV / Excel を、
+ファイル全体をメモリに読み込まずに1行ずつ読む機能
+
+読めないファイル（壊れた Excel、Excel 形式でないファイル）は ValueError にする。
+"""
+
+import csv
+import io
+import zipfile
+from typing import Iterator, List
+
+
+def iter_csv_rows(stream, encoding: str = 'utf-8-sig') -> Iterator[List]:
+    """CSV を1行ずつ読み込む（バイナリ・テキストどちらのストリームにも対応）"""
+    if not isinstance(stream, io.TextIOBase):
+        stream = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    yield from csv.reader(stream)
+
+
+def iter_excel_rows(source) -> Iterator[List]:
+    """Excel の先頭シートを1行ずつ読み込む（読み取り専用モード）
+
+    壊れたファイル・Excel でないファイルは ValueError にする。
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    try:
+        workbook = load_workbook(source, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as e:
+        raise ValueError(f'Excel ファイルを読み込めません（壊れているか Excel 形式ではありません）: {e}')
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        workbook.close()
+
+
+def iter_file_rows(source, filename: str, encoding: str = 'utf-8-sig') -> Iterator[List]:
+    """拡張子に応じて CSV / Excel の行を読み込む"""
+    if filename.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_excel_rows(source)
+    return iter_csv_rows(source, encoding)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+勘定科目表のキャッシュのテスト
+引き当て用の辞書・部分木の範囲・親科目への小計の集計と、試算表の表示行のまとめ方（データベース不要）、
+ロールバックされた変更がキャッシュに残らないこと（メモリ上の SQLite を使用）を確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, AccountingAccount
+from account_chart import AccountChart, ChartAccount, account_chart
+from trial_balance import TrialBalance, TrialBalanceLine
+
+# (ID, コード, 科目名, 区分, 親科目ID)
+ACCOUNTS = [
+    (1, '100', '現金預金', '資産', None),
+    (2, '101', '現金', '資産', 1),
+    (3, '102', '普通預金', '資産', 1),
+    (4, '103', 'みずほ銀行普通預金', '資産', 3),
+    (5, '110', '売掛金', '資産', None),
+    (6, '200', '未払金', '負債', 1),          # 区分の違う親科目
+    (7, '900', '循環A', '費用', 8),           # 親をたどると循環
+    (8, '901', '循環B', '費用', 7),
+]
+
+def make_chart():
+    return AccountChart(1, [ChartAccount(account_id, code, name, account_type, parent_id, True, None, None)
+                            for account_id, code, name, account_type, parent_id in ACCOUNTS])
+
+def test_account_chart():
+    """勘定科目表・部分木の集計・表示行のテスト"""
+    print("🗂️ 勘定科目表 キャッシュテスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    chart = make_chart()
+    check('コード・科目名での引き当て', chart.account_for_code('102').id == 3
+          and chart.account_for_name('売掛金').id == 5 and chart.account_for_code('999') is None)
+    check('部分木（深さ優先・コード順）', [account.id for account in chart.subtree(1)] == [1, 2, 3, 4, 6])
+    check('階層の深さ', chart.get(4).level == 2 and chart.get(1).level == 0)
+    check('子孫の判定', chart.is_descendant(4, 1) and not chart.is_descendant(1, 4) and not chart.is_descendant(5, 1))
+    check('循環した親子関係も全科目を1回ずつ並べる', sorted(account.id for account in chart.order) == list(range(1, 9)))
+
+    subtotals = chart.roll_up({2: 1000, 3: 200, 4: 30, 5: 4})
+    check('親科目の小計', subtotals[1] == 1230 and subtotals[3] == 230 and subtotals[5] == 4 and subtotals[2] == 1000)
+
+    lines = [TrialBalanceLine(account_id, code, name, account_type, 0, debit, credit, debit or credit)
+             for (account_id, code, name, account_type, _), (debit, credit) in zip(ACCOUNTS, [
+                 (0, 0), (1000, 0), (200, 0), (30, 0), (4, 0), (0, 500), (7, 0), (0, 0)])]
+    trial_balance = TrialBalance(2025, date(2025, 4, 1), date(2026, 4, 1), lines, chart)
+    assets = {line.account_name: line.balance for line in trial_balance.statement_lines('資産')}
+    check('子科目は親科目の行にまとめる', assets == {'現金預金': 1230, '売掛金': 4})
+    check('表示行の合計は区分の合計と一致', sum(assets.values()) == trial_balance.total('資産'))
+    liabilities = {line.account_name: line.balance for line in trial_balance.statement_lines('負債')}
+    check('区分の違う親科目にはまとめない', liabilities == {'未払金': 500})
+    expenses = [line.account_name for line in trial_balance.statement_lines('費用')]
+    check('循環した親子関係は片方を親として扱う', len(expenses) == 1)
+
+    flat = TrialBalance(2025, date(2025, 4, 1), date(2026, 4, 1), lines)
+    check('勘定科目表なしは科目ごと', [line.account_name for line in flat.statement_lines('資産')]
+          == ['現金', '普通預金', 'みずほ銀行普通預金', '売掛金'])
+
+    return success
+
+def test_rolled_back_changes():
+    """ロールバックされた勘定科目の変更をキャッシュしないことのテスト"""
+    print("\n↩️ 勘定科目表 ロールバックテスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(AccountingAccount(account_code='101', account_name='現金', account_type='資産'))
+        db.session.commit()
+        cached = account_chart()
+
+        account = AccountingAccount.query.filter_by(account_code='101').first()
+        account.account_name = '変更中'
+        pending = account_chart()
+        check('変更中は未フラッシュの変更を読まない', pending.account_for_code('101').account_name == '現金')
+        db.session.rollback()
+        check('ロールバック後もキャッシュは変わらない', account_chart() is cached
+              and cached.account_for_code('101').account_name == '現金')
+
+        account.account_name = '変更中'
+        db.session.flush()
+        check('フラッシュ済みの変更は読むがキャッシュしない', account_chart().account_for_code('101').account_name == '変更中')
+        db.session.rollback()
+        check('ロールバック後は元の科目表', account_chart().account_for_code('101').account_name == '現金')
+
+        account.account_name = '小口現金'
+        db.session.commit()
+        check('同じ世代番号でコミットした変更を読む', account_chart().account_for_code('101').account_name == '小口現金')
+
+        db.drop_all()
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_account_chart()
+    success = test_rolled_back_changes() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
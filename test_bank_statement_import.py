@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+銀行・クレジットカード明細の一括仕訳取込テスト（メモリ上の SQLite を使用）
+明細行が取引パターン・取引先に照合されて仕訳になり、照合できない行が確認待ちに残り、
+同じ明細の再取込で重複しないことを確認する
+"""
+
+import sys
+import os
+import io
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, User, AccountingAccount, BankStatementLine, BusinessPartner, GeneralLedger, JournalEntry, \
+    TransactionPattern
+import ledger_balances  # 仕訳の変更を月次残高に反映するイベントを登録
+from tabular_import import iter_csv_rows
+from bank_statement_import import BankStatementImporter, parse_amount, parse_date, pending_statement_lines, \
+    resolve_statement_lines
+
+STATEMENT = """口座番号,1234567
+照会期間,2025/07/01～2025/07/31
+取引日,摘要,お引出金額,お預入金額,残高
+2025/07/01,ﾀｸｼｰ ﾆﾎﾝｺｳﾂｳ,"3,200",,996800
+2025/07/03,振込 株式会社A商事,,"110,000",1106800
+2025/07/10,ﾌﾘｺﾐ ｶ)ｼｰｼﾖｳﾃﾝ,"55,000",,1051800
+2025/07/10,ﾌﾘｺﾐ ｶ)ｼｰｼﾖｳﾃﾝ,"55,000",,996800
+2025/07/32,ﾌﾒｲ,1000,,
+"""
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def import_statement(cash_account, user, text=STATEMENT):
+    rows = iter_csv_rows(io.BytesIO(text.encode('cp932')), 'cp932')
+    return BankStatementImporter(cash_account.id, user.id, source_filename='statement.csv', chunk_size=2).run(rows)
+
+def test_bank_statement_import():
+    """明細取込のテスト"""
+    print("🏦 明細取込テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    check('金額の表記', (parse_amount('1,200', '金額'), parse_amount('△500', '金額'), parse_amount('¥３００', '金額'),
+                         parse_amount('', '金額')) == (1200, -500, 300, 0))
+    check('日付の表記', parse_date('2025年7月1日') == parse_date('20250701') == date(2025, 7, 1))
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='accounting@example.com', password='x', role='accounting')
+        bank = AccountingAccount(account_code='102', account_name='普通預金', account_type='資産')
+        sales = AccountingAccount(account_code='401', account_name='売上高', account_type='収益')
+        purchase = AccountingAccount(account_code='501', account_name='仕入高', account_type='費用')
+        travel = AccountingAccount(account_code='523', account_name='旅費交通費', account_type='費用')
+        db.session.add_all([user, bank, sales, purchase, travel])
+        db.session.add_all([
+            TransactionPattern(pattern_name='商品・サービスの売上', category='売上関係', transaction_type='入金',
+                               credit_account_code='401', main_account_side='cash_debit'),
+            TransactionPattern(pattern_name='商品・サービスの仕入', category='仕入関係', transaction_type='出金',
+                               debit_account_code='501', main_account_side='cash_credit'),
+            TransactionPattern(pattern_name='交通費', category='経費関係', transaction_type='出金',
+                               debit_account_code='523', main_account_side='cash_credit',
+                               description='電車代、バス代、タクシー代など'),
+            BusinessPartner(partner_code='C001', partner_name='株式会社A商事', partner_type='顧客'),
+            BusinessPartner(partner_code='S001', partner_name='C商店', partner_type='仕入先'),
+        ])
+        db.session.commit()
+        sales_pattern = TransactionPattern.query.filter_by(pattern_name='商品・サービスの売上').one()
+        purchase_pattern = TransactionPattern.query.filter_by(pattern_name='商品・サービスの仕入').one()
+        customer = BusinessPartner.query.filter_by(partner_code='C001').one()
+
+        result = import_statement(bank, user)
+        check('見出し行の前の行を読み飛ばす', result['rows'] == 5)
+        check('不正な行はエラー', result['error_count'] == 1 and result['errors'][0]['line'] == 8)
+        check('キーワードで照合した行は仕訳登録', result['imported'] == 1)
+        check('照合できない行は確認待ち', result['pending'] == 3 and len(pending_statement_lines()) == 3)
+
+        taxi = BankStatementLine.query.filter_by(amount=3200).one()
+        check('半角カナの摘要もキーワードで照合', taxi.pattern.pattern_name == '交通費' and taxi.status == 'imported')
+        receipt = BankStatementLine.query.filter_by(amount=110000).one()
+        check('取引先は摘要の取引先名で照合', receipt.partner_id == customer.id and receipt.status == 'pending')
+
+        # 再取込は取込済みの行を読み飛ばす（同じ内容の2行も区別する）
+        again = import_statement(bank, user)
+        check('再取込で重複しない', (again['duplicates'], again['imported'], again['pending']) == (4, 0, 0)
+              and JournalEntry.query.count() == 1)
+
+        # 確認待ちの行を登録する
+        payments = BankStatementLine.query.filter_by(amount=55000).order_by(BankStatementLine.id).all()
+        resolved = resolve_statement_lines([
+            {'line_id': receipt.id, 'action': 'import', 'pattern_id': sales_pattern.id, 'partner_id': customer.id},
+            {'line_id': payments[0].id, 'action': 'import', 'pattern_id': purchase_pattern.id, 'partner_id': None},
+            {'line_id': payments[1].id, 'action': 'import', 'pattern_id': sales_pattern.id, 'partner_id': None},
+        ], user.id)
+        db.session.commit()
+        check('入出金に合わないパターンは登録しない', (resolved['imported'], resolved['unresolved']) == (2, 1)
+              and [line.id for line in pending_statement_lines()] == [payments[1].id])
+
+        entry = receipt.journal_entry
+        check('貸借の一致した仕訳', sorted((detail.account.account_name, detail.debit_amount, detail.credit_amount)
+                                    for detail in entry.details)
+              == [('売上高', 0, 110000), ('普通預金', 110000, 0)]
+              and entry.description == '商品・サービスの売上（振込 株式会社A商事） - 株式会社A商事')
+        ledger = GeneralLedger.query.filter_by(account_id=bank.id, year=2025, month=7).one()
+        check('月次残高に反映', (ledger.debit_total, ledger.credit_total) == (110000, 3200 + 55000))
+
+        # 登録した明細は次回の取込で使われる（同じ摘要、同じ取引先・金額）
+        next_month = STATEMENT.replace('2025/07/', '2025/08/') + '2025/08/20,振込 株式会社A商事 8月分,,"110,000",\n'
+        learned = import_statement(bank, user, next_month)
+        check('登録済みの摘要・取引先と金額で自動照合', (learned['imported'], learned['pending']) == (5, 0))
+        check('仕訳の合計は明細と一致', sum(entry.total_amount for entry in JournalEntry.query)
+              == 3200 * 2 + 110000 * 3 + 55000 * 3)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_bank_statement_import()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Excel出力の共通部品のテスト（データベース不要）
+名前付き書式がワークブックごとに1回だけ作られ、書き出した内容・書式が読み戻せることを確認する
+"""
+
+import sys
+import os
+import io
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import load_workbook
+
+from excel_export import AMOUNT_FORMAT, DASHED, MEDIUM, MINCHO, ExcelWorkbook
+
+STYLES = {
+    'title': {'font_name': MINCHO, 'font_size': 14, 'bold': True, 'align': 'center'},
+    'amount': {'font_name': MINCHO, 'font_size': 9, 'align': 'right', 'num_format': AMOUNT_FORMAT},
+}
+
+def test_excel_export():
+    """書式の使い回し・書き出し内容のテスト"""
+    print("📗 Excel出力 共通部品テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    book = ExcelWorkbook(STYLES, output=io.BytesIO())
+    check('同じ書式は使い回す', book.style('amount') is book.style('amount')
+          and book.style('amount', left=MEDIUM) is book.style('amount', left=MEDIUM))
+    check('属性を上書きした書式は別に作る', book.style('amount', left=MEDIUM) is not book.style('amount'))
+
+    ws = book.add_worksheet('明細', column_widths=[10, 20])
+    ws.merge_range(0, 0, 0, 1, '見出し', book.style('title'))
+    row_count = 5000
+    for row in range(1, row_count + 1):
+        ws.write(row, 0, f'行{row}')
+        ws.write_number(row, 1, row * 1000, book.style('amount', bottom=DASHED))
+    check('書式の数は行数に比例しない', len(book._formats) == 4)
+
+    sheet = load_workbook(book.close()).active
+    check('結合セル', [str(cells) for cells in sheet.merged_cells.ranges] == ['A1:B1'])
+    check('見出しの書式', sheet['A1'].value == '見出し' and sheet['A1'].font.b and sheet['A1'].font.name == MINCHO)
+    last = sheet.cell(row=row_count + 1, column=2)
+    check('最終行の金額と書式', last.value == row_count * 1000 and last.number_format == AMOUNT_FORMAT
+          and last.border.bottom.style == 'dashed')
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_excel_export()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+財務諸表Excel出力のテスト（データベース不要）
+1つの試算表から全帳票を書き出し、ページプロファイルで用紙の向きだけが変わり、
+書式が帳票の数に比例して増えないことを確認する
+"""
+
+import sys
+import os
+import io
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from openpyxl import load_workbook
+
+from financial_statement_excel import (PAGE_PROFILES, STATEMENTS, FinancialStatementWriter,
+                                       render_financial_statements, sample_trial_balance)
+
+def column_values(sheet, column):
+    """列の値（表示名 → 金額の確認用）"""
+    return {sheet.cell(row=row, column=column).value: sheet.cell(row=row, column=column + 1).value
+            for row in range(1, sheet.max_row + 1)}
+
+def test_financial_statement_excel():
+    """全帳票の書き出し・ページプロファイル・書式の共有のテスト"""
+    print("📊 財務諸表Excel出力テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    trial_balance = sample_trial_balance(2025)
+    schedules = SimpleNamespace(
+        cash_flow=None,
+        equity_change=None,
+        fixed_assets=[SimpleNamespace(asset_type='建物', beginning_book_value=0, increase=20000000, decrease=0,
+                                      ending_book_value=20000000, accumulated_depreciation=0,
+                                      acquisition_cost=20000000)],
+        bonds=[], loans=[], reserves=[]
+    )
+
+    writer = FinancialStatementWriter('株式会社テスト', trial_balance, schedules, 'mixed', io.BytesIO())
+    workbook = load_workbook(writer.write())
+    check('全帳票のシート', workbook.sheetnames == [title for _, title in STATEMENTS])
+    check('混合レイアウトの向き', [sheet.page_setup.orientation for sheet in workbook]
+          == ['portrait', 'portrait', 'portrait', 'landscape', 'landscape'])
+    # 書式は (書式名, 文字サイズ) ごとに1つ（縦・横で文字サイズが異なる書式だけ増える）
+    check('書式はワークブック内で共有', len(writer.book._formats) <= 2 * len(writer.book.styles))
+
+    balance_sheet = workbook['貸借対照表']
+    assets = column_values(balance_sheet, 1)
+    liabilities = column_values(balance_sheet, 4)
+    check('表題に会社名', balance_sheet['A1'].value == '株式会社テスト　貸借対照表')
+    check('期末日', balance_sheet['A2'].value == '2026年3月31日現在')
+    check('流動・固定の区分', assets['流動資産合計'] == 16000000 and assets['固定資産合計'] == 57000000
+          and liabilities['固定負債合計'] == 20000000)
+    check('貸借一致（当期純利益を純資産に含める）',
+          assets['資産合計'] == liabilities['負債及び純資産合計'] == 73000000)
+    check('金額は数値で書式付き', balance_sheet['B7'].number_format == '#,##0'
+          and isinstance(balance_sheet['B7'].value, int))
+
+    income_statement = workbook['損益計算書']
+    profits = {income_statement.cell(row=row, column=1).value: income_statement.cell(row=row, column=3).value
+               for row in range(1, income_statement.max_row + 1)}
+    check('段階利益', profits['売上総利益'] == 40000000 and profits['営業利益'] == 9000000
+          and profits['経常利益'] == 9000000)
+    check('当期純利益は試算表と一致', profits['当期純利益'] == trial_balance.net_income == 6000000)
+
+    check('明細のない帳票', workbook['キャッシュフロー計算書']['A5'].value == 'データがありません')
+    notes = column_values(workbook['附属明細書'], 1)
+    check('附属明細書の明細', notes['建物'] == 0 and workbook['附属明細書']['C7'].value == 20000000)
+
+    for profile in PAGE_PROFILES:
+        sheet = load_workbook(render_financial_statements('株式会社テスト', trial_balance,
+                                                          report_type='balance_sheet', page_profile=profile)).active
+        expected = 'landscape' if profile == 'a4_landscape' else 'portrait'
+        check(f'{profile}: 1帳票のみ・向き', sheet.title == '貸借対照表' and sheet.page_setup.orientation == expected)
+
+    for report_type, page_profile in (('unknown', 'mixed'), ('all', 'unknown')):
+        try:
+            render_financial_statements('株式会社テスト', trial_balance, report_type=report_type,
+                                        page_profile=page_profile)
+            check(f'不正な指定はエラー（{report_type}, {page_profile}）', False)
+        except ValueError:
+            check(f'不正な指定はエラー（{report_type}, {page_profile}）', True)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_financial_statement_excel()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+バックグラウンドジョブキューのテスト（メモリ上の SQLite を使用）
+登録 → 取り出し → 実行（成功・再試行・失敗）→ 古いジョブの削除 を確認する
+"""
+
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from werkzeug.datastructures import MultiDict
+
+import job_queue
+from job_queue import claim_next_job, cleanup_jobs, register_job, run_job, submit_job
+from models import db, BackgroundJob
+
+@register_job('test_text', roles=['accounting'], label='テスト')
+def text_job(params, context):
+    """パラメータを書き出すだけのジョブ"""
+    if params.get('mode') == 'invalid':
+        raise ValueError('入力エラー')
+    if params.get('mode') == 'crash':
+        raise RuntimeError('一時的なエラー')
+    context.progress(50, '書き込み中')
+    with open(context.artifact_path, 'w', encoding='utf-8') as artifact:
+        artifact.write(','.join(params.getlist('names')))
+    return 'test.txt', 'text/plain'
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def test_job_queue():
+    """ジョブキューのテスト"""
+    print("🗂️ バックグラウンドジョブキューテスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with tempfile.TemporaryDirectory() as artifact_dir, app.app_context():
+        job_queue.JOB_ARTIFACT_DIR = artifact_dir
+        db.create_all()
+
+        # 成功
+        job = submit_job('test_text', MultiDict([('names', '山田'), ('names', '佐藤')]))
+        claimed = claim_next_job()
+        check('登録したジョブを取り出せる', claimed is not None and claimed.id == job.id and claimed.status == 'running')
+        check('実行中のジョブは二重に取り出さない', claim_next_job() is None)
+        run_job(claimed)
+        job = db.session.get(BackgroundJob, job.id)
+        with open(job.artifact_path, encoding='utf-8') as artifact:
+            content = artifact.read()
+        check('成功時は成果物を保存', job.status == 'succeeded' and job.progress == 100 and content == '山田,佐藤')
+
+        # 予期しないエラーは待機後に再試行、上限で失敗
+        job = submit_job('test_text', MultiDict({'mode': 'crash'}), max_attempts=2)
+        run_job(claim_next_job())
+        job = db.session.get(BackgroundJob, job.id)
+        check('エラー時は再試行待ち', job.status == 'queued' and job.available_at > datetime.now())
+        check('待機時間中は取り出さない', claim_next_job() is None)
+        job.available_at = datetime.now()
+        db.session.commit()
+        run_job(claim_next_job())
+        job = db.session.get(BackgroundJob, job.id)
+        check('再試行上限で失敗', job.status == 'failed' and job.attempts == 2)
+
+        # 入力エラーは再試行しない
+        job = submit_job('test_text', MultiDict({'mode': 'invalid'}))
+        run_job(claim_next_job())
+        job = db.session.get(BackgroundJob, job.id)
+        check('入力エラーは即失敗', job.status == 'failed' and job.attempts == 1 and job.error == '入力エラー')
+
+        # 保存期間を過ぎたジョブと成果物を削除
+        BackgroundJob.query.update({'finished_at': datetime.now() - timedelta(days=2)})
+        db.session.commit()
+        artifact_path = BackgroundJob.query.filter_by(status='succeeded').first().artifact_path
+        removed = cleanup_jobs()
+        check('古いジョブを削除', removed == 3 and BackgroundJob.query.count() == 0 and not os.path.exists(artifact_path))
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_job_queue()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
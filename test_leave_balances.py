@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+年休残高の集計テスト（メモリ上の SQLite を使用）
+全従業員の付与合計・取得合計・残日数・直近の付与日が、従業員数に関わらず
+2回の集計クエリで求まることを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, Employee, LeaveCredit, LeaveRecord
+from leave_balances import leave_balance, leave_balances, next_auto_grant_date
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def test_leave_balances():
+    """年休残高の集計テスト"""
+    print("🏖️ 年休残高 集計テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        employees = [Employee(name=f'年休 テスト{i}', join_date=date(2020, 4, 1), status='在籍中') for i in range(30)]
+        employees.append(Employee(name='年休 退職者', join_date=date(2020, 4, 1), status='退職済'))
+        db.session.add_all(employees)
+        db.session.flush()
+        for employee in employees[:20]:
+            db.session.add(LeaveCredit(employee_id=employee.id, days_credited=10, date_credited=date(2023, 10, 1)))
+            db.session.add(LeaveCredit(employee_id=employee.id, days_credited=11, date_credited=date(2024, 10, 1)))
+            db.session.add(LeaveRecord(employee_id=employee.id, days_taken=3, date_taken=date(2024, 11, 5)))
+        db.session.add(LeaveRecord(employee_id=employees[25].id, days_taken=1, date_taken=date(2024, 12, 1)))
+        db.session.commit()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        balances = leave_balances()
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+        check('全従業員で2回のクエリ', len(statements) == 2)
+        first = balances[employees[0].id]
+        check('付与・取得・残日数', (first.credited, first.taken, first.remaining) == (21, 3, 18))
+        check('直近の付与日', first.last_credited == date(2024, 10, 1))
+        check('付与のない従業員は0', balances[employees[29].id].credited == 0
+              and balances[employees[29].id].last_credited is None)
+        check('付与なしの取得は残日数がマイナス', balances[employees[25].id].remaining == -1)
+
+        single = leave_balance(employees[0].id)
+        check('従業員1名', single.remaining == 18)
+        check('対象の絞り込み', set(leave_balances([employees[1].id])) == {employees[1].id})
+
+        as_of = date(2025, 1, 15)
+        check('次回付与は次の法定付与日', next_auto_grant_date(employees[0], first, as_of) == date(2025, 10, 1))
+        check('付与がなければまだ有効な未付与の法定付与日のうち最も古い日',
+              next_auto_grant_date(employees[29], balances[employees[29].id], as_of) == date(2023, 10, 1))
+        check('退職者は予定なし', next_auto_grant_date(employees[30], balances[employees[30].id], as_of) is None)
+
+        db.drop_all()
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_leave_balances()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+年次有給休暇の自動付与テスト（メモリ上の SQLite を使用）
+法定付与日（入社6か月後、以降1年ごと）と付与日数を暦どおりに求め、
+付与日を迎えた従業員分を一括登録し、再実行・同時実行しても二重に付与しないこと、
+実行が遅れてもまだ有効な付与日の分をすべて付与することを確認する
+"""
+
+import sys
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import event
+
+from models import db, Employee, LeaveCredit
+from leave_grants import grant_due_leave, grant_number_on, legal_grant_date, legal_leave_days, next_grant_date
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def test_legal_schedule():
+    """法定付与日・付与日数の計算テスト（データベース不要）"""
+    print("📅 法定付与日の計算テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    join_date = date(2024, 4, 1)
+    check('初回は入社6か月後', legal_grant_date(join_date, 0) == date(2024, 10, 1))
+    check('以降1年ごと', legal_grant_date(join_date, 2) == date(2026, 10, 1))
+    check('付与日の前日は未到来', grant_number_on(join_date, date(2024, 9, 30)) is None)
+    check('付与日当日に到来', grant_number_on(join_date, date(2024, 10, 1)) == 0)
+    check('月末入社は月末に付与', legal_grant_date(date(2023, 8, 31), 0) == date(2024, 2, 29)
+          and grant_number_on(date(2023, 8, 31), date(2024, 2, 29)) == 0)
+    check('付与日数 10・11・12・14日', [legal_leave_days(join_date, legal_grant_date(join_date, n))
+                                     for n in range(4)] == [10, 11, 12, 14])
+    check('6年6か月以降は20日', legal_leave_days(join_date, date(2040, 1, 1)) == 20)
+    check('6か月未満は0日', legal_leave_days(join_date, date(2024, 9, 30)) == 0)
+    check('付与済みなら次の付与日', next_grant_date(join_date, date(2024, 10, 1), date(2025, 3, 1)) == date(2025, 10, 1))
+    check('未付与なら直近の付与日', next_grant_date(join_date, None, date(2025, 3, 1)) == date(2024, 10, 1))
+
+    return success
+
+def test_grant_due_leave():
+    """付与日を迎えた従業員の一括付与テスト"""
+    print("\n🏖️ 年休一括付与テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        first = Employee(name='付与 初回', join_date=date(2024, 4, 1), status='在籍中')
+        yearly = Employee(name='付与 継続', join_date=date(2020, 4, 1), status='在籍中')
+        granted = Employee(name='付与 済み', join_date=date(2020, 4, 1), status='在籍中')
+        new = Employee(name='付与 新入社員', join_date=date(2024, 6, 1), status='在籍中')
+        never = Employee(name='付与 未付与', join_date=date(2020, 4, 1), status='在籍中')
+        retired = Employee(name='付与 退職者', join_date=date(2020, 4, 1), status='退職済')
+        employees = [first, yearly, granted, new, never, retired]
+        db.session.add_all(employees)
+        db.session.flush()
+        db.session.add(LeaveCredit(employee_id=yearly.id, days_credited=14, date_credited=date(2023, 10, 1)))
+        db.session.add(LeaveCredit(employee_id=granted.id, days_credited=16, date_credited=date(2024, 10, 3)))
+        db.session.commit()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        grants = grant_due_leave(date(2024, 10, 15))
+        db.session.commit()
+        event.remove(db.engine, 'before_cursor_execute', listener)
+
+        by_employee = {grant.employee_id: grant for grant in grants if grant.employee_id != never.id}
+        check('付与対象は初回・継続・未付与の3名', {grant.employee_id for grant in grants} == {first.id, yearly.id, never.id})
+        check('初回は10日を6か月後の日付で付与', (by_employee[first.id].days_credited,
+              by_employee[first.id].date_credited) == (10, date(2024, 10, 1)))
+        check('勤続4年6か月は16日', by_employee[yearly.id].days_credited == 16)
+        check('未付与ならまだ有効な直近2回分を付与', [(grant.date_credited, grant.days_credited) for grant in grants
+              if grant.employee_id == never.id] == [(date(2023, 10, 1), 14), (date(2024, 10, 1), 16)])
+        check('書き込みロック・判定・登録の3回のクエリ', len(statements) == 3 and statements[0] == 'BEGIN IMMEDIATE')
+        check('付与を登録', LeaveCredit.query.count() == 6)
+
+        again = grant_due_leave(date(2024, 10, 16))
+        db.session.commit()
+        check('再実行しても二重に付与しない', again == [] and LeaveCredit.query.count() == 6)
+
+        next_year = grant_due_leave(date(2025, 10, 1))
+        db.session.rollback()
+        check('翌年の付与日に全員へ付与', {grant.employee_id for grant in next_year}
+              == {first.id, yearly.id, granted.id, new.id, never.id})
+
+        db.drop_all()
+
+    return success
+
+def test_concurrent_runs():
+    """同時に実行しても二重に付与しないことのテスト（一時ファイルの SQLite を使用）"""
+    print("\n🔒 年休一括付与 同時実行テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask(__name__)
+        app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(directory, 'grants.db')}"
+        db.init_app(app)
+        with app.app_context():
+            db.create_all()
+            db.session.add(Employee(name='同時 テスト', join_date=date(2024, 4, 1), status='在籍中'))
+            db.session.commit()
+
+        granted = threading.Event()
+        results = {}
+
+        def run(name, hold_seconds):
+            with app.app_context():
+                grants = grant_due_leave(date(2024, 10, 15))
+                if hold_seconds:
+                    # 付与を登録したままコミット前に待ち、後の実行と重ねる
+                    granted.set()
+                    time.sleep(hold_seconds)
+                db.session.commit()
+                results[name] = len(grants)
+
+        first = threading.Thread(target=run, args=('first', 0.5))
+        first.start()
+        granted.wait()
+        second = threading.Thread(target=run, args=('second', 0))
+        second.start()
+        first.join()
+        second.join()
+
+        with app.app_context():
+            check('後の実行は先の付与を待ってから判定', results == {'first': 1, 'second': 0})
+            check('付与は1件だけ', LeaveCredit.query.count() == 1)
+            db.session.remove()
+            db.engine.dispose()
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_legal_schedule()
+    success = test_grant_due_leave() and success
+    success = test_concurrent_runs() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
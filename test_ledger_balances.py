@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+総勘定元帳の月次残高のテスト（メモリ上の SQLite を使用）
+仕訳の登録・金額/科目/日付の修正・削除のたびに月次残高が増分更新され、
+仕訳からの全件再作成と一致することを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, User, AccountingAccount, JournalEntry, JournalEntryDetail, GeneralLedger
+from ledger_balances import (closing_balances, ledger_lines, ledger_page, ledger_totals, parse_ledger_cursor,
+                             rebuild_general_ledger, verify_general_ledger)
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def ledger_rows():
+    return [(row.account_id, row.year, row.month, row.opening_balance, row.debit_total,
+             row.credit_total, row.closing_balance)
+            for row in GeneralLedger.query.order_by(GeneralLedger.account_id, GeneralLedger.year, GeneralLedger.month)]
+
+def add_entry(user, entry_date, debit_account, credit_account, amount):
+    entry = JournalEntry(entry_date=entry_date, description='テスト', total_amount=amount, created_by=user.id)
+    db.session.add(entry)
+    db.session.flush()
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=debit_account.id, debit_amount=amount, credit_amount=0))
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=credit_account.id, debit_amount=0, credit_amount=amount))
+    db.session.commit()
+    return entry
+
+def test_ledger_balances():
+    """総勘定元帳の月次残高のテスト"""
+    print("📒 総勘定元帳 月次残高テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='accounting@example.com', password='x', role='accounting')
+        cash = AccountingAccount(account_code='111', account_name='現金', account_type='資産')
+        sales = AccountingAccount(account_code='411', account_name='売上高', account_type='収益')
+        supplies = AccountingAccount(account_code='521', account_name='消耗品費', account_type='費用')
+        db.session.add_all([user, cash, sales, supplies])
+        db.session.commit()
+
+        # 登録
+        january = add_entry(user, date(2025, 1, 10), cash, sales, 10000)
+        march = add_entry(user, date(2025, 3, 5), supplies, cash, 3000)
+        check('登録で月次残高が作成される', (cash.id, 2025, 3, 10000, 0, 3000, 7000) in ledger_rows())
+
+        # 前の月に追加すると後の月の残高も繰り下がる
+        add_entry(user, date(2024, 12, 20), cash, sales, 500)
+        check('過去月の登録で以降の残高が更新される',
+              (cash.id, 2025, 1, 500, 10000, 0, 10500) in ledger_rows()
+              and (cash.id, 2025, 3, 10500, 0, 3000, 7500) in ledger_rows())
+
+        # 金額・科目の修正
+        detail = JournalEntryDetail.query.filter_by(journal_entry_id=march.id, account_id=supplies.id).one()
+        detail.debit_amount = 4000
+        detail.account_id = cash.id
+        credit_detail = JournalEntryDetail.query.filter_by(journal_entry_id=march.id, credit_amount=3000).one()
+        credit_detail.credit_amount = 4000
+        db.session.commit()
+        check('金額・科目の修正が反映される', not verify_general_ledger())
+
+        # 仕訳日付の修正（明細は変更しない）
+        january.entry_date = date(2025, 2, 1)
+        db.session.commit()
+        check('仕訳日付の修正で月が移る', ledger_totals((2025, 2), (2025, 2)).get(cash.id) == (10000, 0)
+              and ledger_totals((2025, 1), (2025, 1)).get(cash.id) == (0, 0))
+        check('日付修正後も再集計と一致', not verify_general_ledger())
+
+        # 削除
+        for entry_detail in JournalEntryDetail.query.filter_by(journal_entry_id=january.id).all():
+            db.session.delete(entry_detail)
+        db.session.delete(january)
+        db.session.commit()
+        check('削除が反映される', not verify_general_ledger())
+        check('月末残高（借方プラス）', closing_balances(2025, 12) == {cash.id: 500, sales.id: -500, supplies.id: 0})
+
+        # 元帳明細（相手科目・差引残高）
+        lines = ledger_lines(cash.id, date(2024, 1, 1), date(2026, 1, 1), opening_balance=1000)
+        check('元帳明細の相手科目と差引残高',
+              [(line.opposite_account_name, line.running_balance) for line in lines]
+              == [('売上高', 1500), ('現金', 5500), ('現金', 1500)])
+
+        # ページ送り（1件ずつ）でも繰越残高から同じ差引残高になる
+        paged, cursor = [], None
+        while True:
+            page, carried, next_cursor = ledger_page(cash.id, date(2024, 1, 1), date(2026, 1, 1),
+                                                     opening_balance=1000, cursor=cursor, page_size=1)
+            paged += [(line.id, line.running_balance) for line in page]
+            if not next_cursor:
+                break
+            cursor = parse_ledger_cursor(next_cursor)
+        check('ページ送りの差引残高が全件表示と一致', paged == [(line.id, line.running_balance) for line in lines])
+
+        incremental = [row for row in ledger_rows() if row[4] or row[5]]
+        rebuild_general_ledger()
+        db.session.commit()
+        check('全件再作成と増分更新の結果が一致', ledger_rows() == incremental)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_ledger_balances()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
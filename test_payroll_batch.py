@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+給与一括計算エンジンのテスト
+一括計算と従業員単位の計算が同じ結果になること、
+給与明細を発行しても賃金台帳が給与計算結果・明細と一致したままであることを確認する
+"""
+
+import sys
+import os
+from datetime import date, time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import app, db, calculate_monthly_payroll
+from models import Employee, EmployeePayrollSettings, WorkingTimeRecord, PayrollCalculation, PayrollSlip, User, WageRegister
+from payroll_batch import PayrollBatchEngine
+from wage_register_manager import WageRegisterManager
+
+TEST_YEAR = 2099
+TEST_MONTH = 6
+
+def create_test_employees():
+    """テスト従業員・給与設定・勤怠データを作成"""
+    employees = []
+    for name, wage_type, base_salary, hourly_rate in [
+        ('一括計算テスト月給', 'monthly', 300000, 0),
+        ('一括計算テスト時給', 'hourly', 0, 1200),
+    ]:
+        employee = Employee(name=name, status='在籍中', join_date=date(2090, 4, 1),
+                            wage_type=wage_type, standard_working_hours=8.0, standard_working_days=5)
+        db.session.add(employee)
+        db.session.flush()
+        db.session.add(EmployeePayrollSettings(
+            employee_id=employee.id, wage_type=wage_type, base_salary=base_salary,
+            hourly_rate=hourly_rate, effective_from=date(2090, 1, 1)
+        ))
+        # 平日9時間勤務（週45時間 → 週40時間超過分が法定外残業）
+        for day in range(1, 31):
+            work_date = date(TEST_YEAR, TEST_MONTH, day)
+            if work_date.weekday() >= 5:
+                continue
+            db.session.add(WorkingTimeRecord(
+                employee_id=employee.id, work_date=work_date,
+                start_time=time(9, 0), end_time=time(19, 0), break_time_minutes=60,
+                regular_working_minutes=540, night_working_minutes=0
+            ))
+        employees.append(employee)
+    db.session.commit()
+    return employees
+
+def cleanup(employee_ids):
+    """テストデータを削除"""
+    PayrollSlip.query.filter(PayrollSlip.employee_id.in_(employee_ids)).delete(synchronize_session=False)
+    PayrollCalculation.query.filter(PayrollCalculation.employee_id.in_(employee_ids)).delete(synchronize_session=False)
+    WorkingTimeRecord.query.filter(WorkingTimeRecord.employee_id.in_(employee_ids)).delete(synchronize_session=False)
+    EmployeePayrollSettings.query.filter(EmployeePayrollSettings.employee_id.in_(employee_ids)).delete(synchronize_session=False)
+    WageRegister.query.filter(WageRegister.employee_id.in_(employee_ids)).delete(synchronize_session=False)
+    Employee.query.filter(Employee.id.in_(employee_ids)).delete(synchronize_session=False)
+    db.session.commit()
+
+def test_batch_matches_single_calculation():
+    """一括計算と単独計算の結果一致テスト"""
+    print("🧮 給与一括計算エンジンテスト")
+    print("=" * 50)
+
+    with app.app_context():
+        employees = create_test_employees()
+        employee_ids = [employee.id for employee in employees]
+
+        try:
+            # 一括計算（存在しない従業員IDを含める）
+            result = PayrollBatchEngine(TEST_YEAR, TEST_MONTH).run(employee_ids + [-1])
+            batch_results = {
+                employee_id: (payroll.gross_salary, payroll.overtime_minutes, payroll.regular_working_minutes)
+                for employee_id, payroll in result['payrolls'].items()
+            }
+            print(f"一括計算: 成功{len(result['payrolls'])}名 / エラー{len(result['errors'])}名")
+
+            if len(result['payrolls']) != len(employee_ids):
+                print("❌ 一括計算の成功件数が一致しません")
+                return False
+            if len(result['errors']) != 1 or result['errors'][0]['employee_id'] != -1:
+                print(f"❌ 従業員別エラーが正しく報告されていません: {result['errors']}")
+                return False
+
+            # 従業員単位で再計算して比較
+            for employee_id in employee_ids:
+                payroll = calculate_monthly_payroll(employee_id, TEST_YEAR, TEST_MONTH)
+                single = (payroll.gross_salary, payroll.overtime_minutes, payroll.regular_working_minutes)
+                print(f"   従業員ID {employee_id}: 一括={batch_results[employee_id]} 単独={single}")
+                if batch_results[employee_id] != single:
+                    print("❌ 一括計算と単独計算の結果が一致しません")
+                    return False
+                if payroll.overtime_minutes <= 0:
+                    print("❌ 週40時間超過分が法定外残業に再分類されていません")
+                    return False
+
+            count = PayrollCalculation.query.filter(
+                PayrollCalculation.employee_id.in_(employee_ids),
+                PayrollCalculation.year == TEST_YEAR,
+                PayrollCalculation.month == TEST_MONTH
+            ).count()
+            if count != len(employee_ids):
+                print(f"❌ 再計算後の給与計算件数が不正です: {count}")
+                return False
+
+            print("✅ 一括計算と単独計算の結果が一致しました")
+            return True
+        finally:
+            cleanup(employee_ids)
+
+def test_issued_slip_updates_wage_register():
+    """給与計算 → 明細発行 → 賃金台帳の突き合わせテスト"""
+    print("\n🧾 明細発行と賃金台帳の一致テスト")
+    print("=" * 50)
+
+    with app.app_context():
+        employees = create_test_employees()
+        employee_ids = [employee.id for employee in employees]
+        user = User.query.filter_by(role='accounting').first()
+        if user is None:
+            print("❌ 経理ユーザーがいないためテストできません")
+            cleanup(employee_ids)
+            return False
+
+        try:
+            PayrollBatchEngine(TEST_YEAR, TEST_MONTH).run(employee_ids)
+
+            app.config['WTF_CSRF_ENABLED'] = False
+            client = app.test_client()
+            with client.session_transaction() as session:
+                session['_user_id'] = str(user.id)
+                session['_fresh'] = True
+            response = client.post(f'/create_payroll_slip/{employee_ids[0]}/{TEST_YEAR}/{TEST_MONTH}')
+            db.session.expire_all()
+            slip = PayrollSlip.query.filter_by(employee_id=employee_ids[0], slip_year=TEST_YEAR,
+                                               slip_month=TEST_MONTH).first()
+            if slip is None:
+                print(f"❌ 給与明細が発行されていません（HTTP {response.status_code}）")
+                return False
+
+            result = WageRegisterManager().reconcile(TEST_YEAR, TEST_MONTH)
+            print(f"   突き合わせ: {result['checked']}件 / 不足{len(result['missing'])}件 / "
+                  f"不一致{len(result['mismatched'])}件 / 余分{len(result['orphaned'])}件")
+            if result['missing'] or result['mismatched'] or result['orphaned']:
+                print(f"❌ 明細発行後の賃金台帳が一致しません: {result['mismatched'][:1]}")
+                return False
+
+            register = WageRegister.query.filter_by(employee_id=employee_ids[0], year=TEST_YEAR,
+                                                    month=TEST_MONTH).first()
+            if (register.net_salary, register.working_days) != (slip.net_salary, slip.working_days):
+                print("❌ 賃金台帳に明細の値が書き込まれていません")
+                return False
+
+            print("✅ 明細発行後も賃金台帳は給与計算結果・明細と一致しています")
+            return True
+        finally:
+            cleanup(employee_ids)
+
+def main():
+    """メイン実行"""
+    success = test_batch_matches_single_calculation()
+    success = test_issued_slip_updates_wage_register() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
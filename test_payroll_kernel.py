@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+給与計算カーネルのテスト（データベース不要）
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from payroll_kernel import compute_payroll_roll, rows_to_columns, columns_to_rows, calculate_annual_working_hours
+
+def make_row(**overrides):
+    """テスト用入力行を作成"""
+    row = {
+        'wage_type': 'monthly',
+        'employee_wage_type': 'monthly',
+        'base_salary': 0,
+        'hourly_rate': 0,
+        'daily_rate': 0,
+        'standard_working_hours': 8.0,
+        'standard_working_days': 5,
+        'regular_working_minutes': 0,
+        'legal_overtime_minutes': 0,
+        'overtime_minutes': 0,
+        'legal_holiday_minutes': 0,
+        'holiday_minutes': 0,
+        'night_working_minutes': 0,
+        'daily_wage_working_days': 0,
+        'absence_days': 0,
+        'company_closure_days': 0,
+    }
+    row.update(overrides)
+    return row
+
+def test_payroll_kernel():
+    """給与形態別の計算テスト"""
+    print("🧮 給与計算カーネルテスト")
+    print("=" * 50)
+
+    year = 2025
+    annual_working_hours, annual_working_days = calculate_annual_working_hours(year)
+    print(f"年間所定労働時間: {annual_working_hours}時間 / {annual_working_days}日")
+
+    rows = [
+        # 月給制: 法定外残業10時間・欠勤1日
+        make_row(base_salary=300000, regular_working_minutes=9600, overtime_minutes=600, absence_days=1),
+        # 日給制: 20日出勤・法定休日8時間
+        make_row(wage_type='daily', employee_wage_type='daily', daily_rate=12000,
+                 regular_working_minutes=9600, legal_holiday_minutes=480, daily_wage_working_days=20),
+        # 時給制: 法定外残業2時間
+        make_row(wage_type='hourly', employee_wage_type='hourly', hourly_rate=1500,
+                 regular_working_minutes=6000, overtime_minutes=120),
+    ]
+    roll = columns_to_rows(compute_payroll_roll(rows_to_columns(rows), year))
+
+    monthly_rate = 300000 * 12 / annual_working_hours
+    expected_monthly_overtime = int(600 / 60 * monthly_rate * 1.25)
+    expected_monthly_absence = int(1 * (300000 / (annual_working_days / 12)))
+
+    checks = [
+        ('月給制 基本給', roll[0]['base_salary'], 300000),
+        ('月給制 時間外手当', roll[0]['overtime_allowance'], expected_monthly_overtime),
+        ('月給制 欠勤控除', roll[0]['absence_deduction'], expected_monthly_absence),
+        ('月給制 総支給額', roll[0]['gross_salary'],
+         300000 + expected_monthly_overtime - expected_monthly_absence),
+        ('日給制 基本給', roll[1]['base_salary'], 240000),
+        ('日給制 休日手当', roll[1]['holiday_allowance'], int(480 / 60 * (12000 / 8) * 1.35)),
+        ('時給制 基本給', roll[2]['base_salary'], 150000),
+        ('時給制 時間外手当', roll[2]['overtime_allowance'], int(120 / 60 * 1500 * 1.25)),
+    ]
+
+    success = True
+    for label, actual, expected in checks:
+        mark = "✅" if actual == expected else "❌"
+        print(f"   {mark} {label}: {actual:,} (期待値 {expected:,})")
+        success = success and actual == expected
+
+    # 空の入力でも計算できること
+    empty = compute_payroll_roll(rows_to_columns([]), year)
+    if any(empty[column] for column in empty):
+        print("❌ 空入力の結果が空ではありません")
+        success = False
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_payroll_kernel()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+給与明細書PDF一括生成のテスト（データベース不要）
+逐次描画とプロセスプールでの並列描画が同じ件数のPDFをZIPに書き込むことを確認する
+"""
+
+import sys
+import os
+import io
+import zipfile
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models import PayrollSlip, PayrollCalculation
+from payroll_slip_bulk import MIN_PARALLEL_SLIPS, render_slips_to_zip
+
+def make_job(index):
+    """テスト用の描画ジョブを作成"""
+    payroll_slip = SimpleNamespace(**{column.name: 0 for column in PayrollSlip.__table__.columns})
+    payroll_slip.slip_year = 2025
+    payroll_slip.slip_month = 4
+    payroll_slip.base_salary = 280000 + index
+    payroll_slip.gross_salary = 280000 + index
+    payroll_slip.net_salary = 250000 + index
+    payroll_slip.issued_at = datetime(2025, 4, 25)
+    payroll_slip.remarks = ''
+    payroll_slip.other_allowances_detail = []
+    payroll_slip.other_deductions_detail = []
+
+    payroll_calculation = SimpleNamespace(**{column.name: 0 for column in PayrollCalculation.__table__.columns})
+    payroll_calculation.regular_working_minutes = 9600
+
+    return {
+        'employee_id': index,
+        'filename': f'2025年4月_テスト{index}_給与明細書.pdf',
+        'payroll_slip': payroll_slip,
+        'employee': SimpleNamespace(id=index, name=f'テスト{index}'),
+        'payroll_calculation': payroll_calculation,
+    }
+
+def render(jobs, max_workers):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        result = render_slips_to_zip(jobs, zip_file, max_workers=max_workers)
+    with zipfile.ZipFile(buffer) as zip_file:
+        names = sorted(zip_file.namelist())
+    return result, names
+
+def test_bulk_slip_rendering():
+    """逐次・並列描画のテスト"""
+    print("🧾 給与明細書PDF一括生成テスト")
+    print("=" * 50)
+
+    jobs = [make_job(index) for index in range(MIN_PARALLEL_SLIPS)]
+    expected_names = sorted(job['filename'] for job in jobs)
+
+    success = True
+    for label, max_workers in [('逐次描画', 1), ('並列描画', 2)]:
+        result, names = render(jobs, max_workers)
+        ok = result['generated'] == len(jobs) and not result['errors'] and names == expected_names
+        mark = "✅" if ok else "❌"
+        print(f"   {mark} {label}: {result['generated']}件生成 / エラー{len(result['errors'])}件")
+        success = success and ok
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_bulk_slip_rendering()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+PDFフォント登録のテスト（データベース不要）
+フォント登録が1回だけ行われ、文字幅の計測結果が使い回されることを確認する
+"""
+
+import sys
+import os
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from reportlab.pdfbase import pdfmetrics
+
+import pdf_fonts
+from pdf_fonts import ipaex_font, japanese_font, japanese_font_pair, string_width, warm_up_fonts
+
+def test_pdf_fonts():
+    """フォント登録・文字幅キャッシュのテスト"""
+    print("🔤 PDFフォント登録テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    warm_up_fonts()
+    font_name = japanese_font()
+    check(f'日本語フォント登録: {font_name}', font_name in pdfmetrics.getRegisteredFontNames() or font_name == 'Helvetica')
+
+    # 2回目以降は登録処理を呼ばない
+    with mock.patch.object(pdf_fonts.pdfmetrics, 'registerFont') as register:
+        japanese_font()
+        japanese_font_pair()
+        ipaex_font()
+        warm_up_fonts()
+    check('2回目以降は再登録しない', register.call_count == 0)
+
+    text = '基本給　２８０，０００円'
+    expected = pdfmetrics.stringWidth(text, font_name, 10)
+    check('文字幅は ReportLab と同じ', string_width(text, font_name, 10) == expected)
+
+    hits = string_width.cache_info().hits
+    string_width(text, font_name, 10)
+    check('同じ文字列は計測結果を使い回す', string_width.cache_info().hits == hits + 1)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_pdf_fonts()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+帳票の並列描画のテスト（データベース不要）
+ワーカー数×IN_FLIGHT_PER_WORKER 件を超えるジョブを渡しても、
+投入済みで受け取っていないジョブが上限を超えないことを確認する
+（プロセスの起動を避けるため、プロセスプールをスレッドプールに差し替える）
+"""
+
+import sys
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import render_pool
+from render_pool import IN_FLIGHT_PER_WORKER, iter_rendered
+
+class CountingExecutor(ThreadPoolExecutor):
+    """投入したジョブ数を数えるスレッドプール（mp_context は無視する）"""
+
+    submitted = 0
+
+    def __init__(self, max_workers=None, mp_context=None, initializer=None):
+        super().__init__(max_workers=max_workers, initializer=initializer)
+
+    def submit(self, *args, **kwargs):
+        CountingExecutor.submitted += 1
+        return super().submit(*args, **kwargs)
+
+def render_number(job, factor):
+    if job['fail']:
+        raise ValueError('描画できません')
+    return job['number'] * factor
+
+def test_bounded_window():
+    """投入済みジョブ数の上限テスト"""
+    print("🖨️ 並列描画 投入数の上限テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    max_workers = 2
+    window = max_workers * IN_FLIGHT_PER_WORKER
+    jobs = [{'number': number, 'fail': number == 7} for number in range(40)]
+
+    original = render_pool.ProcessPoolExecutor
+    render_pool.ProcessPoolExecutor = CountingExecutor
+    try:
+        CountingExecutor.submitted = 0
+        consumed = 0
+        peak = 0
+        results = {}
+        errors = []
+        for job, result, error in iter_rendered(jobs, render_number, args=(10,), max_workers=max_workers):
+            peak = max(peak, CountingExecutor.submitted - consumed)
+            consumed += 1
+            if error:
+                errors.append((job['number'], str(error)))
+            else:
+                results[job['number']] = result
+            # 受け取り側が遅い（ZIP への書き込みなど）場合
+            time.sleep(0.005)
+
+        check(f'投入済みで受け取っていないジョブは{window}件まで（最大 {peak}件）', 0 < peak <= window)
+        check('全ジョブを投入', CountingExecutor.submitted == len(jobs))
+        check('全ジョブの結果を返す', consumed == len(jobs))
+        check('描画結果', results == {number: number * 10 for number in range(40) if number != 7})
+        check('失敗したジョブはエラーを返す', errors == [(7, '描画できません')])
+
+        # 途中で受け取りをやめても、残りのジョブは投入しない
+        CountingExecutor.submitted = 0
+        rendered = iter_rendered(jobs, render_number, args=(10,), max_workers=max_workers)
+        next(rendered)
+        rendered.close()
+        check('中断時は残りのジョブを投入しない', CountingExecutor.submitted <= window)
+    finally:
+        render_pool.ProcessPoolExecutor = original
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_bounded_window()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
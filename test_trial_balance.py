@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+試算表のテスト（メモリ上の SQLite を使用）
+勘定科目別の期首残高・借方・貸方が1回の集計で得られ、仕訳・期首残高の変更で
+キャッシュが作り直されることを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, User, AccountingAccount, AccountingPeriod, JournalEntry, JournalEntryDetail, OpeningBalance
+import ledger_balances  # 仕訳の変更を月次残高・世代番号に反映するイベントを登録
+from fiscal_periods import fiscal_date_range, fiscal_year_range
+from trial_balance import build_trial_balance, trial_balance_for
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def add_entry(user, entry_date, debit_account, credit_account, amount):
+    entry = JournalEntry(entry_date=entry_date, description='テスト', total_amount=amount, created_by=user.id)
+    db.session.add(entry)
+    db.session.flush()
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=debit_account.id, debit_amount=amount, credit_amount=0))
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=credit_account.id, debit_amount=0, credit_amount=amount))
+    db.session.commit()
+
+def test_trial_balance():
+    """試算表のテスト"""
+    print("🧮 試算表テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='accounting@example.com', password='x', role='accounting')
+        cash = AccountingAccount(account_code='111', account_name='現金', account_type='資産')
+        loan = AccountingAccount(account_code='211', account_name='短期借入金', account_type='負債')
+        sales = AccountingAccount(account_code='411', account_name='売上高', account_type='収益')
+        salary = AccountingAccount(account_code='521', account_name='給料手当', account_type='費用')
+        db.session.add_all([user, cash, loan, sales, salary])
+        db.session.commit()
+        db.session.add(OpeningBalance(fiscal_year=2025, account_id=cash.id, opening_balance=50000))
+        db.session.add(AccountingPeriod(fiscal_year=2025, start_date=date(2025, 4, 1), end_date=date(2026, 3, 31)))
+        db.session.commit()
+
+        # 会計年度は AccountingPeriod の期間（未作成の年度は4月始まり）
+        check('会計年度の期間', fiscal_year_range(2025) == (date(2025, 4, 1), date(2026, 4, 1))
+              and fiscal_year_range(2026) == (date(2026, 4, 1), date(2027, 4, 1)))
+        check('年度内の月は翌年の1〜3月も含む', fiscal_date_range(2025, 2) == (date(2026, 2, 1), date(2026, 3, 1))
+              and fiscal_date_range(2025, 4) == (date(2025, 4, 1), date(2025, 5, 1)))
+
+        add_entry(user, date(2025, 3, 31), cash, sales, 777)  # 前年度
+        add_entry(user, date(2025, 5, 1), cash, sales, 300000)
+        add_entry(user, date(2025, 7, 15), salary, cash, 120000)
+        add_entry(user, date(2026, 1, 30), cash, loan, 100000)
+        add_entry(user, date(2026, 4, 5), cash, sales, 999)  # 翌年度
+
+        tb = trial_balance_for(2025)
+        cash_line = tb.line_named('現金')
+        check('期首・借方・貸方・期末', (cash_line.opening, cash_line.debit, cash_line.credit, cash_line.closing)
+              == (50000, 400000, 120000, 330000))
+        check('科目区分の向きで表示', [(line.account_name, line.balance) for line in tb.statement_lines('負債')]
+              == [('短期借入金', 100000)])
+        check('当期純利益', tb.net_income == 180000)
+        check('月単位でない期間は仕訳明細から集計（同じ結果）',
+              [(line.account_id, line.debit, line.credit) for line in build_trial_balance(2025, date(2025, 4, 1), date(2026, 3, 31)).lines]
+              == [(line.account_id, line.debit, line.credit) for line in tb.lines])
+
+        check('変更がなければキャッシュを返す', trial_balance_for(2025) is tb)
+
+        add_entry(user, date(2026, 3, 31), salary, cash, 1000)
+        refreshed = trial_balance_for(2025)
+        check('仕訳の登録でキャッシュを作り直す', refreshed is not tb and refreshed.net_income == 179000)
+
+        opening = OpeningBalance.query.filter_by(fiscal_year=2025, account_id=cash.id).one()
+        opening.opening_balance = 70000
+        db.session.commit()
+        check('期首残高の変更でキャッシュを作り直す', trial_balance_for(2025).line_named('現金').opening == 70000)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_trial_balance()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
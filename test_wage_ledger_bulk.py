@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+賃金台帳PDF一括作成のテスト（データベース不要）
+給与明細から12ヶ月分のリストと年間合計を作り、JSON 文字列を介さずに
+メモリ上へ描画できることを確認する
+"""
+
+import sys
+import os
+import json
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from wage_ledger_bulk import WAGE_LEDGER_FIELDS, iter_rendered_ledgers, wage_ledger_data
+from wage_ledger_pdf_generator import WageLedgerPDFGenerator
+
+def make_slip(slip_id, month, gross_salary, **values):
+    slip = SimpleNamespace(id=slip_id, slip_month=month, other_allowances_json=None, other_deductions_json=None,
+                           **{field: 0 for field in WAGE_LEDGER_FIELDS})
+    slip.gross_salary = gross_salary
+    slip.total_deduction = 40000
+    slip.net_salary = gross_salary - 40000
+    for key, value in values.items():
+        setattr(slip, key, value)
+    return slip
+
+def test_wage_ledger_bulk():
+    """賃金台帳データの作成・描画のテスト"""
+    print("📒 賃金台帳PDF一括作成テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    slips = [
+        make_slip(1, 4, 300000, overtime_hours=10.5,
+                  other_allowances_json=json.dumps([{'name': '資格手当', 'amount': 5000}])),
+        make_slip(2, 5, 310000, overtime_hours=12.0),
+        make_slip(3, 5, 320000, overtime_hours=8.0),  # 同じ月の作り直し（後の明細を使う）
+    ]
+    wage_data = wage_ledger_data(slips)
+
+    check('月別データは12ヶ月のリスト', wage_data['monthly_gross_salary'] == [None] * 3 + [300000, 320000] + [None] * 7)
+    check('同じ月は後の明細で年間合計', wage_data['annual_gross_salary'] == 620000)
+    check('時間は小数で合計', wage_data['annual_overtime_hours'] == 18.5)
+    check('手当の明細を展開', wage_data['monthly_allowance1'][3] == 5000 and wage_data['annual_allowance1'] == 5000)
+    check('台帳の合計行に対応付け', wage_data['monthly_gross_pay'] == wage_data['monthly_gross_salary']
+          and wage_data['annual_net_pay'] == 540000 and wage_data['annual_deductions'] == 80000)
+    check('値はJSON文字列ではない', not any(isinstance(value, str) for value in wage_data.values()))
+
+    generator = WageLedgerPDFGenerator(company_name='株式会社テスト')
+    employee_data = {'id': 1, 'name': '台帳 テスト', 'employee_number': 'EMP001'}
+    pdf_data = generator.render_wage_ledger_pdf(employee_data, wage_data, 2025)
+    check('メモリ上に描画', pdf_data.startswith(b'%PDF'))
+    check('従来のJSON形式も受け付ける', generator._monthly_values(
+        {'monthly_base_salary': json.dumps({'4': 250000})}, 'monthly_base_salary')[3] == 250000)
+
+    jobs = [{'employee_id': i, 'filename': f'{i}.pdf', 'employee_data': employee_data, 'wage_data': wage_data}
+            for i in range(2)]
+    jobs.append({'employee_id': 9, 'filename': '9.pdf', 'employee_data': employee_data, 'wage_data': None})
+    results = {job['employee_id']: (pdf, error) for job, pdf, error in iter_rendered_ledgers(jobs, 2025)}
+    check('全員分を描画', all(results[i][0].startswith(b'%PDF') for i in range(2)))
+    check('失敗した従業員はエラーとして返す', results[9][0] is None and results[9][1] is not None)
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_wage_ledger_bulk()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
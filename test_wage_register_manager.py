@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+賃金台帳管理のテスト（メモリ上の SQLite を使用）
+1か月分の更新が該当月の1行だけを書き換え、年間合計が集計クエリで求まること、
+給与計算結果・給与明細との突き合わせで食い違いを検出・修復できることを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, Employee, PayrollCalculation, PayrollSlip, WageRegister
+from wage_register_manager import WageRegisterManager, register_values
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def payroll_data(gross_salary, overtime_hours=0.0):
+    return {
+        'base_salary': 250000,
+        'overtime_allowance': gross_salary - 250000,
+        'gross_salary': gross_salary,
+        'total_deductions': 40000,
+        'net_salary': gross_salary - 40000,
+        'working_days': 20,
+        'overtime_hours': overtime_hours,
+    }
+
+def test_wage_register_manager():
+    """月ごとの upsert・年間合計・取得形式のテスト"""
+    print("📒 賃金台帳管理テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        employees = [Employee(name=f'台帳 テスト{i}', birth_date=date(1990, 1, 1), status='在籍中') for i in range(2)]
+        db.session.add_all(employees)
+        db.session.commit()
+        first, second = (employee.id for employee in employees)
+
+        manager = WageRegisterManager()
+        check('一括更新', manager.update_wage_registers(2025, 4, [
+            (first, payroll_data(300000, 10.5)), (second, payroll_data(280000))
+        ]) == 2)
+        check('単独更新', manager.update_wage_register(first, 2025, 5, payroll_data(310000, 12.0)))
+
+        # 同じ月の再計算は該当月の1行を上書きする
+        manager.update_wage_register(first, 2025, 4, payroll_data(305000, 11.0))
+        rows = WageRegister.query.filter_by(employee_id=first, year=2025).order_by(WageRegister.month).all()
+        check('従業員・月ごとに1行', [row.month for row in rows] == [4, 5])
+        check('再計算で上書き', rows[0].gross_salary == 305000 and rows[0].overtime_hours == 11.0)
+        check('未指定の項目は0', rows[0].resident_tax == 0 and rows[0].paid_leave_days == 0.0)
+
+        totals = manager.annual_totals(2025)
+        check('年間合計（集計クエリ）', totals[first]['gross_salary'] == 615000 and totals[first]['months'] == 2
+              and totals[second]['net_salary'] == 240000)
+        check('時間の年間合計', totals[first]['overtime_hours'] == 23.0)
+        check('従業員の絞り込み', list(manager.annual_totals(2025, [second])) == [second])
+        check('データのない年', manager.annual_totals(2024) == {})
+
+        data = manager.get_wage_register_data(first, 2025)
+        check('月別データ', data['monthly_gross_salary'] == {'4': 305000, '5': 310000})
+        check('年間合計', data['annual_gross_salary'] == 615000 and data['annual_working_days'] == 40)
+        check('データがなければ None', manager.get_wage_register_data(second, 2024) is None)
+
+        # コミット前の書き込みはロールバックで取り消される
+        manager.stage_wage_registers(2025, 6, [(second, payroll_data(999999))])
+        db.session.rollback()
+        check('コミットは呼び出し側', manager.get_wage_register_data(second, 2025)['monthly_gross_salary'] == {'4': 280000})
+
+        db.drop_all()
+
+    return success
+
+def test_reconcile():
+    """給与計算結果・給与明細との突き合わせのテスト"""
+    print("\n🔍 賃金台帳 突き合わせテスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        employees = [Employee(name=f'照合 テスト{i}', birth_date=date(1990, 1, 1), status='在籍中') for i in range(3)]
+        db.session.add_all(employees)
+        db.session.flush()
+        first, second, third = (employee.id for employee in employees)
+
+        calculations = [PayrollCalculation(employee_id=employee_id, year=2025, month=4, wage_type='monthly',
+                                           base_salary=250000, gross_salary=gross_salary, net_salary=gross_salary,
+                                           overtime_minutes=600, legal_overtime_minutes=30, absence_days=1.0)
+                        for employee_id, gross_salary in ((first, 300000), (second, 280000), (third, 260000))]
+        db.session.add_all(calculations)
+        db.session.flush()
+        # 発行済みの明細（手修正あり）は明細の値を優先する
+        db.session.add(PayrollSlip(employee_id=second, payroll_calculation_id=calculations[1].id, slip_year=2025,
+                                   slip_month=4, base_salary=250000, gross_salary=285000, net_salary=250000,
+                                   total_deduction=35000, working_days=21))
+        db.session.commit()
+
+        values = register_values(calculations[0], working_days=20)
+        check('残業時間は計算結果の分から', values['overtime_hours'] == 10.5 and values['working_days'] == 20)
+        check('出勤日数が不明なら None', register_values(calculations[0])['working_days'] is None)
+
+        manager = WageRegisterManager()
+        manager.stage_wage_registers(2025, 4, [(first, values)])
+        manager.stage_wage_registers(2025, 4, [(second, register_values(calculations[1]))])
+        manager.stage_wage_registers(2025, 5, [(third, values)])
+        db.session.commit()
+
+        result = manager.reconcile(2025)
+        check('件数', result['checked'] == 3)
+        check('行のない月を検出', result['missing'] == [(third, 4)])
+        check('明細との食い違いを検出', [mismatch['key'] for mismatch in result['mismatched']] == [(second, 4)]
+              and result['mismatched'][0]['differences']['gross_salary'] == (280000, 285000))
+        check('給与計算のない行を検出', result['orphaned'] == [(third, 5)])
+        check('確認だけでは変更しない', WageRegister.query.count() == 3)
+
+        manager.reconcile(2025, repair=True)
+        db.session.commit()
+        after = manager.reconcile(2025)
+        check('修復後は一致', not after['missing'] and not after['mismatched'] and not after['orphaned'])
+        check('明細の値で修復', manager.get_wage_register_data(second, 2025)['monthly_working_days'] == {'4': 21})
+        check('出勤日数は既存の値を保つ', manager.get_wage_register_data(first, 2025)['monthly_working_days'] == {'4': 20})
+        check('月の指定', manager.reconcile(2025, 5)['checked'] == 0)
+
+        db.drop_all()
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_wage_register_manager()
+    success = test_reconcile() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+週40時間制限エンジンのテスト（データベース不要）
+月をまたぐ週の比例配分と、週単位の振り分けを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from weekly_overtime import distribute_week, month_week_window, week_monday
+
+class DummyRecord:
+    """テスト用勤怠レコード"""
+
+    def __init__(self, work_date, regular_minutes, holiday_minutes=0):
+        self.work_date = work_date
+        self.regular_working_minutes = regular_minutes
+        self.overtime_minutes = 0
+        self.holiday_minutes = holiday_minutes
+
+def make_record(work_date, regular_minutes, holiday_minutes=0):
+    """テスト用勤怠レコードを作成"""
+    return DummyRecord(work_date, regular_minutes, holiday_minutes)
+
+def test_weekly_overtime():
+    """週40時間制限の配分テスト"""
+    print("📅 週40時間制限エンジンテスト")
+    print("=" * 50)
+
+    success = True
+
+    # 2025年7月に掛かる週: 6/30(月)〜8/3(日)
+    window = month_week_window(2025, 7)
+    print(f"対象期間: {window[0]} 〜 {window[1]}")
+    if window != (date(2025, 6, 30), date(2025, 8, 3)):
+        print("❌ 対象期間が不正です")
+        success = False
+
+    if week_monday(date(2025, 7, 6)) != date(2025, 6, 30):
+        print("❌ 週の月曜日が不正です")
+        success = False
+
+    # 6/30(月)〜7/5(土) 各9時間 = 54時間（うち6/30は前月）
+    week = [make_record(date(2025, 6, 30), 540)]
+    week += [make_record(date(2025, 7, day), 540) for day in range(1, 6)]
+    distribution = distribute_week(week, 2025, 7)
+
+    # 対象月分 2700分 × (2400/3240) = 2000分が法定内
+    regular_total = sum(regular for regular, _ in distribution.values())
+    overtime_total = sum(overtime for _, overtime in distribution.values())
+    print(f"   対象月 法定内: {regular_total}分 / 法定外: {overtime_total}分")
+    if week[0] in distribution:
+        print("❌ 前月のレコードが更新対象になっています")
+        success = False
+    if (regular_total, overtime_total) != (2000, 700):
+        print("❌ 法定内・法定外の配分が不正です")
+        success = False
+
+    # 法定内は日付順に割り当てられる
+    if distribution[week[-1]] != (0, 540):
+        print(f"❌ 週末の配分が不正です: {distribution[week[-1]]}")
+        success = False
+
+    # 法定外休日労働は週40時間計算から除外
+    week = [make_record(date(2025, 7, day), 480) for day in range(7, 12)]
+    week.append(make_record(date(2025, 7, 12), 480, holiday_minutes=480))
+    distribution = distribute_week(week, 2025, 7)
+    if week[-1] in distribution or any(overtime for _, overtime in distribution.values()):
+        print("❌ 休日労働が週40時間計算に含まれています")
+        success = False
+
+    if success:
+        print("✅ 週40時間制限の配分が正しく計算されました")
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_weekly_overtime()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
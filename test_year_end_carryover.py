@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+年度繰越のテスト（メモリ上の SQLite を使用）
+期末残高（期首残高＋当期の増減）が繰越先年度の期首残高に一括で書き込まれ、
+ドライランで既存の期首残高との差分が得られることを確認する
+"""
+
+import sys
+import os
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+
+from models import db, User, AccountingAccount, AccountingPeriod, JournalEntry, JournalEntryDetail, OpeningBalance
+import ledger_balances  # 仕訳の変更を月次残高・世代番号に反映するイベントを登録
+from trial_balance import trial_balance_for
+from year_end_carryover import apply_carryover, plan_carryover
+
+def create_test_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    db.init_app(app)
+    return app
+
+def add_entry(user, entry_date, debit_account, credit_account, amount):
+    entry = JournalEntry(entry_date=entry_date, description='テスト', total_amount=amount, created_by=user.id)
+    db.session.add(entry)
+    db.session.flush()
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=debit_account.id, debit_amount=amount, credit_amount=0))
+    db.session.add(JournalEntryDetail(journal_entry_id=entry.id, account_id=credit_account.id, debit_amount=0, credit_amount=amount))
+    db.session.commit()
+
+def test_year_end_carryover():
+    """年度繰越のテスト"""
+    print("📦 年度繰越テスト")
+    print("=" * 50)
+
+    success = True
+
+    def check(label, ok):
+        nonlocal success
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    app = create_test_app()
+    with app.app_context():
+        db.create_all()
+        user = User(email='accounting@example.com', password='x', role='accounting')
+        cash = AccountingAccount(account_code='111', account_name='現金', account_type='資産')
+        loan = AccountingAccount(account_code='211', account_name='短期借入金', account_type='負債')
+        capital = AccountingAccount(account_code='311', account_name='資本金', account_type='純資産')
+        sales = AccountingAccount(account_code='411', account_name='売上高', account_type='収益')
+        salary = AccountingAccount(account_code='521', account_name='給料手当', account_type='費用')
+        db.session.add_all([user, cash, loan, capital, sales, salary])
+        db.session.commit()
+        from_period = AccountingPeriod(fiscal_year=2025, start_date=date(2025, 4, 1), end_date=date(2026, 3, 31))
+        db.session.add_all([
+            from_period,
+            AccountingPeriod(fiscal_year=2026, start_date=date(2026, 4, 1), end_date=date(2027, 3, 31)),
+            OpeningBalance(fiscal_year=2025, account_id=cash.id, opening_balance=50000),
+            OpeningBalance(fiscal_year=2025, account_id=capital.id, opening_balance=-50000),
+            OpeningBalance(fiscal_year=2026, account_id=cash.id, opening_balance=1, source_type='manual'),
+            OpeningBalance(fiscal_year=2026, account_id=capital.id, opening_balance=-50000, source_type='manual'),
+        ])
+        db.session.commit()
+
+        add_entry(user, date(2025, 5, 1), cash, sales, 300000)
+        add_entry(user, date(2025, 7, 15), salary, cash, 120000)
+        add_entry(user, date(2026, 3, 31), cash, loan, 100000)  # 期末日
+        add_entry(user, date(2026, 4, 5), cash, sales, 999)     # 翌年度
+
+        # ドライラン（書き込みはしない）
+        plan = plan_carryover(from_period, 2026)
+        by_name = {row.account_name: row for row in plan}
+        check('対象は資産・負債・純資産科目のみ', sorted(by_name) == ['現金', '短期借入金', '資本金'])
+        check('期末残高は期首残高＋当期の増減（期末日を含む）', by_name['現金'].new_balance == 330000
+              and by_name['短期借入金'].new_balance == -100000)
+        check('既存の期首残高との差分', (by_name['現金'].current_balance, by_name['現金'].difference) == (1, 329999)
+              and (by_name['短期借入金'].current_balance, by_name['短期借入金'].difference) == (None, -100000))
+        check('変わらない科目は差分なし', [row.account_name for row in plan if row.changed] == ['現金', '短期借入金'])
+        check('ドライランでは書き込まない', OpeningBalance.query.filter_by(fiscal_year=2026).count() == 2
+              and not from_period.is_closed)
+
+        before = trial_balance_for(2026).line_named('現金').opening
+
+        # 繰越実行
+        count = apply_carryover(from_period, 2026, plan)
+        db.session.commit()
+        balances = {balance.account_id: balance for balance in OpeningBalance.query.filter_by(fiscal_year=2026)}
+        check('残高のある科目数', count == 3)
+        check('期首残高を一括で書き込み', {account_id: balance.opening_balance for account_id, balance in balances.items()}
+              == {cash.id: 330000, loan.id: -100000, capital.id: -50000})
+        check('繰越で書き込んだ残高は carryover', {balance.source_type for balance in balances.values()} == {'carryover'})
+        check('繰越元年度は締め済み', AccountingPeriod.query.filter_by(fiscal_year=2025).one().is_closed)
+        check('翌年度の試算表に反映（キャッシュを作り直す）',
+              before == 1 and trial_balance_for(2026).line_named('現金').opening == 330000)
+
+        # 再実行しても結果は同じ
+        check('繰越後のドライランは差分なし', not any(row.changed for row in plan_carryover(from_period, 2026)))
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_year_end_carryover()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+ZIPストリーミングのテスト（データベース不要）
+ファイルごとにバイト列が返され、連結すると正しい ZIP になること、
+一括作成の描画結果から ZIP の項目とエラー一覧を作れることを確認する
+"""
+
+import sys
+import os
+import io
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from render_pool import iter_rendered
+from zip_stream import ERROR_LIST_FILENAME, iter_rendered_zip_entries, iter_zip_stream, write_rendered_to_zip
+
+def test_zip_stream():
+    """ZIPストリーミングのテスト"""
+    print("📦 ZIPストリーミングテスト")
+    print("=" * 50)
+
+    entries = [(f'テスト{index}.txt', ('明細データ' * 1000 * (index + 1)).encode('utf-8')) for index in range(3)]
+
+    produced = []
+    def generate():
+        for filename, data in entries:
+            produced.append(filename)
+            yield filename, data
+
+    stream = iter_zip_stream(generate())
+    first_chunk = next(stream)
+    produced_before_first_chunk = list(produced)
+    chunks = [first_chunk] + list(stream)
+
+    success = True
+    checks = [
+        ('最初のチャンクは1ファイル目だけで返る', produced_before_first_chunk == ['テスト0.txt'] and len(first_chunk) > 0),
+        ('ファイルごと＋中央ディレクトリのチャンク', len(chunks) == len(entries) + 1),
+    ]
+
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as zip_file:
+        checks.append(('ZIP が壊れていない', zip_file.testzip() is None))
+        checks.append(('内容が一致', [(name, zip_file.read(name)) for name in zip_file.namelist()] == entries))
+
+    for label, ok in checks:
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    return success
+
+def render_text(job, suffix):
+    if job['fail']:
+        raise ValueError('描画できません')
+    return f"{job['filename']}{suffix}".encode('utf-8')
+
+def test_rendered_entries():
+    """描画結果から ZIP の項目・エラー一覧を作るテスト"""
+    print("\n🗃️ 一括作成の ZIP 項目テスト")
+    print("=" * 50)
+
+    jobs = [{'filename': f'{index}.txt', 'fail': index == 1} for index in range(3)]
+    describe_error = lambda job, error: f"{job['filename']}: {error}"
+
+    entries = list(iter_rendered_zip_entries(iter_rendered(jobs, render_text, ('!',)), describe_error))
+    calls = []
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as zip_file:
+        result = write_rendered_to_zip(iter_rendered(jobs, render_text, ('!',)), len(jobs), zip_file,
+                                       describe_error, lambda done, total: calls.append((done, total)))
+    with zipfile.ZipFile(buffer) as zip_file:
+        error_list = zip_file.read(ERROR_LIST_FILENAME).decode('utf-8')
+
+    success = True
+    checks = [
+        ('成功したジョブの項目', entries[:2] == [('0.txt', b'0.txt!'), ('2.txt', b'2.txt!')]),
+        ('最後にエラー一覧', entries[2] == (ERROR_LIST_FILENAME, '1.txt: 描画できません'.encode('utf-8'))),
+        ('ZIP への書き込み件数とエラー', result == {'generated': 2, 'errors': ['1.txt: 描画できません']}),
+        ('ZIP にもエラー一覧', error_list == '1.txt: 描画できません'),
+        ('1件ごとに進捗', calls == [(1, 3), (2, 3), (3, 3)]),
+    ]
+    for label, ok in checks:
+        print(f"   {'✅' if ok else '❌'} {label}")
+        success = success and ok
+
+    return success
+
+def main():
+    """メイン実行"""
+    success = test_zip_stream()
+    success = test_rendered_entries() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
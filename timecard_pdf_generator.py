@@ -9,11 +9,16 @@ from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 import calendar
 from datetime import datetime, date
-import os
+
+from pdf_fonts import ipaex_font
+
+def working_minutes_of(record):
+    """1日の労働時間（分）＝法定内・残業・休日労働の合計"""
+    return sum(getattr(record, column) or 0 for column in (
+        'regular_working_minutes', 'legal_overtime_minutes', 'overtime_minutes',
+        'legal_holiday_minutes', 'holiday_minutes'))
 
 def create_timecard_pdf(employee, working_time_records, year, month):
     """
@@ -29,16 +34,8 @@ def create_timecard_pdf(employee, working_time_records, year, month):
         PDFのバイナリデータ
     """
 
-    # フォント設定
-    try:
-        font_path = os.path.join(os.path.dirname(__file__), 'fonts', 'ipaexg.ttf')
-        if os.path.exists(font_path):
-            pdfmetrics.registerFont(TTFont('IPAexGothic', font_path))
-            font_name = 'IPAexGothic'
-        else:
-            font_name = 'Helvetica'
-    except:
-        font_name = 'Helvetica'
+    # フォント設定（登録はプロセスで1回だけ）
+    font_name = ipaex_font()
 
     # PDFバッファ作成
     buffer = BytesIO()
@@ -67,8 +64,8 @@ def create_timecard_pdf(employee, working_time_records, year, month):
     info_style.fontSize = 12
 
     basic_info = [
-        [f"対象期間: {year}年{month}月", f"従業員ID: {employee.employee_id}"],
-        [f"氏名: {employee.last_name} {employee.first_name}", f"部署: {employee.department or ''}"]
+        [f"対象期間: {year}年{month}月", f"従業員ID: {employee.id}"],
+        [f"氏名: {employee.name}", f"部署: {employee.department or ''}"]
     ]
 
     basic_table = Table(basic_info, colWidths=[90*mm, 90*mm])
@@ -87,7 +84,7 @@ def create_timecard_pdf(employee, working_time_records, year, month):
     # 労働時間データをdict形式に変換
     work_data = {}
     for record in working_time_records:
-        work_data[record.day] = record
+        work_data[record.work_date.day] = record
 
     # 月のカレンダー情報取得
     cal = calendar.monthcalendar(year, month)
@@ -126,22 +123,26 @@ def create_timecard_pdf(employee, working_time_records, year, month):
             end_time = record.end_time.strftime('%H:%M') if record.end_time else ""
 
             # 休憩時間（分から時:分に変換）
-            break_time = format_time(record.break_minutes)
+            break_time = format_time(record.break_time_minutes)
 
             # 労働時間（分から時:分に変換）
-            working_time = format_time(record.working_minutes)
+            working_time = format_time(working_minutes_of(record))
 
             # 時間外労働（分から時:分に変換）
             overtime = format_time(record.overtime_minutes)
 
             # 備考
             remarks = ""
-            if record.is_holiday:
+            if record.legal_holiday_minutes or record.holiday_minutes:
                 remarks += "休日 "
             if record.is_paid_leave:
                 remarks += "有給 "
-            if record.remarks:
-                remarks += record.remarks
+            if record.is_special_leave:
+                remarks += "特別休暇 "
+            if record.is_absence:
+                remarks += "欠勤 "
+            if record.is_company_closure:
+                remarks += "休業 "
 
         else:
             # データなしの場合
@@ -185,10 +186,10 @@ def create_timecard_pdf(employee, working_time_records, year, month):
     content.append(Spacer(1, 10*mm))
 
     # 集計計算
-    total_working_minutes = sum(record.working_minutes or 0 for record in working_time_records)
+    total_working_minutes = sum(working_minutes_of(record) for record in working_time_records)
     total_overtime_minutes = sum(record.overtime_minutes or 0 for record in working_time_records)
-    total_break_minutes = sum(record.break_minutes or 0 for record in working_time_records)
-    working_days = len([r for r in working_time_records if r.working_minutes and r.working_minutes > 0])
+    total_break_minutes = sum(record.break_time_minutes or 0 for record in working_time_records)
+    working_days = len([r for r in working_time_records if working_minutes_of(r) > 0])
 
     def format_total_time(minutes):
         if minutes == 0:
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+試算表
+会計期間の勘定科目別 期首残高・借方合計・貸方合計・期末残高 を1回の集計で作る仕組み
+
+財務諸表画面・Excel出力・キャッシュフロー計算書・株主資本等変動計算書・附属明細書は
+同じ試算表から作る。財務諸表の表示行は、同じ区分の親科目を持つ科目を親科目の行に
+まとめる（親科目の小計は勘定科目表の部分木の範囲から1回の集計で求める）。試算表は (会計年度, 期間, 元帳の世代番号) ごとにプロセス内で
+キャッシュし、仕訳・期首残高・勘定科目が変更されると世代番号が進んで作り直される。
+
+金額は月単位の期間なら general_ledger の月次合計から、それ以外は仕訳明細から集計する。
+"""
+
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_
+
+from account_chart import AccountChart, account_chart
+from cache_versions import LEDGER_VERSION, current_version
+from date_ranges import in_date_range
+from fiscal_periods import fiscal_year_range
+from models import db, AccountingAccount, GeneralLedger, JournalEntry, JournalEntryDetail, OpeningBalance
+
+# 借方残高の科目区分（それ以外は貸方残高）
+DEBIT_ACCOUNT_TYPES = ('資産', '費用')
+
+_CACHE_SIZE = 16
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class TrialBalanceLine:
+    """試算表の1科目（金額は借方プラス・貸方マイナス）"""
+
+    def __init__(self, account_id, account_code, account_name, account_type, opening, debit, credit, has_activity):
+        self.account_id = account_id
+        self.account_code = account_code
+        self.account_name = account_name
+        self.account_type = account_type
+        self.opening = opening
+        self.debit = debit
+        self.credit = credit
+        self.has_activity = has_activity
+
+    @property
+    def movement(self) -> int:
+        """当期の増減（借方−貸方）"""
+        return self.debit - self.credit
+
+    @property
+    def closing(self) -> int:
+        """期末残高（期首残高＋当期の増減）"""
+        return self.opening + self.movement
+
+    @property
+    def balance(self) -> int:
+        """当期の増減を科目区分の向き（資産・費用は借方、負債・純資産・収益は貸方）で表した金額"""
+        return self.movement if self.account_type in DEBIT_ACCOUNT_TYPES else -self.movement
+
+
+class TrialBalance:
+    """会計期間の試算表"""
+
+    def __init__(self, fiscal_year: int, start_date, end_date, lines: List[TrialBalanceLine],
+                 chart: Optional[AccountChart] = None):
+        self.fiscal_year = fiscal_year
+        self.start_date = start_date
+        self.end_date = end_date
+        self.lines = lines
+        self.chart = chart
+        self._by_name = {}
+        for line in sorted(lines, key=lambda line: line.account_id):
+            self._by_name.setdefault(line.account_name, line)
+
+    def line_named(self, account_name: str) -> Optional[TrialBalanceLine]:
+        """科目名の行（同名の科目が複数あれば ID の小さい方）"""
+        return self._by_name.get(account_name)
+
+    def statement_lines(self, account_type: str) -> list:
+        """財務諸表の表示行（当期に取引のある科目、科目ID順）
+
+        勘定科目表があれば、同じ区分の親科目を持つ科目は親科目の行にまとめ、
+        親科目の行の金額は子孫の科目を含めた小計とする。
+        """
+        lines = [line for line in sorted(self.lines, key=lambda line: line.account_id)
+                 if line.account_type == account_type]
+        if self.chart is None:
+            return [SimpleNamespace(account_name=line.account_name, balance=line.balance)
+                    for line in lines if line.has_activity]
+
+        subtotals = self.chart.roll_up({line.account_id: line.balance for line in lines})
+        activity = self.chart.roll_up({line.account_id: 1 for line in lines if line.has_activity})
+        return [SimpleNamespace(account_name=line.account_name,
+                                balance=subtotals.get(line.account_id, line.balance))
+                for line in lines
+                if activity.get(line.account_id, line.has_activity) and self._is_statement_root(line)]
+
+    def _is_statement_root(self, line: TrialBalanceLine) -> bool:
+        """祖先に同じ区分の科目がない（財務諸表に行として出す）科目か"""
+        account = self.chart.get(line.account_id)
+        while account is not None:
+            parent = self.chart.get(account.parent_account_id)
+            if parent is None or not self.chart.is_descendant(account.id, parent.id):
+                return True
+            if parent.account_type == line.account_type:
+                return False
+            account = parent
+        return True
+
+    def total(self, account_type: str) -> int:
+        """科目区分の当期増減の合計（科目区分の向き）"""
+        return sum(line.balance for line in self.lines if line.account_type == account_type)
+
+    @property
+    def net_income(self) -> int:
+        """当期純利益（収益−費用）"""
+        return self.total('収益') - self.total('費用')
+
+
+def _month_aligned(start_date, end_date) -> bool:
+    return start_date.day == 1 and end_date.day == 1
+
+
+def _period_totals_subquery(start_date, end_date):
+    """期間の勘定科目別 借方合計・貸方合計・取引有無 のサブクエリ"""
+    if _month_aligned(start_date, end_date):
+        # 月単位の期間は月次残高を合計（end_date は翌月1日）
+        period = GeneralLedger.year * 100 + GeneralLedger.month
+        last_month = end_date.year * 100 + end_date.month
+        return db.session.query(
+            GeneralLedger.account_id.label('account_id'),
+            func.sum(GeneralLedger.debit_total).label('debit'),
+            func.sum(GeneralLedger.credit_total).label('credit'),
+            func.max(or_(GeneralLedger.debit_total != 0, GeneralLedger.credit_total != 0)).label('has_activity')
+        ).filter(
+            period >= start_date.year * 100 + start_date.month,
+            period < last_month
+        ).group_by(GeneralLedger.account_id).subquery()
+
+    return db.session.query(
+        JournalEntryDetail.account_id.label('account_id'),
+        func.sum(JournalEntryDetail.debit_amount).label('debit'),
+        func.sum(JournalEntryDetail.credit_amount).label('credit'),
+        (func.count(JournalEntryDetail.id) > 0).label('has_activity')
+    ).join(JournalEntry, JournalEntryDetail.journal_entry_id == JournalEntry.id).filter(
+        in_date_range(JournalEntry.entry_date, start_date, end_date)
+    ).group_by(JournalEntryDetail.account_id).subquery()
+
+
+def build_trial_balance(fiscal_year: int, start_date, end_date) -> TrialBalance:
+    """[start_date, end_date) の試算表を1回のクエリで作る（期首残高は fiscal_year の OpeningBalance）"""
+    totals = _period_totals_subquery(start_date, end_date)
+    rows = db.session.query(
+        AccountingAccount.id, AccountingAccount.account_code, AccountingAccount.account_name,
+        AccountingAccount.account_type, OpeningBalance.opening_balance,
+        totals.c.debit, totals.c.credit, totals.c.has_activity
+    ).outerjoin(
+        totals, totals.c.account_id == AccountingAccount.id
+    ).outerjoin(
+        OpeningBalance, and_(OpeningBalance.account_id == AccountingAccount.id,
+                             OpeningBalance.fiscal_year == fiscal_year)
+    ).order_by(AccountingAccount.account_code)
+
+    lines = [TrialBalanceLine(account_id, code, name, account_type, opening or 0, debit or 0, credit or 0,
+                              bool(has_activity))
+             for account_id, code, name, account_type, opening, debit, credit, has_activity in rows]
+    return TrialBalance(fiscal_year, start_date, end_date, lines, account_chart())
+
+
+def trial_balance_for(fiscal_year: int, start_date=None, end_date=None) -> TrialBalance:
+    """会計年度の試算表（元帳の世代番号が同じ間はキャッシュを返す）
+
+    期間を省略した場合は会計期間（AccountingPeriod）の期首日〜期末日。
+    返す試算表は共有されるため変更しないこと。
+    """
+    if start_date is None or end_date is None:
+        start_date, end_date = fiscal_year_range(fiscal_year)
+
+    key = (str(db.engine.url), fiscal_year, start_date, end_date, current_version(LEDGER_VERSION))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    trial_balance = build_trial_balance(fiscal_year, start_date, end_date)
+    with _cache_lock:
+        _cache[key] = trial_balance
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return trial_balance
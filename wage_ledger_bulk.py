@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+賃金台帳PDF一括作成
+年間の給与明細データから従業員ごとの賃金台帳を作成し、PDF にまとめる機能
+
+対象年の給与明細と従業員は1回の結合クエリで読み込み、従業員ごとに
+12ヶ月分のリスト（JSON 文字列ではない素の値）へまとめてから描画する。
+描画は render_pool のプロセスプールで並列化し（ワーカーごとにフォントを1回だけ登録）、
+PDF はメモリ上に作って一時ファイルを介さずに返す。
+描画の投入はワーカー数×2件までに絞り、全従業員分の PDF を親プロセスで同時に抱えない。
+"""
+
+import json
+from itertools import groupby
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from models import db, Employee, PayrollSlip
+from pdf_fonts import japanese_font, warm_up_fonts
+from render_pool import iter_rendered
+from wage_ledger_pdf_generator import WageLedgerPDFGenerator, get_company_name
+from zip_stream import iter_rendered_zip_entries, write_rendered_to_zip
+
+# この人数未満はプロセスを起動せずに描画する
+MIN_PARALLEL_LEDGERS = 8
+
+# 給与明細の項目（賃金台帳の monthly_<項目> / annual_<項目>）
+WAGE_LEDGER_FIELDS = [
+    'base_salary', 'overtime_allowance', 'holiday_allowance', 'night_allowance',
+    'position_allowance', 'family_allowance', 'transportation_allowance',
+    'housing_allowance', 'meal_allowance', 'skill_allowance',
+    'temporary_closure_compensation', 'salary_payment', 'bonus_payment',
+    'other_allowance', 'gross_salary',
+    'health_insurance', 'pension_insurance', 'employment_insurance',
+    'long_term_care_insurance', 'income_tax', 'resident_tax',
+    'union_fee', 'parking_fee', 'uniform_fee', 'other_deduction',
+    'total_deduction', 'net_salary',
+    'working_days', 'absence_days', 'paid_leave_days', 'overtime_hours'
+]
+HOUR_FIELDS = frozenset({'overtime_hours'})
+
+# 賃金台帳PDFの行名 → 給与明細の項目
+LEDGER_ROW_FIELDS = {
+    'temp_closure_compensation': 'temporary_closure_compensation',
+    'bonus': 'bonus_payment',
+    'gross_pay': 'gross_salary',
+    'deductions': 'total_deduction',
+    'net_pay': 'net_salary',
+}
+
+# 手当・その他控除の明細（給与明細の JSON 詳細から展開する項目数）
+ALLOWANCE_DETAILS = 5
+DEDUCTION_DETAILS = 2
+
+# ワーカーで登録済みのフォント名
+_worker_font_name = None
+
+
+def _detail_amounts(detail_json: Optional[str], limit: int) -> List[int]:
+    """その他手当・その他控除の詳細（JSON）から先頭 limit 件の金額を取り出す"""
+    if not detail_json:
+        return []
+    try:
+        return [int(detail.get('amount', 0) or 0) for detail in json.loads(detail_json)[:limit]]
+    except (ValueError, TypeError, AttributeError):
+        return []
+
+
+def wage_ledger_data(slips: List[PayrollSlip]) -> Dict:
+    """1人分・1年分の給与明細から賃金台帳データを作成する
+
+    monthly_<項目> は12ヶ月分のリスト（値のない月は None）、annual_<項目> は年間合計。
+    同じ月の明細が複数ある場合は後から作成したもの（ID の大きい方）を使う。
+    """
+    latest = {}
+    for slip in slips:
+        if 1 <= slip.slip_month <= 12 and (slip.slip_month not in latest or slip.id > latest[slip.slip_month].id):
+            latest[slip.slip_month] = slip
+
+    monthly = {field: [None] * 12 for field in WAGE_LEDGER_FIELDS}
+    monthly.update({f'allowance{i}': [None] * 12 for i in range(1, ALLOWANCE_DETAILS + 1)})
+    monthly.update({f'other_deduction{i}': [None] * 12 for i in range(1, DEDUCTION_DETAILS + 1)})
+
+    for month, slip in latest.items():
+        index = month - 1
+        for field in WAGE_LEDGER_FIELDS:
+            value = getattr(slip, field, 0) or 0
+            monthly[field][index] = float(value) if field in HOUR_FIELDS else int(value)
+        for i, amount in enumerate(_detail_amounts(slip.other_allowances_json, ALLOWANCE_DETAILS), 1):
+            monthly[f'allowance{i}'][index] = amount
+        for i, amount in enumerate(_detail_amounts(slip.other_deductions_json, DEDUCTION_DETAILS), 1):
+            monthly[f'other_deduction{i}'][index] = amount
+
+    for row, field in LEDGER_ROW_FIELDS.items():
+        monthly[row] = monthly[field]
+
+    wage_data = {}
+    for key, values in monthly.items():
+        wage_data[f'monthly_{key}'] = values
+        wage_data[f'annual_{key}'] = sum(value for value in values if value is not None)
+    return wage_data
+
+
+def load_wage_ledger_jobs(year: int, employee_ids: Optional[List[int]] = None) -> List[Dict]:
+    """対象年の給与明細を1回のクエリで読み込み、従業員ごとの賃金台帳データにする
+
+    Args:
+        year: 年
+        employee_ids: 対象従業員ID（省略時は給与明細がある全従業員）
+
+    Returns:
+        list: 'employee_id', 'filename', 'employee_data', 'wage_data' の辞書（従業員ID順）
+    """
+    query = db.session.query(PayrollSlip, Employee).join(
+        Employee, PayrollSlip.employee_id == Employee.id
+    ).filter(PayrollSlip.slip_year == year)
+    if employee_ids is not None:
+        query = query.filter(PayrollSlip.employee_id.in_(employee_ids))
+
+    jobs = []
+    rows = query.order_by(PayrollSlip.employee_id, PayrollSlip.slip_month, PayrollSlip.id).all()
+    for employee_id, employee_rows in groupby(rows, key=lambda row: row[0].employee_id):
+        employee_rows = list(employee_rows)
+        employee = employee_rows[0][1]
+        jobs.append({
+            'employee_id': employee_id,
+            'filename': f'{year}年度_賃金台帳_{employee.name}.pdf',
+            'employee_data': {
+                'id': employee.id,
+                'name': employee.name,
+                'employee_number': f'EMP{employee.id:03d}'  # IDベースで従業員番号を生成
+            },
+            'wage_data': wage_ledger_data([slip for slip, _ in employee_rows]),
+        })
+    return jobs
+
+
+def _init_worker():
+    """ワーカー起動時にフォントを1回だけ登録する"""
+    global _worker_font_name
+    warm_up_fonts()
+    _worker_font_name = japanese_font()
+
+
+def _render_ledger(job: Dict, year: int, company_name: str) -> bytes:
+    """賃金台帳1件を描画する"""
+    generator = WageLedgerPDFGenerator(font_name=_worker_font_name, company_name=company_name)
+    return generator.render_wage_ledger_pdf(job['employee_data'], job['wage_data'], year)
+
+
+def render_wage_ledger(job: Dict, year: int) -> bytes:
+    """賃金台帳1件をこのプロセスで描画する（単独のダウンロード用）"""
+    return WageLedgerPDFGenerator().render_wage_ledger_pdf(job['employee_data'], job['wage_data'], year)
+
+
+def iter_rendered_ledgers(jobs: List[Dict], year: int,
+                          max_workers: Optional[int] = None) -> Iterator[Tuple[Dict, Optional[bytes], Optional[Exception]]]:
+    """賃金台帳を描画し、できた順に (ジョブ, PDF, エラー) を返す
+
+    描画に失敗したジョブは PDF が None、エラーに例外が入る。
+
+    Args:
+        jobs: load_wage_ledger_jobs の戻り値
+        year: 年
+        max_workers: 最大ワーカー数（省略時は CPU 数）
+    """
+    if not jobs:
+        return iter(())
+    # 会社名は描画前に1回だけ取得（ワーカーはデータベースに接続しない）
+    return iter_rendered(jobs, _render_ledger, (year, get_company_name()), initializer=_init_worker,
+                         min_parallel=MIN_PARALLEL_LEDGERS, max_workers=max_workers)
+
+
+def _describe_error(job: Dict, error: Exception) -> str:
+    print(f"賃金台帳PDF生成エラー（従業員ID: {job['employee_id']}）: {error}")
+    return f"{job['employee_data']['name']}: {error}"
+
+
+def render_ledgers_to_zip(jobs: List[Dict], year: int, zip_file, max_workers: Optional[int] = None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """賃金台帳を描画して ZIP に書き込む（失敗した従業員はエラー一覧に記載）
+
+    Args:
+        jobs: load_wage_ledger_jobs の戻り値
+        year: 年
+        zip_file: 書き込み先の zipfile.ZipFile
+        max_workers: 最大ワーカー数（省略時は CPU 数）
+        progress: 1件終わるごとに (処理済み件数, 全件数) で呼ばれる関数
+
+    Returns:
+        dict: 'generated'（生成件数）、'errors'（従業員名とエラー内容）
+    """
+    return write_rendered_to_zip(iter_rendered_ledgers(jobs, year, max_workers), len(jobs), zip_file,
+                                 _describe_error, progress)
+
+
+def iter_ledger_zip_entries(jobs: List[Dict], year: int, max_workers: Optional[int] = None) -> Iterator[Tuple[str, bytes]]:
+    """ZIP ストリーミング用に (ファイル名, PDF) を返す（失敗した従業員があれば最後にエラー一覧）"""
+    return iter_rendered_zip_entries(iter_rendered_ledgers(jobs, year, max_workers), _describe_error)
@@ -10,15 +10,14 @@ from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.units import mm
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.cidfonts import UnicodeCIDFont
-from reportlab.pdfbase.ttfonts import TTFont
 import os
 import io
 from datetime import datetime
 from typing import Dict, List, Optional
 import json
 
+from pdf_fonts import draw_centered_text, draw_justified_text, japanese_font, string_width
+
 def get_company_name():
     """企業情報から会社名を取得"""
     try:
@@ -31,93 +30,30 @@ def get_company_name():
     except Exception:
         return "株式会社 サンプル企業"  # データベースエラー時のフォールバック
 
-def draw_justified_text(canvas, font_name, font_size, text, x, y, width):
-    """項目名を均等割り付けで描画（給与明細書と同じ関数）"""
-    canvas.setFont(font_name, font_size)
-    
-    # 2文字の場合は中央揃えで文字間に全角スペース3つを挿入
-    if len(text) == 2:
-        spaced_text = text[0] + "　　　" + text[1]  # 全角スペース3つ
-        text_width = canvas.stringWidth(spaced_text, font_name, font_size)
-        center_x = x + (width - text_width) / 2
-        canvas.drawString(center_x, y, spaced_text)
-        return
-    
-    # 1文字の場合は中央揃え
-    if len(text) == 1:
-        text_width = canvas.stringWidth(text, font_name, font_size)
-        center_x = x + (width - text_width) / 2
-        canvas.drawString(center_x, y, text)
-        return
-    
-    # 文字間のスペースを計算
-    text_width = canvas.stringWidth(text, font_name, font_size)
-    if text_width >= width:
-        # 文字列が幅を超える場合は通常表示
-        canvas.drawString(x, y, text)
-        return
-    
-    # 均等割り付けのため文字間の追加スペースを計算
-    extra_space = width - text_width
-    char_count = len(text) - 1  # 文字間の数
-    
-    if char_count > 0:
-        space_per_char = extra_space / char_count
-        current_x = x
-        
-        for i, char in enumerate(text):
-            canvas.drawString(current_x, y, char)
-            char_width = canvas.stringWidth(char, font_name, font_size)
-            current_x += char_width
-            if i < char_count:  # 最後の文字以外
-                current_x += space_per_char
-    else:
-        canvas.drawString(x, y, text)
-
-def draw_centered_text(canvas, font_name, font_size, text, x, y, width):
-    """項目名を中央揃えで描画（給与明細書と同じ関数）"""
-    canvas.setFont(font_name, font_size)
-    text_width = canvas.stringWidth(text, font_name, font_size)
-    center_x = x + (width - text_width) / 2
-    canvas.drawString(center_x, y, text)
-
 class WageLedgerPDFGenerator:
-    def __init__(self):
-        self.japanese_font = self.setup_japanese_font()
+    def __init__(self, font_name: Optional[str] = None, company_name: Optional[str] = None):
+        """一括作成ではフォント名・会社名を渡して、台帳ごとの登録・データベース参照を省略する"""
+        self.japanese_font = font_name or japanese_font()
+        self.company_name = company_name
         self.page_size = landscape(A4)
         self.margin = 15 * mm
         
-    def setup_japanese_font(self):
-        """日本語フォント設定（給与明細書と同じロジック）"""
-        # CIDフォントを試行（最も確実）
-        cid_fonts = [
-            'HeiseiKakuGo-W5',  # 日本語ゴシック
-            'HeiseiMin-W3',     # 日本語明朝
-        ]
-        
-        for font_name in cid_fonts:
-            try:
-                pdfmetrics.registerFont(UnicodeCIDFont(font_name))
-                return font_name
-            except Exception:
-                continue
+    def render_wage_ledger_pdf(self, employee_data: Dict, wage_data: Dict, year: int) -> bytes:
+        """賃金台帳PDFをメモリ上に描画して返す
         
-        # TTFフォントフォールバック
-        font_paths = [
-            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',
-            '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf'
-        ]
+        wage_data の monthly_<項目> は12ヶ月分のリスト（1月が先頭）。
+        従来形式の {"月": 値} の辞書・JSON文字列も受け付ける。
+        """
+        # CanvasベースのPDF生成（給与明細書と同じアプローチ）
+        buffer = io.BytesIO()
+        p = canvas.Canvas(buffer, pagesize=self.page_size)
         
-        for font_path in font_paths:
-            if os.path.exists(font_path):
-                try:
-                    pdfmetrics.registerFont(TTFont('JapaneseFont', font_path))
-                    return 'JapaneseFont'
-                except Exception:
-                    continue
+        # 賃金台帳フォーマットで描画
+        self.draw_wage_ledger_format(p, employee_data, wage_data, year)
         
-        # 最終フォールバック
-        return 'Helvetica'
+        # ページを保存
+        p.save()
+        return buffer.getvalue()
     
     def generate_wage_ledger_pdf(self, employee_data: Dict, wage_data: Dict, year: int, output_path: str) -> bool:
         """賃金台帳PDFを生成 - 給与明細書フォーマット準拠
@@ -132,19 +68,11 @@ class WageLedgerPDFGenerator:
             bool: 生成成功の場合True
         """
         try:
-            # CanvasベースのPDF生成（給与明細書と同じアプローチ）
-            buffer = io.BytesIO()
-            p = canvas.Canvas(buffer, pagesize=self.page_size)
-            
-            # 賃金台帳フォーマットで描画
-            self.draw_wage_ledger_format(p, employee_data, wage_data, year)
-            
-            # ページを保存
-            p.save()
+            pdf_data = self.render_wage_ledger_pdf(employee_data, wage_data, year)
             
             # ファイルへ書き込み
             with open(output_path, 'wb') as f:
-                f.write(buffer.getvalue())
+                f.write(pdf_data)
             
             return True
             
@@ -174,7 +102,7 @@ class WageLedgerPDFGenerator:
         # タイトル
         canvas.setFont(self.japanese_font, 18)
         title = f"{year}年度 賃金台帳"
-        title_width = canvas.stringWidth(title, self.japanese_font, 18)
+        title_width = string_width(title, self.japanese_font, 18)
         canvas.drawString((page_width - title_width) / 2, y, title)
         
         y -= 20  # タイトル下の余白を25→20に縮小
@@ -258,8 +186,7 @@ class WageLedgerPDFGenerator:
             annual_key = f'annual_allowance{i}'
             
             # データが存在するかチェック
-            monthly_data = self._parse_json_field(wage_data.get(allowance_key, '{}'))
-            has_data = any(monthly_data.values()) or wage_data.get(annual_key, 0)
+            has_data = any(self._monthly_values(wage_data, allowance_key)) or wage_data.get(annual_key, 0)
             
             if has_data or i <= 5:  # 最低5項目は表示（給与明細書に合わせる）
                 allowance_items.append((f'手当{i}', allowance_key, annual_key))
@@ -360,17 +287,15 @@ class WageLedgerPDFGenerator:
                 draw_justified_text(canvas, self.japanese_font, 7, item_name, table_x + 3, current_y - 10, item_width - 6)
             
             # 各月のデータを描画
-            monthly_data = self._parse_json_field(wage_data.get(monthly_key, '{}'))
             current_x = table_x + item_width
             
-            for month in range(1, 13):
-                value = monthly_data.get(str(month), '')
+            for value in self._monthly_values(wage_data, monthly_key):
                 formatted_value = self._format_value(value, item_name)
                 
                 # 数値は右寄せで表示（フォントサイズを7に縮小）
                 canvas.setFont(self.japanese_font, 7)
                 if formatted_value != '-':
-                    value_width = canvas.stringWidth(formatted_value, self.japanese_font, 7)
+                    value_width = string_width(formatted_value, self.japanese_font, 7)
                     canvas.drawString(current_x + month_width - value_width - 3, current_y - 10, formatted_value)
                 else:
                     draw_centered_text(canvas, self.japanese_font, 7, formatted_value, current_x, current_y - 10, month_width)
@@ -384,7 +309,7 @@ class WageLedgerPDFGenerator:
             # 年間合計も同じく文字サイズを7に縮小
             canvas.setFont(self.japanese_font, 7)
             if formatted_total != '-':
-                total_value_width = canvas.stringWidth(formatted_total, self.japanese_font, 7)
+                total_value_width = string_width(formatted_total, self.japanese_font, 7)
                 canvas.drawString(current_x + total_width - total_value_width - 3, current_y - 10, formatted_total)
             else:
                 draw_centered_text(canvas, self.japanese_font, 7, formatted_total, current_x, current_y - 10, total_width)
@@ -523,17 +448,15 @@ class WageLedgerPDFGenerator:
                 draw_justified_text(canvas, self.japanese_font, 7, item_name, table_x + label_col_width + 3, item_y, item_name_col_width - 6)
             
             # 各月のデータを描画
-            monthly_data = self._parse_json_field(wage_data.get(monthly_key, '{}'))
             current_x = table_x + item_width
             
-            for month in range(1, 13):
-                value = monthly_data.get(str(month), '')
+            for value in self._monthly_values(wage_data, monthly_key):
                 formatted_value = self._format_value(value, item_name)
                 
                 # 数値は右寄せで表示
                 canvas.setFont(self.japanese_font, 7)
                 if formatted_value != '-':
-                    value_width = canvas.stringWidth(formatted_value, self.japanese_font, 7)
+                    value_width = string_width(formatted_value, self.japanese_font, 7)
                     canvas.drawString(current_x + month_width - value_width - 3, item_y, formatted_value)
                 else:
                     draw_centered_text(canvas, self.japanese_font, 7, formatted_value, current_x, item_y, month_width)
@@ -546,7 +469,7 @@ class WageLedgerPDFGenerator:
             
             canvas.setFont(self.japanese_font, 7)
             if formatted_total != '-':
-                total_value_width = canvas.stringWidth(formatted_total, self.japanese_font, 7)
+                total_value_width = string_width(formatted_total, self.japanese_font, 7)
                 canvas.drawString(current_x + total_width - total_value_width - 3, item_y, formatted_total)
             else:
                 draw_centered_text(canvas, self.japanese_font, 7, formatted_total, current_x, item_y, total_width)
@@ -607,17 +530,15 @@ class WageLedgerPDFGenerator:
                 draw_justified_text(canvas, self.japanese_font, 7, item_name, table_x + label_col_width + 3, item_y, item_name_col_width - 6)
             
             # 各月のデータを描画
-            monthly_data = self._parse_json_field(wage_data.get(monthly_key, '{}'))
             current_x = table_x + item_width
             
-            for month in range(1, 13):
-                value = monthly_data.get(str(month), '')
+            for value in self._monthly_values(wage_data, monthly_key):
                 formatted_value = self._format_value(value, item_name)
                 
                 # 数値は右寄せで表示
                 canvas.setFont(self.japanese_font, 7)
                 if formatted_value != '-':
-                    value_width = canvas.stringWidth(formatted_value, self.japanese_font, 7)
+                    value_width = string_width(formatted_value, self.japanese_font, 7)
                     canvas.drawString(current_x + month_width - value_width - 3, item_y, formatted_value)
                 else:
                     draw_centered_text(canvas, self.japanese_font, 7, formatted_value, current_x, item_y, month_width)
@@ -630,7 +551,7 @@ class WageLedgerPDFGenerator:
             
             canvas.setFont(self.japanese_font, 7)
             if formatted_total != '-':
-                total_value_width = canvas.stringWidth(formatted_total, self.japanese_font, 7)
+                total_value_width = string_width(formatted_total, self.japanese_font, 7)
                 canvas.drawString(current_x + total_width - total_value_width - 3, item_y, formatted_total)
             else:
                 draw_centered_text(canvas, self.japanese_font, 7, formatted_total, current_x, item_y, total_width)
@@ -655,11 +576,20 @@ class WageLedgerPDFGenerator:
     def draw_company_name_below_table(self, canvas, page_width: float, table_end_y: float):
         """テーブル下に会社名を表示"""
         canvas.setFont(self.japanese_font, 12)
-        company_name = get_company_name()
-        company_width = canvas.stringWidth(company_name, self.japanese_font, 12)
+        company_name = self.company_name or get_company_name()
+        company_width = string_width(company_name, self.japanese_font, 12)
         # テーブル終了位置から15ポイント下に会社名を表示
         canvas.drawString((page_width - company_width) / 2, table_end_y - 15, company_name)
     
+    def _monthly_values(self, wage_data: Dict, key: str) -> List:
+        """月別データを12ヶ月分のリストで返す（値のない月は空文字）"""
+        values = wage_data.get(key)
+        if isinstance(values, (list, tuple)):
+            return [value if value is not None else '' for value in values[:12]] + [''] * (12 - len(values[:12]))
+        if not isinstance(values, dict):
+            values = self._parse_json_field(values)
+        return [values.get(str(month), '') for month in range(1, 13)]
+    
     def _parse_json_field(self, json_str: str) -> Dict:
         """JSON文字列をパース"""
         try:
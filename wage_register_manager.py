@@ -1,364 +1,262 @@
 #!/usr/bin/env python3
 """
 賃金台帳管理モジュール
-給与明細データを12ヶ月分集約して賃金台帳用に保存・更新する機能
+給与計算データを従業員・年・月ごとに1行（各項目は数値の列）として保存・更新し、
+年間合計は集計クエリで求める機能
+
+書き込みは SQLAlchemy のセッション経由で行うため、1か月分の更新は該当月の1行の
+upsert だけで済み、他の月の行を読み直すことはない。給与計算では計算結果と同じ
+トランザクションで stage_wage_registers を呼び、コミットを1回にまとめる。
+
+賃金台帳の値は給与計算結果（発行済みの給与明細があれば明細の値）から求める。
+食い違いの確認・修復:
+    python wage_register_manager.py verify <年> [月]
+    python wage_register_manager.py repair <年> [月]
 """
 
-import json
-import sqlite3
+import sys
 from datetime import datetime
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Iterable
+
+from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, PayrollCalculation, PayrollSlip, WageRegister
+
+# 賃金台帳の項目（給与計算データのキー = wage_register の列名）
+WAGE_REGISTER_ITEMS = (
+    # 支給項目
+    'base_salary', 'overtime_allowance', 'holiday_allowance', 'night_allowance',
+    'position_allowance', 'transportation_allowance', 'housing_allowance', 'family_allowance',
+    'other_allowances',
+    # 控除項目
+    'health_insurance', 'pension_insurance', 'employment_insurance', 'income_tax',
+    'resident_tax', 'other_deductions',
+    # 支給・控除合計
+    'gross_salary', 'total_deductions', 'net_salary',
+    # 労働時間データ
+    'working_days', 'overtime_hours', 'paid_leave_days', 'absence_days'
+)
+# 時間・日数で小数を持つ項目（その他は円単位の整数）
+FLOAT_ITEMS = frozenset({'overtime_hours', 'paid_leave_days', 'absence_days'})
+
+# 給与明細の列名が賃金台帳と異なる項目（賃金台帳 → 給与明細）
+SLIP_COLUMNS = {
+    'other_allowances': 'other_allowance',
+    'other_deductions': 'other_deduction',
+    'total_deductions': 'total_deduction',
+}
+
+wage_register_table = WageRegister.__table__
+
+def _item_value(payroll_data: Dict, item: str):
+    value = payroll_data.get(item) or 0
+    return float(value) if item in FLOAT_ITEMS else int(value)
+
+def register_values(calculation, slip=None, working_days: Optional[int] = None) -> Dict:
+    """給与計算結果から賃金台帳の1か月分の値を求める
+
+    発行済みの給与明細があれば明細の値を優先する（明細は手修正されることがあるため）。
+    出勤日数は給与計算結果に保存されないため、明細か working_days で与える。
+    どちらもなければ 'working_days' は None（既存の値を使う）。
+    """
+    values = {item: getattr(calculation, item, None) for item in WAGE_REGISTER_ITEMS}
+    values['overtime_hours'] = ((calculation.overtime_minutes or 0) + (calculation.legal_overtime_minutes or 0)) / 60.0
+    values['working_days'] = working_days
+    if slip is not None:
+        for item in WAGE_REGISTER_ITEMS:
+            values[item] = getattr(slip, SLIP_COLUMNS.get(item, item))
+    return {item: value if item == 'working_days' and value is None else _item_value(values, item)
+            for item, value in values.items()}
 
 class WageRegisterManager:
-    def __init__(self, db_path: str = 'instance/employees.db'):
-        self.db_path = db_path
+    def __init__(self, session=None):
+        self.session = session or db.session
 
     def update_wage_register(self, employee_id: int, year: int, month: int, payroll_data: Dict) -> bool:
         """
         給与計算データから賃金台帳を更新する
-        
+
         Args:
             employee_id: 従業員ID
             year: 年
             month: 月
             payroll_data: 給与計算データ
-        
+
         Returns:
-            bool: 更新成功時True
+            bool: 更新成功時True（失敗時はロールバックして例外を送出する）
+        """
+        self.update_wage_registers(year, month, [(employee_id, payroll_data)])
+        return True
+
+    def update_wage_registers(self, year: int, month: int, entries: List) -> int:
         """
+        複数従業員分の賃金台帳を1回の upsert・1回のコミットで更新する
+
+        Args:
+            year: 年
+            month: 月
+            entries: [(従業員ID, 給与計算データ), ...]
+
+        Returns:
+            int: 更新した従業員数
+        """
+        if not entries:
+            return 0
+
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 既存の賃金台帳データを取得
-            cursor.execute('''
-                SELECT * FROM wage_register WHERE employee_id = ? AND year = ?
-            ''', (employee_id, year))
-            
-            existing_record = cursor.fetchone()
-            
-            if existing_record:
-                # 既存レコードを更新
-                self._update_existing_register(cursor, employee_id, year, month, payroll_data)
-            else:
-                # 新規レコードを作成
-                self._create_new_register(cursor, employee_id, year, month, payroll_data)
-            
-            conn.commit()
-            conn.close()
-            return True
-            
-        except Exception as e:
-            print(f"Error updating wage register: {e}")
-            return False
-
-    def _update_existing_register(self, cursor, employee_id: int, year: int, month: int, payroll_data: Dict):
-        """既存の賃金台帳レコードを更新"""
-        
-        # 現在のJSONデータを取得
-        cursor.execute('''
-            SELECT monthly_base_salary, monthly_overtime_allowance, monthly_holiday_allowance,
-                   monthly_night_allowance, monthly_position_allowance, monthly_transportation_allowance,
-                   monthly_housing_allowance, monthly_family_allowance, monthly_other_allowances,
-                   monthly_health_insurance, monthly_pension_insurance, monthly_employment_insurance,
-                   monthly_income_tax, monthly_resident_tax, monthly_other_deductions,
-                   monthly_gross_salary, monthly_total_deductions, monthly_net_salary,
-                   monthly_working_days, monthly_overtime_hours, monthly_paid_leave_days, monthly_absence_days
-            FROM wage_register WHERE employee_id = ? AND year = ?
-        ''', (employee_id, year))
-        
-        current_data = cursor.fetchone()
-        
-        # JSONデータを解析・更新
-        monthly_data = {}
-        column_names = [
-            'monthly_base_salary', 'monthly_overtime_allowance', 'monthly_holiday_allowance',
-            'monthly_night_allowance', 'monthly_position_allowance', 'monthly_transportation_allowance',
-            'monthly_housing_allowance', 'monthly_family_allowance', 'monthly_other_allowances',
-            'monthly_health_insurance', 'monthly_pension_insurance', 'monthly_employment_insurance',
-            'monthly_income_tax', 'monthly_resident_tax', 'monthly_other_deductions',
-            'monthly_gross_salary', 'monthly_total_deductions', 'monthly_net_salary',
-            'monthly_working_days', 'monthly_overtime_hours', 'monthly_paid_leave_days', 'monthly_absence_days'
-        ]
-        
-        for i, col_name in enumerate(column_names):
-            try:
-                monthly_data[col_name] = json.loads(current_data[i] or '{}')
-            except (json.JSONDecodeError, TypeError):
-                monthly_data[col_name] = {}
-        
-        # 該当月のデータを更新
-        monthly_data['monthly_base_salary'][str(month)] = payroll_data.get('base_salary', 0)
-        monthly_data['monthly_overtime_allowance'][str(month)] = payroll_data.get('overtime_allowance', 0)
-        monthly_data['monthly_holiday_allowance'][str(month)] = payroll_data.get('holiday_allowance', 0)
-        monthly_data['monthly_night_allowance'][str(month)] = payroll_data.get('night_allowance', 0)
-        monthly_data['monthly_position_allowance'][str(month)] = payroll_data.get('position_allowance', 0)
-        monthly_data['monthly_transportation_allowance'][str(month)] = payroll_data.get('transportation_allowance', 0)
-        monthly_data['monthly_housing_allowance'][str(month)] = payroll_data.get('housing_allowance', 0)
-        monthly_data['monthly_family_allowance'][str(month)] = payroll_data.get('family_allowance', 0)
-        monthly_data['monthly_other_allowances'][str(month)] = payroll_data.get('other_allowances', 0)
-        
-        # 控除項目
-        monthly_data['monthly_health_insurance'][str(month)] = payroll_data.get('health_insurance', 0)
-        monthly_data['monthly_pension_insurance'][str(month)] = payroll_data.get('pension_insurance', 0)
-        monthly_data['monthly_employment_insurance'][str(month)] = payroll_data.get('employment_insurance', 0)
-        monthly_data['monthly_income_tax'][str(month)] = payroll_data.get('income_tax', 0)
-        monthly_data['monthly_resident_tax'][str(month)] = payroll_data.get('resident_tax', 0)
-        monthly_data['monthly_other_deductions'][str(month)] = payroll_data.get('other_deductions', 0)
-        
-        # 合計
-        monthly_data['monthly_gross_salary'][str(month)] = payroll_data.get('gross_salary', 0)
-        monthly_data['monthly_total_deductions'][str(month)] = payroll_data.get('total_deductions', 0)
-        monthly_data['monthly_net_salary'][str(month)] = payroll_data.get('net_salary', 0)
-        
-        # 労働時間データ
-        monthly_data['monthly_working_days'][str(month)] = payroll_data.get('working_days', 0)
-        monthly_data['monthly_overtime_hours'][str(month)] = payroll_data.get('overtime_hours', 0.0)
-        monthly_data['monthly_paid_leave_days'][str(month)] = payroll_data.get('paid_leave_days', 0.0)
-        monthly_data['monthly_absence_days'][str(month)] = payroll_data.get('absence_days', 0.0)
-        
-        # 年間合計を計算
-        annual_totals = self._calculate_annual_totals(monthly_data)
-        
-        # データベースを更新
-        cursor.execute('''
-            UPDATE wage_register SET
-                monthly_base_salary = ?, monthly_overtime_allowance = ?, monthly_holiday_allowance = ?,
-                monthly_night_allowance = ?, monthly_position_allowance = ?, monthly_transportation_allowance = ?,
-                monthly_housing_allowance = ?, monthly_family_allowance = ?, monthly_other_allowances = ?,
-                monthly_health_insurance = ?, monthly_pension_insurance = ?, monthly_employment_insurance = ?,
-                monthly_income_tax = ?, monthly_resident_tax = ?, monthly_other_deductions = ?,
-                monthly_gross_salary = ?, monthly_total_deductions = ?, monthly_net_salary = ?,
-                monthly_working_days = ?, monthly_overtime_hours = ?, monthly_paid_leave_days = ?, monthly_absence_days = ?,
-                annual_gross_salary = ?, annual_total_deductions = ?, annual_net_salary = ?, annual_overtime_hours = ?,
-                updated_at = ?
-            WHERE employee_id = ? AND year = ?
-        ''', (
-            json.dumps(monthly_data['monthly_base_salary']),
-            json.dumps(monthly_data['monthly_overtime_allowance']),
-            json.dumps(monthly_data['monthly_holiday_allowance']),
-            json.dumps(monthly_data['monthly_night_allowance']),
-            json.dumps(monthly_data['monthly_position_allowance']),
-            json.dumps(monthly_data['monthly_transportation_allowance']),
-            json.dumps(monthly_data['monthly_housing_allowance']),
-            json.dumps(monthly_data['monthly_family_allowance']),
-            json.dumps(monthly_data['monthly_other_allowances']),
-            json.dumps(monthly_data['monthly_health_insurance']),
-            json.dumps(monthly_data['monthly_pension_insurance']),
-            json.dumps(monthly_data['monthly_employment_insurance']),
-            json.dumps(monthly_data['monthly_income_tax']),
-            json.dumps(monthly_data['monthly_resident_tax']),
-            json.dumps(monthly_data['monthly_other_deductions']),
-            json.dumps(monthly_data['monthly_gross_salary']),
-            json.dumps(monthly_data['monthly_total_deductions']),
-            json.dumps(monthly_data['monthly_net_salary']),
-            json.dumps(monthly_data['monthly_working_days']),
-            json.dumps(monthly_data['monthly_overtime_hours']),
-            json.dumps(monthly_data['monthly_paid_leave_days']),
-            json.dumps(monthly_data['monthly_absence_days']),
-            annual_totals['annual_gross_salary'],
-            annual_totals['annual_total_deductions'],
-            annual_totals['annual_net_salary'],
-            annual_totals['annual_overtime_hours'],
-            datetime.now(),
-            employee_id, year
-        ))
-
-    def _create_new_register(self, cursor, employee_id: int, year: int, month: int, payroll_data: Dict):
-        """新規の賃金台帳レコードを作成"""
-        
-        # 12ヶ月分の空データを初期化
-        monthly_data = {}
-        for field in ['monthly_base_salary', 'monthly_overtime_allowance', 'monthly_holiday_allowance',
-                      'monthly_night_allowance', 'monthly_position_allowance', 'monthly_transportation_allowance',
-                      'monthly_housing_allowance', 'monthly_family_allowance', 'monthly_other_allowances',
-                      'monthly_health_insurance', 'monthly_pension_insurance', 'monthly_employment_insurance',
-                      'monthly_income_tax', 'monthly_resident_tax', 'monthly_other_deductions',
-                      'monthly_gross_salary', 'monthly_total_deductions', 'monthly_net_salary',
-                      'monthly_working_days', 'monthly_overtime_hours', 'monthly_paid_leave_days', 'monthly_absence_days']:
-            monthly_data[field] = {}
-        
-        # 該当月のデータを設定
-        monthly_data['monthly_base_salary'][str(month)] = payroll_data.get('base_salary', 0)
-        monthly_data['monthly_overtime_allowance'][str(month)] = payroll_data.get('overtime_allowance', 0)
-        monthly_data['monthly_holiday_allowance'][str(month)] = payroll_data.get('holiday_allowance', 0)
-        monthly_data['monthly_night_allowance'][str(month)] = payroll_data.get('night_allowance', 0)
-        monthly_data['monthly_position_allowance'][str(month)] = payroll_data.get('position_allowance', 0)
-        monthly_data['monthly_transportation_allowance'][str(month)] = payroll_data.get('transportation_allowance', 0)
-        monthly_data['monthly_housing_allowance'][str(month)] = payroll_data.get('housing_allowance', 0)
-        monthly_data['monthly_family_allowance'][str(month)] = payroll_data.get('family_allowance', 0)
-        monthly_data['monthly_other_allowances'][str(month)] = payroll_data.get('other_allowances', 0)
-        
-        monthly_data['monthly_health_insurance'][str(month)] = payroll_data.get('health_insurance', 0)
-        monthly_data['monthly_pension_insurance'][str(month)] = payroll_data.get('pension_insurance', 0)
-        monthly_data['monthly_employment_insurance'][str(month)] = payroll_data.get('employment_insurance', 0)
-        monthly_data['monthly_income_tax'][str(month)] = payroll_data.get('income_tax', 0)
-        monthly_data['monthly_resident_tax'][str(month)] = payroll_data.get('resident_tax', 0)
-        monthly_data['monthly_other_deductions'][str(month)] = payroll_data.get('other_deductions', 0)
-        
-        monthly_data['monthly_gross_salary'][str(month)] = payroll_data.get('gross_salary', 0)
-        monthly_data['monthly_total_deductions'][str(month)] = payroll_data.get('total_deductions', 0)
-        monthly_data['monthly_net_salary'][str(month)] = payroll_data.get('net_salary', 0)
-        
-        monthly_data['monthly_working_days'][str(month)] = payroll_data.get('working_days', 0)
-        monthly_data['monthly_overtime_hours'][str(month)] = payroll_data.get('overtime_hours', 0.0)
-        monthly_data['monthly_paid_leave_days'][str(month)] = payroll_data.get('paid_leave_days', 0.0)
-        monthly_data['monthly_absence_days'][str(month)] = payroll_data.get('absence_days', 0.0)
-        
-        # 年間合計を計算
-        annual_totals = self._calculate_annual_totals(monthly_data)
-        
-        # 新規レコードを挿入
-        cursor.execute('''
-            INSERT INTO wage_register (
-                employee_id, year,
-                monthly_base_salary, monthly_overtime_allowance, monthly_holiday_allowance,
-                monthly_night_allowance, monthly_position_allowance, monthly_transportation_allowance,
-                monthly_housing_allowance, monthly_family_allowance, monthly_other_allowances,
-                monthly_health_insurance, monthly_pension_insurance, monthly_employment_insurance,
-                monthly_income_tax, monthly_resident_tax, monthly_other_deductions,
-                monthly_gross_salary, monthly_total_deductions, monthly_net_salary,
-                monthly_working_days, monthly_overtime_hours, monthly_paid_leave_days, monthly_absence_days,
-                annual_gross_salary, annual_total_deductions, annual_net_salary, annual_overtime_hours,
-                created_at, updated_at, created_by
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            employee_id, year,
-            json.dumps(monthly_data['monthly_base_salary']),
-            json.dumps(monthly_data['monthly_overtime_allowance']),
-            json.dumps(monthly_data['monthly_holiday_allowance']),
-            json.dumps(monthly_data['monthly_night_allowance']),
-            json.dumps(monthly_data['monthly_position_allowance']),
-            json.dumps(monthly_data['monthly_transportation_allowance']),
-            json.dumps(monthly_data['monthly_housing_allowance']),
-            json.dumps(monthly_data['monthly_family_allowance']),
-            json.dumps(monthly_data['monthly_other_allowances']),
-            json.dumps(monthly_data['monthly_health_insurance']),
-            json.dumps(monthly_data['monthly_pension_insurance']),
-            json.dumps(monthly_data['monthly_employment_insurance']),
-            json.dumps(monthly_data['monthly_income_tax']),
-            json.dumps(monthly_data['monthly_resident_tax']),
-            json.dumps(monthly_data['monthly_other_deductions']),
-            json.dumps(monthly_data['monthly_gross_salary']),
-            json.dumps(monthly_data['monthly_total_deductions']),
-            json.dumps(monthly_data['monthly_net_salary']),
-            json.dumps(monthly_data['monthly_working_days']),
-            json.dumps(monthly_data['monthly_overtime_hours']),
-            json.dumps(monthly_data['monthly_paid_leave_days']),
-            json.dumps(monthly_data['monthly_absence_days']),
-            annual_totals['annual_gross_salary'],
-            annual_totals['annual_total_deductions'],
-            annual_totals['annual_net_salary'],
-            annual_totals['annual_overtime_hours'],
-            datetime.now(),
-            datetime.now(),
-            None  # created_by
-        ))
-
-    def _calculate_annual_totals(self, monthly_data: Dict) -> Dict:
-        """月次データから年間合計を計算"""
-        annual_gross_salary = sum(monthly_data['monthly_gross_salary'].values())
-        annual_total_deductions = sum(monthly_data['monthly_total_deductions'].values())
-        annual_net_salary = sum(monthly_data['monthly_net_salary'].values())
-        annual_overtime_hours = sum(monthly_data['monthly_overtime_hours'].values())
-        
-        return {
-            'annual_gross_salary': annual_gross_salary,
-            'annual_total_deductions': annual_total_deductions,
-            'annual_net_salary': annual_net_salary,
-            'annual_overtime_hours': annual_overtime_hours
-        }
+            self.stage_wage_registers(year, month, entries)
+            self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        return len(entries)
+
+    def stage_wage_registers(self, year: int, month: int, entries: List) -> None:
+        """賃金台帳の該当月の行をセッションのトランザクション内で upsert する（コミットは呼び出し側）"""
+        now = datetime.now()
+        values = [{
+            'employee_id': employee_id,
+            'year': year,
+            'month': month,
+            **{item: _item_value(payroll_data, item) for item in WAGE_REGISTER_ITEMS},
+            'created_at': now,
+            'updated_at': now,
+        } for employee_id, payroll_data in entries]
+
+        stmt = sqlite_insert(wage_register_table)
+        self.session.execute(stmt.on_conflict_do_update(
+            index_elements=['employee_id', 'year', 'month'],
+            set_={
+                **{item: stmt.excluded[item] for item in WAGE_REGISTER_ITEMS},
+                'updated_at': stmt.excluded.updated_at,
+            }
+        ), values)
+
+    def reconcile(self, year: int, month: Optional[int] = None, repair: bool = False) -> Dict:
+        """賃金台帳を給与計算結果・給与明細と突き合わせる（repair=True なら修復。コミットは呼び出し側）
+
+        給与計算結果と給与明細は1回の結合クエリ、賃金台帳は1回のクエリで読み込む。
+
+        Returns:
+            dict: 'checked'（給与計算の件数）、'missing'（台帳の行がない）、
+                  'mismatched'（値が異なる。項目ごとの保存値と期待値）、'orphaned'（給与計算のない台帳の行）
+        """
+        query = self.session.query(PayrollCalculation, PayrollSlip).outerjoin(
+            PayrollSlip, PayrollSlip.payroll_calculation_id == PayrollCalculation.id
+        ).filter(PayrollCalculation.year == year)
+        register_query = self.session.query(WageRegister).filter(WageRegister.year == year)
+        if month is not None:
+            query = query.filter(PayrollCalculation.month == month)
+            register_query = register_query.filter(WageRegister.month == month)
+
+        # 従業員・月ごとに最新の給与計算（と最新の給与明細）
+        expected = {}
+        for calculation, slip in query.order_by(PayrollCalculation.id, PayrollSlip.id):
+            expected[(calculation.employee_id, calculation.month)] = register_values(calculation, slip)
+        registers = {(row.employee_id, row.month): row for row in register_query}
+
+        result = {'checked': len(expected), 'missing': [], 'mismatched': [], 'orphaned': []}
+        repairs = {}
+        for key, values in expected.items():
+            row = registers.get(key)
+            if row is None:
+                result['missing'].append(key)
+                repairs[key] = values
+                continue
+            if values['working_days'] is None:
+                values['working_days'] = row.working_days
+            differences = {item: (getattr(row, item), value) for item, value in values.items()
+                           if getattr(row, item) != value}
+            if differences:
+                result['mismatched'].append({'key': key, 'differences': differences})
+                repairs[key] = values
+        result['orphaned'] = sorted(key for key in registers if key not in expected)
+
+        if repair:
+            # 月ごとに1回の upsert
+            entries_by_month = {}
+            for (employee_id, row_month), values in repairs.items():
+                entries_by_month.setdefault(row_month, []).append((employee_id, values))
+            for row_month, entries in sorted(entries_by_month.items()):
+                self.stage_wage_registers(year, row_month, entries)
+            if result['orphaned']:
+                self.session.query(WageRegister).filter(
+                    WageRegister.id.in_([registers[key].id for key in result['orphaned']])
+                ).delete(synchronize_session=False)
+        return result
+
+    def annual_totals(self, year: int, employee_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+        """従業員ごとの年間合計 {従業員ID: {項目: 合計, 'months': 月数}}（1回の集計クエリ）"""
+        query = self.session.query(
+            WageRegister.employee_id,
+            func.count(WageRegister.id),
+            *[func.coalesce(func.sum(getattr(WageRegister, item)), 0) for item in WAGE_REGISTER_ITEMS]
+        ).filter(WageRegister.year == year)
+        if employee_ids is not None:
+            query = query.filter(WageRegister.employee_id.in_(list(employee_ids)))
+
+        totals = {}
+        for employee_id, months, *sums in query.group_by(WageRegister.employee_id):
+            totals[employee_id] = dict(zip(WAGE_REGISTER_ITEMS, sums), months=months)
+        return totals
 
     def get_wage_register_data(self, employee_id: int, year: int) -> Optional[Dict]:
-        """指定した従業員・年の賃金台帳データを取得"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM wage_register WHERE employee_id = ? AND year = ?
-            ''', (employee_id, year))
-            
-            row = cursor.fetchone()
-            conn.close()
-            
-            if not row:
-                return None
-            
-            # カラム名のマッピング
-            columns = [
-                'id', 'employee_id', 'year',
-                'monthly_base_salary', 'monthly_overtime_allowance', 'monthly_holiday_allowance',
-                'monthly_night_allowance', 'monthly_position_allowance', 'monthly_transportation_allowance',
-                'monthly_housing_allowance', 'monthly_family_allowance', 'monthly_other_allowances',
-                'monthly_health_insurance', 'monthly_pension_insurance', 'monthly_employment_insurance',
-                'monthly_income_tax', 'monthly_resident_tax', 'monthly_other_deductions',
-                'monthly_gross_salary', 'monthly_total_deductions', 'monthly_net_salary',
-                'monthly_working_days', 'monthly_overtime_hours', 'monthly_paid_leave_days', 'monthly_absence_days',
-                'annual_gross_salary', 'annual_total_deductions', 'annual_net_salary', 'annual_overtime_hours',
-                'created_at', 'updated_at', 'created_by'
-            ]
-            
-            result = dict(zip(columns, row))
-            
-            # JSONフィールドをパース
-            json_fields = [
-                'monthly_base_salary', 'monthly_overtime_allowance', 'monthly_holiday_allowance',
-                'monthly_night_allowance', 'monthly_position_allowance', 'monthly_transportation_allowance',
-                'monthly_housing_allowance', 'monthly_family_allowance', 'monthly_other_allowances',
-                'monthly_health_insurance', 'monthly_pension_insurance', 'monthly_employment_insurance',
-                'monthly_income_tax', 'monthly_resident_tax', 'monthly_other_deductions',
-                'monthly_gross_salary', 'monthly_total_deductions', 'monthly_net_salary',
-                'monthly_working_days', 'monthly_overtime_hours', 'monthly_paid_leave_days', 'monthly_absence_days'
-            ]
-            
-            for field in json_fields:
-                try:
-                    result[field] = json.loads(result[field] or '{}')
-                except (json.JSONDecodeError, TypeError):
-                    result[field] = {}
-            
-            return result
-            
-        except Exception as e:
-            print(f"Error getting wage register data: {e}")
+        """指定した従業員・年の賃金台帳データを取得
+
+        monthly_<項目> は {"月": 値}、annual_<項目> は年間合計。データがなければ None
+        """
+        rows = self.session.query(WageRegister).filter_by(
+            employee_id=employee_id, year=year
+        ).order_by(WageRegister.month).all()
+        if not rows:
             return None
 
+        result = {'employee_id': employee_id, 'year': year}
+        for item in WAGE_REGISTER_ITEMS:
+            monthly = {str(row.month): getattr(row, item) for row in rows}
+            result[f'monthly_{item}'] = monthly
+            result[f'annual_{item}'] = sum(monthly.values())
+        return result
+
+def main():
+    args = sys.argv[1:]
+    command = args[0] if args else None
+
+    if command not in ('verify', 'repair') or len(args) not in (2, 3):
+        print("Usage: python wage_register_manager.py verify | repair <year> [month]")
+        sys.exit(1)
+    year = int(args[1])
+    month = int(args[2]) if len(args) == 3 else None
+    period = f"{year}年{month}月" if month else f"{year}年"
+
+    from app import app
+    with app.app_context():
+        manager = WageRegisterManager()
+        result = manager.reconcile(year, month, repair=(command == 'repair'))
+        problems = len(result['missing']) + len(result['mismatched']) + len(result['orphaned'])
+
+        if command == 'repair':
+            db.session.commit()
+            print(f"✅ {period}の賃金台帳を修復しました: 追加{len(result['missing'])}件 / "
+                  f"更新{len(result['mismatched'])}件 / 削除{len(result['orphaned'])}件")
+            return
+
+        if not problems:
+            print(f"✅ {period}の賃金台帳は給与計算結果と一致しています（{result['checked']}件）")
+            return
+        for employee_id, row_month in result['missing'][:50]:
+            print(f"❌ 従業員ID {employee_id} {year}年{row_month}月: 賃金台帳の行がありません")
+        for mismatch in result['mismatched'][:50]:
+            employee_id, row_month = mismatch['key']
+            details = ', '.join(f"{item}: 保存値={stored} 期待値={value}"
+                                for item, (stored, value) in mismatch['differences'].items())
+            print(f"❌ 従業員ID {employee_id} {year}年{row_month}月: {details}")
+        for employee_id, row_month in result['orphaned'][:50]:
+            print(f"❌ 従業員ID {employee_id} {year}年{row_month}月: 給与計算結果のない賃金台帳の行です")
+        print(f"💡 {problems}件の食い違いがあります。python wage_register_manager.py repair {' '.join(args[1:])} で修復してください。")
+        sys.exit(1)
+
+
 if __name__ == "__main__":
-    # テスト用コード
-    manager = WageRegisterManager()
-    
-    # サンプルデータでテスト
-    sample_payroll = {
-        'base_salary': 250000,
-        'overtime_allowance': 19054,
-        'holiday_allowance': 30868,
-        'night_allowance': 0,
-        'position_allowance': 0,
-        'transportation_allowance': 0,
-        'housing_allowance': 0,
-        'family_allowance': 0,
-        'other_allowances': 0,
-        'health_insurance': 0,
-        'pension_insurance': 0,
-        'employment_insurance': 0,
-        'income_tax': 0,
-        'resident_tax': 0,
-        'other_deductions': 0,
-        'gross_salary': 299922,
-        'total_deductions': 0,
-        'net_salary': 299922,
-        'working_days': 22,
-        'overtime_hours': 17.5,
-        'paid_leave_days': 0.0,
-        'absence_days': 0.0
-    }
-    
-    result = manager.update_wage_register(4, 2024, 11, sample_payroll)
-    print(f"Update result: {result}")
-    
-    data = manager.get_wage_register_data(4, 2024)
-    if data:
-        print(f"Retrieved data for employee 4, year 2024:")
-        print(f"  Annual gross salary: ¥{data['annual_gross_salary']:,}")
-        print(f"  November gross salary: ¥{data['monthly_gross_salary'].get('11', 0):,}")
\ No newline at end of file
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+週40時間制限エンジン
+労働基準法第32条に基づき、週40時間を超える労働時間を法定外労働時間として再分類する
+
+対象月に掛かる週（月曜日起算）の全期間を1回の範囲クエリで取得し、
+メモリ上で週ごとに振り分けて再分類する。値が変わったレコードのみ更新する。
+複数従業員をまとめて処理できる。
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import Dict, Iterable, List
+
+from models import WorkingTimeRecord
+
+WEEKLY_LIMIT_MINUTES = 40 * 60  # 週40時間 = 2400分
+
+
+def week_monday(work_date: date) -> date:
+    """その日が属する週の月曜日を返す"""
+    return work_date - timedelta(days=work_date.weekday())
+
+
+def month_week_window(year: int, month: int):
+    """対象月に掛かる週の期間（最初の週の月曜日〜最後の週の日曜日）を返す"""
+    _, days_in_month = calendar.monthrange(year, month)
+    first_monday = week_monday(date(year, month, 1))
+    last_sunday = week_monday(date(year, month, days_in_month)) + timedelta(days=6)
+    return first_monday, last_sunday
+
+
+def distribute_week(week_records: List, year: int, month: int) -> Dict:
+    """1週間分のレコードについて、対象月のレコードの法定内・法定外労働時間を算出する
+
+    週合計のうち40時間以内の比率で、対象月の労働時間を日付順に法定内から割り当て、
+    残りを法定外労働時間とする（月をまたぐ週にも対応）。
+
+    Args:
+        week_records: 同一従業員・同一週のレコード（日付順）
+        year: 対象年
+        month: 対象月
+
+    Returns:
+        dict: {record: (法定内労働時間, 法定外労働時間)}
+    """
+    # 法定休日労働は週40時間計算から除外
+    workday_records = []
+    total_work_minutes = 0
+    for record in week_records:
+        if record.holiday_minutes and record.holiday_minutes > 0:
+            continue
+        daily_work_minutes = (record.regular_working_minutes or 0) + (record.overtime_minutes or 0)
+        if daily_work_minutes > 0:
+            total_work_minutes += daily_work_minutes
+            workday_records.append((record, daily_work_minutes))
+
+    if total_work_minutes <= 0:
+        return {}
+
+    # 対象月のレコードのみを更新（クロスマンス考慮）
+    target_month_records = [
+        (record, daily_minutes) for record, daily_minutes in workday_records
+        if record.work_date.year == year and record.work_date.month == month
+    ]
+    target_month_total = sum(daily_minutes for _, daily_minutes in target_month_records)
+    if target_month_total <= 0:
+        return {}
+
+    # 対象月の労働時間を週の比例で法定内・法定外に分配
+    legal_regular_minutes = min(total_work_minutes, WEEKLY_LIMIT_MINUTES)
+    month_regular_ratio = min(1.0, legal_regular_minutes / total_work_minutes)
+    remaining_month_regular = int(target_month_total * month_regular_ratio)
+
+    distribution = {}
+    for record, daily_minutes in sorted(target_month_records, key=lambda x: x[0].work_date):
+        daily_regular = min(daily_minutes, remaining_month_regular)
+        remaining_month_regular -= daily_regular
+        distribution[record] = (daily_regular, daily_minutes - daily_regular)
+    return distribution
+
+
+def apply_weekly_limit(employee_ids: Iterable[int], year: int, month: int) -> int:
+    """対象従業員・対象月の週40時間制限を適用する（コミットはしない）
+
+    Args:
+        employee_ids: 従業員ID
+        year: 年
+        month: 月
+
+    Returns:
+        int: 労働時間区分を変更したレコード数
+    """
+    employee_ids = list(employee_ids)
+    if not employee_ids:
+        return 0
+
+    # 対象期間のレコードを1回で取得
+    window_start, window_end = month_week_window(year, month)
+    records = WorkingTimeRecord.query.filter(
+        WorkingTimeRecord.employee_id.in_(employee_ids),
+        WorkingTimeRecord.work_date >= window_start,
+        WorkingTimeRecord.work_date <= window_end
+    ).order_by(WorkingTimeRecord.employee_id, WorkingTimeRecord.work_date).all()
+
+    # 従業員・週ごとに振り分け
+    weeks = {}
+    for record in records:
+        weeks.setdefault((record.employee_id, week_monday(record.work_date)), []).append(record)
+
+    changed = 0
+    for week_records in weeks.values():
+        for record, (regular, overtime) in distribute_week(week_records, year, month).items():
+            if record.regular_working_minutes != regular or record.overtime_minutes != overtime:
+                record.regular_working_minutes = regular
+                record.overtime_minutes = overtime
+                changed += 1
+    return changed
+
+
+def reclassify_weekly_overtime(weekly_data: Dict) -> List:
+    """週40時間超過分を後半の労働日から法定外残業に再分類する（コミットはしない）
+
+    Args:
+        weekly_data: {週開始日: {'total_minutes': int, 'records': [record, ...]}}
+
+    Returns:
+        list: 再分類したレコード
+    """
+    changed_records = []
+
+    for week_start, week_info in weekly_data.items():
+        # その週の法定休日以外の労働記録を取得
+        workday_records = []
+        total_workday_minutes = 0
+
+        for record in week_info['records']:
+            # 法定休日労働は週40時間計算から除外
+            if record.legal_holiday_minutes and record.legal_holiday_minutes > 0:
+                continue
+
+            # 平日・法定外休日の労働時間を集計
+            daily_minutes = record.regular_working_minutes or 0
+            if daily_minutes > 0:
+                workday_records.append((record, daily_minutes))
+                total_workday_minutes += daily_minutes
+
+        # 週40時間を超過している場合の再分類
+        if total_workday_minutes > WEEKLY_LIMIT_MINUTES:
+            # 週の労働日を時系列で並び替え（月曜日から日曜日順）
+            workday_records.sort(key=lambda x: x[0].work_date)
+
+            # 逆順（日曜日から）で超過時間を時間外労働に分類
+            remaining_overtime = total_workday_minutes - WEEKLY_LIMIT_MINUTES
+            for record, daily_minutes in reversed(workday_records):
+                if remaining_overtime <= 0:
+                    break
+
+                overtime_for_this_day = min(remaining_overtime, daily_minutes)
+                record.regular_working_minutes = daily_minutes - overtime_for_this_day
+                record.overtime_minutes = overtime_for_this_day
+                changed_records.append(record)
+
+                remaining_overtime -= overtime_for_this_day
+
+    return changed_records
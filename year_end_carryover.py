@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+年度繰越
+繰越元年度の資産・負債・純資産科目の期末残高を、繰越先年度の期首残高（OpeningBalance）にする仕組み
+
+期末残高は試算表（全科目を1回で集計）から求め、期首残高は1回の一括 UPSERT で書き込む。
+plan_carryover() は書き込まずに繰越案と既存の期首残高との差分を返すので、
+実行前の確認（ドライラン）にも使う。
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from cache_versions import LEDGER_VERSION, bump_version
+from models import db, OpeningBalance
+from trial_balance import build_trial_balance
+
+# 繰越する科目区分
+CARRYOVER_ACCOUNT_TYPES = ('資産', '負債', '純資産')
+
+opening_table = OpeningBalance.__table__
+
+
+def plan_carryover(from_period, to_year: int) -> list:
+    """繰越案（科目ごとの 現在の期首残高・繰越後の期首残高・差額）を作る（書き込みはしない）
+
+    繰越後の期首残高は、繰越元年度の期首残高＋当期の借方−貸方（借方プラス・貸方マイナス）。
+    """
+    trial_balance = build_trial_balance(from_period.fiscal_year, from_period.start_date,
+                                        from_period.end_date + timedelta(days=1))
+    current_balances = dict(db.session.query(OpeningBalance.account_id, OpeningBalance.opening_balance).filter(
+        OpeningBalance.fiscal_year == to_year
+    ))
+
+    plan = []
+    for line in trial_balance.lines:
+        if line.account_type not in CARRYOVER_ACCOUNT_TYPES:
+            continue
+        current_balance = current_balances.get(line.account_id)
+        difference = line.closing - (current_balance or 0)
+        plan.append(SimpleNamespace(
+            account_id=line.account_id,
+            account_code=line.account_code,
+            account_name=line.account_name,
+            account_type=line.account_type,
+            current_balance=current_balance,
+            new_balance=line.closing,
+            difference=difference,
+            changed=difference != 0  # 未設定の科目は残高0とみなす
+        ))
+    return plan
+
+
+def apply_carryover(from_period, to_year: int, plan: list) -> int:
+    """繰越案を期首残高に一括で書き込み、繰越元年度を締める（コミットは呼び出し側）
+
+    戻り値は残高のある（ゼロでない）科目数。
+    """
+    now = datetime.now()
+    values = [{
+        'fiscal_year': to_year,
+        'account_id': row.account_id,
+        'opening_balance': row.new_balance,
+        'source_type': 'carryover',
+        'created_at': now,
+        'updated_at': now,
+    } for row in plan]
+
+    if values:
+        stmt = sqlite_insert(opening_table)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=['fiscal_year', 'account_id'],
+            set_={
+                'opening_balance': stmt.excluded.opening_balance,
+                'source_type': stmt.excluded.source_type,
+                'updated_at': stmt.excluded.updated_at,
+            }
+        ), values)
+        # ORM を通さない書き込みなので試算表のキャッシュを明示的に無効化
+        bump_version(db.session.connection(), LEDGER_VERSION)
+
+    from_period.is_closed = True
+    from_period.closing_date = now
+    return sum(1 for row in plan if row.new_balance != 0)
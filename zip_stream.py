@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ZIPストリーミング
+一括ダウンロードの ZIP を、ファイルができた順にレスポンスへ流す機能
+
+ZIP 全体をメモリ（BytesIO）に組み立ててから返すと、全ファイル分のメモリを
+使ううえ、最初の1バイトが届くまで全件の作成を待つことになる。
+ここではシークできない出力先に ZipFile で書き込み（データディスクリプタ形式）、
+1ファイル書き込むごとに溜まったバイト列をジェネレーターから返す。
+
+一括作成の描画結果（render_pool.iter_rendered）を ZIP の項目にする処理もここにまとめる。
+描画に失敗したジョブはエラー一覧のテキストとして最後に加える。
+"""
+
+import io
+import zipfile
+from typing import Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from flask import Response, stream_with_context
+
+ERROR_LIST_FILENAME = 'エラー一覧.txt'
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """ZipFile の書き込み先（書き込んだバイト列を取り出すまで保持する）"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        """溜まったバイト列を取り出す"""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip_stream(entries: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """(ファイル名, データ) を順に ZIP にして、できた部分から返す"""
+    buffer = _ZipStreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for filename, data in entries:
+            zip_file.writestr(filename, data)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    # 中央ディレクトリ
+    yield buffer.drain()
+
+
+def streaming_zip_response(entries: Iterable[Tuple[str, bytes]], download_name: str) -> Response:
+    """ZIP をストリーミングで返すレスポンスを作成する
+
+    entries はレスポンス送信中に評価されるため、リクエストコンテキスト
+    （データベースセッション）を保ったまま実行する。
+    """
+    response = Response(stream_with_context(iter_zip_stream(entries)), mimetype='application/zip')
+    encoded_filename = quote(download_name, safe='')
+    response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{encoded_filename}"
+    return response
+
+
+def write_rendered_to_zip(rendered: Iterable[Tuple[Dict, Optional[bytes], Optional[Exception]]], total: int,
+                          zip_file, describe_error: Callable[[Dict, Exception], str],
+                          progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """描画結果 (ジョブ, データ, エラー) を ZIP に書き込む
+
+    Args:
+        rendered: render_pool.iter_rendered の戻り値（ジョブは 'filename' を持つ）
+        total: 全件数
+        zip_file: 書き込み先の zipfile.ZipFile
+        describe_error: 失敗したジョブのエラー一覧の行を返す関数（ログ出力もここで行う）
+        progress: 1件終わるごとに (処理済み件数, 全件数) で呼ばれる関数
+
+    Returns:
+        dict: 'generated'（生成件数）、'errors'（エラー一覧の行）
+    """
+    result = {'generated': 0, 'errors': []}
+    for done, (job, data, error) in enumerate(rendered, start=1):
+        if error is None:
+            zip_file.writestr(job['filename'], data)
+            result['generated'] += 1
+        else:
+            result['errors'].append(describe_error(job, error))
+        if progress:
+            progress(done, total)
+    if result['errors']:
+        zip_file.writestr(ERROR_LIST_FILENAME, '\n'.join(result['errors']).encode('utf-8'))
+    return result
+
+
+def iter_rendered_zip_entries(rendered: Iterable[Tuple[Dict, Optional[bytes], Optional[Exception]]],
+                              describe_error: Callable[[Dict, Exception], str]) -> Iterator[Tuple[str, bytes]]:
+    """ZIP ストリーミング用に描画結果から (ファイル名, データ) を返す
+
+    描画に失敗したジョブがあれば、最後にエラー一覧のテキストを加える。
+    """
+    errors = []
+    for job, data, error in rendered:
+        if error is None:
+            yield job['filename'], data
+        else:
+            errors.append(describe_error(job, error))
+
+    if errors:
+        yield ERROR_LIST_FILENAME, '\n'.join(errors).encode('utf-8')